@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Body cleaning throughput of ``CSVExporter.clean_bodies`` by worker count.
+
+Cleans the bodies of a seeded synthetic mailbox with 1, 2, ... worker
+processes and reports bodies per second, then cleans them again with the
+same exporter to show the cost of a re-export served from the body-hash
+cache, and with a new exporter reading them from a SQLite storage (the
+cost of a later export, see ``EmailStorage.get_cleaned_bodies``).
+Speedups need as many free cores as workers.
+
+Usage::
+
+    python benchmarks/bench_clean_bodies.py --messages 50000 --workers 1,2,4,8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from outlook_extractor.core.synthetic_mailbox import SyntheticMailbox  # noqa: E402
+from outlook_extractor.export.csv_exporter import CLEAN_CHUNK_SIZE, CSVExporter  # noqa: E402
+from outlook_extractor.storage import SQLiteStorage  # noqa: E402
+
+
+def mailbox_bodies(mailbox: SyntheticMailbox):
+    """(body, is_html) pairs of a synthetic mailbox."""
+    bodies = []
+    for index in range(len(mailbox)):
+        spec = mailbox.message(index)
+        bodies.append((spec.html_body, True) if spec.html_body else (spec.body, False))
+    return bodies
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=20000, help='Mailbox size')
+    parser.add_argument('--seed', type=int, default=42, help='Mailbox seed')
+    parser.add_argument('--workers', default='1,2,4', help='Comma-separated worker counts')
+    parser.add_argument('--chunk-size', type=int, default=CLEAN_CHUNK_SIZE, help='Bodies per worker task')
+    args = parser.parse_args()
+
+    bodies = mailbox_bodies(SyntheticMailbox(message_count=args.messages, seed=args.seed))
+    megabytes = sum(len(body) for body, _ in bodies) / 1e6
+    print(f"{len(bodies)} bodies, {megabytes:.1f} MB, {os.cpu_count()} CPUs")
+    for workers in [int(count) for count in args.workers.split(',') if count.strip()]:
+        exporter = CSVExporter()
+        started = time.perf_counter()
+        for _ in exporter.clean_bodies(bodies, workers=workers, chunk_size=args.chunk_size):
+            pass
+        cold = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in exporter.clean_bodies(bodies, workers=workers, chunk_size=args.chunk_size):
+            pass
+        cached = time.perf_counter() - started
+        with tempfile.TemporaryDirectory() as directory:
+            storage = SQLiteStorage(str(Path(directory) / 'emails.db'))
+            for _ in exporter.clean_bodies(bodies, workers=workers, store=storage):
+                pass
+            started = time.perf_counter()
+            for _ in CSVExporter().clean_bodies(bodies, workers=workers, store=storage):
+                pass
+            stored = time.perf_counter() - started
+            storage.close()
+        print(f"{workers:>3} workers  {cold:>7.2f}s  {len(bodies) / cold:>9.0f} bodies/s  "
+              f"{megabytes / cold:>6.1f} MB/s   cached {cached:>6.2f}s   stored {stored:>6.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
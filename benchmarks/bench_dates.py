@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Date parsing throughput: core.dates against the parsers it replaced.
+
+Parses the same timestamps with the previous ``EmailThread._parse_date``
+(six ``strptime`` formats in turn), the previous ``JSONStorage._parse_date``
+and ``core.dates``, and times a date-range filter that reparses every row
+against one that compares cached epoch seconds.
+
+Timestamps are ISO 8601 as the extractor writes them (``isoformat()``), or
+in the space-separated layout of older exports with ``--layout legacy``.
+
+Usage::
+
+    python benchmarks/bench_dates.py --count 1000000
+    python benchmarks/bench_dates.py --count 200000 --layout legacy
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from outlook_extractor.core.dates import DateParser  # noqa: E402
+
+START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def previous_thread_parse(date_str):
+    """EmailThread._parse_date before core.dates."""
+    if not date_str:
+        return None
+    for fmt in (
+        '%Y-%m-%d %H:%M:%S%z',
+        '%Y-%m-%d %H:%M:%S',
+        '%Y-%m-%d',
+        '%m/%d/%Y %H:%M:%S %p',
+        '%m/%d/%Y %H:%M:%S',
+        '%m/%d/%Y',
+    ):
+        try:
+            dt = datetime.strptime(date_str, fmt)
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return dt
+        except ValueError:
+            continue
+    return None
+
+
+def previous_storage_parse(date_str):
+    """JSONStorage._parse_date before core.dates."""
+    if not date_str:
+        return None
+    try:
+        if 'T' in date_str:
+            return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%m/%d/%Y %H:%M:%S', '%m/%d/%Y'):
+            try:
+                return datetime.strptime(date_str, fmt)
+            except ValueError:
+                continue
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
+def timestamps(count: int, layout: str, seed: int):
+    """Random timestamps over five years."""
+    rng = random.Random(seed)
+    values = []
+    for _ in range(count):
+        moment = START + timedelta(seconds=rng.randrange(5 * 365 * 86400))
+        values.append(moment.isoformat() if layout == 'iso' else moment.strftime('%Y-%m-%d %H:%M:%S'))
+    return values
+
+
+def timed(label, function, values, rows):
+    started = time.perf_counter()
+    parsed = sum(1 for value in values if function(value) is not None)
+    seconds = time.perf_counter() - started
+    rows.append((label, seconds, parsed))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=1_000_000, help='Number of timestamps')
+    parser.add_argument('--layout', choices=['iso', 'legacy'], default='iso',
+                        help="'iso' (isoformat) or 'legacy' ('YYYY-MM-DD HH:MM:SS')")
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    args = parser.parse_args()
+
+    values = timestamps(args.count, args.layout, args.seed)
+    rows = []
+    timed('previous EmailThread._parse_date', previous_thread_parse, values, rows)
+    timed('previous JSONStorage._parse_date', previous_storage_parse, values, rows)
+    timed('DateParser.parse', DateParser().parse, values, rows)
+    timed('DateParser.to_epoch', DateParser().to_epoch, values, rows)
+
+    # Range filter over the same rows: reparse per query vs cached epochs
+    low, high = START + timedelta(days=365), START + timedelta(days=730)
+    started = time.perf_counter()
+    matched = 0
+    for value in values:
+        parsed = previous_thread_parse(value) or previous_storage_parse(value)
+        if parsed is not None:
+            parsed = parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+            matched += low <= parsed <= high
+    rows.append(('range filter, reparsing', time.perf_counter() - started, matched))
+
+    date_parser = DateParser()
+    epochs = [date_parser.to_epoch(value) for value in values]
+    low_epoch, high_epoch = int(low.timestamp()), int(high.timestamp())
+    started = time.perf_counter()
+    matched = sum(1 for epoch in epochs if epoch is not None and low_epoch <= epoch <= high_epoch)
+    rows.append(('range filter, epoch ints', time.perf_counter() - started, matched))
+
+    print(f"{args.count} timestamps, {args.layout} layout")
+    print(f"{'':<36} {'seconds':>8} {'per value':>10} {'parsed':>9}")
+    for label, seconds, parsed in rows:
+        print(f"{label:<36} {seconds:>8.2f} {seconds / max(args.count, 1) * 1e6:>8.2f}us {parsed:>9}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
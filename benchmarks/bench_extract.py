@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+End-to-end extraction benchmark against the fake Outlook object model.
+
+Builds a seeded synthetic mailbox, runs ``OutlookExtractor.extract_emails``
+over all of its folders into a temporary SQLite database and reports
+throughput and the COM calls made.
+
+Usage::
+
+    python benchmarks/bench_extract.py --messages 10000
+    python benchmarks/bench_extract.py --messages 1000000 --profile headers --call-latency-us 20
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from outlook_extractor.config import ConfigManager  # noqa: E402
+from outlook_extractor.core.fake_outlook import FakeOutlookApplication  # noqa: E402
+from outlook_extractor.core.synthetic_mailbox import SyntheticMailbox  # noqa: E402
+from outlook_extractor.extractor import OutlookExtractor  # noqa: E402
+
+
+def run(messages: int, seed: int, profile: str, attachments: bool,
+        call_latency: float, body_latency_per_kb: float, work_dir: str) -> dict:
+    """Run one extraction and return timing and call statistics."""
+    started = time.perf_counter()
+    mailbox = SyntheticMailbox(message_count=messages, seed=seed)
+    generate_seconds = time.perf_counter() - started
+
+    config = ConfigManager()
+    config.config['storage']['sqlite_path'] = os.path.join(work_dir, 'emails.db')
+    config.config['storage']['output_dir'] = work_dir
+    extractor = OutlookExtractor(config=config)
+    outlook = FakeOutlookApplication(mailbox, call_latency=call_latency,
+                                     body_latency_per_kb=body_latency_per_kb)
+    extractor.outlook_client = outlook
+
+    try:
+        started = time.perf_counter()
+        result = extractor.extract_emails(
+            mailbox.folder_names, mailbox.start, mailbox.end,
+            extraction_profile=profile, extract_attachments=attachments
+        )
+        extract_seconds = time.perf_counter() - started
+    finally:
+        extractor.close()
+
+    return {
+        'messages': messages,
+        'generate_seconds': round(generate_seconds, 3),
+        'extract_seconds': round(extract_seconds, 3),
+        'messages_per_second': round(result.get('emails_processed', 0) / extract_seconds, 1),
+        'com_calls': outlook.total_calls,
+        'com_calls_per_message': round(outlook.total_calls / max(messages, 1), 1),
+        'result': {k: v for k, v in result.items() if k not in ('threads', 'emails')},
+        'top_calls': outlook.call_counts.most_common(10),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=10_000, help='Mailbox size')
+    parser.add_argument('--seed', type=int, default=42, help='Mailbox seed')
+    parser.add_argument('--profile', choices=['headers', 'text', 'full'], default='text',
+                        help='Body extraction profile')
+    parser.add_argument('--attachments', action='store_true', help='Save attachments')
+    parser.add_argument('--call-latency-us', type=float, default=0.0,
+                        help='Simulated latency per COM call in microseconds')
+    parser.add_argument('--body-latency-us-per-kb', type=float, default=0.0,
+                        help='Extra simulated latency per KB of body in microseconds')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix='bench_extract_') as work_dir:
+        stats = run(args.messages, args.seed, args.profile, args.attachments,
+                    args.call_latency_us / 1e6, args.body_latency_us_per_kb / 1e6, work_dir)
+
+    for key in ('messages', 'generate_seconds', 'extract_seconds', 'messages_per_second',
+                'com_calls', 'com_calls_per_message'):
+        print(f"{key:<24} {stats[key]}")
+    print(f"{'result':<24} {stats['result']}")
+    print('top COM calls:')
+    for name, count in stats['top_calls']:
+        print(f"  {name:<32} {count}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
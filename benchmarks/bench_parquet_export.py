@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Parquet export against CSV: write time, file size and reload time.
+
+Exports the same seeded synthetic mailbox with
+``CSVExporter.export_emails_to_csv`` and ``ParquetExporter.export_emails``,
+then loads each file back with pandas (and DuckDB, if installed), the way
+downstream analysis reads exports. Needs pyarrow.
+
+Usage::
+
+    python benchmarks/bench_parquet_export.py --messages 20000
+    python benchmarks/bench_parquet_export.py --messages 100000 --row-group-size 20000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_csv_stream import export_dicts  # noqa: E402
+from outlook_extractor.core.synthetic_mailbox import SyntheticMailbox  # noqa: E402
+from outlook_extractor.export import CSVExporter, ParquetExporter  # noqa: E402
+from outlook_extractor.export.parquet_exporter import ROW_GROUP_SIZE, parquet_available  # noqa: E402
+
+
+def timed(function, *args, **kwargs):
+    """Call a function and return (result, seconds)."""
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=20000, help='Mailbox size')
+    parser.add_argument('--seed', type=int, default=42, help='Mailbox seed')
+    parser.add_argument('--row-group-size', type=int, default=ROW_GROUP_SIZE, help='Parquet row group size')
+    args = parser.parse_args()
+
+    if not parquet_available():
+        print('pyarrow is not installed (pip install pyarrow)', file=sys.stderr)
+        return 1
+    import pandas as pd
+    try:
+        import duckdb
+    except ImportError:
+        duckdb = None
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = str(Path(directory) / 'emails.csv')
+        parquet_path = str(Path(directory) / 'emails.parquet')
+
+        def mailbox():
+            return export_dicts(SyntheticMailbox(message_count=args.messages, seed=args.seed))
+
+        _, csv_write = timed(CSVExporter().export_emails_to_csv, mailbox(), csv_path)
+        _, parquet_write = timed(ParquetExporter().export_emails, mailbox(), parquet_path,
+                                 row_group_size=args.row_group_size)
+        # CSV needs its dates parsed to match the Parquet types
+        _, csv_load = timed(pd.read_csv, csv_path,
+                            parse_dates=['sent_datetime', 'received_datetime'])
+        _, parquet_load = timed(pd.read_parquet, parquet_path)
+
+        print(f"{args.messages} emails")
+        print(f"{'':<10}{'write':>10}{'pandas load':>14}{'duckdb query':>15}{'size':>12}")
+        for name, path, write, load in (('csv', csv_path, csv_write, csv_load),
+                                        ('parquet', parquet_path, parquet_write, parquet_load)):
+            query = ''
+            if duckdb is not None:
+                reader = 'read_csv_auto' if name == 'csv' else 'read_parquet'
+                _, seconds = timed(lambda: duckdb.sql(
+                    f"SELECT parent_folder, count(*) FROM {reader}('{path}') GROUP BY 1").fetchall())
+                query = f"{seconds:>14.2f}s"
+            print(f"{name:<10}{write:>9.2f}s{load:>13.2f}s{query:>15}"
+                  f"{os.path.getsize(path) / 1e6:>9.1f} MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Compare import-time startup cost of the headless CLI and the GUI.
+
+Each entry point is imported in a fresh interpreter with ``-X importtime``
+and the cumulative import time of the entry module is reported, together
+with wall-clock time for the whole interpreter run.
+
+Usage::
+
+    python benchmarks/bench_startup.py [--repeat 5]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = {
+    'cli': 'outlook_extractor.cli',
+    'gui': 'outlook_extractor.ui.main_window',
+}
+
+
+def measure(module: str):
+    """Import a module in a fresh interpreter.
+
+    Returns:
+        Tuple of (cumulative import microseconds or None, wall seconds, error)
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if completed.returncode != 0:
+        last_line = completed.stderr.strip().splitlines()[-1:] or ['import failed']
+        return None, wall, last_line[0]
+
+    cumulative = None
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative = int(parts[1].strip())
+    return cumulative, wall, None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per entry point')
+    args = parser.parse_args()
+
+    print(f"{'entry':<6} {'module':<36} {'import ms':>10} {'wall ms':>10}")
+    for name, module in ENTRY_POINTS.items():
+        imports, walls, error = [], [], None
+        for _ in range(args.repeat):
+            cumulative, wall, error = measure(module)
+            if error:
+                break
+            imports.append(cumulative / 1000 if cumulative else 0.0)
+            walls.append(wall * 1000)
+        if error:
+            print(f"{name:<6} {module:<36} {'unavailable':>10}  ({error})")
+            continue
+        print(f"{name:<6} {module:<36} {statistics.median(imports):>10.1f} {statistics.median(walls):>10.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Thread analytics on a large synthetic mailbox.
+
+Builds a ``ThreadFrame`` from per-message records of a seeded synthetic
+mailbox (thread = Exchange conversation id) and times the build and each
+aggregate. The records are prepared before timing starts, so the build
+time is the frame alone: date parsing, code assignment and the array
+copies. For comparison, per-thread message count, duration and reply
+latency are also computed with a plain Python loop over the same records.
+
+Usage::
+
+    python benchmarks/bench_thread_analytics.py --messages 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from outlook_extractor.core.synthetic_mailbox import SyntheticMailbox  # noqa: E402
+from outlook_extractor.core.thread_analytics import ThreadFrame  # noqa: E402
+
+
+def records(mailbox: SyntheticMailbox) -> list:
+    """(thread_id, date, sender, recipients) for every message."""
+    rows = []
+    for index in range(len(mailbox)):
+        spec = mailbox.message(index)
+        rows.append((
+            spec.conversation_id,
+            spec.sent_on.isoformat(),
+            spec.sender_email,
+            [address for _, address in spec.to + spec.cc],
+        ))
+    return rows
+
+
+def python_loop(rows: list, frame: ThreadFrame) -> int:
+    """Per-thread count, duration and mean reply latency with dicts."""
+    threads = {}
+    for thread_id, _, sender, _ in rows:
+        threads.setdefault(thread_id, []).append(sender)
+    timestamps = frame.timestamps.tolist()
+    by_thread = {}
+    for (thread_id, _, sender, _), timestamp in zip(rows, timestamps):
+        by_thread.setdefault(thread_id, []).append((timestamp, sender))
+    stats = {}
+    for thread_id, messages in by_thread.items():
+        messages.sort()
+        latencies = [b[0] - a[0] for a, b in zip(messages, messages[1:]) if a[1] != b[1]]
+        stats[thread_id] = (len(messages), messages[-1][0] - messages[0][0],
+                            sum(latencies) / len(latencies) if latencies else None)
+    return len(stats)
+
+
+def timed(label, function, results):
+    started = time.perf_counter()
+    value = function()
+    results.append((label, time.perf_counter() - started))
+    return value
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=200_000, help='Mailbox size')
+    parser.add_argument('--seed', type=int, default=42, help='Mailbox seed')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rows = records(SyntheticMailbox(message_count=args.messages, seed=args.seed))
+    print(f"prepared {len(rows)} records in {time.perf_counter() - started:.1f}s")
+
+    results = []
+    frame = timed('build ThreadFrame', lambda: ThreadFrame.from_records(rows), results)
+    timed('thread_stats', frame.thread_stats, results)
+    timed('activity', frame.activity, results)
+    summary = timed('summary', frame.summary, results)
+    timed('python loop (count, duration, mean reply)', lambda: python_loop(rows, frame), results)
+
+    print(f"{len(frame)} messages, {summary['threads']} threads, {summary['replies']} replies")
+    for label, seconds in results:
+        print(f"{label:<44} {seconds:>8.2f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Memory used by threading state on the synthetic corpus.
+
+Feeds a seeded synthetic mailbox through ``ThreadManager`` and
+``JWZThreader`` one email at a time and reports the memory each keeps
+afterwards (tracemalloc) and the time taken. The email dicts are built
+before tracing starts and copied per email, so the numbers are the
+threading state alone (including the message id strings it keeps).
+
+Usage::
+
+    python benchmarks/bench_thread_memory.py --messages 100000
+    python benchmarks/bench_thread_memory.py --messages 1000000 --engine manager
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from outlook_extractor.core.email_threading import ThreadManager  # noqa: E402
+from outlook_extractor.core.jwz_threading import JWZThreader  # noqa: E402
+from outlook_extractor.core.synthetic_mailbox import SyntheticMailbox  # noqa: E402
+
+
+def email_dicts(mailbox: SyntheticMailbox):
+    """The fields threading reads, for every message, newest first."""
+    for index in reversed(range(len(mailbox))):
+        spec = mailbox.message(index)
+        yield {
+            'entry_id': spec.entry_id,
+            'message_id': spec.message_id,
+            'in_reply_to': spec.in_reply_to,
+            'references': ' '.join(spec.references),
+            'thread_index': spec.conversation_index,
+            'subject': spec.subject,
+            'sender_email': spec.sender_email,
+            'to_recipients': '; '.join(address for _, address in spec.to),
+            'cc_recipients': '; '.join(address for _, address in spec.cc),
+            'sent_on': str(spec.sent_on),
+            'received_time': str(spec.received_time),
+            'categories': spec.categories,
+        }
+
+
+def _copy(email_data: dict) -> dict:
+    """Copy an email with fresh strings, as the extractor would read them."""
+    return {key: ''.join(value) if isinstance(value, str) else value
+            for key, value in email_data.items()}
+
+
+def measure(engine: str, emails: list) -> dict:
+    """Thread the emails with one engine and report retained memory."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+
+    state = ThreadManager() if engine == 'manager' else JWZThreader()
+    for email_data in emails:
+        state.add_email(_copy(email_data))
+    threads = len(state.threads_by_id) if engine == 'manager' else len(state.get_threads())
+
+    seconds = time.perf_counter() - started
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del state
+    return {
+        'engine': engine,
+        'threads': threads,
+        'retained_mib': round(retained / 2**20, 1),
+        'bytes_per_message': round(retained / max(len(emails), 1)),
+        'seconds': round(seconds, 2),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=100_000, help='Mailbox size')
+    parser.add_argument('--seed', type=int, default=42, help='Mailbox seed')
+    parser.add_argument('--engine', choices=['manager', 'jwz', 'all'], default='all',
+                        help='Threading engine to measure')
+    args = parser.parse_args()
+
+    mailbox = SyntheticMailbox(message_count=args.messages, seed=args.seed)
+    emails = list(email_dicts(mailbox))
+    engines = ['manager', 'jwz'] if args.engine == 'all' else [args.engine]
+    print(f"{'engine':<10} {'threads':>9} {'retained MiB':>13} {'B/message':>10} {'seconds':>8}")
+    for engine in engines:
+        stats = measure(engine, emails)
+        print(f"{stats['engine']:<10} {stats['threads']:>9} {stats['retained_mib']:>13} "
+              f"{stats['bytes_per_message']:>10} {stats['seconds']:>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
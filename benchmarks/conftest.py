@@ -0,0 +1,133 @@
+"""
+Shared fixtures for the benchmark suite.
+
+Every benchmark runs against emails generated from a seeded
+``SyntheticMailbox``, so runs are reproducible and need neither Outlook nor
+network access. Benchmarks that take a ``size`` argument are parameterized
+over the mailbox sizes given with ``--bench-sizes`` so scaling curves can be
+read straight from the grouped report.
+"""
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from outlook_extractor.core.synthetic_mailbox import MessageSpec, SyntheticMailbox  # noqa: E402
+
+# Mailbox sizes used when --bench-sizes is not given
+DEFAULT_SIZES = '500,2000,8000'
+
+# Seed shared by all benchmarks so baselines stay comparable
+BENCH_SEED = 42
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--bench-sizes', default=DEFAULT_SIZES,
+        help=f"Comma-separated mailbox sizes for scaling benchmarks (default: {DEFAULT_SIZES})"
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if 'size' in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption('--bench-sizes').split(',') if size.strip()]
+        limit = getattr(metafunc.module, 'MAX_SIZE', None)
+        if limit:
+            # Cap slow (e.g. quadratic) benchmarks at the module's MAX_SIZE
+            sizes = sorted({min(size, limit) for size in sizes})
+        metafunc.parametrize('size', sizes)
+
+
+def _address_list(people) -> str:
+    return '; '.join(address for _, address in people)
+
+
+def to_email_dict(spec: MessageSpec) -> Dict[str, Any]:
+    """Convert a synthetic message to the dict produced by the extractor."""
+    return {
+        'id': spec.entry_id,
+        'entry_id': spec.entry_id,
+        'folder': spec.folder,
+        'folder_path': spec.folder,
+        'subject': spec.subject,
+        'sender': spec.sender_name,
+        'sender_email': spec.sender_email,
+        'to_recipients': _address_list(spec.to),
+        'cc_recipients': _address_list(spec.cc),
+        'recipients': [address for _, address in spec.to],
+        'received_time': spec.received_time.isoformat(),
+        'sent_on': spec.sent_on.isoformat(),
+        'received_date': spec.received_time.isoformat(),
+        'sent_date': spec.sent_on.isoformat(),
+        'body': spec.body,
+        'body_text': spec.body,
+        'body_html': spec.html_body,
+        'message_id': spec.message_id,
+        'in_reply_to': spec.in_reply_to,
+        'references': ' '.join(spec.references),
+        'thread_index': spec.conversation_index,
+        'conversation_id': spec.conversation_id,
+        'is_read': not spec.unread,
+        'importance': spec.importance,
+        'has_attachments': bool(spec.attachments),
+        'categories': spec.categories,
+    }
+
+
+def to_export_dict(spec: MessageSpec) -> Dict[str, Any]:
+    """Convert a synthetic message to the dict shape CSVExporter exports."""
+    is_html = bool(spec.html_body)
+    return {
+        'id': spec.entry_id,
+        'conversation_id': spec.conversation_id,
+        'subject': spec.subject,
+        'sender': spec.sender_email,
+        'toRecipients': [address for _, address in spec.to],
+        'ccRecipients': [address for _, address in spec.cc],
+        'bccRecipients': [],
+        'sent_datetime': spec.sent_on.isoformat(),
+        'received_datetime': spec.received_time.isoformat(),
+        'has_attachments': bool(spec.attachments),
+        'importance': spec.importance,
+        'is_read': not spec.unread,
+        'body_preview': spec.body[:255],
+        'parent_folder': spec.folder,
+        'categories': [c.strip() for c in spec.categories.split(',') if c.strip()],
+        'body': {
+            'content': spec.html_body if is_html else spec.body,
+            'contentType': 'html' if is_html else 'text',
+        },
+    }
+
+
+class MailboxCache:
+    """Builds each synthetic mailbox once per session."""
+
+    def __init__(self):
+        self._specs: Dict[int, List[MessageSpec]] = {}
+
+    def specs(self, size: int) -> List[MessageSpec]:
+        """Messages of a mailbox of ``size`` messages, newest first."""
+        if size not in self._specs:
+            mailbox = SyntheticMailbox(message_count=size, seed=BENCH_SEED)
+            specs = [mailbox.message(i) for i in range(size)]
+            specs.sort(key=lambda spec: spec.received_time, reverse=True)
+            self._specs[size] = specs
+        return self._specs[size]
+
+    def emails(self, size: int) -> List[Dict[str, Any]]:
+        """Extractor-style email dicts, newest first (the extraction order)."""
+        return [to_email_dict(spec) for spec in self.specs(size)]
+
+    def export_emails(self, size: int) -> List[Dict[str, Any]]:
+        """CSVExporter-style email dicts."""
+        return [to_export_dict(spec) for spec in self.specs(size)]
+
+
+@pytest.fixture(scope='session')
+def mailboxes() -> MailboxCache:
+    """Session-wide cache of synthetic mailboxes keyed by size."""
+    return MailboxCache()
@@ -0,0 +1,55 @@
+"""Benchmarks for CSV export and body cleaning."""
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from outlook_extractor.export.csv_exporter import CSVExporter  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def exporter():
+    return CSVExporter()
+
+
+@pytest.mark.benchmark(group='csv.clean_body')
+@pytest.mark.parametrize('kind', ['text', 'html'])
+def test_clean_body(benchmark, exporter, mailboxes, size, kind):
+    specs = mailboxes.specs(size)
+    if kind == 'html':
+        bodies = [spec.html_body for spec in specs if spec.html_body]
+    else:
+        bodies = [spec.body for spec in specs]
+    is_html = kind == 'html'
+
+    def clean():
+        return sum(len(exporter.clean_body(body, is_html)) for body in bodies)
+
+    assert benchmark.pedantic(clean, rounds=3, iterations=1) > 0
+
+
+# Inputs that backtrack quadratically in DOTALL-style cleaning patterns,
+# PATHOLOGICAL_CHARS characters per mailbox message so sizes show the scaling
+PATHOLOGICAL_CHARS = 100
+PATHOLOGICAL_BODIES = {
+    'long_line': (lambda chars: 'a' * chars, False),
+    'notices_without_end': (lambda chars: 'confidential information ' * (chars // 25), False),
+    'angle_brackets': (lambda chars: '<' * chars, True),
+}
+
+
+@pytest.mark.benchmark(group='csv.clean_body.pathological')
+@pytest.mark.parametrize('kind', sorted(PATHOLOGICAL_BODIES))
+def test_clean_body_pathological(benchmark, exporter, size, kind):
+    make_body, is_html = PATHOLOGICAL_BODIES[kind]
+    body = make_body(size * PATHOLOGICAL_CHARS)
+    benchmark.pedantic(exporter.clean_body, args=(body, is_html), rounds=3, iterations=1)
+
+
+@pytest.mark.benchmark(group='csv.export_emails_to_csv')
+def test_export_emails_to_csv(benchmark, exporter, mailboxes, tmp_path, size):
+    emails = mailboxes.export_emails(size)
+    output_path = tmp_path / 'emails.csv'
+
+    result = benchmark.pedantic(exporter.export_emails_to_csv, args=(emails, str(output_path)),
+                                rounds=3, iterations=1)
+    assert result == str(output_path)
@@ -0,0 +1,44 @@
+"""End-to-end extraction benchmark against the fake Outlook object model."""
+import itertools
+import logging
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from outlook_extractor.config import ConfigManager  # noqa: E402
+from outlook_extractor.core.fake_outlook import FakeOutlookApplication  # noqa: E402
+from outlook_extractor.core.synthetic_mailbox import SyntheticMailbox  # noqa: E402
+from outlook_extractor.extractor import OutlookExtractor  # noqa: E402
+
+from conftest import BENCH_SEED  # noqa: E402
+
+_counter = itertools.count()
+
+
+@pytest.mark.benchmark(group='extract.extract_emails')
+@pytest.mark.parametrize('profile', ['headers', 'text'])
+def test_extract_emails(benchmark, tmp_path, size, profile):
+    mailbox = SyntheticMailbox(message_count=size, seed=BENCH_SEED)
+    logging.getLogger('outlook_extractor').setLevel(logging.WARNING)
+
+    def setup():
+        work_dir = tmp_path / f"run_{next(_counter)}"
+        work_dir.mkdir()
+        config = ConfigManager()
+        config.config['storage']['sqlite_path'] = str(work_dir / 'emails.db')
+        config.config['storage']['output_dir'] = str(work_dir)
+        extractor = OutlookExtractor(config=config)
+        extractor.outlook_client = FakeOutlookApplication(mailbox)
+        return (extractor,), {}
+
+    def extract(extractor):
+        try:
+            return extractor.extract_emails(mailbox.folder_names, mailbox.start, mailbox.end,
+                                            extraction_profile=profile, extract_attachments=False)
+        finally:
+            extractor.close()
+
+    result = benchmark.pedantic(extract, setup=setup, rounds=3, iterations=1)
+    assert result['success']
+    assert result['emails_processed'] == size
@@ -0,0 +1,39 @@
+"""Benchmarks for the JSON storage backend."""
+import itertools
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from outlook_extractor.storage.json_storage import JSONStorage  # noqa: E402
+
+# JSONStorage rewrites the whole file on every save, which is quadratic in
+# the mailbox size; larger --bench-sizes are capped to this
+MAX_SIZE = 500
+
+_counter = itertools.count()
+
+
+@pytest.mark.benchmark(group='json.save_emails')
+def test_json_save_emails(benchmark, tmp_path, mailboxes, size):
+    emails = mailboxes.emails(size)
+
+    def setup():
+        return (JSONStorage(str(tmp_path / f"emails_{next(_counter)}.json")), emails), {}
+
+    saved = benchmark.pedantic(lambda storage, batch: storage.save_emails(batch),
+                               setup=setup, rounds=3, iterations=1)
+    assert saved == size
+
+
+@pytest.mark.benchmark(group='json.load')
+def test_json_load(benchmark, tmp_path, mailboxes, size):
+    path = str(tmp_path / 'emails.json')
+    storage = JSONStorage(path)
+    # Populate with a single write instead of one rewrite per email
+    storage._save_data, save_data = (lambda: None), storage._save_data
+    storage.save_emails(mailboxes.emails(size))
+    save_data()
+
+    storage = benchmark(JSONStorage, path)
+    assert storage.get_email_count() == size
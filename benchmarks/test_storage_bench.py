@@ -0,0 +1,69 @@
+"""Benchmarks for the SQLite storage backend."""
+import itertools
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from outlook_extractor.storage.sqlite_storage import SQLiteStorage  # noqa: E402
+
+# Query benchmarks run this many lookups per round
+QUERIES_PER_ROUND = 20
+
+_counter = itertools.count()
+
+
+@pytest.fixture
+def sqlite_factory(tmp_path):
+    """Create empty SQLite databases, closing them after the test."""
+    created = []
+
+    def factory():
+        storage = SQLiteStorage(str(tmp_path / f"emails_{next(_counter)}.db"))
+        created.append(storage)
+        return storage
+
+    yield factory
+    for storage in created:
+        storage.close()
+
+
+@pytest.fixture
+def populated_sqlite(sqlite_factory, mailboxes, size):
+    """A SQLite database holding the synthetic mailbox of ``size`` messages."""
+    storage = sqlite_factory()
+    storage.save_emails(mailboxes.emails(size))
+    return storage
+
+
+@pytest.mark.benchmark(group='sqlite.save_emails')
+def test_sqlite_save_emails(benchmark, sqlite_factory, mailboxes, size):
+    emails = mailboxes.emails(size)
+
+    def setup():
+        return (sqlite_factory(), emails), {}
+
+    saved = benchmark.pedantic(lambda storage, batch: storage.save_emails(batch),
+                               setup=setup, rounds=3, iterations=1)
+    assert saved == size
+
+
+@pytest.mark.benchmark(group='sqlite.search_emails')
+def test_sqlite_search_emails(benchmark, populated_sqlite, mailboxes, size):
+    terms = [spec.subject.split()[-1] for spec in mailboxes.specs(size)[:QUERIES_PER_ROUND]]
+
+    def search():
+        return sum(len(populated_sqlite.search_emails(term)) for term in terms)
+
+    assert benchmark(search) > 0
+
+
+@pytest.mark.benchmark(group='sqlite.get_emails_by_recipient')
+def test_sqlite_get_emails_by_recipient(benchmark, populated_sqlite, mailboxes, size):
+    recipients = [spec.to[-1][1] for spec in mailboxes.specs(size)[:QUERIES_PER_ROUND]]
+
+    def lookup():
+        return sum(len(populated_sqlite.get_emails_by_recipient(address)) for address in recipients)
+
+    assert benchmark(lookup) > 0
+
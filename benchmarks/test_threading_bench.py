@@ -0,0 +1,48 @@
+"""Benchmarks for conversation threading."""
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from outlook_extractor.core.email_threading import ThreadManager  # noqa: E402
+from outlook_extractor.core.jwz_threading import JWZThreader  # noqa: E402
+from outlook_extractor.core.sharded_threading import thread_in_shards  # noqa: E402
+
+
+@pytest.mark.benchmark(group='threading.add_email')
+def test_thread_manager_add_email(benchmark, mailboxes, size):
+    emails = mailboxes.emails(size)
+
+    def build():
+        manager = ThreadManager()
+        for email_data in emails:
+            manager.add_email(email_data)
+        return manager
+
+    manager = benchmark.pedantic(build, rounds=3, iterations=1)
+    assert len(manager.message_to_thread) == size
+
+
+@pytest.mark.benchmark(group='threading.add_email')
+@pytest.mark.parametrize('workers', [2, 4])
+def test_sharded_threading(benchmark, mailboxes, size, workers):
+    """Threading in shards across processes, including the pool start-up."""
+    emails = mailboxes.emails(size)
+
+    manager = benchmark.pedantic(lambda: thread_in_shards(emails, workers=workers), rounds=3, iterations=1)
+    assert len(manager.message_to_thread) == size
+
+
+@pytest.mark.benchmark(group='threading.add_email')
+@pytest.mark.parametrize('method', ['headers', 'hybrid'])
+def test_jwz_threader(benchmark, mailboxes, size, method):
+    """Recording every email and building the threads once."""
+    emails = mailboxes.emails(size)
+
+    def build():
+        threader = JWZThreader(method=method)
+        for email_data in emails:
+            threader.add_email(email_data)
+        return threader.get_threads()
+
+    threads = benchmark.pedantic(build, rounds=3, iterations=1)
+    assert sum(len(thread['messages']) for thread in threads) == size
@@ -1,13 +1,17 @@
 """
 Outlook Email Extractor - A tool to extract and process emails from Outlook.
+
+Public names are imported lazily (PEP 562) so that importing the package,
+or a light submodule such as the storage layer or the headless CLI, does not
+pull in pandas, the UI toolkit, win32com or requests.
 """
 
-import sys
+import importlib
 import platform
-import warnings
+from typing import Any
 
 # Version information
-__version__ = "1.1.1"
+__version__ = '1.0.0'
 __author__ = "Your Name"
 __license__ = "MIT"
 
@@ -16,99 +20,24 @@ IS_WINDOWS = platform.system() == 'Windows'
 IS_MAC = platform.system() == 'Darwin'
 IS_LINUX = platform.system() == 'Linux'
 
-# Initialize variables for exports
-OutlookClient = None
-EmailThread = None
-ThreadManager = None
-SQLiteStorage = None
-JSONStorage = None
-OutlookExtractor = None
-ConfigManager = None
-get_config = None
-setup_logging = None
-CSVExporter = None
-AutoUpdater = None
-UpdateError = None
-check_for_updates = None
-
-# Import core functionality
-try:
-    # Import platform-agnostic modules first
-    from .storage.base import EmailStorage as BaseStorage
-    from .storage.json_storage import JSONStorage
-    from .config import ConfigManager, get_config
-    from .logging_config import setup_logging
-    from .export.csv_exporter import CSVExporter
-    
-    # Import threading module (platform-agnostic)
-    from .core import StoppableThread, WorkerThread, ThreadPool
-    
-    # Import Windows-specific modules if on Windows
-    if IS_WINDOWS:
-        try:
-            from .core.outlook_client import OutlookClient
-            from .core.email_threading import EmailThread
-            from .main import OutlookExtractor
-            from .auto_updater import AutoUpdater, UpdateError
-            from .ui.update_dialog import check_for_updates
-            
-            # Set up Windows-specific exports
-            ThreadManager = ThreadPool  # Use ThreadPool as the default ThreadManager
-        except ImportError as e:
-            warnings.warn(f"Failed to import Windows-specific modules: {e}")
-    else:
-        warnings.warn("Outlook integration is only available on Windows")
-        
-        # Provide dummy implementations for non-Windows platforms
-        class DummyOutlookClient:
-            def __init__(self, *args, **kwargs):
-                raise NotImplementedError("Outlook integration is only available on Windows")
-        
-        OutlookClient = DummyOutlookClient
-        EmailThread = object
-        ThreadManager = ThreadPool  # Still provide thread pool functionality
-        
-    # Import main application
-    from .main import OutlookExtractor
-    
-except ImportError as e:
-    warnings.warn(f"Failed to import some modules: {e}")
-    
-    # Provide dummy implementations if imports failed
-    class DummyClass: pass
-    
-    for name in [
-        'BaseStorage', 'JSONStorage', 'ConfigManager', 'get_config',
-        'setup_logging', 'CSVExporter', 'StoppableThread', 'WorkerThread',
-        'ThreadPool', 'OutlookClient', 'EmailThread', 'ThreadManager',
-        'OutlookExtractor', 'AutoUpdater', 'UpdateError', 'check_for_updates'
-    ]:
-        if name not in locals():
-            locals()[name] = DummyClass
-
-# Export public API
-__all__ = [
-    'OutlookClient', 'EmailThread', 'ThreadManager', 'SQLiteStorage',
-    'JSONStorage', 'OutlookExtractor', 'ConfigManager', 'get_config',
-    'setup_logging', 'CSVExporter', 'AutoUpdater', 'UpdateError', 
-    'check_for_updates'
-]
-
-# Export the threading utilities
-__all__ = [
-    'OutlookClient', 'EmailThread', 'ThreadManager', 'SQLiteStorage',
-    'JSONStorage', 'OutlookExtractor', 'ConfigManager', 'get_config',
-    'setup_logging', 'CSVExporter', 'AutoUpdater', 'UpdateError', 
-    'check_for_updates', 'StoppableThread', 'WorkerThread', 'ThreadPool'
-]
-
-# Always import export functionality as it's platform-independent
-try:
-    from .export import CSVExporter
-except ImportError as e:
-    print(f"Warning: Could not import export modules: {e}")
+# Public name -> (module, attribute), resolved on first access
+_LAZY_EXPORTS = {
+    'ConfigManager': ('.config', 'ConfigManager'),
+    'get_config': ('.config', 'get_config'),
+    'setup_logging': ('.logging_config', 'setup_logging'),
+    'BaseStorage': ('.storage.base', 'EmailStorage'),
+    'SQLiteStorage': ('.storage.sqlite_storage', 'SQLiteStorage'),
+    'JSONStorage': ('.storage.json_storage', 'JSONStorage'),
+    'CSVExporter': ('.export.csv_exporter', 'CSVExporter'),
+    'OutlookClient': ('.core.outlook_client', 'OutlookClient'),
+    'EmailThread': ('.core.email_threading', 'EmailThread'),
+    'ThreadManager': ('.core.email_threading', 'ThreadManager'),
+    'OutlookExtractor': ('.main', 'OutlookExtractor'),
+    'AutoUpdater': ('.auto_updater', 'AutoUpdater'),
+    'UpdateError': ('.auto_updater', 'UpdateError'),
+    'check_for_updates': ('.ui.update_dialog', 'check_for_updates'),
+}
 
-__version__ = '1.0.0'
 __all__ = [
     'OutlookClient',
     'EmailThread',
@@ -119,5 +48,25 @@ __all__ = [
     'ConfigManager',
     'get_config',
     'setup_logging',
-    'CSVExporter'
+    'CSVExporter',
+    'AutoUpdater',
+    'UpdateError',
+    'check_for_updates',
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import public names on first access."""
+    try:
+        module_name, attribute = _LAZY_EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    globals()[name] = value  # Cache so __getattr__ is not called again
+    return value
+
+
+def __dir__():
+    """Include lazily imported names in dir()."""
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
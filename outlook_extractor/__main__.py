@@ -15,8 +15,16 @@ def setup_environment():
     if project_root not in sys.path:
         sys.path.insert(0, project_root)
 
+# Subcommands handled by the headless CLI instead of the UI
+CLI_COMMANDS = ('extract', 'export')
+
 def main():
     """Main entry point for the application."""
+    # Headless commands never import the UI toolkit
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS:
+        from outlook_extractor.cli import main as cli_main
+        return cli_main(sys.argv[1:])
+    
     try:
         # Import here to ensure environment is set up first
         from outlook_extractor.ui import EmailExtractorUI
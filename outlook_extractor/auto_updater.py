@@ -13,7 +13,6 @@ import platform
 import subprocess
 from pathlib import Path
 from typing import Optional, Tuple
-import requests
 from packaging import version
 import semver
 
@@ -48,7 +47,8 @@ class AutoUpdater:
         self.update_dir = self.app_dir / "updates"
         self.update_dir.mkdir(exist_ok=True)
         
-        # Configure requests session
+        # Configure requests session (requests is imported lazily to keep startup fast)
+        import requests
         self.session = requests.Session()
         self.session.headers.update({
             'Accept': 'application/vnd.github.v3+json',
@@ -63,6 +63,8 @@ class AutoUpdater:
                 - update_available: True if an update is available
                 - update_info: Dictionary with update details if available, None otherwise
         """
+        import requests
+        
         try:
             logger.info("Checking for updates...")
             
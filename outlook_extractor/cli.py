@@ -0,0 +1,381 @@
+"""
+Headless command-line interface for scheduled extraction.
+
+Usage::
+
+    python -m outlook_extractor extract --folder Inbox --days-back 1 --json
+    python -m outlook_extractor export --output emails.csv --query invoice
+
+This module must not import the UI toolkit, so it can run on servers and
+from schedulers without a display. Results are printed as text or, with
+``--json``, as a single JSON document on stdout; logs go to stderr.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+DATE_FORMAT = '%Y-%m-%d'
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_date(value: str) -> datetime:
+    """Parse a YYYY-MM-DD command-line date as a UTC datetime."""
+    try:
+        return datetime.strptime(value, DATE_FORMAT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}', expected YYYY-MM-DD")
+
+
+def _positive_int(value: str) -> int:
+    """Parse a non-negative integer command-line value."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer '{value}'")
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"value must be >= 0, got {number}")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line argument parser.
+
+    Returns:
+        The configured ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m outlook_extractor',
+        description='Outlook Email Extraction Tool (headless mode)'
+    )
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.required = True
+
+    extract = subparsers.add_parser('extract', help='Extract emails without starting the UI')
+    extract.add_argument('--config', '-c', help='Path to configuration file')
+    extract.add_argument('--folder', '-f', dest='folders', action='append',
+                         help='Folder pattern to extract (repeatable, supports wildcards; '
+                              'defaults to outlook.folder_patterns)')
+    extract.add_argument('--start-date', type=_parse_date, help='Start date (YYYY-MM-DD)')
+    extract.add_argument('--end-date', type=_parse_date, help='End date (YYYY-MM-DD, inclusive)')
+    extract.add_argument('--days-back', type=_positive_int,
+                         help='Extract the last N days (ignored when --start-date is given)')
+    extract.add_argument('--storage', choices=['sqlite', 'json'], help='Storage backend')
+    extract.add_argument('--db-path', help='SQLite database or JSON file to write to')
+    extract.add_argument('--workers', type=_positive_int,
+                         help='Number of background attachment writer threads')
+    extract.add_argument('--max-emails', type=_positive_int, default=0,
+                         help='Maximum number of emails to process (0 for no limit)')
+    extract.add_argument('--profile', choices=['headers', 'text', 'full'],
+                         help='Body extraction profile')
+    attachments = extract.add_mutually_exclusive_group()
+    attachments.add_argument('--attachments', dest='extract_attachments', action='store_true',
+                             default=None, help='Save attachments')
+    attachments.add_argument('--no-attachments', dest='extract_attachments', action='store_false',
+                             help='Do not save attachments')
+    extract.add_argument('--no-threads', dest='include_threads', action='store_false',
+                         help='Skip conversation threading')
+    extract.add_argument('--persist-threads', action='store_true', default=None,
+                         help='Thread against the conversations already in the SQLite database '
+                              'and store the updated threads there '
+                              '(Message-ID/References/ConversationIndex links only)')
+    extract.add_argument('--threading-workers', type=_positive_int,
+                         help='Thread the extracted emails in shards across N processes '
+                              '(Message-ID/References/ConversationIndex links only)')
+    extract.add_argument('--export-csv', metavar='DIR',
+                         help='Export the extracted emails to a CSV file in DIR')
+    extract.add_argument('--metrics-json', dest='write_metrics', action='store_true', default=None,
+                         help='Append per-stage run metrics to a .metrics.jsonl file next to the database')
+    extract.add_argument('--metrics-textfile', metavar='PATH',
+                         help='Keep a node_exporter textfile (.prom) with live run metrics at PATH')
+    extract.add_argument('--profiler', choices=['cprofile', 'sampling', 'auto', 'off'],
+                         help='Profile the run and write reports to --profile-dir')
+    extract.add_argument('--trace-memory', action='store_true', default=None,
+                         help='Trace allocations with tracemalloc and report the top sites per folder')
+    extract.add_argument('--profile-dir', metavar='DIR',
+                         help='Directory for profile reports (default: <output dir>/profiles)')
+    extract.add_argument('--json', dest='json_output', action='store_true',
+                         help='Print the result as JSON on stdout')
+    extract.add_argument('--log-level', default='WARNING',
+                         choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
+                         help='Log level for messages written to stderr')
+    extract.set_defaults(handler=run_extract)
+
+    export = subparsers.add_parser('export', help='Export stored emails to CSV or Parquet')
+    export.add_argument('--config', '-c', help='Path to configuration file')
+    export.add_argument('--storage', choices=['sqlite', 'json'], help='Storage backend')
+    export.add_argument('--db-path', help='SQLite database or JSON file to read from')
+    export.add_argument('--output', '-o', required=True, help='CSV or Parquet file to write')
+    export.add_argument('--format', choices=['csv', 'parquet'],
+                        help='Export format (default: parquet for a .parquet output, else csv)')
+    export.add_argument('--start-date', type=_parse_date, help='Start date (YYYY-MM-DD)')
+    export.add_argument('--end-date', type=_parse_date, help='End date (YYYY-MM-DD, inclusive)')
+    export.add_argument('--folder', '-f', dest='folders', action='append',
+                        help='Folder path to export (repeatable, supports wildcards)')
+    export.add_argument('--sender', dest='senders', action='append',
+                        help='Sender address to export (repeatable)')
+    export.add_argument('--query', '-q', help='Full-text search the emails must match')
+    export.add_argument('--limit', type=_positive_int, help='Maximum number of emails to export')
+    export.add_argument('--clean-workers', type=_positive_int,
+                        help='Clean message bodies in N processes')
+    export.add_argument('--json', dest='json_output', action='store_true',
+                        help='Print the result as JSON on stdout')
+    export.add_argument('--log-level', default='WARNING',
+                        choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'],
+                        help='Log level for messages written to stderr')
+    export.set_defaults(handler=run_export)
+
+    return parser
+
+
+def _resolve_dates(args: argparse.Namespace, config) -> Dict[str, Optional[datetime]]:
+    """Work out the extraction date range from arguments and configuration."""
+    end_date = args.end_date
+    if end_date is None:
+        end_date = datetime.now(timezone.utc)
+    else:
+        # The end date is inclusive
+        end_date = end_date + timedelta(days=1) - timedelta(microseconds=1)
+    start_date = args.start_date
+    if start_date is None:
+        days_back = args.days_back
+        if days_back is None:
+            days_back = config.get_int('date_range', 'days_back', 30)
+        start_date = end_date - timedelta(days=days_back)
+    return {'start_date': start_date, 'end_date': end_date}
+
+
+def _apply_storage_overrides(args: argparse.Namespace, config) -> None:
+    """Apply the --storage and --db-path overrides to the loaded configuration."""
+    if args.storage:
+        config.config['storage']['type'] = args.storage
+    if args.db_path:
+        storage_type = config.get('storage', 'type', 'sqlite').lower()
+        key = 'sqlite_path' if storage_type == 'sqlite' else 'json_path'
+        config.config['storage'][key] = args.db_path
+
+
+def _apply_overrides(args: argparse.Namespace, config) -> None:
+    """Apply command-line overrides to the loaded configuration."""
+    _apply_storage_overrides(args, config)
+    if args.persist_threads:
+        config.config['threading']['persist_threads'] = '1'
+    if args.threading_workers:
+        config.config['threading']['parallel_workers'] = str(args.threading_workers)
+
+
+def _summarize(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop bulky per-email and per-thread data from an extraction result."""
+    return {key: value for key, value in result.items() if key not in ('emails', 'threads')}
+
+
+def run_extract(args: argparse.Namespace) -> int:
+    """Run the ``extract`` command.
+
+    Args:
+        args: Parsed command-line arguments
+
+    Returns:
+        int: Process exit code
+    """
+    if args.start_date and args.end_date and args.start_date > args.end_date:
+        print('Error: --start-date is after --end-date', file=sys.stderr)
+        return EXIT_USAGE
+
+    timings = {}
+    started = time.perf_counter()
+
+    from .config import ConfigManager
+    from .extractor import OutlookExtractor
+
+    config = ConfigManager(args.config) if args.config else ConfigManager()
+    _apply_overrides(args, config)
+    folders: List[str] = args.folders or config.get_list('outlook', 'folder_patterns', ['Inbox'])
+    dates = _resolve_dates(args, config)
+
+    extractor = OutlookExtractor(config=config)
+    timings['startup_seconds'] = round(time.perf_counter() - started, 3)
+
+    try:
+        options = {
+            'max_emails': args.max_emails,
+            'include_threads': args.include_threads,
+        }
+        if args.profile:
+            options['extraction_profile'] = args.profile
+        if args.extract_attachments is not None:
+            options['extract_attachments'] = args.extract_attachments
+        if args.workers is not None:
+            options['attachment_workers'] = args.workers
+        if args.write_metrics:
+            options['write_metrics'] = True
+        if args.metrics_textfile:
+            options['metrics_textfile'] = args.metrics_textfile
+        if args.profiler:
+            options['profiler'] = args.profiler
+        if args.trace_memory:
+            options['trace_memory'] = True
+        if args.profile_dir:
+            options['profile_dir'] = args.profile_dir
+
+        phase_started = time.perf_counter()
+        result = extractor.extract_emails(folders, dates['start_date'], dates['end_date'], **options)
+        timings['extract_seconds'] = round(time.perf_counter() - phase_started, 3)
+
+        if result.get('success') and args.export_csv:
+            from .storage import EmailFilter
+
+            # Stream the emails of this date range back out of storage
+            phase_started = time.perf_counter()
+            email_filter = EmailFilter(start_date=dates['start_date'], end_date=dates['end_date'])
+            success, output_files = extractor.export_emails(
+                None,
+                format='csv',
+                export_settings={'output_dir': args.export_csv, 'email_filter': email_filter}
+            )
+            timings['export_seconds'] = round(time.perf_counter() - phase_started, 3)
+            result['export'] = {'success': success, 'files': output_files}
+            if not success:
+                result['success'] = False
+                result.setdefault('error', 'CSV export failed')
+    finally:
+        extractor.close()
+
+    timings['total_seconds'] = round(time.perf_counter() - started, 3)
+    summary = _summarize(result)
+    summary['timings'] = timings
+    summary['start_date'] = dates['start_date']
+    summary['end_date'] = dates['end_date']
+    summary['folders'] = folders
+
+    if args.json_output:
+        print(json.dumps(summary, indent=2, default=str))
+    elif summary.get('success'):
+        print(f"Processed {summary.get('emails_processed', 0)} emails from "
+              f"{summary.get('folders_processed', 0)} folders, "
+              f"saved {summary.get('emails_saved', 0)} "
+              f"in {timings['total_seconds']:.1f}s")
+        for path in summary.get('export', {}).get('files', []):
+            print(f"Exported {path}")
+    else:
+        print(f"Error: {summary.get('error', 'Unknown error')}", file=sys.stderr)
+
+    return EXIT_OK if summary.get('success') else EXIT_FAILURE
+
+
+def run_export(args: argparse.Namespace) -> int:
+    """Run the ``export`` command.
+
+    Args:
+        args: Parsed command-line arguments
+
+    Returns:
+        int: Process exit code
+    """
+    if args.start_date and args.end_date and args.start_date > args.end_date:
+        print('Error: --start-date is after --end-date', file=sys.stderr)
+        return EXIT_USAGE
+
+    from .config import ConfigManager
+    from .export import CSVExporter, ParquetExporter
+    from .export.parquet_exporter import parquet_available
+    from .storage import EmailFilter, create_storage
+
+    export_format = args.format or ('parquet' if args.output.lower().endswith('.parquet') else 'csv')
+    if export_format == 'parquet' and not parquet_available():
+        print('Error: Parquet export requires pyarrow (pip install pyarrow)', file=sys.stderr)
+        return EXIT_FAILURE
+
+    config = ConfigManager(args.config) if args.config else ConfigManager()
+    _apply_storage_overrides(args, config)
+    if args.clean_workers is not None:
+        config.config['export']['clean_workers'] = str(args.clean_workers)
+    end_date = args.end_date
+    if end_date is not None:
+        # The end date is inclusive
+        end_date = end_date + timedelta(days=1) - timedelta(microseconds=1)
+    email_filter = EmailFilter(
+        start_date=args.start_date,
+        end_date=end_date,
+        folders=args.folders or (),
+        senders=args.senders or (),
+        query=args.query,
+        limit=args.limit,
+    )
+
+    exporter = ParquetExporter(config) if export_format == 'parquet' else CSVExporter(config)
+
+    started = time.perf_counter()
+    exported: List[int] = []
+    storage = create_storage(config)
+    try:
+        output_file = exporter.export_from_storage(
+            storage, args.output, email_filter=email_filter, progress_callback=exported.append
+        )
+    finally:
+        storage.close()
+
+    summary = {
+        'success': bool(output_file),
+        'emails_exported': exported[-1] if exported else 0,
+        'file': output_file or None,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+    if args.json_output:
+        print(json.dumps(summary, indent=2))
+    elif output_file:
+        print(f"Exported {summary['emails_exported']} emails to {output_file} "
+              f"in {summary['seconds']:.1f}s")
+    else:
+        print('Error: no stored emails match the filter', file=sys.stderr)
+
+    return EXIT_OK if output_file else EXIT_FAILURE
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point for the headless command-line interface.
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        int: Process exit code
+    """
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_USAGE if e.code else EXIT_OK
+
+    logging.basicConfig(
+        level=getattr(logging, args.log_level),
+        stream=sys.stderr,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    try:
+        return args.handler(args)
+    except KeyboardInterrupt:
+        print('Operation cancelled by user', file=sys.stderr)
+        return EXIT_INTERRUPTED
+    except Exception as e:
+        logger.critical(f"Fatal error: {e}", exc_info=True)
+        if getattr(args, 'json_output', False):
+            print(json.dumps({'success': False, 'error': str(e)}))
+        return EXIT_FAILURE
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()  # threading workers in frozen builds
+    sys.exit(main())
@@ -9,6 +9,8 @@ from typing import Dict, List, Tuple, Optional, Any
 import logging
 from datetime import datetime, timedelta
 
+from .core.extraction_profile import DEFAULT_PROFILE
+
 # Default configuration values
 DEFAULT_CONFIG = {
     'outlook': {
@@ -24,6 +26,8 @@ DEFAULT_CONFIG = {
         'enable_threading': '1',
         'thread_method': 'hybrid',  # 'headers', 'content', or 'hybrid'
         'max_thread_depth': '10',
+        'persist_threads': '0',  # keep threading state in the SQLite database
+        'parallel_workers': '0',  # processes threading shards of the messages (0/1: none)
         'thread_timeout_days': '30',
     },
     'storage': {
@@ -31,6 +35,7 @@ DEFAULT_CONFIG = {
         'db_filename': 'outlook_emails.db',
         'json_export': '1',
         'json_pretty_print': '1',
+        'write_metrics': '0',  # Append run metrics to <db name>.metrics.jsonl
     },
     'logging': {
         'log_level': 'INFO',
@@ -39,10 +44,30 @@ DEFAULT_CONFIG = {
     'email_processing': {
         'extract_attachments': '0',
         'attachment_dir': 'attachments',
+        'attachment_workers': '4',
+        'attachment_retries': '3',
+        'attachment_byte_budget_mb': '0',  # 0 means no limit
         'extract_embedded_images': '0',
         'image_dir': 'images',
         'extract_links': '1',
         'extract_phone_numbers': '1',
+        'extraction_profile': DEFAULT_PROFILE,  # headers, text or full
+        'max_body_bytes': '0',  # 0 means no limit
+    },
+    'export': {
+        'clean_workers': '0',  # processes cleaning message bodies (0/1: none)
+        'clean_cache_size': '50000',  # cleaned bodies cached by body hash
+        'precompute_clean_bodies': '0',  # clean new bodies into storage after extracting
+    },
+    'metrics': {
+        'textfile_path': '',  # .prom file for node_exporter; empty disables it
+        'textfile_interval': '15',  # Seconds between rewrites of the file
+    },
+    'profiling': {
+        'mode': 'off',  # 'off', 'cprofile', 'sampling' (pyinstrument) or 'auto'
+        'trace_memory': '0',
+        'top_n': '30',
+        'output_dir': '',  # Empty means <storage output_dir>/profiles
     },
     'security': {
         'redact_sensitive_data': '1',
@@ -0,0 +1,135 @@
+"""
+Decoder for Outlook's ConversationIndex (PidTagConversationIndex).
+
+Exchange stamps every message with a binary ConversationIndex, exposed by
+the Outlook object model as a hex string:
+
+- a 22-byte header shared by the whole conversation: a reserved byte
+  (0x01), the five high-order bytes of the FILETIME the conversation
+  started and a 16-byte conversation GUID;
+- one 5-byte child block per reply level: a 1-bit code, a 31-bit time
+  delta from the parent and 8 random/sequence bits. With code 0 the delta
+  holds bits 18-48 of the FILETIME difference, with code 1 bits 23-53.
+
+A reply's index is its parent's index plus one block, so the header is a
+conversation key and dropping the last block gives the parent's index.
+Threading on it is exact and needs no header parsing.
+"""
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Union
+
+HEADER_SIZE = 22
+CHILD_BLOCK_SIZE = 5
+
+# Seconds between the FILETIME epoch (1601-01-01) and the Unix epoch
+_FILETIME_EPOCH_OFFSET = 11_644_473_600
+
+
+def filetime_to_datetime(filetime: int) -> datetime:
+    """Convert a Windows FILETIME (100ns since 1601) to an aware datetime."""
+    return datetime(1601, 1, 1, tzinfo=timezone.utc) + timedelta(microseconds=filetime // 10)
+
+
+@dataclass(frozen=True)
+class ConversationIndex:
+    """A decoded ConversationIndex."""
+    raw: bytes
+
+    @property
+    def root(self) -> bytes:
+        """The 22-byte header identifying the conversation."""
+        return self.raw[:HEADER_SIZE]
+
+    @property
+    def root_key(self) -> str:
+        """The header as upper-case hex, usable as a thread key."""
+        return self.root.hex().upper()
+
+    @property
+    def guid(self) -> uuid.UUID:
+        """The conversation GUID."""
+        return uuid.UUID(bytes=self.raw[6:HEADER_SIZE])
+
+    @property
+    def depth(self) -> int:
+        """Number of reply levels below the conversation start (0 for the first message)."""
+        return (len(self.raw) - HEADER_SIZE) // CHILD_BLOCK_SIZE
+
+    @property
+    def started(self) -> datetime:
+        """When the conversation started (to about 1.7 seconds)."""
+        return filetime_to_datetime(int.from_bytes(self.raw[1:6], 'big') << 24)
+
+    def child_deltas(self) -> List[timedelta]:
+        """Time between each reply level and its parent, oldest first."""
+        deltas = []
+        for offset in range(HEADER_SIZE, len(self.raw), CHILD_BLOCK_SIZE):
+            value = int.from_bytes(self.raw[offset:offset + 4], 'big')
+            if value & 0x80000000:
+                ticks = (value & 0x7FFFFFFF) << 23
+            else:
+                ticks = value << 18
+            deltas.append(timedelta(microseconds=ticks // 10))
+        return deltas
+
+    @property
+    def sent(self) -> datetime:
+        """Approximate time this message was added to the conversation."""
+        return self.started + sum(self.child_deltas(), timedelta())
+
+    @property
+    def key(self) -> str:
+        """The whole index as upper-case hex."""
+        return self.raw.hex().upper()
+
+    @property
+    def parent_key(self) -> Optional[str]:
+        """Hex index of the message this one replies to, or None for the first message."""
+        if self.depth == 0:
+            return None
+        return self.raw[:-CHILD_BLOCK_SIZE].hex().upper()
+
+    def ancestor_keys(self) -> List[str]:
+        """Hex indexes of all ancestors, from the conversation start down to the parent."""
+        return [
+            self.raw[:end].hex().upper()
+            for end in range(HEADER_SIZE, len(self.raw), CHILD_BLOCK_SIZE)
+        ]
+
+
+def parse_conversation_index(value: Union[str, bytes, None]) -> Optional[ConversationIndex]:
+    """Decode a ConversationIndex.
+
+    Args:
+        value: Hex string as returned by Outlook, or the raw bytes
+
+    Returns:
+        ConversationIndex, or None if the value is empty or malformed
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            raw = bytes.fromhex(value.strip())
+        except ValueError:
+            return None
+    else:
+        raw = bytes(value)
+    if len(raw) < HEADER_SIZE or (len(raw) - HEADER_SIZE) % CHILD_BLOCK_SIZE:
+        return None
+    return ConversationIndex(raw)
+
+
+def conversation_index_of(email_data: dict) -> Optional[ConversationIndex]:
+    """Decode the ConversationIndex of an email dict, if it has a valid one.
+
+    Args:
+        email_data: Dictionary containing email data ('thread_index' as set by
+            the extractor, or 'conversation_index')
+
+    Returns:
+        ConversationIndex or None
+    """
+    return parse_conversation_index(email_data.get('thread_index') or email_data.get('conversation_index'))
@@ -0,0 +1,164 @@
+"""
+Date normalization shared by threading and storage.
+
+Dates reach threading and storage as ISO 8601 strings (the extractor
+writes ``datetime.isoformat()``), as ``datetime`` objects, or, from older
+exports and hand-edited JSON files, in a handful of other layouts.
+
+- ``parse_datetime`` tries ``datetime.fromisoformat`` first, which parses
+  the common case in C without format probing.
+- Anything else goes to a ``DateParser``, which remembers the ``strptime``
+  format that matched last, so a source with a consistent layout pays for
+  probing once instead of on every value.
+- ``to_epoch`` gives the canonical form for comparisons and range filters:
+  integer seconds since 1970-01-01 UTC.
+
+Naive values are taken to be UTC, so every parsed value is comparable.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, Sequence, Union
+
+# Fallback layouts, most common first
+DATE_FORMATS = (
+    '%Y-%m-%d %H:%M:%S%z',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d',
+    '%m/%d/%Y %I:%M:%S %p',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y',
+    '%a, %d %b %Y %H:%M:%S %z',
+    '%d %b %Y %H:%M:%S %z',
+)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_SECOND = timedelta(seconds=1)
+
+DateValue = Union[str, datetime, date, int, float, None]
+
+
+class DateParser:
+    """Date parser that memoizes the layout of one source.
+
+    Keep one instance per source (a storage backend, the threading engine);
+    values that are not ISO 8601 are first tried with the format that
+    matched the previous value.
+    """
+
+    __slots__ = ('formats', '_last_format')
+
+    def __init__(self, formats: Sequence[str] = DATE_FORMATS):
+        """Create the parser.
+
+        Args:
+            formats: ``strptime`` formats to try for values that are not ISO 8601
+        """
+        self.formats = tuple(formats)
+        self._last_format: Optional[str] = None
+
+    def parse(self, value: DateValue) -> Optional[datetime]:
+        """Parse a date into an aware datetime.
+
+        Args:
+            value: ISO 8601 or other supported string, datetime, date, or
+                epoch seconds
+
+        Returns:
+            Aware datetime (UTC if the value had no offset), or None if the
+            value is empty or cannot be parsed
+        """
+        if not value:
+            return None
+        if type(value) is str:
+            # Fast path: ISO 8601 as written by the extractor
+            try:
+                parsed = datetime.fromisoformat(value)
+            except ValueError:
+                parsed = self._parse_string(value.strip())
+                if parsed is None:
+                    return None
+        elif isinstance(value, datetime):
+            parsed = value
+        elif isinstance(value, date):
+            parsed = datetime(value.year, value.month, value.day)
+        elif isinstance(value, (int, float)):
+            return datetime.fromtimestamp(value, timezone.utc)
+        elif isinstance(value, str):
+            parsed = self._parse_string(value.strip())
+            if parsed is None:
+                return None
+        else:
+            return None
+        return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+    def _parse_string(self, value: str) -> Optional[datetime]:
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+        if value.endswith(('Z', 'z')):
+            # fromisoformat only accepts a 'Z' suffix from Python 3.11
+            try:
+                return datetime.fromisoformat(value[:-1] + '+00:00')
+            except ValueError:
+                pass
+
+        last_format = self._last_format
+        if last_format is not None:
+            try:
+                return datetime.strptime(value, last_format)
+            except ValueError:
+                pass
+        for fmt in self.formats:
+            if fmt == last_format:
+                continue
+            try:
+                parsed = datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            self._last_format = fmt
+            return parsed
+        return None
+
+    def to_epoch(self, value: DateValue) -> Optional[int]:
+        """Parse a date into integer seconds since the Unix epoch.
+
+        Args:
+            value: Any value accepted by ``parse``
+
+        Returns:
+            Epoch seconds, or None if the value cannot be parsed
+        """
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        parsed = self.parse(value)
+        return (parsed - EPOCH) // _SECOND if parsed is not None else None
+
+
+# Parser for callers without a source of their own
+_DEFAULT_PARSER = DateParser()
+
+
+def parse_datetime(value: DateValue, parser: Optional[DateParser] = None) -> Optional[datetime]:
+    """Parse a date into an aware datetime (see DateParser.parse).
+
+    Args:
+        value: Date to parse
+        parser: Parser of the value's source (a shared one if omitted)
+
+    Returns:
+        Aware datetime, or None if the value cannot be parsed
+    """
+    return (parser or _DEFAULT_PARSER).parse(value)
+
+
+def to_epoch(value: DateValue, parser: Optional[DateParser] = None) -> Optional[int]:
+    """Parse a date into integer seconds since the Unix epoch.
+
+    Args:
+        value: Date to parse
+        parser: Parser of the value's source (a shared one if omitted)
+
+    Returns:
+        Epoch seconds, or None if the value cannot be parsed
+    """
+    return (parser or _DEFAULT_PARSER).to_epoch(value)
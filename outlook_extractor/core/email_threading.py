@@ -4,44 +4,91 @@ from __future__ import annotations
 
 import hashlib
 import re
-from collections import defaultdict
+import sys
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
+from datetime import datetime
 from email.utils import getaddresses
-from typing import Any, Dict, List, Optional, Set, DefaultDict
+from typing import Any, Dict, List, Optional, Set
+
+from .conversation_index import conversation_index_of
+from .dates import DateParser, parse_datetime
+from .interning import ADDRESSES, AddressSet, CategorySet, ParticipantIndex, SortedStringSet
 
 # Thread status constants
 THREAD_STATUS_ACTIVE = 'active'
 THREAD_STATUS_RESOLVED = 'resolved'
 THREAD_STATUS_ARCHIVED = 'archived'
 
-@dataclass
+# Dates of all threads come from the same extractor, so one parser
+# remembers their layout
+_DATE_PARSER = DateParser()
+
+# Instances without a __dict__ where dataclasses support it (Python 3.10+)
+_DATACLASS_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+def message_id_of(email_data: Dict[str, Any]) -> Optional[str]:
+    """Get the Message-ID threading uses for an email.
+    
+    Emails without a Message-ID (Exchange mail read without transport
+    headers, drafts) get one derived from their EntryID, so they can still
+    be threaded by ConversationIndex.
+    
+    Args:
+        email_data: Dictionary containing email data
+        
+    Returns:
+        The Message-ID, '<entry id@entry-id>', or None without either
+    """
+    return email_data.get('message_id') or (
+        f"<{email_data['entry_id']}@entry-id>" if email_data.get('entry_id') else None
+    )
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class EmailThread:
-    """Represents a conversation thread of emails."""
+    """Represents a conversation thread of emails.
+    
+    Participants and categories are interned and stored as integer ids,
+    message ids in a sorted list (see core.interning); all three behave as
+    sets of strings. Plain sets passed to the constructor are converted.
+    """
     thread_id: str
     subject: str
-    participants: Set[str] = field(default_factory=set)
-    message_ids: Set[str] = field(default_factory=set)
+    participants: Set[str] = field(default_factory=AddressSet)
+    message_ids: Set[str] = field(default_factory=SortedStringSet)
     root_message_id: Optional[str] = None
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     status: str = THREAD_STATUS_ACTIVE
-    categories: Set[str] = field(default_factory=set)
+    categories: Set[str] = field(default_factory=CategorySet)
     
-    def add_email(self, email_data: Dict[str, Any]) -> None:
+    def __post_init__(self):
+        if not isinstance(self.participants, AddressSet):
+            self.participants = AddressSet(self.participants)
+        if not isinstance(self.message_ids, SortedStringSet):
+            self.message_ids = SortedStringSet(self.message_ids)
+        if not isinstance(self.categories, CategorySet):
+            self.categories = CategorySet(self.categories)
+    
+    def add_email(self, email_data: Dict[str, Any]) -> Set[str]:
         """Add an email to this thread.
         
         Args:
             email_data: Dictionary containing email data
+            
+        Returns:
+            Set of participant addresses of the email
         """
         if not self.root_message_id and not self.message_ids:
-            self.root_message_id = email_data.get('message_id')
+            self.root_message_id = message_id_of(email_data)
             self.subject = email_data.get('subject', '(No Subject)')
         
         self.message_ids.add(email_data['entry_id'])
         
         # Update participants
-        self.participants.update(self._extract_participants(email_data))
+        participants = self._extract_participants(email_data)
+        self.participants.update(participants)
         
         # Update date range
         email_date = self._parse_date(email_data.get('sent_on') or email_data.get('received_time'))
@@ -54,6 +101,29 @@ class EmailThread:
         # Update categories
         if email_data.get('categories'):
             self.categories.update(cat.strip() for cat in email_data['categories'].split(','))
+        
+        return participants
+    
+    def merge(self, other: 'EmailThread') -> None:
+        """Merge another thread of the same conversation into this one.
+        
+        Messages, participants and categories are combined and the date range
+        widened. If the other thread started earlier, its root message and
+        subject are adopted.
+        
+        Args:
+            other: Thread to absorb (left unchanged)
+        """
+        if other.start_date and (not self.start_date or other.start_date < self.start_date):
+            self.start_date = other.start_date
+            if other.root_message_id:
+                self.root_message_id = other.root_message_id
+                self.subject = other.subject
+        if other.end_date and (not self.end_date or other.end_date > self.end_date):
+            self.end_date = other.end_date
+        self.message_ids.update(other.message_ids)
+        self.participants.update(other.participants)
+        self.categories.update(other.categories)
     
     def _extract_participants(self, email_data: Dict[str, Any]) -> Set[str]:
         """Extract all participants from an email.
@@ -71,7 +141,7 @@ class EmailThread:
                 return
             for name, addr in getaddresses([field]):
                 if '@' in addr:
-                    participants.add(addr.lower())
+                    participants.add(ADDRESSES.intern(addr.lower()))
         
         add_emails(email_data.get('sender_email', ''))
         add_emails(email_data.get('to_recipients', ''))
@@ -83,35 +153,14 @@ class EmailThread:
         """Parse a date string into a datetime object.
         
         Args:
-            date_str: Date string to parse
+            date_str: Date string to parse (ISO 8601 as written by the
+                extractor, or one of the layouts in dates.DATE_FORMATS)
             
         Returns:
-            datetime object or None if parsing fails
+            Aware datetime (UTC if the string had no offset), or None if
+            parsing fails
         """
-        if not date_str:
-            return None
-        
-        try:
-            # Try parsing with timezone
-            for fmt in (
-                '%Y-%m-%d %H:%M:%S%z',
-                '%Y-%m-%d %H:%M:%S',
-                '%Y-%m-%d',
-                '%m/%d/%Y %H:%M:%S %p',
-                '%m/%d/%Y %H:%M:%S',
-                '%m/%d/%Y',
-            ):
-                try:
-                    dt = datetime.strptime(date_str, fmt)
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=timezone.utc)
-                    return dt
-                except ValueError:
-                    continue
-        except Exception:
-            pass
-        
-        return None
+        return parse_datetime(date_str, _DATE_PARSER)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert thread to dictionary for serialization.
@@ -161,12 +210,32 @@ class EmailThread:
 
 
 class ThreadManager:
-    """Manages email threads and their relationships."""
+    """Manages email threads and their relationships.
+    
+    Messages may arrive in any order. Threads are the connected components
+    of the reply graph and are kept in a union-find structure over thread
+    ids: when a message links two existing threads (for example a parent
+    arriving after replies that were threaded separately), the smaller
+    thread is merged into the larger one and its id is redirected, so no
+    second pass over the messages is needed.
+    
+    Message-IDs that were referenced but not seen yet are remembered in
+    ``pending_references`` so that the referenced message joins the right
+    thread when it arrives.
+    
+    Messages with a valid Outlook ConversationIndex are keyed on its 22-byte
+    header, which all messages of an Exchange conversation share, so they
+    find their thread with one lookup even without Internet headers.
+    """
     
     def __init__(self):
         self.threads_by_id: Dict[str, EmailThread] = {}
         self.message_to_thread: Dict[str, str] = {}
-        self.threads_by_participant: DefaultDict[str, Set[str]] = defaultdict(set)
+        self.threads_by_participant = ParticipantIndex()
+        # Union-find parent links of merged thread ids (absent for live threads)
+        self.merged_threads: Dict[str, str] = {}
+        # Referenced but not yet seen Message-ID -> thread id of the referrer
+        self.pending_references: Dict[str, str] = {}
     
     def add_email(self, email_data: Dict[str, Any]) -> None:
         """Add an email to the appropriate thread.
@@ -174,24 +243,161 @@ class ThreadManager:
         Args:
             email_data: Dictionary containing email data
         """
-        message_id = email_data.get('message_id')
-        if not message_id or message_id in self.message_to_thread:
+        message_id = message_id_of(email_data)
+        if not message_id or self._lookup_message(message_id) is not None:
             return  # Already processed this message
         
         # Check if this is a reply to an existing message
         in_reply_to = email_data.get('in_reply_to')
         references = self._parse_references(email_data.get('references', ''))
         
-        # Find existing thread or create a new one
-        thread = self._find_existing_thread(in_reply_to, references) or self._create_new_thread(email_data)
+        parents = references if not in_reply_to or in_reply_to in references else references + [in_reply_to]
+        index = conversation_index_of(email_data)
+        conversation_id = f"thread_{index.root_key}" if index else None
+        
+        # Every thread this message connects to: the thread of its Exchange
+        # conversation, threads of its parents (seen, or only referenced by
+        # earlier replies), and threads of earlier replies that referenced
+        # this message before it arrived
+        linked = []
+        if conversation_id is not None:
+            conversation_thread_id = self._resolve_thread_id(conversation_id)
+            if self._lookup_thread(conversation_thread_id) is not None:
+                linked.append(conversation_thread_id)
+        pending = self._lookup_pending(message_id)
+        if pending is not None:
+            self.pending_references.pop(message_id, None)
+            linked.append(pending)
+        thread = self._find_existing_thread(in_reply_to, references)
+        if thread is not None:
+            linked.append(thread.thread_id)
+        for ref in parents:
+            pending = self._lookup_pending(ref)
+            if pending is not None:
+                linked.append(pending)
+        
+        if linked:
+            thread = self._union_threads(linked)
+        else:
+            thread = self._create_new_thread(email_data)
+        
+        # Let later messages of the conversation find this thread by its key
+        if (conversation_id is not None and conversation_id != thread.thread_id
+                and self._resolve_thread_id(conversation_id) == conversation_id
+                and self._lookup_thread(conversation_id) is None):
+            self.merged_threads[conversation_id] = thread.thread_id
+        
+        # A message without parents is the start of the conversation
+        is_start = not in_reply_to and not references and (index is None or index.depth == 0)
+        if is_start and thread.message_ids:
+            thread.root_message_id = message_id
+            thread.subject = email_data.get('subject', '(No Subject)')
         
         # Add email to thread
-        thread.add_email(email_data)
-        self.message_to_thread[message_id] = thread.thread_id
+        participants = thread.add_email(email_data)
+        self.message_to_thread[sys.intern(message_id)] = thread.thread_id
+        
+        # Remember parents that have not been seen yet (interned, as the
+        # same id is usually referenced by several replies)
+        for ref in parents:
+            if self._lookup_message(ref) is None:
+                self.pending_references[sys.intern(ref)] = thread.thread_id
         
         # Update participant index
-        for participant in thread.participants:
-            self.threads_by_participant[participant].add(thread.thread_id)
+        for participant in participants:
+            self.threads_by_participant.add(participant, thread.thread_id)
+    
+    def _lookup_message(self, message_id: str) -> Optional[str]:
+        """Thread id recorded for a processed message (possibly merged since).
+        
+        Subclasses backed by storage override the ``_lookup_*`` methods to
+        fall back to stored state.
+        
+        Args:
+            message_id: Message-ID to look up
+            
+        Returns:
+            Thread id, or None if the message has not been processed
+        """
+        return self.message_to_thread.get(message_id)
+    
+    def _lookup_pending(self, message_id: str) -> Optional[str]:
+        """Thread id of an earlier reply that referenced a not yet seen message.
+        
+        Args:
+            message_id: Referenced Message-ID
+            
+        Returns:
+            Thread id, or None if the message has not been referenced
+        """
+        return self.pending_references.get(message_id)
+    
+    def _lookup_thread(self, thread_id: str) -> Optional[EmailThread]:
+        """Get a live thread by id.
+        
+        Args:
+            thread_id: Id of a live thread
+            
+        Returns:
+            EmailThread, or None if there is no live thread with that id
+        """
+        return self.threads_by_id.get(thread_id)
+    
+    def _resolve_thread_id(self, thread_id: str) -> str:
+        """Follow merge links to the id of the live thread (with path halving).
+        
+        Args:
+            thread_id: Id of a live or merged thread
+            
+        Returns:
+            Id of the live thread the given thread belongs to
+        """
+        merged = self.merged_threads
+        while thread_id in merged:
+            parent = merged[thread_id]
+            grandparent = merged.get(parent)
+            if grandparent is not None:
+                merged[thread_id] = grandparent
+            thread_id = parent
+        return thread_id
+    
+    def _union_threads(self, thread_ids: List[str]) -> EmailThread:
+        """Merge threads into one, absorbing smaller threads into the largest.
+        
+        Args:
+            thread_ids: Ids of live or merged threads (at least one)
+            
+        Returns:
+            The surviving EmailThread
+        """
+        roots = []
+        for thread_id in thread_ids:
+            root = self._resolve_thread_id(thread_id)
+            if root not in roots and self._lookup_thread(root) is not None:
+                roots.append(root)
+        
+        survivor = max((self.threads_by_id[root] for root in roots), key=lambda t: len(t.message_ids))
+        for root in roots:
+            if root == survivor.thread_id:
+                continue
+            absorbed = self.threads_by_id.pop(root)
+            survivor.merge(absorbed)
+            self.merged_threads[root] = survivor.thread_id
+            for participant in absorbed.participants:
+                self.threads_by_participant.replace(participant, root, survivor.thread_id)
+        return survivor
+    
+    def thread_id_for(self, message_id: str) -> Optional[str]:
+        """Get the id of the thread a message currently belongs to.
+        
+        Args:
+            message_id: Message-ID of a processed email
+            
+        Returns:
+            Thread id, or None if the message has not been processed
+        """
+        thread_id = self._lookup_message(message_id)
+        return self._resolve_thread_id(thread_id) if thread_id else None
     
     def _find_existing_thread(self, in_reply_to: Optional[str], references: List[str]) -> Optional[EmailThread]:
         """Find an existing thread based on reply/reference headers.
@@ -203,29 +409,32 @@ class ThreadManager:
         Returns:
             Existing EmailThread or None if not found
         """
-        # Check direct reply
-        if in_reply_to and in_reply_to in self.message_to_thread:
-            return self.threads_by_id[self.message_to_thread[in_reply_to]]
-        
-        # Check references
-        for ref in reversed(references):
-            if ref in self.message_to_thread:
-                return self.threads_by_id[self.message_to_thread[ref]]
+        # Check direct reply, then the references from the nearest ancestor up
+        for message_id in ([in_reply_to] if in_reply_to else []) + references[::-1]:
+            thread_id = self.thread_id_for(message_id)
+            if thread_id is not None:
+                return self._lookup_thread(thread_id)
         
         return None
     
     def _create_new_thread(self, email_data: Dict[str, Any]) -> EmailThread:
         """Create a new thread for an email.
         
+        If the generated id belongs to an existing thread (same
+        ConversationIndex, or same subject and participants), that thread
+        is returned instead.
+        
         Args:
             email_data: Dictionary containing email data
             
         Returns:
-            New EmailThread instance
+            New or existing EmailThread instance
         """
-        thread_id = self._generate_thread_id(email_data)
-        thread = EmailThread(thread_id=thread_id, subject=email_data.get('subject', '(No Subject)'))
-        self.threads_by_id[thread_id] = thread
+        thread_id = self._resolve_thread_id(self._generate_thread_id(email_data))
+        thread = self._lookup_thread(thread_id)
+        if thread is None:
+            thread = EmailThread(thread_id=thread_id, subject=email_data.get('subject', '(No Subject)'))
+            self.threads_by_id[thread_id] = thread
         return thread
     
     def _generate_thread_id(self, email_data: Dict[str, Any]) -> str:
@@ -237,8 +446,13 @@ class ThreadManager:
         Returns:
             Generated thread ID
         """
+        # Key Exchange conversations on the ConversationIndex header
+        index = conversation_index_of(email_data)
+        if index is not None:
+            return f"thread_{index.root_key}"
+        
         # Use existing thread ID if present
-        if 'thread_index' in email_data:
+        if email_data.get('thread_index'):
             return f"thread_{email_data['thread_index']}"
         
         # Fallback: Generate ID from subject and participants
@@ -309,6 +523,18 @@ class ThreadManager:
             if tid in self.threads_by_id
         ]
     
+    def analytics(self, emails: List[Dict[str, Any]]) -> 'ThreadFrame':
+        """Build columnar thread analytics for emails added to this manager.
+        
+        Args:
+            emails: The email dicts that were threaded
+            
+        Returns:
+            ThreadFrame (see core.thread_analytics; requires NumPy)
+        """
+        from .thread_analytics import ThreadFrame
+        return ThreadFrame.from_emails(emails, self.thread_id_for)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert the thread manager to a dictionary for serialization.
         
@@ -317,7 +543,18 @@ class ThreadManager:
         """
         return {
             'threads': [t.to_dict() for t in self.threads_by_id.values()],
-            'message_to_thread': self.message_to_thread,
+            'message_to_thread': {
+                message_id: self._resolve_thread_id(thread_id)
+                for message_id, thread_id in self.message_to_thread.items()
+            },
+            'pending_references': {
+                message_id: self._resolve_thread_id(thread_id)
+                for message_id, thread_id in self.pending_references.items()
+            },
+            'thread_aliases': {
+                thread_id: self._resolve_thread_id(thread_id)
+                for thread_id in self.merged_threads
+            },
             'threads_by_participant': {
                 k: list(v) for k, v in self.threads_by_participant.items()
             }
@@ -342,11 +579,12 @@ class ThreadManager:
         
         # Rebuild message to thread mapping
         manager.message_to_thread = data.get('message_to_thread', {})
+        manager.pending_references = data.get('pending_references', {})
+        manager.merged_threads = data.get('thread_aliases', {})
         
         # Rebuild participant index
-        manager.threads_by_participant = defaultdict(
-            set,
-            {k: set(v) for k, v in data.get('threads_by_participant', {}).items()}
+        manager.threads_by_participant = ParticipantIndex.from_dict(
+            data.get('threads_by_participant', {})
         )
         
         return manager
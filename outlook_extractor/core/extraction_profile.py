@@ -0,0 +1,99 @@
+"""
+Extraction profiles controlling which message bodies are read from Outlook.
+
+Reading ``Body`` and ``HTMLBody`` is the most expensive part of marshalling a
+MailItem over COM. A profile decides which of them are fetched at all, and an
+optional byte cap limits how much of each body is kept.
+"""
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Profile names
+PROFILE_HEADERS = 'headers'  # No body properties are read
+PROFILE_TEXT = 'text'        # Plain-text body only
+PROFILE_FULL = 'full'        # Plain-text and HTML bodies
+
+EXTRACTION_PROFILES = (PROFILE_HEADERS, PROFILE_TEXT, PROFILE_FULL)
+# Profile used when email_processing.extraction_profile is not set
+DEFAULT_PROFILE = PROFILE_TEXT
+
+
+def resolve_profile(profile: Optional[str], fallback: str = DEFAULT_PROFILE) -> str:
+    """Normalize a profile name, falling back for empty or unknown values.
+
+    Args:
+        profile: Profile name from config or caller (case-insensitive)
+        fallback: Profile to use if ``profile`` is empty or invalid
+
+    Returns:
+        One of the names in ``EXTRACTION_PROFILES``
+    """
+    name = (profile or '').strip().lower()
+    if not name:
+        return fallback
+    if name not in EXTRACTION_PROFILES:
+        logger.warning(f"Unknown extraction profile '{profile}', using '{fallback}'")
+        return fallback
+    return name
+
+
+def truncate_body(text: str, max_bytes: int = 0) -> Tuple[str, bool]:
+    """Truncate text so its UTF-8 encoding fits within ``max_bytes``.
+
+    Args:
+        text: Body text to truncate
+        max_bytes: Maximum encoded size in bytes (0 or less for no limit)
+
+    Returns:
+        Tuple of (text, truncated) where truncated is True if text was cut
+    """
+    if not text or max_bytes <= 0:
+        return text or '', False
+
+    # Every character is at least one byte, so short strings never need encoding
+    if len(text) <= max_bytes // 4:
+        return text, False
+
+    encoded = text.encode('utf-8')
+    if len(encoded) <= max_bytes:
+        return text, False
+
+    # Drop any partial multi-byte sequence left at the cut point
+    return encoded[:max_bytes].decode('utf-8', errors='ignore'), True
+
+
+def fetch_body(mail_item: Any, profile: str, max_body_bytes: int = 0) -> Dict[str, Any]:
+    """Read the body properties required by a profile from a MailItem.
+
+    Args:
+        mail_item: Outlook MailItem (or compatible) object
+        profile: One of ``EXTRACTION_PROFILES``
+        max_body_bytes: Per-body size cap in bytes (0 for no limit)
+
+    Returns:
+        Dictionary with ``body``, ``html_body``, ``body_truncated`` and
+        ``body_fetched`` keys
+    """
+    result = {
+        'body': '',
+        'html_body': '',
+        'body_truncated': False,
+        'body_fetched': False,
+    }
+
+    if profile == PROFILE_HEADERS:
+        return result
+
+    body = getattr(mail_item, 'Body', '') or ''
+    result['body'], result['body_truncated'] = truncate_body(str(body), max_body_bytes)
+
+    if profile == PROFILE_FULL:
+        html_body = getattr(mail_item, 'HTMLBody', '') or ''
+        html_body, html_truncated = truncate_body(str(html_body), max_body_bytes)
+        result['html_body'] = html_body
+        result['body_truncated'] = result['body_truncated'] or html_truncated
+
+    result['body_fetched'] = True
+    return result
@@ -0,0 +1,538 @@
+"""
+In-process fake of the Outlook COM object model.
+
+Mirrors the parts of the Outlook object model used by the extractor
+(Application, Namespace, Folders, Items, MailItem, Recipients, Attachments,
+PropertyAccessor and Table) on top of a ``SyntheticMailbox``, so the
+extraction hot paths can be exercised and benchmarked without Windows.
+
+Every COM property read and method call is counted, and an optional
+per-call latency (plus a per-kilobyte cost for body properties) models the
+cross-process marshalling cost of the real object model::
+
+    mailbox = SyntheticMailbox(message_count=10_000, seed=42)
+    outlook = FakeOutlookApplication(mailbox, call_latency=20e-6)
+    extractor.outlook_client = outlook
+    extractor.extract_emails(['Inbox'])
+    print(outlook.call_counts.most_common(5))
+"""
+import re
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Union
+
+from .internet_headers import PR_TRANSPORT_MESSAGE_HEADERS
+from .synthetic_mailbox import AttachmentSpec, MessageSpec, SyntheticMailbox
+
+# Outlook constants used by the fake
+OL_MAIL_ITEM = 0           # OlItemType for mail folders
+OL_MAIL_CLASS = 43         # OlObjectClass.olMail
+OL_FOLDER_INBOX = 6        # OlDefaultFolders.olFolderInbox
+OL_FOLDER_SENT_MAIL = 5    # OlDefaultFolders.olFolderSentMail
+OL_TO = 1
+OL_CC = 2
+OL_BY_VALUE = 1            # OlAttachmentType.olByValue
+
+_RESTRICT_CLAUSE_RE = re.compile(r"\[(\w+)\]\s*(>=|<=|<>|=|>|<)\s*'([^']*)'")
+_RESTRICT_DATE_FORMATS = ('%m/%d/%Y %H:%M %p', '%m/%d/%Y %I:%M %p', '%m/%d/%Y %H:%M', '%m/%d/%Y')
+_COMPARISONS = {
+    '>=': lambda a, b: a >= b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '<': lambda a, b: a < b,
+    '=': lambda a, b: a == b,
+    '<>': lambda a, b: a != b,
+}
+
+
+def _spend(seconds: float) -> None:
+    """Wait for a (possibly sub-millisecond) simulated call latency."""
+    if seconds <= 0:
+        return
+    if seconds >= 0.001:
+        time.sleep(seconds)
+        return
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _parse_restrict_value(value: str) -> Any:
+    """Parse a Restrict filter value as a date if possible."""
+    for date_format in _RESTRICT_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return value
+
+
+class FakeOutlookApplication:
+    """Fake ``Outlook.Application`` backed by a synthetic mailbox."""
+
+    def __init__(self, mailbox: SyntheticMailbox, call_latency: float = 0.0,
+                 body_latency_per_kb: float = 0.0):
+        """Initialize the fake application.
+
+        Args:
+            mailbox: Synthetic mailbox providing the messages
+            call_latency: Simulated seconds per COM property read or call
+            body_latency_per_kb: Extra simulated seconds per KB of Body/HTMLBody
+        """
+        self.mailbox = mailbox
+        self.call_latency = call_latency
+        self.body_latency_per_kb = body_latency_per_kb
+        self.call_counts: Counter = Counter()
+        self._namespace = FakeNamespace(self)
+
+    def _call(self, name: str, payload_bytes: int = 0) -> None:
+        """Record a COM call and spend its simulated latency."""
+        self.call_counts[name] += 1
+        latency = self.call_latency
+        if payload_bytes and self.body_latency_per_kb:
+            latency += self.body_latency_per_kb * payload_bytes / 1024
+        _spend(latency)
+
+    @property
+    def total_calls(self) -> int:
+        """Total number of COM calls made so far."""
+        return sum(self.call_counts.values())
+
+    def reset_counts(self) -> None:
+        """Clear the call counters."""
+        self.call_counts.clear()
+
+    def GetNamespace(self, name: str) -> 'FakeNamespace':
+        self._call('Application.GetNamespace')
+        if name.upper() != 'MAPI':
+            raise ValueError(f"Unsupported namespace: {name}")
+        return self._namespace
+
+    def Quit(self) -> None:
+        self._call('Application.Quit')
+
+    # OutlookExtractor.close() calls quit() on its client
+    quit = Quit
+
+
+class FakeCollection:
+    """Base for 1-based COM collections."""
+
+    def __init__(self, app: FakeOutlookApplication, name: str):
+        self._app = app
+        self._name = name
+
+    def _items(self) -> Sequence[Any]:
+        raise NotImplementedError
+
+    @property
+    def Count(self) -> int:
+        self._app._call(f'{self._name}.Count')
+        return len(self._items())
+
+    def Item(self, index: Union[int, str]) -> Any:
+        self._app._call(f'{self._name}.Item')
+        items = self._items()
+        if isinstance(index, str):
+            for item in items:
+                if getattr(item, 'Name', None) == index:
+                    return item
+            raise KeyError(index)
+        if not 1 <= index <= len(items):
+            raise IndexError(f"{self._name} index {index} out of range")
+        return items[index - 1]
+
+    def __getitem__(self, index: Union[int, str]) -> Any:
+        return self.Item(index)
+
+    def __len__(self) -> int:
+        return len(self._items())
+
+    def __iter__(self) -> Iterator[Any]:
+        self._app._call(f'{self._name}.__iter__')
+        return iter(list(self._items()))
+
+
+class FakeNamespace:
+    """Fake MAPI ``Namespace``."""
+
+    def __init__(self, app: FakeOutlookApplication):
+        self._app = app
+        root = FakeFolder(app, app.mailbox.account_name, item_indices=[], item_type=OL_MAIL_ITEM)
+        for name in app.mailbox.folder_names:
+            root.add_folder(FakeFolder(app, name, parent=root))
+        self._stores = [root]
+        self.Folders = FakeFolders(app, self._stores)
+
+    def GetDefaultFolder(self, folder_type: int) -> 'FakeFolder':
+        self._app._call('Namespace.GetDefaultFolder')
+        wanted = {OL_FOLDER_INBOX: 'Inbox', OL_FOLDER_SENT_MAIL: 'Sent Items'}.get(folder_type)
+        for folder in self._stores[0].Folders:
+            if folder.Name == wanted:
+                return folder
+        raise ValueError(f"Default folder {folder_type} not available")
+
+
+class FakeFolders(FakeCollection):
+    """Fake ``Folders`` collection."""
+
+    def __init__(self, app: FakeOutlookApplication, folders: List['FakeFolder']):
+        super().__init__(app, 'Folders')
+        self._folders = folders
+
+    def _items(self) -> Sequence['FakeFolder']:
+        return self._folders
+
+
+class FakeFolder:
+    """Fake ``MAPIFolder``."""
+
+    def __init__(self, app: FakeOutlookApplication, name: str,
+                 parent: Optional['FakeFolder'] = None,
+                 item_indices: Optional[List[int]] = None, item_type: int = OL_MAIL_ITEM):
+        self._app = app
+        self.Name = name
+        self.DefaultItemType = item_type
+        self.Parent = parent
+        self.EntryID = f"FOLDER-{name}"
+        self._subfolders: List[FakeFolder] = []
+        self._item_indices = item_indices
+        self.Folders = FakeFolders(app, self._subfolders)
+
+    def add_folder(self, folder: 'FakeFolder') -> 'FakeFolder':
+        self._subfolders.append(folder)
+        return folder
+
+    @property
+    def FolderPath(self) -> str:
+        if self.Parent is None:
+            return f"\\\\{self.Name}"
+        return f"{self.Parent.FolderPath}\\{self.Name}"
+
+    @property
+    def Items(self) -> 'FakeItems':
+        # Like COM, every access returns a new collection object
+        self._app._call('Folder.Items')
+        if self._item_indices is None:
+            self._item_indices = self._app.mailbox.folder_indices(self.Name)
+        return FakeItems(self._app, self._item_indices)
+
+
+class FakeItems(FakeCollection):
+    """Fake ``Items`` collection with Sort, Restrict, GetFirst/GetNext and GetTable."""
+
+    def __init__(self, app: FakeOutlookApplication, indices: List[int]):
+        super().__init__(app, 'Items')
+        self._indices = list(indices)
+        self._cursor = 0
+
+    def _items(self) -> Sequence[int]:
+        return self._indices
+
+    def _item(self, position: int) -> 'FakeMailItem':
+        return FakeMailItem(self._app, self._indices[position])
+
+    def Item(self, index: int) -> 'FakeMailItem':
+        self._app._call('Items.Item')
+        if not 1 <= index <= len(self._indices):
+            raise IndexError(f"Items index {index} out of range")
+        return self._item(index - 1)
+
+    def __iter__(self) -> Iterator['FakeMailItem']:
+        self._app._call('Items.__iter__')
+        for position in range(len(self._indices)):
+            yield self._item(position)
+
+    def Sort(self, property_name: str, descending: bool = False) -> None:
+        self._app._call('Items.Sort')
+        key = self._sort_key(property_name.strip('[]'))
+        self._indices.sort(key=key, reverse=bool(descending))
+
+    def _sort_key(self, property_name: str) -> Callable[[int], Any]:
+        mailbox = self._app.mailbox
+        if property_name in ('ReceivedTime', 'SentOn'):
+            return mailbox.received_timestamp
+        if property_name == 'EntryID':
+            return mailbox.entry_id
+        return lambda index: getattr(mailbox.message(index), _SPEC_ATTRIBUTES.get(property_name, property_name))
+
+    def Restrict(self, filter_text: str) -> 'FakeItems':
+        """Filter items with a Jet-style filter of ANDed [Property] op 'value' clauses."""
+        self._app._call('Items.Restrict')
+        clauses = _RESTRICT_CLAUSE_RE.findall(filter_text)
+        if not clauses:
+            raise ValueError(f"Unsupported Restrict filter: {filter_text}")
+
+        mailbox = self._app.mailbox
+        matched = self._indices
+        for property_name, operator, raw_value in clauses:
+            value = _parse_restrict_value(raw_value)
+            compare = _COMPARISONS[operator]
+            if property_name in ('ReceivedTime', 'SentOn') and isinstance(value, datetime):
+                # Outlook compares dates with minute precision
+                threshold = value.timestamp()
+                matched = [i for i in matched
+                           if compare(int(mailbox.received_timestamp(i) // 60) * 60, threshold)]
+            else:
+                attribute = _SPEC_ATTRIBUTES.get(property_name, property_name)
+                matched = [i for i in matched
+                           if compare(getattr(mailbox.message(i), attribute), value)]
+        return FakeItems(self._app, matched)
+
+    def GetFirst(self) -> Optional['FakeMailItem']:
+        self._app._call('Items.GetFirst')
+        self._cursor = 0
+        return self._next()
+
+    def GetNext(self) -> Optional['FakeMailItem']:
+        self._app._call('Items.GetNext')
+        return self._next()
+
+    def _next(self) -> Optional['FakeMailItem']:
+        if self._cursor >= len(self._indices):
+            return None
+        item = self._item(self._cursor)
+        self._cursor += 1
+        return item
+
+    def GetTable(self, filter_text: str = '', table_contents: int = 0) -> 'FakeTable':
+        self._app._call('Items.GetTable')
+        items = self.Restrict(filter_text) if filter_text else self
+        return FakeTable(self._app, items._indices)
+
+
+# COM property name -> MessageSpec attribute, where they differ
+_SPEC_ATTRIBUTES = {
+    'EntryID': 'entry_id',
+    'Subject': 'subject',
+    'SenderName': 'sender_name',
+    'SenderEmailAddress': 'sender_email',
+    'ReceivedTime': 'received_time',
+    'SentOn': 'sent_on',
+    'ConversationID': 'conversation_id',
+    'ConversationTopic': 'conversation_topic',
+    'ConversationIndex': 'conversation_index',
+    'Categories': 'categories',
+    'Importance': 'importance',
+    'UnRead': 'unread',
+    'Size': 'size',
+}
+
+
+class FakeTable:
+    """Fake ``Table`` returned by ``Items.GetTable``; rows are read in one call each."""
+
+    DEFAULT_COLUMNS = ('EntryID', 'Subject', 'CreationTime', 'LastModificationTime', 'MessageClass')
+
+    def __init__(self, app: FakeOutlookApplication, indices: List[int]):
+        self._app = app
+        self._indices = indices
+        self._position = 0
+        self.Columns = FakeColumns(list(self.DEFAULT_COLUMNS))
+
+    @property
+    def EndOfTable(self) -> bool:
+        return self._position >= len(self._indices)
+
+    def GetRowCount(self) -> int:
+        self._app._call('Table.GetRowCount')
+        return len(self._indices)
+
+    def GetNextRow(self) -> Optional['FakeRow']:
+        self._app._call('Table.GetNextRow')
+        if self.EndOfTable:
+            return None
+        spec = self._app.mailbox.message(self._indices[self._position])
+        self._position += 1
+        return FakeRow(spec, list(self.Columns.names))
+
+    def MoveToStart(self) -> None:
+        self._position = 0
+
+
+class FakeColumns:
+    """Fake ``Columns`` collection of a Table."""
+
+    def __init__(self, names: List[str]):
+        self.names = names
+
+    def Add(self, name: str) -> None:
+        if name not in self.names:
+            self.names.append(name)
+
+    def RemoveAll(self) -> None:
+        self.names = []
+
+    @property
+    def Count(self) -> int:
+        return len(self.names)
+
+
+class FakeRow:
+    """Fake table ``Row``; values are addressed by column name or 1-based index."""
+
+    def __init__(self, spec: MessageSpec, columns: List[str]):
+        self._spec = spec
+        self._columns = columns
+
+    def Item(self, column: Union[int, str]) -> Any:
+        if isinstance(column, int):
+            column = self._columns[column - 1]
+        if column == 'MessageClass':
+            return 'IPM.Note'
+        if column in ('CreationTime', 'LastModificationTime'):
+            return self._spec.received_time
+        if column == PR_TRANSPORT_MESSAGE_HEADERS:
+            return self._spec.transport_headers()
+        return getattr(self._spec, _SPEC_ATTRIBUTES.get(column, column))
+
+    __call__ = Item
+
+    def GetValues(self) -> tuple:
+        return tuple(self.Item(column) for column in self._columns)
+
+
+class FakeMailItem:
+    """Fake ``MailItem``; every property read is a counted COM call."""
+
+    Class = OL_MAIL_CLASS
+    MessageClass = 'IPM.Note'
+
+    def __init__(self, app: FakeOutlookApplication, index: int):
+        self._app = app
+        self._index = index
+        self._spec: Optional[MessageSpec] = None
+
+    @property
+    def spec(self) -> MessageSpec:
+        """The synthetic message behind this item (not a COM property)."""
+        if self._spec is None:
+            self._spec = self._app.mailbox.message(self._index)
+        return self._spec
+
+    def _get(self, name: str) -> Any:
+        self._app._call(f'MailItem.{name}')
+        return getattr(self.spec, _SPEC_ATTRIBUTES[name])
+
+    EntryID = property(lambda self: self._get('EntryID'))
+    Subject = property(lambda self: self._get('Subject'))
+    SenderName = property(lambda self: self._get('SenderName'))
+    SenderEmailAddress = property(lambda self: self._get('SenderEmailAddress'))
+    ReceivedTime = property(lambda self: self._get('ReceivedTime'))
+    SentOn = property(lambda self: self._get('SentOn'))
+    ConversationID = property(lambda self: self._get('ConversationID'))
+    ConversationTopic = property(lambda self: self._get('ConversationTopic'))
+    ConversationIndex = property(lambda self: self._get('ConversationIndex'))
+    Categories = property(lambda self: self._get('Categories'))
+    Importance = property(lambda self: self._get('Importance'))
+    UnRead = property(lambda self: self._get('UnRead'))
+    Size = property(lambda self: self._get('Size'))
+
+    @property
+    def Body(self) -> str:
+        body = self.spec.body
+        self._app._call('MailItem.Body', len(body))
+        return body
+
+    @property
+    def HTMLBody(self) -> str:
+        html_body = self.spec.html_body
+        self._app._call('MailItem.HTMLBody', len(html_body))
+        return html_body
+
+    @property
+    def To(self) -> str:
+        self._app._call('MailItem.To')
+        return '; '.join(name for name, _ in self.spec.to)
+
+    @property
+    def CC(self) -> str:
+        self._app._call('MailItem.CC')
+        return '; '.join(name for name, _ in self.spec.cc)
+
+    @property
+    def Recipients(self) -> 'FakeRecipients':
+        self._app._call('MailItem.Recipients')
+        recipients = [FakeRecipient(self._app, name, address, OL_TO) for name, address in self.spec.to]
+        recipients.extend(FakeRecipient(self._app, name, address, OL_CC) for name, address in self.spec.cc)
+        return FakeRecipients(self._app, recipients)
+
+    @property
+    def Attachments(self) -> 'FakeAttachments':
+        self._app._call('MailItem.Attachments')
+        return FakeAttachments(self._app, [FakeAttachment(self._app, a) for a in self.spec.attachments])
+
+    @property
+    def PropertyAccessor(self) -> 'FakePropertyAccessor':
+        self._app._call('MailItem.PropertyAccessor')
+        return FakePropertyAccessor(self._app, self)
+
+
+class FakeRecipients(FakeCollection):
+    """Fake ``Recipients`` collection."""
+
+    def __init__(self, app: FakeOutlookApplication, recipients: List['FakeRecipient']):
+        super().__init__(app, 'Recipients')
+        self._recipients = recipients
+
+    def _items(self) -> Sequence['FakeRecipient']:
+        return self._recipients
+
+
+class FakeRecipient:
+    """Fake SMTP ``Recipient`` (no Exchange user)."""
+
+    def __init__(self, app: FakeOutlookApplication, name: str, address: str, recipient_type: int):
+        self._app = app
+        self.Name = name
+        self.Address = address
+        self.Type = recipient_type
+
+    def GetExchangeUser(self) -> None:
+        self._app._call('Recipient.GetExchangeUser')
+        return None
+
+
+class FakeAttachments(FakeCollection):
+    """Fake ``Attachments`` collection."""
+
+    def __init__(self, app: FakeOutlookApplication, attachments: List['FakeAttachment']):
+        super().__init__(app, 'Attachments')
+        self._attachments = attachments
+
+    def _items(self) -> Sequence['FakeAttachment']:
+        return self._attachments
+
+
+class FakeAttachment:
+    """Fake ``Attachment`` whose SaveAsFile writes deterministic content."""
+
+    Type = OL_BY_VALUE
+
+    def __init__(self, app: FakeOutlookApplication, spec: AttachmentSpec):
+        self._app = app
+        self._spec = spec
+        self.FileName = spec.filename
+        self.DisplayName = spec.filename
+        self.Size = spec.size
+
+    def SaveAsFile(self, path: str) -> None:
+        content = self._spec.content()
+        self._app._call('Attachment.SaveAsFile', len(content))
+        with open(path, 'wb') as f:
+            f.write(content)
+
+
+class FakePropertyAccessor:
+    """Fake ``PropertyAccessor`` supporting the transport header property."""
+
+    def __init__(self, app: FakeOutlookApplication, item: FakeMailItem):
+        self._app = app
+        self._item = item
+
+    def GetProperty(self, schema_name: str) -> Any:
+        self._app._call('PropertyAccessor.GetProperty')
+        if schema_name == PR_TRANSPORT_MESSAGE_HEADERS:
+            return self._item.spec.transport_headers()
+        raise KeyError(f"Property {schema_name} is not supported by the fake")
@@ -0,0 +1,113 @@
+"""
+Parsing of Internet transport headers read from Outlook messages.
+
+Outlook exposes the raw header block of a received message through the
+PR_TRANSPORT_MESSAGE_HEADERS MAPI property. The block is fetched once per
+message and parsed here into a structured dictionary, including the
+Message-ID, In-Reply-To and References values used for threading.
+"""
+import re
+from email.parser import HeaderParser
+from email.policy import compat32
+from typing import Any, Dict, Iterable, List, Optional
+
+# MAPI property holding the full Internet header block of a message
+PR_TRANSPORT_MESSAGE_HEADERS = "http://schemas.microsoft.com/mapi/proptag/0x007D001F"
+
+# Headers persisted when no allowlist is configured
+DEFAULT_HEADER_FIELDS = (
+    'Received', 'Received-SPF', 'Authentication-Results',
+    'DKIM-Signature', 'X-Received', 'X-Google-DKIM-Signature',
+    'X-Google-Smtp-Source', 'MIME-Version', 'X-Originating-IP',
+    'Message-ID', 'References', 'In-Reply-To', 'Thread-Index'
+)
+
+_MESSAGE_ID_RE = re.compile(r'<[^<>\s]+>')
+_FOLDING_RE = re.compile(r'\r?\n[ \t]+')
+
+_parser = HeaderParser(policy=compat32)
+
+
+def _unfold(value: Any) -> str:
+    """Collapse folded header continuation lines into a single line."""
+    return _FOLDING_RE.sub(' ', str(value)).strip()
+
+
+def parse_message_ids(value: Optional[str]) -> List[str]:
+    """Extract message IDs from a Message-ID, In-Reply-To or References value.
+
+    Args:
+        value: Raw header value
+
+    Returns:
+        List of message IDs in header order, including angle brackets
+    """
+    if not value:
+        return []
+    ids = _MESSAGE_ID_RE.findall(value)
+    if ids:
+        return ids
+    # Some clients omit the angle brackets
+    return [part for part in value.split() if part]
+
+
+def parse_internet_headers(raw_headers: Optional[str],
+                           allowlist: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Parse a raw Internet header block.
+
+    Args:
+        raw_headers: Header block as returned by PR_TRANSPORT_MESSAGE_HEADERS
+        allowlist: Header names to keep in ``fields`` (case-insensitive).
+            Defaults to ``DEFAULT_HEADER_FIELDS``; ``'*'`` keeps every header.
+
+    Returns:
+        Dictionary with ``message_id``, ``in_reply_to``, ``references`` (list)
+        and ``fields`` (allowlisted header name -> value, or list of values
+        for repeated headers such as Received)
+    """
+    result = {
+        'message_id': '',
+        'in_reply_to': '',
+        'references': [],
+        'fields': {},
+    }
+
+    if not raw_headers or not isinstance(raw_headers, str):
+        return result
+
+    message = _parser.parsestr(raw_headers, headersonly=True)
+
+    if allowlist is None:
+        allowlist = DEFAULT_HEADER_FIELDS
+    allowed = {name.strip().lower() for name in allowlist if name and name.strip()}
+    keep_all = '*' in allowed
+
+    fields: Dict[str, Any] = {}
+    for name, value in message.items():
+        lower_name = name.lower()
+        value = _unfold(value)
+
+        # Threading headers are always extracted, whatever the allowlist says
+        if lower_name == 'message-id' and not result['message_id']:
+            ids = parse_message_ids(value)
+            result['message_id'] = ids[0] if ids else value
+        elif lower_name == 'in-reply-to' and not result['in_reply_to']:
+            ids = parse_message_ids(value)
+            result['in_reply_to'] = ids[-1] if ids else value
+        elif lower_name == 'references' and not result['references']:
+            result['references'] = parse_message_ids(value)
+
+        if not keep_all and lower_name not in allowed:
+            continue
+
+        if name in fields:
+            existing = fields[name]
+            if isinstance(existing, list):
+                existing.append(value)
+            else:
+                fields[name] = [existing, value]
+        else:
+            fields[name] = value
+
+    result['fields'] = fields
+    return result
@@ -0,0 +1,242 @@
+"""
+Compact string collections for threading state.
+
+Threading keeps a few small collections per thread (participants,
+categories, message ids). As Python ``set``s each costs at least 216 bytes
+even when it holds one element, and every lowercased address is a separate
+string object. At a million messages that adds up to hundreds of MB.
+
+- ``InternTable`` maps each distinct string to a small integer id and
+  keeps one copy of the string.
+- ``InternedSet`` is a set of strings stored as a sorted ``array('I')`` of
+  ids in a table (4 bytes per element).
+- ``SortedStringSet`` is a set of unique strings (message ids) kept in a
+  sorted list.
+
+Both sets implement ``collections.abc.MutableSet``, so they compare equal
+to ``set`` objects and support ``in``, iteration and the set operators.
+"""
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableSet
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class InternTable:
+    """Bidirectional mapping between strings and dense integer ids."""
+
+    __slots__ = ('_ids', '_values')
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._values: List[str] = []
+
+    def id_for(self, value: str) -> int:
+        """Id of a string, adding it to the table if new."""
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = self._ids[value] = len(self._values)
+            self._values.append(value)
+        return value_id
+
+    def lookup(self, value: str) -> Optional[int]:
+        """Id of a string, or None if it was never added."""
+        return self._ids.get(value)
+
+    def value(self, value_id: int) -> str:
+        """The string with the given id."""
+        return self._values[value_id]
+
+    def intern(self, value: str) -> str:
+        """The table's copy of a string (adding it if new)."""
+        return self._values[self.id_for(value)]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+# Shared tables; addresses and categories repeat across threads and managers
+ADDRESSES = InternTable()
+CATEGORIES = InternTable()
+
+
+class InternedSet(MutableSet):
+    """Set of strings stored as sorted ids of an InternTable."""
+
+    __slots__ = ('_ids',)
+
+    table = InternTable()
+
+    def __init__(self, values: Iterable[str] = ()):
+        self._ids = array('I')
+        for value in values:
+            self.add(value)
+
+    def __contains__(self, value) -> bool:
+        value_id = self.table.lookup(value) if isinstance(value, str) else None
+        if value_id is None:
+            return False
+        position = bisect_left(self._ids, value_id)
+        return position < len(self._ids) and self._ids[position] == value_id
+
+    def __iter__(self) -> Iterator[str]:
+        value = self.table.value
+        return (value(value_id) for value_id in self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, value: str) -> None:
+        value_id = self.table.id_for(value)
+        position = bisect_left(self._ids, value_id)
+        if position == len(self._ids) or self._ids[position] != value_id:
+            self._ids.insert(position, value_id)
+
+    def discard(self, value: str) -> None:
+        value_id = self.table.lookup(value)
+        if value_id is None:
+            return
+        position = bisect_left(self._ids, value_id)
+        if position < len(self._ids) and self._ids[position] == value_id:
+            del self._ids[position]
+
+    def update(self, values: Iterable[str]) -> None:
+        """Add all values (merging id arrays directly for sets of the same type)."""
+        if type(values) is type(self):
+            if values._ids:
+                self._ids = array('I', sorted(set(self._ids).union(values._ids)))
+            return
+        for value in values:
+            self.add(value)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({sorted(self)!r})"
+
+
+class AddressSet(InternedSet):
+    """Set of email addresses interned in ADDRESSES."""
+
+    __slots__ = ()
+
+    table = ADDRESSES
+
+
+class CategorySet(InternedSet):
+    """Set of category names interned in CATEGORIES."""
+
+    __slots__ = ()
+
+    table = CATEGORIES
+
+
+class SortedStringSet(MutableSet):
+    """Set of strings kept in a sorted list (about 8 bytes per element)."""
+
+    __slots__ = ('_values',)
+
+    def __init__(self, values: Iterable[str] = ()):
+        self._values: List[str] = sorted(set(values))
+
+    def __contains__(self, value) -> bool:
+        position = bisect_left(self._values, value) if isinstance(value, str) else len(self._values)
+        return position < len(self._values) and self._values[position] == value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, value: str) -> None:
+        position = bisect_left(self._values, value)
+        if position == len(self._values) or self._values[position] != value:
+            self._values.insert(position, value)
+
+    def discard(self, value: str) -> None:
+        position = bisect_left(self._values, value)
+        if position < len(self._values) and self._values[position] == value:
+            del self._values[position]
+
+    def update(self, values: Iterable[str]) -> None:
+        """Add all values."""
+        values = list(values)
+        if len(values) > 8:
+            self._values = sorted(set(self._values).union(values))
+        else:
+            for value in values:
+                self.add(value)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._values!r})"
+
+
+class ParticipantIndex:
+    """Address -> ids of the threads the address takes part in.
+
+    Keys are interned addresses; an address in a single thread stores the
+    thread id itself instead of a one-element set.
+    """
+
+    __slots__ = ('_threads',)
+
+    def __init__(self):
+        self._threads: Dict[int, object] = {}
+
+    def add(self, address: str, thread_id: str) -> None:
+        """Record that an address takes part in a thread."""
+        key = ADDRESSES.id_for(address)
+        current = self._threads.get(key)
+        if current is None:
+            self._threads[key] = thread_id
+        elif isinstance(current, set):
+            current.add(thread_id)
+        elif current != thread_id:
+            self._threads[key] = {current, thread_id}
+
+    def replace(self, address: str, old_thread_id: str, new_thread_id: str) -> None:
+        """Move an address from one thread id to another (after a merge)."""
+        key = ADDRESSES.lookup(address)
+        current = self._threads.get(key) if key is not None else None
+        if current is None:
+            self.add(address, new_thread_id)
+        elif isinstance(current, set):
+            current.discard(old_thread_id)
+            current.add(new_thread_id)
+            if len(current) == 1:
+                self._threads[key] = next(iter(current))
+        elif current == old_thread_id:
+            self._threads[key] = new_thread_id
+        elif current != new_thread_id:
+            self._threads[key] = {current, new_thread_id}
+
+    def get(self, address: str, default=None):
+        """Set of thread ids of an address, or ``default`` if it has none."""
+        key = ADDRESSES.lookup(address)
+        current = self._threads.get(key) if key is not None else None
+        if current is None:
+            return default
+        return set(current) if isinstance(current, set) else {current}
+
+    def __getitem__(self, address: str) -> set:
+        return self.get(address, set())
+
+    def __contains__(self, address: str) -> bool:
+        key = ADDRESSES.lookup(address)
+        return key is not None and key in self._threads
+
+    def __len__(self) -> int:
+        return len(self._threads)
+
+    def items(self) -> Iterator:
+        """(address, set of thread ids) pairs."""
+        for key, current in self._threads.items():
+            yield ADDRESSES.value(key), set(current) if isinstance(current, set) else {current}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Iterable[str]]) -> 'ParticipantIndex':
+        """Build an index from ``{address: [thread ids]}``."""
+        index = cls()
+        for address, thread_ids in data.items():
+            for thread_id in thread_ids:
+                index.add(address, thread_id)
+        return index
@@ -0,0 +1,477 @@
+"""
+JWZ message threading.
+
+An implementation of Jamie Zawinski's threading algorithm
+(https://www.jwz.org/doc/threading.html), the one used by Netscape Mail and
+most mail clients since:
+
+1. Every message gets a container in an id table; the References chain
+   (plus In-Reply-To) links containers parent to child, creating empty
+   containers for messages that were referenced but not seen.
+2. Containers without a parent are the roots.
+3. Empty containers are pruned: their children move up to their parent,
+   and empty leaves are dropped.
+4. Roots with the same normalized subject (``Re:``/``Fwd:``/``AW:``/
+   ``SV:``... stripped) are grouped into one thread.
+
+``JWZThreader.add_email`` only records the few fields threading needs in a
+``ThreadRecord`` tuple, with repeated strings (subjects, addresses)
+interned, so adding is O(1) and memory stays proportional to the number of
+messages, not their size. ``get_threads`` runs the algorithm over everything added so
+far; each step visits every container a constant number of times, so a run
+is O(n) apart from the short ancestor walks used to avoid reference loops.
+
+The ``threading.thread_method`` setting selects the steps:
+
+- ``headers``: reference linking only (steps 1-3).
+- ``content``: subject grouping only; headers are ignored.
+- ``hybrid``: both (the full algorithm).
+
+Messages without reply headers but with an Outlook ConversationIndex are
+linked through the index instead: each 5-byte child block is one reply
+level, so the index prefixes act as a References chain.
+
+``threading.max_thread_depth`` limits the reply tree: messages nested
+deeper are attached to their ancestor one level above it, so no message
+is deeper than the limit.
+"""
+import hashlib
+import re
+import sys
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .conversation_index import conversation_index_of
+from .email_threading import EmailThread, message_id_of
+
+# Threading methods
+METHOD_HEADERS = 'headers'
+METHOD_CONTENT = 'content'
+METHOD_HYBRID = 'hybrid'
+THREAD_METHODS = (METHOD_HEADERS, METHOD_CONTENT, METHOD_HYBRID)
+
+# Older spellings of the methods found in configuration files
+METHOD_ALIASES = {'references': METHOD_HEADERS, 'subject': METHOD_CONTENT}
+
+DEFAULT_MAX_DEPTH = 10
+
+# Prefix of id-table keys derived from ConversationIndex values
+_INDEX_KEY_PREFIX = 'index:'
+
+
+class ThreadRecord(NamedTuple):
+    """Fields kept per message; everything else (bodies, headers) is dropped."""
+    entry_id: str
+    message_id: str
+    subject: Optional[str]
+    sender_email: Optional[str]
+    to_recipients: Optional[str]
+    cc_recipients: Optional[str]
+    sent_on: Optional[str]
+    received_time: Optional[str]
+    categories: Optional[str]
+
+
+THREAD_FIELDS = ThreadRecord._fields
+
+# Fields whose values repeat across messages and are interned
+_INTERNED_FIELDS = ('subject', 'sender_email', 'to_recipients', 'cc_recipients', 'categories')
+
+# Reply/forward prefixes in English and the common Outlook localizations,
+# optionally followed by a counter ("Re[2]:", "RE(3):") and repeated
+_SUBJECT_PREFIX_RE = re.compile(
+    r'^\s*(?:(?:re|fwd?|aw|wg|sv|vs|vb|antw|tr|rif|enc|odp|doorst)'
+    r'\s*(?:\[\d+\]|\(\d+\))?\s*:\s*)+',
+    re.IGNORECASE
+)
+_REPLY_PREFIX_RE = re.compile(r'^\s*(?:re|aw|sv|vs|antw|rif|odp)\s*(?:\[\d+\]|\(\d+\))?\s*:', re.IGNORECASE)
+_MESSAGE_ID_RE = re.compile(r'<[^<>\s]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_subject(subject: Optional[str]) -> str:
+    """Reduce a subject to the form shared by all messages of a conversation.
+
+    Reply and forward prefixes are stripped (repeatedly, so
+    ``"RE: Fwd: AW: Budget"`` becomes ``"budget"``), whitespace is collapsed
+    and the result is lowercased.
+
+    Args:
+        subject: Subject line
+
+    Returns:
+        Normalized subject ('' for empty subjects)
+    """
+    if not subject:
+        return ''
+    subject = _SUBJECT_PREFIX_RE.sub('', subject)
+    return _WHITESPACE_RE.sub(' ', subject).strip().lower()
+
+
+def is_reply_subject(subject: Optional[str]) -> bool:
+    """Whether a subject starts with a reply prefix (``Re:``, ``AW:``...)."""
+    return bool(subject and _REPLY_PREFIX_RE.match(subject))
+
+
+def resolve_thread_method(method: Optional[str]) -> str:
+    """Normalize a thread_method setting, defaulting to hybrid."""
+    name = (method or '').strip().lower()
+    name = METHOD_ALIASES.get(name, name)
+    return name if name in THREAD_METHODS else METHOD_HYBRID
+
+
+class Container:
+    """Node of the reply tree; ``email`` is None for messages not seen."""
+
+    __slots__ = ('message_id', 'email', 'parent', 'children')
+
+    def __init__(self, message_id: Optional[str], email: Optional[ThreadRecord] = None):
+        self.message_id = message_id
+        self.email = email
+        self.parent: Optional['Container'] = None
+        self.children: List['Container'] = []
+
+    def has_ancestor(self, other: 'Container') -> bool:
+        """Whether ``other`` is this container or one of its ancestors."""
+        node = self
+        while node is not None:
+            if node is other:
+                return True
+            node = node.parent
+        return False
+
+    def add_child(self, child: 'Container') -> None:
+        """Attach a child, detaching it from its current parent."""
+        if child.parent is not None:
+            child.parent.children.remove(child)
+        child.parent = self
+        self.children.append(child)
+
+    def walk(self) -> Iterator[Tuple['Container', int]]:
+        """Containers of this subtree with their depth, parents first."""
+        stack = [(self, 0)]
+        while stack:
+            node, depth = stack.pop()
+            yield node, depth
+            stack.extend((child, depth + 1) for child in reversed(node.children))
+
+    def first_email(self) -> Optional[ThreadRecord]:
+        """The topmost message of this subtree."""
+        for node, _ in self.walk():
+            if node.email is not None:
+                return node.email
+        return None
+
+    def __repr__(self) -> str:
+        return f"Container({self.message_id!r}, seen={self.email is not None}, children={len(self.children)})"
+
+
+class JWZThreader:
+    """Threads messages with the JWZ algorithm.
+
+    Offers the ``add_email``/``get_threads`` interface of ``ThreadManager``,
+    so the extractor can use either. Threads are rebuilt from the recorded
+    messages on every ``get_threads`` call.
+    """
+
+    def __init__(self, method: Optional[str] = METHOD_HYBRID, max_depth: int = DEFAULT_MAX_DEPTH):
+        """Create the threader.
+
+        Args:
+            method: 'headers', 'content' or 'hybrid' (see module docstring)
+            max_depth: Maximum depth of the reply tree (0 for no limit)
+        """
+        self.method = resolve_thread_method(method)
+        self.max_depth = max(0, int(max_depth or 0))
+        # (message id, parent keys oldest first, ConversationIndex key, record)
+        self._messages: List[Tuple[str, Tuple[str, ...], Optional[str], ThreadRecord]] = []
+        self._seen: set = set()
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def add_email(self, email_data: Dict[str, Any]) -> None:
+        """Record an email for threading.
+
+        Duplicate Message-IDs are ignored. Emails without a Message-ID
+        (drafts, some Exchange-internal mail) get one derived from their
+        EntryID, so they can still be grouped by subject.
+
+        Args:
+            email_data: Dictionary containing email data
+        """
+        message_id = message_id_of(email_data)
+        if not message_id or message_id in self._seen:
+            return
+        message_id = sys.intern(message_id)
+        self._seen.add(message_id)
+
+        parents = ()
+        index_key = None
+        if self.method != METHOD_CONTENT:
+            parents = self._parse_parents(email_data.get('references'), email_data.get('in_reply_to'))
+            parents = tuple(sys.intern(ref) for ref in parents if ref != message_id)
+            index = conversation_index_of(email_data)
+            if index is not None:
+                index_key = _INDEX_KEY_PREFIX + index.key
+                if not parents:
+                    parents = tuple(_INDEX_KEY_PREFIX + key for key in index.ancestor_keys())
+
+        values = {key: email_data.get(key) for key in THREAD_FIELDS}
+        for key in _INTERNED_FIELDS:
+            if isinstance(values[key], str):
+                values[key] = sys.intern(values[key])
+        values['message_id'] = message_id
+        values['entry_id'] = values['entry_id'] or message_id
+        # Only one date is used for the thread's date range
+        if values['sent_on']:
+            values['received_time'] = None
+        self._messages.append((message_id, parents, index_key, ThreadRecord(**values)))
+
+    @staticmethod
+    def _parse_parents(references: Optional[str], in_reply_to: Optional[str]) -> List[str]:
+        """Parent Message-IDs, oldest first, with In-Reply-To last."""
+        parents = _MESSAGE_ID_RE.findall(references) if references else []
+        if not parents and references:
+            parents = references.split()
+        if in_reply_to:
+            reply_ids = _MESSAGE_ID_RE.findall(in_reply_to) or in_reply_to.split()
+            if reply_ids and (not parents or parents[-1] != reply_ids[0]):
+                parents.append(reply_ids[0])
+        return parents
+
+    def build(self) -> List[Container]:
+        """Run the threading algorithm.
+
+        Returns:
+            Root containers, one per thread, in order of first appearance
+        """
+        id_table: Dict[str, Container] = {}
+        roots = self._link_references(id_table)
+        del id_table
+        roots = self._prune(roots)
+        if self.method != METHOD_HEADERS:
+            roots = self._group_by_subject(roots)
+        if self.max_depth:
+            for root in roots:
+                self._limit_depth(root)
+        return roots
+
+    def _link_references(self, id_table: Dict[str, Container]) -> List[Container]:
+        """Steps 1 and 2: build the id table, link parents, find the roots."""
+        order: List[Container] = []
+
+        def container_for(message_id: str) -> Container:
+            container = id_table.get(message_id)
+            if container is None:
+                container = id_table[message_id] = Container(message_id)
+                order.append(container)
+            return container
+
+        for message_id, parents, index_key, email in self._messages:
+            container = container_for(message_id)
+            container.email = email
+            if index_key is not None:
+                self._register_index_key(id_table, index_key, container)
+
+            # Link the References chain pairwise, keeping existing links
+            previous = None
+            for ref in parents:
+                current = container_for(ref)
+                if (previous is not None and current.parent is None
+                        and not previous.has_ancestor(current)):
+                    previous.add_child(current)
+                previous = current
+
+            # The last reference is this message's parent; the message's own
+            # headers override links guessed from other messages' References
+            if container.parent is not previous and not (previous is not None and previous.has_ancestor(container)):
+                if container.parent is not None:
+                    container.parent.children.remove(container)
+                    container.parent = None
+                if previous is not None:
+                    previous.add_child(container)
+
+        return [container for container in order if container.parent is None]
+
+    @staticmethod
+    def _register_index_key(id_table: Dict[str, Container], index_key: str, container: Container) -> None:
+        """Make a message reachable by its ConversationIndex key.
+
+        If replies already created an empty container for the key, its
+        children are moved to the message's container.
+        """
+        placeholder = id_table.get(index_key)
+        id_table[index_key] = container
+        if placeholder is None or placeholder is container or placeholder.email is not None:
+            return
+        for child in placeholder.children:
+            if not container.has_ancestor(child):
+                child.parent = container
+                container.children.append(child)
+            else:
+                child.parent = None
+        placeholder.children = []
+        if placeholder.parent is not None:
+            if container.parent is None and not placeholder.parent.has_ancestor(container):
+                placeholder.parent.add_child(container)
+            placeholder.parent.children.remove(placeholder)
+            placeholder.parent = None
+
+    @staticmethod
+    def _prune(roots: List[Container]) -> List[Container]:
+        """Step 4: remove empty containers, promoting their children."""
+        result: List[Container] = []
+        for root in roots:
+            # Post-order: when a node is finished its empty children have
+            # already been reduced to their own (non-empty) children
+            stack = [(root, False)]
+            while stack:
+                node, visited = stack.pop()
+                if not visited:
+                    stack.append((node, True))
+                    stack.extend((child, False) for child in node.children)
+                    continue
+                children = []
+                for child in node.children:
+                    if child.email is None:
+                        for grandchild in child.children:
+                            grandchild.parent = node
+                        children.extend(child.children)
+                        child.children = []
+                        child.parent = None
+                    else:
+                        children.append(child)
+                node.children = children
+
+            if root.email is None:
+                if not root.children:
+                    continue
+                if len(root.children) == 1:
+                    root = root.children[0]
+                    root.parent = None
+            result.append(root)
+        return result
+
+    @staticmethod
+    def _group_by_subject(roots: List[Container]) -> List[Container]:
+        """Step 5: merge roots whose normalized subjects match.
+
+        Within a group the head is an empty container if there is one,
+        otherwise the only non-reply message; failing that a new empty
+        container holds all of the group's roots.
+        """
+        groups: Dict[str, List[Container]] = {}
+        result: List[Optional[Container]] = []
+        positions: Dict[str, int] = {}
+        for root in roots:
+            email = root.first_email()
+            subject = normalize_subject(email.subject) if email else ''
+            if not subject:
+                result.append(root)
+                continue
+            if subject not in groups:
+                groups[subject] = []
+                positions[subject] = len(result)
+                result.append(None)
+            groups[subject].append(root)
+
+        for subject, members in groups.items():
+            if len(members) == 1:
+                result[positions[subject]] = members[0]
+                continue
+            head = next((root for root in members if root.email is None), None)
+            if head is None:
+                originals = [root for root in members if not is_reply_subject(root.email.subject)]
+                head = originals[0] if len(originals) == 1 else Container(None)
+            for root in members:
+                if root is head:
+                    continue
+                if root.email is None and head.email is None:
+                    for child in root.children:
+                        child.parent = head
+                    head.children.extend(root.children)
+                    root.children = []
+                else:
+                    head.add_child(root)
+            result[positions[subject]] = head
+        return [root for root in result if root is not None]
+
+    def _limit_depth(self, root: Container) -> None:
+        """Attach containers deeper than max_depth to their ancestor at max_depth - 1."""
+        stack = [(root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if depth < self.max_depth - 1:
+                stack.extend((child, depth + 1) for child in node.children)
+                continue
+            # Flatten everything below this node into its children, at max_depth
+            descendants = [child for child, _ in node.walk()][1:]
+            for child in descendants:
+                child.children = []
+                child.parent = node
+            node.children = descendants
+
+    @staticmethod
+    def _thread_id(root: Container) -> str:
+        email = root.first_email()
+        key = root.message_id or f"subject:{normalize_subject(email.subject if email else None)}"
+        return f"thread_{hashlib.md5(key.encode('utf-8')).hexdigest()[:16]}"
+
+    def iter_threads(self) -> Iterator[Tuple[EmailThread, List[Dict[str, Any]]]]:
+        """Threads with their reply trees.
+
+        Yields:
+            (EmailThread, messages) where messages lists ``message_id``,
+            ``entry_id``, ``parent_id`` and ``depth`` of each message in
+            tree order
+        """
+        for root in self.build():
+            thread = None
+            messages = []
+            for node, depth in root.walk():
+                if node.email is None:
+                    continue
+                if thread is None:
+                    thread = EmailThread(thread_id=self._thread_id(root),
+                                         subject=node.email.subject or '(No Subject)')
+                thread.add_email(node.email._asdict())
+                parent = node.parent
+                while parent is not None and parent.email is None:
+                    parent = parent.parent
+                messages.append({
+                    'message_id': node.message_id,
+                    'entry_id': node.email.entry_id,
+                    'parent_id': parent.message_id if parent is not None else None,
+                    'depth': depth,
+                })
+            if thread is not None:
+                yield thread, messages
+
+    def get_threads(self) -> List[Dict[str, Any]]:
+        """Get all threads as a list of dictionaries.
+
+        Each thread dictionary has the keys of ``EmailThread.to_dict`` plus
+        ``messages``, the reply tree (see iter_threads).
+
+        Returns:
+            List of thread dictionaries
+        """
+        threads = []
+        for thread, messages in self.iter_threads():
+            data = thread.to_dict()
+            data['messages'] = messages
+            threads.append(data)
+        return threads
+
+
+def create_thread_manager(method: Optional[str] = METHOD_HYBRID, max_depth: int = DEFAULT_MAX_DEPTH) -> JWZThreader:
+    """Create the threading engine for the threading settings.
+
+    Args:
+        method: threading.thread_method ('headers', 'content' or 'hybrid')
+        max_depth: threading.max_thread_depth (0 for no limit)
+
+    Returns:
+        A JWZThreader
+    """
+    return JWZThreader(method=method, max_depth=max_depth)
@@ -0,0 +1,270 @@
+"""
+Metrics text file for node_exporter's textfile collector.
+
+Long-running extraction jobs can expose their progress to Prometheus by
+writing a ``.prom`` file into the directory the textfile collector watches.
+``TextfileMetricsSink`` keeps counters, gauges and histograms in memory and
+rewrites the file atomically (temporary file + ``os.replace``), so the
+collector never reads a half-written file. Flushes happen at batch
+boundaries, at most once per ``interval`` seconds, and when the run ends.
+
+The file uses the text exposition format the textfile collector parses
+(``# HELP``/``# TYPE`` lines, counters named ``*_total``). Every sample
+carries a ``run_id`` label; per-folder samples also carry ``folder``.
+
+When no path is configured ``create_metrics_sink`` returns a
+``NullMetricsSink`` whose methods do nothing, so disabled metrics cost one
+no-op call per batch.
+"""
+import logging
+import os
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'outlook_extractor'
+
+# Histogram buckets in seconds for a batch of 100 emails and its storage write
+BATCH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+WRITE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+# Default seconds between flushes
+DEFAULT_INTERVAL = 15.0
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Histogram:
+    """Cumulative-bucket histogram for one label set."""
+
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+    def samples(self, name: str, labels: Labels) -> Iterable[str]:
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f"{name}_bucket{_format_labels(labels + (('le', _format_value(bound)),))} {cumulative}"
+        yield f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {self.count}"
+        yield f"{name}_sum{_format_labels(labels)} {_format_value(self.total)}"
+        yield f"{name}_count{_format_labels(labels)} {self.count}"
+
+
+class NullMetricsSink:
+    """Metrics sink that records nothing; used when the textfile is disabled."""
+
+    enabled = False
+
+    def observe_batch(self, folder: str, seconds: float, emails: int, com_errors: int = 0) -> None:
+        pass
+
+    def observe_storage_write(self, folder: str, seconds: float, saved: int) -> None:
+        pass
+
+    def set_queue_depth(self, queue: str, depth: int) -> None:
+        pass
+
+    def set_attachment_bytes(self, total_bytes: int) -> None:
+        pass
+
+    def maybe_flush(self) -> bool:
+        return False
+
+    def flush(self) -> bool:
+        return False
+
+    def close(self, success: bool = True) -> None:
+        pass
+
+
+class TextfileMetricsSink(NullMetricsSink):
+    """Writes extraction metrics to a text file for node_exporter."""
+
+    enabled = True
+
+    def __init__(self, path: str, run_id: str, interval: float = DEFAULT_INTERVAL):
+        """Create the sink.
+
+        Args:
+            path: Output file, normally ``<collector dir>/<name>.prom``
+            run_id: Value of the ``run_id`` label on every sample
+            interval: Minimum seconds between periodic flushes
+        """
+        self.path = path
+        self.run_id = run_id
+        self.interval = interval
+        self._started_wall = time.time()
+        self._started = time.perf_counter()
+        self._last_flush = 0.0
+        self._finished = 0
+        self._success = 1
+        self._emails: Dict[str, int] = {}
+        self._saved: Dict[str, int] = {}
+        self._com_errors: Dict[str, int] = {}
+        self._batches: Dict[str, _Histogram] = {}
+        self._writes: Dict[str, _Histogram] = {}
+        self._queues: Dict[str, int] = {}
+        self._attachment_bytes = 0
+        self.flush_count = 0
+
+    def observe_batch(self, folder: str, seconds: float, emails: int, com_errors: int = 0) -> None:
+        """Record one processed batch of a folder."""
+        histogram = self._batches.get(folder)
+        if histogram is None:
+            histogram = self._batches[folder] = _Histogram(BATCH_BUCKETS)
+        histogram.observe(seconds)
+        self._emails[folder] = self._emails.get(folder, 0) + emails
+        self._com_errors[folder] = self._com_errors.get(folder, 0) + com_errors
+
+    def observe_storage_write(self, folder: str, seconds: float, saved: int) -> None:
+        """Record one storage write of a folder's batch."""
+        histogram = self._writes.get(folder)
+        if histogram is None:
+            histogram = self._writes[folder] = _Histogram(WRITE_BUCKETS)
+        histogram.observe(seconds)
+        self._saved[folder] = self._saved.get(folder, 0) + saved
+
+    def set_queue_depth(self, queue: str, depth: int) -> None:
+        """Record the current depth of a work queue."""
+        self._queues[queue] = depth
+
+    def set_attachment_bytes(self, total_bytes: int) -> None:
+        """Record the attachment bytes written so far in this run."""
+        self._attachment_bytes = total_bytes
+
+    def maybe_flush(self) -> bool:
+        """Flush if at least ``interval`` seconds passed since the last flush."""
+        if time.perf_counter() - self._last_flush < self.interval:
+            return False
+        return self.flush()
+
+    def close(self, success: bool = True) -> None:
+        """Mark the run finished and write the final metrics."""
+        self._finished = 1
+        self._success = 1 if success else 0
+        self.flush()
+
+    def render(self) -> str:
+        """The metrics in text exposition format."""
+        run = (('run_id', self.run_id),)
+        elapsed = time.perf_counter() - self._started
+        total_emails = sum(self._emails.values())
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str, samples: Iterable[str]) -> None:
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+            lines.extend(samples)
+
+        def per_folder(name: str, values: Dict[str, float]) -> Iterable[str]:
+            for folder, value in sorted(values.items()):
+                yield f"{METRIC_PREFIX}_{name}{_format_labels(run + (('folder', folder),))} {_format_value(value)}"
+
+        def single(name: str, value: float, labels: Labels = run) -> List[str]:
+            return [f"{METRIC_PREFIX}_{name}{_format_labels(labels)} {_format_value(value)}"]
+
+        def histograms(name: str, values: Dict[str, _Histogram]) -> Iterable[str]:
+            for folder, histogram in sorted(values.items()):
+                yield from histogram.samples(f"{METRIC_PREFIX}_{name}", run + (('folder', folder),))
+
+        family('run_start_timestamp_seconds', 'gauge', 'Unix time the run started.',
+               single('run_start_timestamp_seconds', round(self._started_wall, 3)))
+        family('last_update_timestamp_seconds', 'gauge', 'Unix time this file was written.',
+               single('last_update_timestamp_seconds', round(time.time(), 3)))
+        family('run_finished', 'gauge', '1 once the run has ended.',
+               single('run_finished', self._finished))
+        family('run_success', 'gauge', '0 if the run ended with an error.',
+               single('run_success', self._success))
+        family('emails_processed_total', 'counter', 'Emails read from Outlook.',
+               per_folder('emails_processed_total', self._emails))
+        family('emails_saved_total', 'counter', 'Emails written to storage.',
+               per_folder('emails_saved_total', self._saved))
+        family('emails_per_second', 'gauge', 'Average emails processed per second in this run.',
+               single('emails_per_second', round(total_emails / elapsed, 3) if elapsed > 0 else 0))
+        family('com_errors_total', 'counter', 'Outlook (COM) errors while reading items.',
+               per_folder('com_errors_total', self._com_errors))
+        family('batch_duration_seconds', 'histogram', 'Time to read and process a batch of emails.',
+               histograms('batch_duration_seconds', self._batches))
+        family('storage_write_duration_seconds', 'histogram', 'Time to write a batch to storage.',
+               histograms('storage_write_duration_seconds', self._writes))
+        family('queue_depth', 'gauge', 'Items waiting in a work queue.',
+               (f"{METRIC_PREFIX}_queue_depth{_format_labels(run + (('queue', queue),))} {depth}"
+                for queue, depth in sorted(self._queues.items())))
+        family('attachment_bytes_total', 'counter', 'Attachment bytes written.',
+               single('attachment_bytes_total', self._attachment_bytes))
+        return '\n'.join(lines) + '\n'
+
+    def flush(self) -> bool:
+        """Atomically rewrite the metrics file.
+
+        Returns:
+            bool: True if the file was written, False otherwise
+        """
+        self._last_flush = time.perf_counter()
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8', newline='\n') as f:
+                f.write(self.render())
+            os.replace(temp_path, self.path)
+            self.flush_count += 1
+            return True
+        except Exception as e:
+            logger.error(f"Error writing metrics file {self.path}: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+
+
+def create_metrics_sink(path: Optional[str], run_id: str,
+                        interval: float = DEFAULT_INTERVAL) -> NullMetricsSink:
+    """Create a textfile sink, or a no-op sink if ``path`` is empty.
+
+    Args:
+        path: Output ``.prom`` file (empty or None to disable)
+        run_id: Run identifier used as the ``run_id`` label
+        interval: Minimum seconds between periodic flushes
+
+    Returns:
+        A TextfileMetricsSink or a NullMetricsSink
+    """
+    if not path:
+        return NullMetricsSink()
+    return TextfileMetricsSink(path, run_id, interval)
@@ -10,13 +10,14 @@ import sys
 import logging
 from typing import List, Tuple, Optional, Dict, Any, Union
 from datetime import datetime
-import win32com.client
-import pythoncom
 from pathlib import Path
 
 # Import config and logging
 from ..config import get_config
 from ..logging_setup import get_logger
+from .extraction_profile import DEFAULT_PROFILE, fetch_body, resolve_profile
+from .internet_headers import PR_TRANSPORT_MESSAGE_HEADERS, parse_internet_headers
+from ..storage.attachment_store import AttachmentStore
 
 # Get logger
 logger = get_logger(__name__)
@@ -24,8 +25,6 @@ logger = get_logger(__name__)
 if sys.platform != 'win32':
     from .mock_outlook import MockOutlookClient as OutlookClient
 else:
-    import win32com.client
-    import pythoncom
     from typing import List, Dict, Any, Optional
     from datetime import datetime, timedelta
     import re
@@ -46,6 +45,14 @@ class OutlookClient:
         self.outlook = None
         self.namespace = None
         self.account = None
+        self._attachment_store = None
+        
+    @property
+    def attachment_store(self) -> AttachmentStore:
+        """Content-addressed store for saved attachments, created on first use."""
+        if self._attachment_store is None:
+            self._attachment_store = AttachmentStore(self.config.get_attachment_dir())
+        return self._attachment_store
         
     def connect(self) -> bool:
         """Connect to Microsoft Outlook.
@@ -54,6 +61,10 @@ class OutlookClient:
             bool: True if the connection was successful, False otherwise.
         """
         try:
+            # Imported here so the module can be imported without pywin32
+            import pythoncom
+            import win32com.client
+            
             # Initialize COM for the current thread
             pythoncom.CoInitialize()
             
@@ -94,6 +105,7 @@ class OutlookClient:
                 self.outlook = None
                 
                 # Uninitialize COM for this thread
+                import pythoncom
                 pythoncom.CoUninitialize()
                 
                 self.logger.info("Disconnected from Outlook")
@@ -329,6 +341,13 @@ class OutlookClient:
             Dictionary containing extracted email information, or None if an error occurs.
         """
         try:
+            # Bodies are the most expensive properties, so only read what the profile needs
+            profile = resolve_profile(
+                self.config.get('email_processing', 'extraction_profile', DEFAULT_PROFILE)
+            )
+            max_body_bytes = self.config.get_int('email_processing', 'max_body_bytes', 0)
+            body_data = fetch_body(mail_item, profile, max_body_bytes)
+            
             # Basic email information
             email = {
                 'entry_id': mail_item.EntryID,
@@ -340,8 +359,9 @@ class OutlookClient:
                 'bcc_recipients': self._get_recipients(mail_item, 'BCC'),
                 'received_time': self._parse_outlook_date(mail_item.ReceivedTime),
                 'sent_time': self._parse_outlook_date(mail_item.SentOnBehalfOf if hasattr(mail_item, 'SentOnBehalfOf') else mail_item.SentOnBehalfOf),
-                'body': mail_item.Body or '',
-                'html_body': mail_item.HTMLBody if hasattr(mail_item, 'HTMLBody') else '',
+                'body': body_data['body'],
+                'html_body': body_data['html_body'],
+                'body_truncated': body_data['body_truncated'],
                 'importance': self._get_importance(mail_item.Importance) if hasattr(mail_item, 'Importance') else 'Normal',
                 'categories': mail_item.Categories.split(';') if hasattr(mail_item, 'Categories') and mail_item.Categories else [],
                 'has_attachments': mail_item.Attachments.Count > 0 if hasattr(mail_item, 'Attachments') else False,
@@ -350,9 +370,14 @@ class OutlookClient:
                 'conversation_topic': mail_item.ConversationTopic if hasattr(mail_item, 'ConversationTopic') else '',
                 'size': mail_item.Size if hasattr(mail_item, 'Size') else 0,
                 'flags': self._get_email_flags(mail_item),
-                'headers': self._get_email_headers(mail_item) if hasattr(mail_item, 'PropertyAccessor') else {},
+                'headers': self._get_email_headers(mail_item),
             }
             
+            # Promote threading headers so they can be used without digging into 'headers'
+            email['message_id'] = email['headers']['message_id']
+            email['in_reply_to'] = email['headers']['in_reply_to']
+            email['references'] = ' '.join(email['headers']['references'])
+            
             # Process attachments if needed
             if self.config.get_boolean('email_processing', 'extract_attachments', False):
                 email['attachments'] = self._process_attachments(mail_item)
@@ -490,54 +515,30 @@ class OutlookClient:
         }
         return sensitivity_map.get(sensitivity_value, 'Normal')
     
-    def _get_email_headers(self, mail_item) -> Dict[str, str]:
-        """Get email headers.
+    def _get_email_headers(self, mail_item) -> Dict[str, Any]:
+        """Get parsed Internet headers for an email.
+        
+        The transport header block is read with a single PropertyAccessor call
+        and parsed locally.
         
         Args:
             mail_item: The Outlook MailItem object.
             
         Returns:
-            Dictionary with email headers.
+            Dictionary with message_id, in_reply_to, references and the
+            allowlisted header fields.
         """
-        headers = {}
-        
         try:
             if not hasattr(mail_item, 'PropertyAccessor'):
-                return headers
-                
-            property_accessor = mail_item.PropertyAccessor
+                return parse_internet_headers(None)
             
-            # Common headers to retrieve
-            header_fields = [
-                'Received', 'Received-SPF', 'Authentication-Results',
-                'DKIM-Signature', 'X-Received', 'X-Google-DKIM-Signature',
-                'X-Google-Smtp-Source', 'MIME-Version', 'X-Originating-IP',
-                'Message-ID', 'References', 'In-Reply-To', 'Thread-Index'
-            ]
-            
-            for field in header_fields:
-                try:
-                    value = property_accessor.GetProperty(f"http://schemas.microsoft.com/mapi/proptag/0x007D001F")
-                    if value:
-                        headers[field] = value
-                except:
-                    continue
-            
-            # Special handling for some headers
-            try:
-                # Get the full internet headers as a string
-                internet_headers = property_accessor.GetProperty(
-                    "http://schemas.microsoft.com/mapi/proptag/0x007D001F"
-                )
-                if internet_headers:
-                    headers['all_headers'] = internet_headers
-            except:
-                pass
+            raw_headers = mail_item.PropertyAccessor.GetProperty(PR_TRANSPORT_MESSAGE_HEADERS)
+            allowlist = self.config.get_list('email_processing', 'header_allowlist') or None
+            return parse_internet_headers(raw_headers, allowlist)
                 
         except Exception as e:
             self.logger.warning(f"Error getting email headers: {e}")
-        
-        return headers
+            return parse_internet_headers(None)
     
     def _process_attachments(self, mail_item) -> List[Dict[str, Any]]:
         """Process email attachments.
@@ -553,8 +554,6 @@ class OutlookClient:
         if not hasattr(mail_item, 'Attachments') or mail_item.Attachments.Count == 0:
             return attachments
         
-        attachment_dir = self.config.get_attachment_dir()
-        
         try:
             for i in range(1, mail_item.Attachments.Count + 1):
                 try:
@@ -577,21 +576,13 @@ class OutlookClient:
                     # Save the attachment if needed
                     if self.config.get_boolean('email_processing', 'extract_attachments', False):
                         try:
-                            # Create a safe filename
-                            safe_filename = self._sanitize_filename(attachment.FileName)
-                            save_path = os.path.join(attachment_dir, safe_filename)
-                            
-                            # Handle duplicate filenames
-                            counter = 1
-                            base_name, ext = os.path.splitext(safe_filename)
-                            while os.path.exists(save_path):
-                                new_filename = f"{base_name}_{counter}{ext}"
-                                save_path = os.path.join(attachment_dir, new_filename)
-                                counter += 1
-                            
-                            # Save the attachment
-                            attachment.SaveAsFile(save_path)
-                            attachment_info['saved_path'] = save_path
+                            # Content-addressed: identical attachments are stored once
+                            stored = self.attachment_store.save_attachment(
+                                attachment, self._sanitize_filename(attachment.FileName)
+                            )
+                            attachment_info['sha256'] = stored['sha256']
+                            attachment_info['saved_path'] = stored['stored_path']
+                            attachment_info['deduplicated'] = stored['deduplicated']
                             
                         except Exception as e:
                             self.logger.error(f"Error saving attachment {attachment.FileName}: {e}")
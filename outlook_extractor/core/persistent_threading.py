@@ -0,0 +1,145 @@
+"""
+ThreadManager backed by SQLite storage.
+
+``PersistentThreadManager`` keeps only the current batch in memory. Lookups
+that miss memory (a parent seen in an earlier run, a thread id merged last
+week, a conversation key) fall back to the tables kept by
+``SQLiteStorage``:
+
+- ``threads``: one row per live thread;
+- ``message_to_thread``: Message-ID -> thread id of every threaded email;
+- ``thread_participants``: address -> thread id;
+- ``pending_references``: referenced but unseen Message-ID -> thread id;
+- ``thread_aliases``: merged thread id or conversation key -> live thread id.
+
+``flush()`` writes the threads touched by the batch and the new links in
+one transaction and then drops them from memory, so a daily delta run
+threads its new messages against the whole history without reading it,
+and memory stays bounded by the batch size.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+from ..storage.sqlite_storage import SQLiteStorage
+from .email_threading import EmailThread, ThreadManager
+from .interning import ParticipantIndex
+
+logger = logging.getLogger(__name__)
+
+
+class PersistentThreadManager(ThreadManager):
+    """ThreadManager that reads through to and flushes into SQLite.
+
+    Example::
+
+        manager = PersistentThreadManager(SQLiteStorage('emails.db'))
+        for email_data in batch:
+            manager.add_email(email_data)
+        manager.flush()
+    """
+
+    def __init__(self, storage: SQLiteStorage):
+        """Create the manager.
+
+        Args:
+            storage: SQLite storage holding the thread tables
+        """
+        super().__init__()
+        self.storage = storage
+        # Stored aliases looked up during the current batch (None: not an alias)
+        self._stored_aliases: Dict[str, Optional[str]] = {}
+        # Ids of the threads changed during this run
+        self.touched_threads: Set[str] = set()
+
+    def _lookup_message(self, message_id: str) -> Optional[str]:
+        thread_id = self.message_to_thread.get(message_id)
+        if thread_id is None:
+            thread_id = self.storage.get_message_thread_id(message_id)
+        return thread_id
+
+    def _lookup_pending(self, message_id: str) -> Optional[str]:
+        thread_id = self.pending_references.get(message_id)
+        if thread_id is None:
+            thread_id = self.storage.get_pending_reference(message_id)
+        return thread_id
+
+    def _lookup_thread(self, thread_id: str) -> Optional[EmailThread]:
+        thread = self.threads_by_id.get(thread_id)
+        if thread is None and thread_id not in self.merged_threads:
+            thread_data = self.storage.get_thread(thread_id)
+            if thread_data is not None and thread_data['thread_id'] == thread_id:
+                thread = self.threads_by_id[thread_id] = EmailThread.from_dict(thread_data)
+        return thread
+
+    def _resolve_thread_id(self, thread_id: str) -> str:
+        thread_id = super()._resolve_thread_id(thread_id)
+        if thread_id in self.threads_by_id:
+            return thread_id
+        if thread_id not in self._stored_aliases:
+            self._stored_aliases[thread_id] = self.storage.get_thread_alias(thread_id)
+        alias = self._stored_aliases[thread_id]
+        # Stored aliases point at threads that were live when flushed
+        return super()._resolve_thread_id(alias) if alias else thread_id
+
+    def flush(self) -> bool:
+        """Write the batch's threading changes to storage and clear memory.
+
+        Returns:
+            bool: True if the changes were saved (on failure they are kept
+            in memory and written with the next flush)
+        """
+        if not (self.threads_by_id or self.message_to_thread or self.pending_references
+                or self.merged_threads):
+            return True
+
+        resolve = self._resolve_thread_id
+        saved = self.storage.save_thread_state(
+            [thread.to_dict() for thread in self.threads_by_id.values()],
+            {message_id: resolve(thread_id) for message_id, thread_id in self.message_to_thread.items()},
+            {message_id: resolve(thread_id) for message_id, thread_id in self.pending_references.items()},
+            {alias: resolve(alias) for alias in self.merged_threads},
+        )
+        if not saved:
+            return False
+
+        self.touched_threads.difference_update(self.merged_threads)
+        self.touched_threads.update(self.threads_by_id)
+        self.threads_by_id = {}
+        self.message_to_thread = {}
+        self.pending_references = {}
+        self.merged_threads = {}
+        self.threads_by_participant = ParticipantIndex()
+        self._stored_aliases = {}
+        return True
+
+    def get_threads(self) -> List[Dict[str, Any]]:
+        """Get the threads changed during this run, as stored at the last flush.
+
+        Returns:
+            List of thread dictionaries
+        """
+        thread_ids = {self.storage.get_thread_alias(thread_id) or thread_id
+                      for thread_id in self.touched_threads}
+        return self.storage.get_threads(sorted(thread_ids))
+
+    def get_thread(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Get a stored thread by ID (merged thread ids are followed).
+
+        Args:
+            thread_id: ID of the thread to retrieve
+
+        Returns:
+            Thread dictionary or None if not found
+        """
+        return self.storage.get_thread(thread_id)
+
+    def get_threads_for_participant(self, email: str) -> List[Dict[str, Any]]:
+        """Get all stored threads involving a specific email address.
+
+        Args:
+            email: Email address to search for
+
+        Returns:
+            List of thread dictionaries
+        """
+        return self.storage.get_threads_for_participant(email)
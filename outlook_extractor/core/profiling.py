@@ -0,0 +1,246 @@
+"""
+Profiling hooks for extraction runs.
+
+``RunProfiler`` wraps a run in a CPU profiler and, optionally, tracemalloc:
+
+- ``cprofile``: the standard-library deterministic profiler. Writes
+  ``profile-<run id>.prof`` (pstats format, for ``python -m pstats``,
+  snakeviz, etc.) and a text summary of the top functions.
+- ``sampling``: pyinstrument, if installed. Writes an HTML and a text
+  report. Sampling has far lower overhead on COM-heavy runs.
+- ``auto``: pyinstrument when available, cProfile otherwise.
+
+With ``trace_memory`` a tracemalloc snapshot is taken after every folder
+and written to ``allocations-<run id>.txt`` as the top-N allocation sites,
+overall and as the growth caused by each folder.
+
+Both profilers only see the thread that started them; background
+attachment writers are not included.
+"""
+import io
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Profiler modes
+PROFILER_CPROFILE = 'cprofile'
+PROFILER_SAMPLING = 'sampling'
+PROFILER_AUTO = 'auto'
+PROFILER_MODES = (PROFILER_CPROFILE, PROFILER_SAMPLING, PROFILER_AUTO)
+
+# Default number of functions / allocation sites in text reports
+DEFAULT_TOP_N = 30
+
+# Frames kept per tracemalloc traceback
+TRACEMALLOC_FRAMES = 1
+
+
+def sampling_profiler_available() -> bool:
+    """Whether pyinstrument is installed."""
+    try:
+        import pyinstrument  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def resolve_profiler(mode: Optional[str]) -> Optional[str]:
+    """Normalize a profiler mode.
+
+    Args:
+        mode: 'cprofile', 'sampling', 'auto', or an empty/'off' value
+
+    Returns:
+        'cprofile', 'sampling', or None if profiling is disabled
+    """
+    name = (mode or '').strip().lower()
+    if name in ('', 'off', 'none', '0', 'false'):
+        return None
+    if name not in PROFILER_MODES:
+        logger.warning(f"Unknown profiler '{mode}', using {PROFILER_CPROFILE}")
+        return PROFILER_CPROFILE
+    if name == PROFILER_CPROFILE:
+        return name
+    if sampling_profiler_available():
+        return PROFILER_SAMPLING
+    if name == PROFILER_SAMPLING:
+        logger.warning("pyinstrument is not installed, falling back to cProfile")
+    return PROFILER_CPROFILE
+
+
+class RunProfiler:
+    """CPU profiler and allocation tracer for one extraction run.
+
+    Example::
+
+        with RunProfiler('output/profiles', mode='auto', trace_memory=True) as profiler:
+            for folder in folders:
+                process(folder)
+                profiler.folder_finished(folder)
+        print(profiler.outputs)
+    """
+
+    def __init__(self, output_dir: str, mode: Optional[str] = PROFILER_AUTO,
+                 trace_memory: bool = False, top_n: int = DEFAULT_TOP_N,
+                 run_id: Optional[str] = None):
+        """Create the profiler.
+
+        Args:
+            output_dir: Directory reports are written to
+            mode: Profiler mode (see resolve_profiler); None for memory tracing only
+            trace_memory: Whether to trace allocations with tracemalloc
+            top_n: Number of entries in text reports
+            run_id: Identifier used in file names (random if omitted)
+        """
+        self.output_dir = output_dir
+        self.mode = resolve_profiler(mode)
+        self.trace_memory = trace_memory
+        self.top_n = max(1, int(top_n))
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.outputs: List[str] = []
+        self._profiler = None
+        self._started_tracing = False
+        self._snapshots: List[Tuple[str, tracemalloc.Snapshot]] = []
+        self._started = 0.0
+        self.seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether anything is being profiled."""
+        return bool(self.mode or self.trace_memory)
+
+    def _path(self, suffix: str) -> str:
+        return os.path.join(self.output_dir, f"profile-{self.run_id}{suffix}")
+
+    def start(self) -> None:
+        """Start profiling."""
+        self._started = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracing = True
+        if self.mode == PROFILER_SAMPLING:
+            from pyinstrument import Profiler
+            self._profiler = Profiler()
+            self._profiler.start()
+        elif self.mode == PROFILER_CPROFILE:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def folder_finished(self, folder: str) -> None:
+        """Take a per-folder allocation snapshot (if tracing memory)."""
+        if self.trace_memory and tracemalloc.is_tracing():
+            self._snapshots.append((folder, tracemalloc.take_snapshot()))
+
+    def stop(self) -> Dict[str, object]:
+        """Stop profiling and write the reports.
+
+        Returns:
+            Summary with the profiler mode, duration and written files
+        """
+        self.seconds = time.perf_counter() - self._started
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+        except OSError as e:
+            logger.error(f"Cannot create profile directory {self.output_dir}: {e}")
+
+        if self.mode == PROFILER_CPROFILE and self._profiler is not None:
+            self._profiler.disable()
+            self._write_cprofile()
+        elif self.mode == PROFILER_SAMPLING and self._profiler is not None:
+            self._profiler.stop()
+            self._write_sampling()
+        self._profiler = None
+
+        if self.trace_memory and tracemalloc.is_tracing():
+            self._snapshots.append(('(end of run)', tracemalloc.take_snapshot()))
+            self._write_allocations()
+            if self._started_tracing:
+                tracemalloc.stop()
+        self._snapshots = []
+
+        for path in self.outputs:
+            logger.info(f"Wrote profile report {path}")
+        return self.summary()
+
+    def summary(self) -> Dict[str, object]:
+        """Profiler mode, duration and written files."""
+        return {
+            'mode': self.mode,
+            'trace_memory': self.trace_memory,
+            'seconds': round(self.seconds, 3),
+            'files': list(self.outputs),
+        }
+
+    def __enter__(self) -> 'RunProfiler':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.stop()
+        return False
+
+    def _write(self, path: str, text: str) -> None:
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            self.outputs.append(path)
+        except OSError as e:
+            logger.error(f"Error writing profile report {path}: {e}")
+
+    def _write_cprofile(self) -> None:
+        stats_path = self._path('.prof')
+        try:
+            self._profiler.dump_stats(stats_path)
+            self.outputs.append(stats_path)
+        except OSError as e:
+            logger.error(f"Error writing profile {stats_path}: {e}")
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=stream)
+        stats.strip_dirs()
+        stream.write(f"Run {self.run_id}: {self.seconds:.3f}s\n\n")
+        stream.write(f"Top {self.top_n} functions by cumulative time\n")
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_n)
+        stream.write(f"Top {self.top_n} functions by own time\n")
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top_n)
+        self._write(self._path('.txt'), stream.getvalue())
+
+    def _write_sampling(self) -> None:
+        self._write(self._path('.html'), self._profiler.output_html())
+        self._write(self._path('.txt'), self._profiler.output_text(unicode=True, color=False))
+
+    def _write_allocations(self) -> None:
+        lines = [f"Run {self.run_id}: top {self.top_n} allocation sites", '']
+        filters = (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        )
+
+        final_name, final = self._snapshots[-1]
+        final = final.filter_traces(filters)
+        total = sum(stat.size for stat in final.statistics('filename'))
+        lines.append(f"== Live at end of run ({total / 1024:.1f} KiB) ==")
+        lines.extend(str(stat) for stat in final.statistics('lineno')[:self.top_n])
+
+        previous = None
+        for folder, snapshot in self._snapshots[:-1]:
+            snapshot = snapshot.filter_traces(filters)
+            lines.append('')
+            if previous is None:
+                lines.append(f"== After folder {folder} ==")
+                lines.extend(str(stat) for stat in snapshot.statistics('lineno')[:self.top_n])
+            else:
+                lines.append(f"== Growth during folder {folder} ==")
+                lines.extend(str(stat) for stat in snapshot.compare_to(previous, 'lineno')[:self.top_n])
+            previous = snapshot
+
+        path = os.path.join(self.output_dir, f"allocations-{self.run_id}.txt")
+        self._write(path, '\n'.join(lines) + '\n')
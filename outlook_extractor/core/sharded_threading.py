@@ -0,0 +1,353 @@
+"""
+Sharded threading across worker processes.
+
+``ThreadManager.add_email`` runs on one core, which becomes the bottleneck
+of large multi-mailbox runs. ``ShardedThreadManager`` collects the fields
+threading reads and threads them at the end of the run:
+
+1. Each message is assigned to a shard by a stable key: the root of its
+   ConversationIndex, the raw Outlook thread index, or a hash of its
+   normalized subject. Every message that can share a generated thread id
+   with another (same conversation root, same raw thread index, or same
+   subject) gets the same key.
+2. Each shard is threaded by a plain ``ThreadManager`` in a process pool,
+   with its messages in their original order.
+3. Shard results are merged. Threads of different shards that share a
+   Message-ID (one contains it, the other references it, or both reference
+   it) are linked by a union step over those ids. Each linked group that
+   spans shards is threaded again in one ``ThreadManager``, in the
+   original order.
+
+Threading only links messages through Message-IDs, conversation keys and
+generated thread ids, so a shard thread that shares none of them with
+other shards ends up exactly as single-process threading would leave it,
+and re-threading the linked groups in order reproduces the rest. The
+result is identical to ``ThreadManager`` fed the same messages in the same
+order, whatever the number of shards or workers.
+"""
+from __future__ import annotations
+
+import logging
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .conversation_index import conversation_index_of
+from .email_threading import ThreadManager, message_id_of
+from .jwz_threading import normalize_subject
+
+logger = logging.getLogger(__name__)
+
+# Email fields read by ThreadManager; only these are sent to the workers
+SHARD_FIELDS = (
+    'entry_id', 'message_id', 'in_reply_to', 'references', 'thread_index', 'conversation_index',
+    'subject', 'sender_email', 'to_recipients', 'cc_recipients', 'sent_on', 'received_time',
+    'categories',
+)
+
+# A message to thread: its position in arrival order and its threading fields
+ShardItem = Tuple[int, Dict[str, Any]]
+
+
+def shard_key(email_data: Dict[str, Any]) -> str:
+    """Get the key that decides which shard threads an email.
+
+    Mirrors the thread id ThreadManager generates for a message without
+    known parents, so messages that could be joined by that id share a key.
+
+    Args:
+        email_data: Dictionary containing email data
+
+    Returns:
+        'index:<ConversationIndex root>', 'raw:<thread index>' or
+        'subject:<normalized subject>'
+    """
+    index = conversation_index_of(email_data)
+    if index is not None:
+        return f"index:{index.root_key}"
+    if email_data.get('thread_index'):
+        return f"raw:{email_data['thread_index']}"
+    return f"subject:{normalize_subject((email_data.get('subject') or '').lower())}"
+
+
+def shard_of(email_data: Dict[str, Any], shards: int) -> int:
+    """Get the shard number of an email (stable across processes and runs).
+
+    Args:
+        email_data: Dictionary containing email data
+        shards: Number of shards
+
+    Returns:
+        Shard number in ``range(shards)``
+    """
+    return zlib.crc32(shard_key(email_data).encode('utf-8')) % shards
+
+
+def _thread_shard(items: List[ShardItem]) -> Dict[str, Any]:
+    """Thread the messages of one shard (runs in a worker process).
+
+    Args:
+        items: Messages of the shard in arrival order
+
+    Returns:
+        Dictionary with the manager state ('state', see ThreadManager.to_dict),
+        the position of the message that created each thread ('created') and
+        the (thread id, Message-ID) pairs of parents that were seen but ended
+        up in another thread of the shard ('links')
+    """
+    manager = ThreadManager()
+    threads = manager.threads_by_id
+    created: Dict[str, int] = {}
+    replies = []
+    for position, email_data in items:
+        count = len(threads)
+        manager.add_email(email_data)
+        if len(threads) > count:
+            # A message creates a thread only if it links to none, so nothing
+            # was merged away and the new thread is the last one
+            created[next(reversed(threads))] = position
+        if message_id_of(email_data) and (email_data.get('references') or email_data.get('in_reply_to')):
+            replies.append(email_data)
+    state = manager.to_dict()
+
+    # Only the nearest known ancestor of a reply is linked, so an older
+    # ancestor may sit in another thread; unseen parents are pending
+    message_to_thread = state['message_to_thread']
+    links = []
+    for email_data in replies:
+        thread_id = message_to_thread[message_id_of(email_data)]
+        parents = manager._parse_references(email_data.get('references', ''))
+        if email_data.get('in_reply_to'):
+            parents.append(email_data['in_reply_to'])
+        for ref in parents:
+            ref_thread_id = message_to_thread.get(ref)
+            if ref_thread_id is not None and ref_thread_id != thread_id:
+                links.append((thread_id, ref))
+    return {'state': state, 'created': created, 'links': links}
+
+
+def _run_shards(shards: List[List[ShardItem]], workers: int) -> List[Dict[str, Any]]:
+    """Thread shards in a process pool, or in this process for one worker.
+
+    Args:
+        shards: Messages of each shard
+        workers: Number of worker processes
+
+    Returns:
+        Results of ``_thread_shard`` in shard order
+    """
+    if workers > 1 and len(shards) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+                return list(executor.map(_thread_shard, shards))
+        except Exception as e:
+            logger.warning(f"Threading shards in this process, the process pool failed: {e}")
+    return [_thread_shard(shard) for shard in shards]
+
+
+class _Groups:
+    """Union-find over (shard, thread id) nodes."""
+
+    def __init__(self):
+        self.parent: Dict[Tuple[int, str], Tuple[int, str]] = {}
+
+    def find(self, node: Tuple[int, str]) -> Tuple[int, str]:
+        parent = self.parent
+        root = parent.setdefault(node, node)
+        while root != parent[root]:
+            parent[root] = parent[parent[root]]
+            root = parent[root]
+        return root
+
+    def union(self, a: Tuple[int, str], b: Tuple[int, str]) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # Deterministic survivor, independent of visiting order
+            if root_b < root_a:
+                root_a, root_b = root_b, root_a
+            self.parent[root_b] = root_a
+
+
+def _spanning_threads(results: List[Dict[str, Any]]) -> List[set]:
+    """Find the shard threads linked to threads of other shards.
+
+    Args:
+        results: Results of ``_thread_shard`` in shard order
+
+    Returns:
+        Per shard, the ids of its threads that must be threaded again
+    """
+    groups = _Groups()
+    owner: Dict[str, Tuple[int, str]] = {}
+
+    def claim(message_id: str, node: Tuple[int, str]) -> None:
+        other = owner.setdefault(message_id, node)
+        if other != node:
+            groups.union(other, node)
+
+    for shard, result in enumerate(results):
+        state = result['state']
+        for message_id, thread_id in state['message_to_thread'].items():
+            claim(message_id, (shard, thread_id))
+        for message_id, thread_id in state['pending_references'].items():
+            claim(message_id, (shard, thread_id))
+        for thread_id, message_id in result['links']:
+            claim(message_id, (shard, thread_id))
+
+    shards_of_group: Dict[Tuple[int, str], set] = {}
+    for node in groups.parent:
+        shards_of_group.setdefault(groups.find(node), set()).add(node[0])
+    spanning: List[set] = [set() for _ in results]
+    for node in groups.parent:
+        if len(shards_of_group[groups.find(node)]) > 1:
+            spanning[node[0]].add(node[1])
+    return spanning
+
+
+def _merge_shards(results: List[Dict[str, Any]], items: List[ShardItem]) -> Dict[str, Any]:
+    """Merge shard results into the state single-process threading produces.
+
+    Args:
+        results: Results of ``_thread_shard`` in shard order
+        items: All messages in arrival order
+
+    Returns:
+        Manager state (see ThreadManager.to_dict)
+    """
+    spanning = _spanning_threads(results)
+    threads: List[Tuple[int, Dict[str, Any]]] = []
+    merged: Dict[str, Any] = {'message_to_thread': {}, 'pending_references': {}, 'thread_aliases': {}}
+    replay_ids = set()
+
+    partials = list(zip(results, spanning))
+    if any(spanning):
+        for result, redo in partials:
+            for message_id, thread_id in result['state']['message_to_thread'].items():
+                if thread_id in redo:
+                    replay_ids.add(message_id)
+        replay = [item for item in items if message_id_of(item[1]) in replay_ids]
+        logger.debug(f"Threading {len(replay)} messages linked across shards again")
+        partials.append((_thread_shard(replay), set()))
+
+    for result, redo in partials:
+        state, created = result['state'], result['created']
+        for thread in state['threads']:
+            if thread['thread_id'] not in redo:
+                threads.append((created[thread['thread_id']], thread))
+        for key in ('message_to_thread', 'pending_references', 'thread_aliases'):
+            merged[key].update(
+                (message_id, thread_id) for message_id, thread_id in state[key].items()
+                if thread_id not in redo
+            )
+
+    # Threads in creation order, as ThreadManager keeps them
+    threads.sort(key=lambda entry: entry[0])
+    merged['threads'] = [thread for _, thread in threads]
+    participants: Dict[str, List[str]] = {}
+    for thread in merged['threads']:
+        for participant in thread['participants']:
+            participants.setdefault(participant, []).append(thread['thread_id'])
+    merged['threads_by_participant'] = participants
+    return merged
+
+
+def thread_in_shards(emails: Iterable[Dict[str, Any]], workers: int = 1,
+                     shards: Optional[int] = None) -> ThreadManager:
+    """Thread emails in shards across worker processes.
+
+    Args:
+        emails: Email dicts in arrival order
+        workers: Number of worker processes (1 threads the shards in this process)
+        shards: Number of shards (defaults to the number of workers)
+
+    Returns:
+        ThreadManager with the same state as one fed the emails in order
+    """
+    items = [(position, {key: email_data[key] for key in SHARD_FIELDS if key in email_data})
+             for position, email_data in enumerate(emails)]
+    return _thread_items(items, workers, shards)
+
+
+def _thread_items(items: List[ShardItem], workers: int, shards: Optional[int]) -> ThreadManager:
+    """Partition messages into shards, thread them and merge the results."""
+    shard_count = max(1, shards or workers)
+    partitioned: List[List[ShardItem]] = [[] for _ in range(shard_count)]
+    for item in items:
+        partitioned[shard_of(item[1], shard_count)].append(item)
+    results = _run_shards([shard for shard in partitioned if shard], workers)
+    return ThreadManager.from_dict(_merge_shards(results, items))
+
+
+class ShardedThreadManager(ThreadManager):
+    """ThreadManager that threads the collected emails in parallel shards.
+
+    ``add_email`` only records the threading fields of an email; they are
+    threaded across ``workers`` processes on first access to the threads
+    (``get_threads``, ``thread_id_for``, ...). Emails added after that are
+    threaded directly, as ThreadManager would.
+    """
+
+    def __init__(self, workers: int = 2, shards: Optional[int] = None):
+        """Create the manager.
+
+        Args:
+            workers: Number of worker processes
+            shards: Number of shards (defaults to the number of workers)
+        """
+        super().__init__()
+        self.workers = max(1, workers)
+        self.shards = shards
+        self._collected: Optional[List[ShardItem]] = []
+
+    def add_email(self, email_data: Dict[str, Any]) -> None:
+        """Add an email to be threaded.
+
+        Args:
+            email_data: Dictionary containing email data
+        """
+        if self._collected is None:
+            super().add_email(email_data)
+            return
+        self._collected.append((
+            len(self._collected),
+            {key: email_data[key] for key in SHARD_FIELDS if key in email_data}
+        ))
+
+    def _ensure_threaded(self) -> None:
+        """Thread the collected emails if that has not happened yet."""
+        if self._collected is None:
+            return
+        items, self._collected = self._collected, None
+        if not items:
+            return
+        merged = _thread_items(items, self.workers, self.shards)
+        self.threads_by_id = merged.threads_by_id
+        self.message_to_thread = merged.message_to_thread
+        self.threads_by_participant = merged.threads_by_participant
+        self.merged_threads = merged.merged_threads
+        self.pending_references = merged.pending_references
+
+    def thread_id_for(self, message_id: str) -> Optional[str]:
+        """Get the id of the thread a message belongs to (threads collected emails first)."""
+        self._ensure_threaded()
+        return super().thread_id_for(message_id)
+
+    def get_threads(self) -> List[Dict[str, Any]]:
+        """Get all threads as a list of dictionaries (threads collected emails first)."""
+        self._ensure_threaded()
+        return super().get_threads()
+
+    def get_thread(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Get a specific thread by ID (threads collected emails first)."""
+        self._ensure_threaded()
+        return super().get_thread(thread_id)
+
+    def get_threads_for_participant(self, email: str) -> List[Dict[str, Any]]:
+        """Get all threads involving an email address (threads collected emails first)."""
+        self._ensure_threaded()
+        return super().get_threads_for_participant(email)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the thread manager to a dictionary (threads collected emails first)."""
+        self._ensure_threaded()
+        return super().to_dict()
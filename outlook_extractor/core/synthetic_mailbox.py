@@ -0,0 +1,480 @@
+"""
+Seeded synthetic mailbox for testing and benchmarking.
+
+Generates a deterministic mailbox with realistic shape: conversation threads
+with a heavy-tailed size distribution and branching replies, Zipf-like
+sender/recipient popularity, log-normal body and attachment sizes, quoted
+reply text, Internet headers (Message-ID, In-Reply-To, References) and
+Outlook ConversationIndex values.
+
+Only compact per-message layout arrays are kept in memory; the full
+``MessageSpec`` of a message is rebuilt on demand from the seed, so
+mailboxes of a million messages are cheap to create.
+"""
+import bisect
+import hashlib
+import math
+import random
+import uuid
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Folder names and the share of threads filed in each
+DEFAULT_FOLDERS = (('Inbox', 0.7), ('Archive', 0.2), ('Sent Items', 0.1))
+
+# Maximum number of ids kept in a References header, as most clients do
+MAX_REFERENCES = 10
+
+# Seconds between 1601-01-01 (FILETIME epoch) and 1970-01-01
+_FILETIME_EPOCH_OFFSET = 11644473600
+
+_FIRST_NAMES = (
+    'Alice', 'Bob', 'Carol', 'David', 'Erin', 'Frank', 'Grace', 'Heidi', 'Ivan',
+    'Judy', 'Mallory', 'Niaj', 'Olivia', 'Peggy', 'Rupert', 'Sybil', 'Trent',
+    'Uma', 'Victor', 'Walter', 'Xena', 'Yusuf', 'Zoe',
+)
+_LAST_NAMES = (
+    'Anderson', 'Brown', 'Chen', 'Dubois', 'Evans', 'Fischer', 'Garcia', 'Hansen',
+    'Ivanova', 'Jones', 'Kowalski', 'Larsen', 'Martin', 'Nguyen', 'Okafor',
+    'Patel', 'Rossi', 'Schmidt', 'Tanaka', 'Williams',
+)
+_TOPICS = (
+    'Quarterly report', 'Project kickoff', 'Invoice {n}', 'Budget review',
+    'Team offsite', 'Contract renewal', 'Release {n} planning', 'Server outage',
+    'Customer feedback', 'Hiring update', 'Security review', 'Weekly sync',
+    'Travel request', 'Design proposal', 'Order #{n}', 'Support ticket {n}',
+)
+_WORDS = (
+    'please', 'review', 'the', 'attached', 'document', 'and', 'let', 'me', 'know',
+    'if', 'you', 'have', 'any', 'questions', 'we', 'need', 'to', 'finalize',
+    'this', 'by', 'friday', 'thanks', 'for', 'update', 'meeting', 'schedule',
+    'budget', 'numbers', 'look', 'good', 'can', 'share', 'latest', 'version',
+    'customer', 'requested', 'changes', 'deadline', 'moved', 'next', 'week',
+)
+_REPLY_PREFIXES = ('RE: ', 'Re: ', 'AW: ', 'RE: RE: ')
+_FORWARD_PREFIXES = ('FW: ', 'Fwd: ', 'WG: ')
+_ATTACHMENT_TYPES = ('pdf', 'docx', 'xlsx', 'png', 'jpg', 'zip', 'pptx', 'txt')
+# Salts keeping the per-message, per-thread topic and per-thread GUID
+# random streams apart (integer seeds are much cheaper than string seeds)
+_TOPIC_SALT = 1 << 62
+_GUID_SALT = 1 << 63
+
+# Size of the shared text corpus message bodies are cut from
+_CORPUS_BYTES = 256 * 1024
+# Attachments sent over and over again (logos, signatures, templates)
+_COMMON_ATTACHMENTS = (('logo.png', 12_288), ('signature.jpg', 8_192), ('terms.pdf', 96_000))
+
+
+@dataclass
+class AttachmentSpec:
+    """An attachment of a synthetic message."""
+    filename: str
+    size: int
+    content_key: str
+    is_inline: bool = False
+
+    def content(self) -> bytes:
+        """Deterministic attachment content of ``size`` bytes."""
+        block = hashlib.sha256(self.content_key.encode('utf-8')).digest()
+        repeats, remainder = divmod(self.size, len(block))
+        return block * repeats + block[:remainder]
+
+
+@dataclass
+class MessageSpec:
+    """Full description of a synthetic message."""
+    index: int
+    entry_id: str
+    folder: str
+    subject: str
+    conversation_topic: str
+    sender_name: str
+    sender_email: str
+    to: List[Tuple[str, str]]
+    cc: List[Tuple[str, str]]
+    sent_on: datetime
+    received_time: datetime
+    message_id: str
+    in_reply_to: str
+    references: List[str]
+    conversation_id: str
+    conversation_index: str
+    body: str
+    html_body: str
+    categories: str = ''
+    unread: bool = False
+    importance: int = 1
+    attachments: List[AttachmentSpec] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        """Approximate message size in bytes, as reported by MailItem.Size."""
+        return len(self.body) + len(self.html_body) + sum(a.size for a in self.attachments) + 1024
+
+    def transport_headers(self) -> str:
+        """Raw Internet header block (PR_TRANSPORT_MESSAGE_HEADERS)."""
+        date = self.sent_on.strftime('%a, %d %b %Y %H:%M:%S +0000')
+        lines = [
+            f"Received: from mail.{self.sender_email.split('@')[-1]} (10.0.0.1) by mx.example.com;",
+            f"\t{self.received_time.strftime('%a, %d %b %Y %H:%M:%S +0000')}",
+            f"From: {self.sender_name} <{self.sender_email}>",
+            f"To: {', '.join(f'{name} <{addr}>' for name, addr in self.to)}",
+        ]
+        if self.cc:
+            lines.append(f"Cc: {', '.join(f'{name} <{addr}>' for name, addr in self.cc)}")
+        lines.extend([
+            f"Subject: {self.subject}",
+            f"Date: {date}",
+            f"Message-ID: {self.message_id}",
+        ])
+        if self.in_reply_to:
+            lines.append(f"In-Reply-To: {self.in_reply_to}")
+        if self.references:
+            lines.append(f"References: {self.references[0]}")
+            lines.extend(f"\t{ref}" for ref in self.references[1:])
+        lines.append("MIME-Version: 1.0")
+        return '\r\n'.join(lines) + '\r\n\r\n'
+
+
+def filetime_from_datetime(value: datetime) -> int:
+    """Convert an aware datetime to a Windows FILETIME (100ns since 1601)."""
+    return int((value.timestamp() + _FILETIME_EPOCH_OFFSET) * 10_000_000)
+
+
+def conversation_index_header(thread_start: datetime, guid: bytes) -> bytes:
+    """Build the 22-byte ConversationIndex header block.
+
+    Layout: one reserved byte (0x01), the five high-order bytes of the
+    FILETIME of the thread start and a 16-byte conversation GUID.
+    """
+    filetime = filetime_from_datetime(thread_start)
+    return b'\x01' + (filetime >> 24).to_bytes(5, 'big') + guid
+
+
+def conversation_index_child(parent_time: datetime, child_time: datetime, random_bits: int = 0) -> bytes:
+    """Build a 5-byte ConversationIndex child block for a reply.
+
+    Layout: a 1-bit code, a 31-bit time delta from the parent and 8 random
+    and sequence bits. With code 0 the delta holds bits 18-48 of the FILETIME
+    difference, with code 1 (large deltas) bits 23-53.
+    """
+    delta = max(0, filetime_from_datetime(child_time) - filetime_from_datetime(parent_time))
+    if delta < (1 << 49):
+        value = (delta >> 18) & 0x7FFFFFFF
+    else:
+        value = (1 << 31) | ((delta >> 23) & 0x7FFFFFFF)
+    return ((value << 8) | (random_bits & 0xFF)).to_bytes(5, 'big')
+
+
+class SyntheticMailbox:
+    """Deterministic generator of a realistic mailbox."""
+
+    def __init__(self, message_count: int = 10_000, seed: int = 0,
+                 folders: Sequence[Tuple[str, float]] = DEFAULT_FOLDERS,
+                 end: Optional[datetime] = None, span_days: int = 365,
+                 people: int = 500, domains: int = 25,
+                 attachment_rate: float = 0.15, html_rate: float = 0.8,
+                 median_body_bytes: int = 1_500,
+                 median_attachment_bytes: int = 64_000,
+                 account_name: str = 'me@example.com'):
+        """Generate the mailbox layout.
+
+        Args:
+            message_count: Number of messages in the mailbox
+            seed: Random seed; the same seed always yields the same mailbox
+            folders: (folder name, share of threads) pairs
+            end: Received time of the newest message (default: now, rounded)
+            span_days: Time span covered by the mailbox
+            people: Number of distinct correspondents
+            domains: Number of distinct email domains
+            attachment_rate: Share of messages with attachments
+            html_rate: Share of messages with an HTML body
+            median_body_bytes: Median plain-text body size
+            median_attachment_bytes: Median attachment size
+            account_name: Name (and address) of the mailbox owner
+        """
+        self.message_count = int(message_count)
+        self.seed = seed
+        self.folder_names = [name for name, _ in folders]
+        self.account_name = account_name
+        self.owner = ('Me', account_name)
+        self.attachment_rate = attachment_rate
+        self.html_rate = html_rate
+        self.median_body_bytes = median_body_bytes
+        self.median_attachment_bytes = median_attachment_bytes
+
+        if end is None:
+            end = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        self.end = end
+        self.start = end - timedelta(days=span_days)
+
+        rng = random.Random(seed)
+        domain_names = [f"{self._word(rng)}{i}.example.{rng.choice(('com', 'org', 'net'))}"
+                        for i in range(max(1, domains))]
+        self.people = []
+        for i in range(max(2, people)):
+            first, last = rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES)
+            self.people.append((f"{first} {last}",
+                                f"{first.lower()}.{last.lower()}{i}@{rng.choice(domain_names)}"))
+        # Zipf-like popularity: a few people send and receive most mail
+        self._person_weights = list(self._cumulative(1.0 / (rank + 1) for rank in range(len(self.people))))
+        self._folder_weights = list(self._cumulative(share for _, share in folders))
+
+        self._corpus = self._build_corpus(rng)
+        self._build_layout(rng, span_days)
+
+    @staticmethod
+    def _build_corpus(rng: random.Random) -> str:
+        """Build the text that message bodies are sliced from."""
+        lines = []
+        length = 0
+        while length < _CORPUS_BYTES:
+            line = ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(6, 16))).capitalize() + '.'
+            lines.append(line)
+            length += len(line) + 2
+        return '\r\n'.join(lines)
+
+    @staticmethod
+    def _cumulative(weights) -> Iterator[float]:
+        total = 0.0
+        for weight in weights:
+            total += weight
+            yield total
+
+    @staticmethod
+    def _word(rng: random.Random) -> str:
+        return rng.choice(_WORDS)
+
+    def _build_layout(self, rng: random.Random, span_days: int) -> None:
+        """Assign messages to threads, parents, folders and received times."""
+        count = self.message_count
+        self._thread = array('l', [0]) * count
+        self._parent = array('l', [-1]) * count
+        self._folder = array('B', bytes(count))
+        self._received = array('d', [0.0]) * count
+        self._thread_start: List[int] = []
+
+        span_seconds = span_days * 86400
+        start_ts = self.start.timestamp()
+        index = 0
+        while index < count:
+            # Heavy-tailed thread sizes: mostly singletons and short threads
+            size = min(count - index, max(1, int(rng.paretovariate(1.4))), 250)
+            thread_number = len(self._thread_start)
+            self._thread_start.append(index)
+            folder = self._pick(self._folder_weights, rng.random())
+            thread_ts = start_ts + rng.random() * span_seconds * 0.98
+            previous_ts = thread_ts
+            for position in range(size):
+                message = index + position
+                self._thread[message] = thread_number
+                self._folder[message] = folder
+                if position:
+                    # Mostly answer the latest message, sometimes an earlier one
+                    if rng.random() < 0.75:
+                        parent = message - 1
+                    else:
+                        parent = index + rng.randrange(position)
+                    self._parent[message] = parent
+                    previous_ts = max(previous_ts, self._received[parent]) + rng.expovariate(1 / 7200.0)
+                self._received[message] = min(previous_ts, start_ts + span_seconds)
+            index += size
+
+    @staticmethod
+    def _pick(cumulative: List[float], value: float) -> int:
+        position = bisect.bisect_left(cumulative, value * cumulative[-1])
+        return min(position, len(cumulative) - 1)
+
+    @property
+    def thread_count(self) -> int:
+        """Number of conversation threads in the mailbox."""
+        return len(self._thread_start)
+
+    def thread_of(self, index: int) -> int:
+        """Thread number of a message."""
+        return self._thread[index]
+
+    def parent_of(self, index: int) -> int:
+        """Index of the message a message replies to (-1 for thread roots)."""
+        return self._parent[index]
+
+    def received_timestamp(self, index: int) -> float:
+        """Received time of a message as a POSIX timestamp."""
+        return self._received[index]
+
+    def folder_indices(self, folder: str) -> List[int]:
+        """Indices of the messages filed in a folder, in storage order."""
+        folder_number = self.folder_names.index(folder)
+        return [i for i, f in enumerate(self._folder) if f == folder_number]
+
+    def message_id(self, index: int) -> str:
+        """Internet Message-ID of a message."""
+        return f"<{self.seed}.{index}.{self._thread[index]}@synthetic.example.com>"
+
+    def entry_id(self, index: int) -> str:
+        """Outlook EntryID of a message."""
+        return f"{self.seed:08X}{index:016X}"
+
+    def _ancestors(self, index: int) -> List[int]:
+        chain = []
+        parent = self._parent[index]
+        while parent >= 0:
+            chain.append(parent)
+            parent = self._parent[parent]
+        chain.reverse()
+        return chain
+
+    def _received_datetime(self, index: int) -> datetime:
+        return datetime.fromtimestamp(self._received[index], tz=timezone.utc).replace(microsecond=0)
+
+    def _person(self, rng: random.Random) -> Tuple[str, str]:
+        return self.people[self._pick(self._person_weights, rng.random())]
+
+    def _text(self, offset: int, size: int) -> str:
+        """Cut ``size`` characters of text from the corpus."""
+        corpus = self._corpus
+        if size >= len(corpus):
+            return (corpus * (size // len(corpus) + 1))[:size]
+        start = offset % (len(corpus) - size)
+        return corpus[start:start + size]
+
+    def _stream(self, number: int) -> int:
+        """Integer seed of the random stream for a message or thread number."""
+        return (self.seed << 32) | number
+
+    def conversation_index(self, index: int) -> str:
+        """Hex ConversationIndex of a message, as exposed by Outlook."""
+        thread = self._thread[index]
+        root = self._thread_start[thread]
+        guid = uuid.UUID(int=random.Random(self._stream(thread) ^ _GUID_SALT).getrandbits(128)).bytes
+        value = conversation_index_header(self._received_datetime(root), guid)
+        previous = root
+        for node in self._ancestors(index)[1:] + ([index] if index != root else []):
+            value += conversation_index_child(
+                self._received_datetime(previous), self._received_datetime(node), node & 0xFF
+            )
+            previous = node
+        return value.hex().upper()
+
+    def message(self, index: int) -> MessageSpec:
+        """Build the full description of a message.
+
+        Args:
+            index: Message index (0 <= index < message_count)
+
+        Returns:
+            The MessageSpec for the message
+        """
+        if not 0 <= index < self.message_count:
+            raise IndexError(f"message index {index} out of range")
+
+        rng = random.Random(self._stream(index))
+        thread = self._thread[index]
+        root = self._thread_start[thread]
+        topic_rng = random.Random(self._stream(thread) ^ _TOPIC_SALT)
+        topic = topic_rng.choice(_TOPICS).format(n=topic_rng.randrange(1000, 99999))
+
+        folder = self.folder_names[self._folder[index]]
+        ancestors = self._ancestors(index)
+        parent = ancestors[-1] if ancestors else -1
+
+        if parent < 0:
+            subject = topic
+        elif rng.random() < 0.08:
+            subject = rng.choice(_FORWARD_PREFIXES) + topic
+        else:
+            subject = rng.choice(_REPLY_PREFIXES) + topic
+
+        if folder == 'Sent Items':
+            sender = self.owner
+        else:
+            sender = self._person(rng)
+        to = [self.owner if folder != 'Sent Items' else self._person(rng)]
+        to.extend(self._person(rng) for _ in range(int(rng.expovariate(1.2))))
+        cc = [self._person(rng) for _ in range(int(rng.expovariate(1.0)))]
+
+        received = self._received_datetime(index)
+        sent = received - timedelta(seconds=rng.randint(1, 90))
+
+        # Log-normal body sizes with quoted history in replies
+        body_size = int(math.exp(rng.gauss(math.log(max(self.median_body_bytes, 16)), 0.9)))
+        body = self._text(rng.getrandbits(32), body_size)
+        body += f"\r\n\r\n--\r\n{sender[0]}\r\n"
+        if parent >= 0:
+            parent_sent = self._received_datetime(parent).strftime('%a, %d %b %Y %H:%M')
+            quoted = self._text(parent * 2654435761, min(body_size, 600))
+            body += f"\r\nOn {parent_sent}, someone wrote:\r\n"
+            body += '\r\n'.join('> ' + line for line in quoted.split('\r\n'))
+
+        html_body = ''
+        if rng.random() < self.html_rate:
+            paragraphs = ''.join(f"<p>{line}</p>" for line in body.split('\r\n') if line)
+            html_body = f"<html><head><style>p{{margin:0}}</style></head><body>{paragraphs}</body></html>"
+
+        attachments = []
+        if rng.random() < self.attachment_rate:
+            for number in range(1 + int(rng.expovariate(1.5))):
+                if rng.random() < 0.2:
+                    filename, size = rng.choice(_COMMON_ATTACHMENTS)
+                    attachments.append(AttachmentSpec(filename, size, f"common:{filename}",
+                                                      is_inline=filename.endswith(('.png', '.jpg'))))
+                else:
+                    extension = rng.choice(_ATTACHMENT_TYPES)
+                    size = int(math.exp(rng.gauss(math.log(max(self.median_attachment_bytes, 16)), 1.2)))
+                    attachments.append(AttachmentSpec(
+                        f"{topic.split()[0].lower()}_{index}_{number}.{extension}",
+                        min(size, 25 * 1024 * 1024), f"{self.seed}:{index}:{number}"
+                    ))
+
+        references = [self.message_id(i) for i in ancestors][-MAX_REFERENCES:]
+        return MessageSpec(
+            index=index,
+            entry_id=self.entry_id(index),
+            folder=folder,
+            subject=subject,
+            conversation_topic=topic,
+            sender_name=sender[0],
+            sender_email=sender[1],
+            to=to,
+            cc=cc,
+            sent_on=sent,
+            received_time=received,
+            message_id=self.message_id(index),
+            in_reply_to=self.message_id(parent) if parent >= 0 else '',
+            references=references,
+            conversation_id=f"{self.seed:08X}{root:024X}",
+            conversation_index=self.conversation_index(index),
+            body=body,
+            html_body=html_body,
+            categories=rng.choice(('', '', '', 'Important', 'Follow up', 'Important, Project')),
+            unread=rng.random() < 0.1,
+            importance=1 if rng.random() < 0.9 else rng.choice((0, 2)),
+            attachments=attachments,
+        )
+
+    def __len__(self) -> int:
+        return self.message_count
+
+    def __iter__(self) -> Iterator[MessageSpec]:
+        for index in range(self.message_count):
+            yield self.message(index)
+
+    def stats(self) -> Dict[str, float]:
+        """Summary of the mailbox shape (thread sizes and folder counts)."""
+        sizes = [
+            (self._thread_start[t + 1] if t + 1 < len(self._thread_start) else self.message_count) - start
+            for t, start in enumerate(self._thread_start)
+        ]
+        folder_counts = {name: 0 for name in self.folder_names}
+        for folder in self._folder:
+            folder_counts[self.folder_names[folder]] += 1
+        return {
+            'messages': self.message_count,
+            'threads': len(sizes),
+            'max_thread_size': max(sizes) if sizes else 0,
+            'mean_thread_size': (self.message_count / len(sizes)) if sizes else 0.0,
+            'singleton_threads': sum(1 for size in sizes if size == 1),
+            'folders': folder_counts,
+        }
@@ -0,0 +1,352 @@
+"""
+Vectorized thread analytics.
+
+``ThreadFrame`` holds one row per message as columnar NumPy arrays:
+
+- ``thread_codes`` (int32): index into ``thread_ids``;
+- ``timestamps`` (int64): epoch seconds (sent time, else received time);
+- ``sender_codes`` (int32): index into ``addresses``;
+- ``participant_threads`` / ``participant_codes`` (int32): one entry per
+  address (sender, To, Cc) on each message.
+
+The frame is built once from email dicts or stored rows. The aggregates
+are computed without Python loops over messages:
+
+- ``thread_stats`` gives per-thread message and participant counts, the
+  first and last message, the duration, and the latency of replies. A
+  reply is a message that follows a message from a different sender in
+  the same thread.
+- ``activity`` gives message counts by weekday and hour.
+- ``summary`` gives the corpus-wide figures.
+
+Messages without a usable date are skipped and counted in
+``skipped_messages``. NumPy is required; it is installed with pandas,
+which the CSV analysis exports already use.
+"""
+import re
+from array import array
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .dates import DateParser
+from .email_threading import message_id_of
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+# 1970-01-01 was a Thursday; weekday 0 is Monday as in datetime.weekday()
+_EPOCH_WEEKDAY = 3
+
+_ADDRESS_SEPARATORS = re.compile(r'[;,]')
+
+# Column order of ThreadFrame.thread_stats() exports
+THREAD_STAT_COLUMNS = (
+    'thread_id', 'messages', 'participants', 'first_message', 'last_message',
+    'duration_seconds', 'replies', 'mean_reply_seconds', 'median_reply_seconds',
+    'max_reply_seconds',
+)
+
+
+def _addresses(value: Any) -> List[str]:
+    """Lowercased addresses of a header string ('a@x; B <b@y>') or list."""
+    if not value:
+        return []
+    parts = value if isinstance(value, (list, tuple)) else _ADDRESS_SEPARATORS.split(value)
+    addresses = []
+    for part in parts:
+        if not isinstance(part, str):
+            continue
+        start = part.find('<')
+        if start != -1:
+            end = part.find('>', start)
+            part = part[start + 1:end if end != -1 else None]
+        part = part.strip().lower()
+        if '@' in part:
+            addresses.append(part)
+    return addresses
+
+
+def _group_order(groups: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Indices that sort rows by group code, then value.
+
+    Packs both into one int64 key when the values span less than 2**32,
+    which sorts about twice as fast as np.lexsort.
+    """
+    if not len(values):
+        return np.zeros(0, np.intp)
+    low = values.min()
+    if values.max() - low < 2 ** 32:
+        return np.argsort((groups.astype(np.int64) << 32) | (values - low).astype(np.int64))
+    return np.lexsort((values, groups))
+
+
+def _group_starts(groups: np.ndarray) -> np.ndarray:
+    """Start index of each run of equal values in a sorted array."""
+    if not len(groups):
+        return np.zeros(0, np.intp)
+    return np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+
+
+class _Codes(dict):
+    """String -> dense integer code (assigned on first use)."""
+
+    def code(self, value: str) -> int:
+        code = self.get(value)
+        if code is None:
+            code = self[value] = len(self)
+        return code
+
+    def values_array(self) -> np.ndarray:
+        return np.array(list(self), dtype=object)
+
+
+class ThreadFrame:
+    """Columnar per-message data for thread analytics."""
+
+    def __init__(self, thread_ids: np.ndarray, addresses: np.ndarray,
+                 thread_codes: np.ndarray, timestamps: np.ndarray, sender_codes: np.ndarray,
+                 participant_threads: np.ndarray, participant_codes: np.ndarray,
+                 skipped_messages: int = 0):
+        """Create a frame from prepared columns (see the builders)."""
+        self.thread_ids = thread_ids
+        self.addresses = addresses
+        self.thread_codes = thread_codes
+        self.timestamps = timestamps
+        self.sender_codes = sender_codes
+        self.participant_threads = participant_threads
+        self.participant_codes = participant_codes
+        self.skipped_messages = skipped_messages
+        self._sorted_columns = None
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[Optional[str], Any, Optional[str], Iterable[str]]]) -> 'ThreadFrame':
+        """Build a frame from ``(thread_id, date, sender, recipients)`` records.
+
+        Args:
+            records: One record per message. ``date`` is anything
+                core.dates accepts; ``recipients`` are addresses or header
+                strings. Records without a thread id or date are skipped.
+
+        Returns:
+            ThreadFrame
+        """
+        threads, addresses = _Codes(), _Codes()
+        thread_codes, sender_codes = array('i'), array('i')
+        timestamps = array('q')
+        participant_threads, participant_codes = array('i'), array('i')
+        parser = DateParser()
+        skipped = 0
+
+        # Address codes per raw header value or list item; addresses repeat a lot
+        address_cache: Dict[str, Tuple[int, ...]] = {}
+
+        def address_codes(value: Any) -> Tuple[int, ...]:
+            if isinstance(value, (list, tuple)):
+                return tuple(code for item in value for code in address_codes(item))
+            if not isinstance(value, str):
+                return ()
+            codes = address_cache.get(value)
+            if codes is None:
+                codes = address_cache[value] = tuple(addresses.code(address) for address in _addresses(value))
+            return codes
+
+        no_sender = addresses.code('')
+        for thread_id, date_value, sender, recipients in records:
+            timestamp = parser.to_epoch(date_value) if thread_id else None
+            if timestamp is None:
+                skipped += 1
+                continue
+            thread_code = threads.code(thread_id)
+            sender_addresses = address_codes(sender)
+            thread_codes.append(thread_code)
+            timestamps.append(timestamp)
+            if sender_addresses:
+                sender_codes.append(sender_addresses[0])
+                participant_threads.append(thread_code)
+                participant_codes.append(sender_addresses[0])
+            else:
+                sender_codes.append(no_sender)
+            for recipient in recipients:
+                codes = address_codes(recipient)
+                participant_threads.extend([thread_code] * len(codes))
+                participant_codes.extend(codes)
+
+        return cls(
+            thread_ids=threads.values_array(),
+            addresses=addresses.values_array(),
+            thread_codes=np.frombuffer(thread_codes, dtype=np.int32) if thread_codes else np.zeros(0, np.int32),
+            timestamps=np.frombuffer(timestamps, dtype=np.int64) if timestamps else np.zeros(0, np.int64),
+            sender_codes=np.frombuffer(sender_codes, dtype=np.int32) if sender_codes else np.zeros(0, np.int32),
+            participant_threads=(np.frombuffer(participant_threads, dtype=np.int32)
+                                 if participant_threads else np.zeros(0, np.int32)),
+            participant_codes=(np.frombuffer(participant_codes, dtype=np.int32)
+                               if participant_codes else np.zeros(0, np.int32)),
+            skipped_messages=skipped,
+        )
+
+    @classmethod
+    def from_emails(cls, emails: Iterable[Dict[str, Any]],
+                    thread_id_for: Optional[Callable[[str], Optional[str]]] = None) -> 'ThreadFrame':
+        """Build a frame from extracted email dicts.
+
+        Args:
+            emails: Email dicts as produced by the extractor
+            thread_id_for: Maps a Message-ID to its thread id (for example
+                ThreadManager.thread_id_for); used when an email has no
+                'thread_id'
+
+        Returns:
+            ThreadFrame
+        """
+        def records():
+            for email_data in emails:
+                thread_id = email_data.get('thread_id')
+                message_id = message_id_of(email_data)
+                if not thread_id and thread_id_for is not None and message_id:
+                    thread_id = thread_id_for(message_id)
+                date_value = (email_data.get('sent_on') or email_data.get('sent_date')
+                              or email_data.get('received_time') or email_data.get('received_date'))
+                yield (
+                    thread_id,
+                    date_value,
+                    email_data.get('sender_email') or email_data.get('sender'),
+                    (email_data.get('to_recipients'), email_data.get('cc_recipients'),
+                     email_data.get('recipients')),
+                )
+        return cls.from_records(records())
+
+    @classmethod
+    def from_storage(cls, storage) -> 'ThreadFrame':
+        """Build a frame from the threaded emails in a SQLiteStorage.
+
+        Args:
+            storage: SQLiteStorage (see SQLiteStorage.iter_thread_activity)
+
+        Returns:
+            ThreadFrame
+        """
+        return cls.from_records(storage.iter_thread_activity())
+
+    def _sorted(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Columns sorted by thread, then time, and the start of each thread's rows (cached)."""
+        if self._sorted_columns is None:
+            order = _group_order(self.thread_codes, self.timestamps)
+            threads = self.thread_codes[order]
+            self._sorted_columns = (
+                threads, self.timestamps[order], self.sender_codes[order], _group_starts(threads)
+            )
+        return self._sorted_columns
+
+    def reply_latencies(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Seconds between each reply and the message before it.
+
+        Returns:
+            (thread codes, latencies) of all replies, grouped by thread
+        """
+        threads, timestamps, senders, _ = self._sorted()
+        is_reply = (threads[1:] == threads[:-1]) & (senders[1:] != senders[:-1])
+        return threads[1:][is_reply], np.diff(timestamps)[is_reply]
+
+    def thread_stats(self) -> Dict[str, np.ndarray]:
+        """Per-thread statistics as columns (see THREAD_STAT_COLUMNS).
+
+        Times are epoch seconds; reply latencies are NaN for threads
+        without replies.
+
+        Returns:
+            Dict of equal-length arrays, one entry per thread
+        """
+        count = len(self.thread_ids)
+        threads, timestamps, _, starts = self._sorted()
+        ends = np.r_[starts[1:], len(threads)] if len(starts) else starts
+
+        first = np.zeros(count, np.int64)
+        last = np.zeros(count, np.int64)
+        if len(starts):
+            first[threads[starts]] = timestamps[starts]
+            last[threads[starts]] = timestamps[ends - 1]
+
+        # Unique (thread, address) pairs (sorting beats np.unique's hashing on large arrays)
+        address_count = max(len(self.addresses), 1)
+        pairs = np.sort(self.participant_threads.astype(np.int64) * address_count + self.participant_codes)
+        if len(pairs):
+            pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]]
+        participants = np.bincount(pairs // address_count, minlength=count)
+
+        reply_threads, latencies = self.reply_latencies()
+        replies = np.bincount(reply_threads, minlength=count)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_latency = np.bincount(reply_threads, weights=latencies, minlength=count) / replies
+        median_latency = np.full(count, np.nan)
+        max_latency = np.full(count, np.nan)
+        if len(latencies):
+            order = _group_order(reply_threads, latencies)
+            sorted_threads, sorted_latencies = reply_threads[order], latencies[order]
+            group_starts = _group_starts(sorted_threads)
+            group_threads = sorted_threads[group_starts]
+            sizes = replies[group_threads]
+            lower = sorted_latencies[group_starts + (sizes - 1) // 2]
+            upper = sorted_latencies[group_starts + sizes // 2]
+            median_latency[group_threads] = (lower + upper) / 2
+            max_latency[group_threads] = sorted_latencies[group_starts + sizes - 1]
+
+        return {
+            'thread_id': self.thread_ids,
+            'messages': np.bincount(self.thread_codes, minlength=count),
+            'participants': participants,
+            'first_message': first,
+            'last_message': last,
+            'duration_seconds': last - first,
+            'replies': replies,
+            'mean_reply_seconds': mean_latency,
+            'median_reply_seconds': median_latency,
+            'max_reply_seconds': max_latency,
+        }
+
+    def activity(self, utc_offset_minutes: int = 0) -> np.ndarray:
+        """Message counts by weekday and hour.
+
+        Args:
+            utc_offset_minutes: Offset of the local time to report in
+
+        Returns:
+            7 x 24 int64 array, rows Monday..Sunday, columns hours 0..23
+        """
+        local = self.timestamps + utc_offset_minutes * 60
+        hours = (local // SECONDS_PER_HOUR) % 24
+        weekdays = (local // SECONDS_PER_DAY + _EPOCH_WEEKDAY) % 7
+        return np.bincount(weekdays * 24 + hours, minlength=7 * 24).reshape(7, 24)
+
+    def summary(self, utc_offset_minutes: int = 0) -> Dict[str, Any]:
+        """Corpus-wide figures.
+
+        Args:
+            utc_offset_minutes: Offset of the local time for the busiest hour
+
+        Returns:
+            Dict with message, thread and reply counts, duration and reply
+            latency percentiles (seconds) and the busiest hour of the day
+        """
+        stats = self.thread_stats()
+        _, latencies = self.reply_latencies()
+        hourly = self.activity(utc_offset_minutes).sum(axis=0)
+
+        def percentiles(values):
+            if not len(values):
+                return {'p50': None, 'p90': None, 'p99': None}
+            p50, p90, p99 = np.percentile(values, [50, 90, 99])
+            return {'p50': float(p50), 'p90': float(p90), 'p99': float(p99)}
+
+        return {
+            'messages': len(self),
+            'threads': len(self.thread_ids),
+            'skipped_messages': self.skipped_messages,
+            'replies': len(latencies),
+            'mean_messages_per_thread': float(stats['messages'].mean()) if len(self.thread_ids) else 0.0,
+            'duration_seconds': percentiles(stats['duration_seconds']),
+            'reply_seconds': percentiles(latencies),
+            'busiest_hour': int(hourly.argmax()) if len(self) else None,
+        }
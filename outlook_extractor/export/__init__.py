@@ -4,6 +4,8 @@ Export functionality for the Outlook Extractor.
 This package provides modules for exporting extracted email data to various formats.
 """
 
+from .body_cleaner import BodyCleaner
 from .csv_exporter import CSVExporter
+from .parquet_exporter import ParquetExporter
 
-__all__ = ['CSVExporter']
+__all__ = ['BodyCleaner', 'CSVExporter', 'ParquetExporter']
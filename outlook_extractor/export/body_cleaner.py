@@ -0,0 +1,223 @@
+# outlook_extractor/export/body_cleaner.py
+"""
+Line-oriented cleaning of email bodies for exports.
+
+``BodyCleaner.clean`` removes quoted replies, reply headers, signatures and
+confidentiality notices, and normalizes whitespace, in one pass over the
+lines of a body:
+
+- HTML is reduced to text first: ``<head>``, ``<style>`` and ``<script>``
+  blocks are dropped, block-level tags become line breaks and other tags
+  spaces. Tags are matched with ``<[^<>]*>``, which cannot run past the
+  next ``<``, so unclosed tags cost no rescans.
+- Each line is classified by anchored patterns (``match``/``fullmatch``
+  from the start of the stripped line). Signature and contact patterns,
+  the only ones with nested repetition, are only tried on lines of at most
+  ``MAX_SIGNATURE_LINE`` characters, so no line costs more than a bounded
+  amount of backtracking.
+- Multi-line constructs (a closing or contact line followed by a short
+  signature block, a notice running to the end of the sentence holding its
+  "unintended recipient" clause) are resolved with positions recorded
+  during the pass instead of lookahead. A signature starts at the earliest
+  closing or contact line after which only short, signature-like lines
+  follow, and never at a thanks line right after the greeting.
+
+Cleaning time is therefore linear in the body size, whatever the input.
+``CLEANER_VERSION`` changes whenever the output for some input changes.
+"""
+import html
+import re
+from typing import List, Optional
+
+# Version of the cleaning rules; bump it whenever cleaned output changes
+CLEANER_VERSION = 3
+
+# Longest (stripped) line considered for signature and contact patterns
+MAX_SIGNATURE_LINE = 120
+# Most non-empty lines after a closing ("Best regards,") for it to start a signature
+MAX_SIGNATURE_LINES = 6
+# Most words of a signature line other than a closing or contact line (a name, a title)
+MAX_SIGNATURE_WORDS = 6
+
+# HTML: blocks without text, block-level tags (line breaks) and other tags
+_HTML_BLOCK_START = re.compile(r'<(head|style|script)\b', re.IGNORECASE)
+_HTML_BLOCK_END = {tag: re.compile(rf'</{tag}\s*>', re.IGNORECASE) for tag in ('head', 'style', 'script')}
+_HTML_BREAK = re.compile(r'<(?:br|/?(?:p|div|li|tr|h[1-6]|blockquote|table|ul|ol))\b[^<>]*>', re.IGNORECASE)
+_HTML_TAG = re.compile(r'<[^<>]*>')
+_HTML_SPACES = re.compile(r'[ \t\xa0]{2,}')
+
+# Quoted text and reply headers (matched at the start of the stripped line)
+_QUOTED = re.compile(r'>')
+_REPLY_HEADER = re.compile(r'(?:from|to|sent|subject):', re.IGNORECASE)
+_ATTRIBUTION = re.compile(r'on\s.*\swrote:', re.IGNORECASE)
+
+# Signature separator ("-- ") and the start of a signature block
+_SIGNATURE_SEPARATOR = re.compile(r'--')
+_CLOSING = re.compile(
+    r'(?:(?:best|kind|warm|warmest|many)\s+)?'
+    r'(?:regards|wishes|sincerely|cheers|thanks|thank\s+you|best|br)'
+    r'(?:\s+again|\s+so\s+much|\s+a\s+lot)?[,.!]*',
+    re.IGNORECASE
+)
+# Lines holding only contact details (phone/fax labels, an address, a web link)
+_CONTACT = re.compile(
+    r'(?:(?:phone|mobile|cell|tel|fax|e-?mail|web)\b[^:]{0,20}:.*|'
+    r'[\w.%+-]+@[\w-]+(?:\.[\w-]+)+|'
+    r'(?:https?://|www\.)\S+)',
+    re.IGNORECASE
+)
+
+# Greetings opening a message ("Hi Bob,"), which do not count as content
+_GREETING = re.compile(r'(?:hi|hello|hey|dear|good\s+(?:morning|afternoon|evening))\b[^.!?]*[,!:]?',
+                       re.IGNORECASE)
+
+# Confidentiality notices, from the heading to the end of the sentence with the clause ending them
+_NOTICE_START = re.compile(r'confidential(?:ity)?\s+(?:notice|statement|information)', re.IGNORECASE)
+_NOTICE_END = re.compile(r'unintended\s+recipient|do\s+not\s+use|unauthorized\s+use', re.IGNORECASE)
+_SENTENCE_END = re.compile(r'[.!?](?=\s|$)')
+
+
+def _after_sentence(line: str, position: int) -> str:
+    """Text of a line after the end of the sentence running at position."""
+    end = _SENTENCE_END.search(line, position)
+    return line[end.end():].strip() if end is not None else ''
+
+
+def _signature_like(line: str) -> bool:
+    """Whether a line can belong to a signature block (blank, closing, contact, name)."""
+    if not line:
+        return True
+    if len(line) > MAX_SIGNATURE_LINE:
+        return False
+    if _CLOSING.fullmatch(line) or _CONTACT.fullmatch(line):
+        return True
+    return line[-1] not in '.!?' and len(line.split()) <= MAX_SIGNATURE_WORDS
+
+
+def html_to_text(body: str) -> str:
+    """Reduce HTML to text: drop invisible blocks and tags, keep line breaks.
+
+    Args:
+        body: HTML source
+
+    Returns:
+        Text with one line per block element, entities unescaped and runs
+        of spaces collapsed
+    """
+    parts: List[str] = []
+    position = 0
+    while True:
+        match = _HTML_BLOCK_START.search(body, position)
+        if match is None:
+            break
+        parts.append(body[position:match.start()])
+        end = _HTML_BLOCK_END[match.group(1).lower()].search(body, match.end())
+        if end is None:
+            # Unclosed block: keep the rest, its tags are removed below
+            position = match.start()
+            break
+        position = end.end()
+    parts.append(body[position:])
+    text = ''.join(parts)
+    text = _HTML_BREAK.sub('\n', text)
+    text = _HTML_TAG.sub(' ', text)
+    return _HTML_SPACES.sub(' ', html.unescape(text))
+
+
+class BodyCleaner:
+    """Removes quoted text, signatures and notices from email bodies."""
+
+    version = CLEANER_VERSION
+
+    def clean(self, body: Optional[str], is_html: bool = False) -> str:
+        """Clean and normalize an email body.
+
+        Args:
+            body: Body text or HTML
+            is_html: Whether the body is HTML
+
+        Returns:
+            Cleaned text: lines stripped, at most one blank line in a row,
+            no leading or trailing blank lines
+        """
+        if not body:
+            return ""
+        if not isinstance(body, str):
+            body = str(body)
+        if is_html:
+            body = html_to_text(body)
+
+        lines: List[str] = []
+        nonempty = 0
+        # Non-empty lines other than an opening greeting
+        content = 0
+        # Output lengths and non-empty counts where a signature may start
+        signatures: List[tuple] = []
+        # Output position of an open confidentiality notice and the text before it
+        notice: Optional[tuple] = None
+
+        for raw_line in body.splitlines():
+            line = raw_line.strip()
+            if not line:
+                if lines and lines[-1]:
+                    lines.append('')
+                continue
+
+            if notice is not None:
+                end = _NOTICE_END.search(line)
+                if end is not None:
+                    # Drop the notice, keeping the text around it
+                    start, before, count = notice
+                    del lines[start:]
+                    while signatures and signatures[-1][0] >= start:
+                        signatures.pop()
+                    content -= nonempty - count
+                    nonempty = count
+                    notice = None
+                    line = ' '.join(part for part in (before, _after_sentence(line, end.end())) if part)
+                    if not line:
+                        continue
+
+            first = line[0]
+            if first == '>' and _QUOTED.match(line):
+                continue
+            if first in 'FfTtSs' and _REPLY_HEADER.match(line):
+                continue
+            if first in 'Oo' and line.endswith(':') and _ATTRIBUTION.fullmatch(line):
+                continue
+            if first == '-' and _SIGNATURE_SEPARATOR.fullmatch(line):
+                break
+
+            start = _NOTICE_START.search(line)
+            if start is not None:
+                end = _NOTICE_END.search(line, start.end())
+                if end is not None:
+                    line = ' '.join(part for part in (line[:start.start()].strip(),
+                                                      _after_sentence(line, end.end())) if part)
+                    if not line:
+                        continue
+                else:
+                    notice = (len(lines), line[:start.start()].strip(), nonempty)
+
+            if content and len(line) <= MAX_SIGNATURE_LINE and (
+                    _CLOSING.fullmatch(line) or _CONTACT.fullmatch(line)):
+                signatures.append((len(lines), nonempty))
+            if nonempty or not (len(line) <= MAX_SIGNATURE_LINE and _GREETING.fullmatch(line)):
+                content += 1
+            lines.append(line)
+            nonempty += 1
+
+        # A notice without its closing clause is kept as it was.
+        # A signature starts at the earliest closing or contact line followed
+        # only by a few signature-like lines.
+        block = len(lines)
+        while block and _signature_like(lines[block - 1]):
+            block -= 1
+        for length, count in signatures:
+            if length + 1 >= block and nonempty - count <= MAX_SIGNATURE_LINES:
+                del lines[length:]
+                break
+
+        while lines and not lines[-1]:
+            lines.pop()
+        return '\n'.join(lines)
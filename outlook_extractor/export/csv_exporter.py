@@ -1,145 +1,266 @@
 # outlook_extractor/export/csv_exporter.py
 import csv
+import hashlib
 import re
 import logging
-import pandas as pd
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
-import html
+from email.utils import getaddresses
 import email
 from email import policy
 from email.parser import BytesParser
 
+from .body_cleaner import BodyCleaner
+
 logger = logging.getLogger(__name__)
 
+# Rows passed to one writerows() call; the chunk list is reused
+EXPORT_CHUNK_SIZE = 1000
+# Rows between two progress callbacks
+PROGRESS_EVERY = 10000
+# Bodies per task sent to a cleaning worker process
+CLEAN_CHUNK_SIZE = 250
+# Cleaned bodies kept in memory, by body hash, for re-exports
+CLEAN_CACHE_SIZE = 50000
+
+# Columns of export_emails
+EMAIL_FIELDS = ['subject', 'sender', 'recipients', 'date', 'body', 'folder']
+
+# Columns of export_emails_to_csv
+GRAPH_FIELDS = [
+    'id', 'conversation_id', 'subject', 'sender', 'to_recipients',
+    'cc_recipients', 'bcc_recipients', 'sent_datetime', 'received_datetime',
+    'has_attachments', 'importance', 'is_read', 'body_preview',
+    'web_link', 'parent_folder', 'categories', 'clean_body', 'summary'
+]
+
+
+def write_csv_rows(
+    output_path: str,
+    header: Optional[List[str]],
+    rows: Iterable[List[Any]],
+    encoding: str = 'utf-8',
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    progress_callback: Optional[Callable[[int], None]] = None,
+    progress_every: int = PROGRESS_EVERY
+) -> int:
+    """Stream rows into a CSV file in chunks.
+    
+    Rows are consumed lazily and written with one ``writerows`` call per
+    chunk, so memory is bounded by the chunk size however many rows the
+    iterable yields.
+    
+    Args:
+        output_path: Path of the CSV file (parent directories are created)
+        header: Column names to write first, or None for no header
+        rows: Row values in column order (any iterable, e.g. a generator)
+        encoding: File encoding
+        chunk_size: Rows per writerows call
+        progress_callback: Called with the number of rows written so far
+            after each chunk that completes ``progress_every`` more rows,
+            and once at the end
+        progress_every: Rows between progress callbacks
+        
+    Returns:
+        Number of rows written
+    """
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    chunk_size = max(1, chunk_size)
+    progress_every = max(1, progress_every)
+    written = reported = 0
+    chunk: List[List[Any]] = []
+    with open(output_path, 'w', newline='', encoding=encoding) as f:
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(header)
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) < chunk_size:
+                continue
+            writer.writerows(chunk)
+            written += len(chunk)
+            chunk.clear()
+            if progress_callback and written - reported >= progress_every:
+                reported = written
+                progress_callback(written)
+        if chunk:
+            writer.writerows(chunk)
+            written += len(chunk)
+            chunk.clear()
+    if progress_callback and written != reported:
+        progress_callback(written)
+    return written
+
+
+def _addresses(value: Any) -> List[str]:
+    """Addresses of a recipient list or a 'a@x; b@y' header string."""
+    if not value:
+        return []
+    if isinstance(value, str):
+        return [address for _, address in getaddresses([value.replace(';', ',')]) if address]
+    return [str(address) for address in value]
+
+
+def _iso(value: Any) -> Any:
+    """ISO 8601 text of a datetime, other values unchanged."""
+    return value.isoformat() if isinstance(value, datetime) else (value or '')
+
+
+def export_record(email_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a stored (extractor-format) email to the export_emails_to_csv shape.
+    
+    Emails that already have a ``body`` dict (Graph-style) are returned
+    unchanged.
+    
+    Args:
+        email_data: Email dictionary as saved by the extractor
+        
+    Returns:
+        Email dictionary with Graph-style keys
+    """
+    if isinstance(email_data.get('body'), dict):
+        return email_data
+    html_body = email_data.get('html_body') or email_data.get('body_html')
+    categories = email_data.get('categories') or []
+    if isinstance(categories, str):
+        categories = [category.strip() for category in categories.split(',') if category.strip()]
+    return {
+        'id': email_data.get('id') or email_data.get('entry_id', ''),
+        'conversation_id': email_data.get('conversation_id') or email_data.get('thread_id', ''),
+        'subject': email_data.get('subject', ''),
+        'sender': email_data.get('sender_email') or email_data.get('sender', ''),
+        'toRecipients': _addresses(email_data.get('to_recipients') or email_data.get('recipients')),
+        'ccRecipients': _addresses(email_data.get('cc_recipients')),
+        'bccRecipients': _addresses(email_data.get('bcc_recipients')),
+        'sent_datetime': _iso(email_data.get('sent_on') or email_data.get('sent_date')),
+        'received_datetime': _iso(email_data.get('received_time') or email_data.get('received_date')),
+        'has_attachments': email_data.get('has_attachments', ''),
+        'importance': email_data.get('importance', ''),
+        'is_read': email_data.get('is_read', ''),
+        'body_preview': email_data.get('body_preview', ''),
+        'parent_folder': email_data.get('folder') or email_data.get('folder_path', ''),
+        'categories': categories,
+        'body': {
+            'content': html_body or email_data.get('body') or email_data.get('body_text') or '',
+            'contentType': 'html' if html_body else 'text',
+        },
+    }
+
+
+def body_hash(body: str, is_html: bool = False) -> bytes:
+    """Cache key of a body: a BLAKE2b digest of its text and content type."""
+    digest = hashlib.blake2b(digest_size=16, person=b'html' if is_html else b'text')
+    digest.update(body.encode('utf-8', 'surrogatepass'))
+    return digest.digest()
+
+
+# The exporter of a cleaning worker process, created on its first task
+_worker_exporter = None
+
+
+def _clean_chunk(chunk: List[Tuple[str, bool]]) -> List[Tuple[str, str]]:
+    """Clean and summarize (body, is_html) pairs in a worker process."""
+    global _worker_exporter
+    if _worker_exporter is None:
+        _worker_exporter = CSVExporter()
+    return [_worker_exporter.clean_text(body, is_html) for body, is_html in chunk]
+
+
+def _config_int(config, section: str, option: str, fallback: int) -> int:
+    """Integer option of a ConfigManager, or the fallback for other configs."""
+    get_int = getattr(config, 'get_int', None)
+    if get_int is None:
+        return fallback
+    try:
+        return int(get_int(section, option, fallback))
+    except (TypeError, ValueError):
+        return fallback
+
+
+def _body_pair(email_data: Dict) -> Tuple[str, bool]:
+    """(body, is_html) of an email in the export_emails_to_csv shape."""
+    body = email_data.get('body') or {}
+    return body.get('content', ''), (body.get('contentType') or '').lower() == 'html'
+
+
+def _peek(items: Iterable[Any]) -> Optional[Iterator[Any]]:
+    """Get an iterator over items, or None if there are none."""
+    iterator = iter(items)
+    for first in iterator:
+        return chain((first,), iterator)
+    return None
+
+
 class CSVExporter:
     """Handles the export of email data to CSV format with advanced text cleaning."""
     
     def __init__(self, config=None):
         self.config = config or {}
-        self._setup_regex_patterns()
+        self.body_cleaner = BodyCleaner()
+        # Processes cleaning bodies during exports (0/1: clean in this process)
+        self.clean_workers = _config_int(self.config, 'export', 'clean_workers', 0)
+        self._clean_cache: 'OrderedDict[bytes, Tuple[str, str]]' = OrderedDict()
+        self.clean_cache_size = _config_int(self.config, 'export', 'clean_cache_size', CLEAN_CACHE_SIZE)
+        # Bodies cleaned by this exporter, as opposed to found in a cache
+        self.bodies_cleaned = 0
         
-    def export_emails(self, emails, output_file, include_headers=True, encoding='utf-8'):
+    def export_emails(self, emails, output_file, include_headers=True, encoding='utf-8',
+                      progress_callback=None, progress_every=PROGRESS_EVERY):
         """Export emails to a CSV file.
         
+        Emails are converted and written in chunks as they are read, so any
+        iterable (a list, a generator, a storage cursor) can be exported
+        without holding all rows in memory.
+        
         Args:
-            emails: List of email dictionaries to export
+            emails: Iterable of email dictionaries to export
             output_file: Path to the output CSV file
             include_headers: Whether to include headers in the CSV
             encoding: File encoding to use
+            progress_callback: Called with the number of rows written so far
+            progress_every: Rows between progress callbacks
             
         Returns:
             bool: True if export was successful, False otherwise
         """
         try:
-            if not emails:
+            emails = _peek(emails or [])
+            if emails is None:
                 logger.warning("No emails to export")
                 return False
-                
-            # Convert emails to a format suitable for CSV export
-            rows = []
-            for email_data in emails:
-                row = {
-                    'subject': email_data.get('subject', ''),
-                    'sender': email_data.get('sender', ''),
-                    'recipients': ', '.join(email_data.get('recipients', [])),
-                    'date': email_data.get('received_time', '').isoformat() if email_data.get('received_time') else '',
-                    'body': email_data.get('body', ''),
-                    'folder': email_data.get('folder', '')
-                }
-                rows.append(row)
             
-            # Create directory if it doesn't exist
-            output_path = Path(output_file)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Write to CSV
-            with open(output_file, 'w', newline='', encoding=encoding) as f:
-                if not rows:
-                    return False
-                    
-                fieldnames = list(rows[0].keys())
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                
-                if include_headers:
-                    writer.writeheader()
-                
-                for row in rows:
-                    writer.writerow(row)
+            written = write_csv_rows(
+                output_file, EMAIL_FIELDS if include_headers else None, self._email_rows(emails),
+                encoding=encoding, progress_callback=progress_callback, progress_every=progress_every
+            )
             
-            logger.info(f"Successfully exported {len(emails)} emails to {output_file}")
+            logger.info(f"Successfully exported {written} emails to {output_file}")
             return True
             
         except Exception as e:
             logger.error(f"Failed to export emails to CSV: {e}", exc_info=True)
             return False
     
-    def _setup_regex_patterns(self):
-        """Initialize regex patterns for text cleaning."""
-        # Common email headers and footers to remove
-        self.patterns = {
-            'signature': re.compile(
-                r'(?is)'  # Global flags at the start
-                r'(?:'  # Start non-capturing group
-                r'--\s*\n.*|'  # Standard signature separator
-                r'^--\s*$.*|'  # Double dash separator
-                r'(?:^[^\n]*[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}.*)|'  # Email in signature
-                r'(?:^[^\n]*www\.[^\s]+\.[a-z]{2,}.*)|'  # URLs in signature
-                r'(?:^[^\n]*\b(?:phone|mobile|tel|fax)[^\n:]*:.*)|'  # Contact info
-                r'(?:^[^\n]*\b(?:regard|best|sincerely|cheers|thanks|thank you|br),?[^\n]*$)'  # Common closings
-                r')'  # End non-capturing group
-            ),
-            'quoted_text': re.compile(
-                r'(?m)'  # Global multiline flag at the start
-                r'(?:'  # Start non-capturing group
-                r'^>.*$|'  # Quoted text
-                r'^On .*? wrote:$|'  # Email client quote
-                r'^From:.*?$|'  # Email header
-                r'^To:.*?$|'  # Email header
-                r'^Sent:.*?$|'  # Email header
-                r'^Subject:.*?$'  # Email header
-                r')'  # End non-capturing group
-            ),
-            'whitespace': re.compile(r'\s+', re.UNICODE),
-            'html_tags': re.compile(r'<[^>]+>'),
-            'multiple_newlines': re.compile(r'\n{3,}'),
-            'trailing_whitespace': re.compile(r'[ \t]+$', re.MULTILINE),
-            'leading_whitespace': re.compile(r'^[ \t]+', re.MULTILINE),
-            'confidentiality_notice': re.compile(
-                r'(?is)confidential(?:ity)?(?: notice| statement| information).*?'
-                r'(?:unintended recipient|do not use|unauthorized use)'
-            )
-        }
-        
+    def _email_rows(self, emails: Iterable[Dict]) -> Iterator[List[Any]]:
+        """Rows of export_emails, one per email (see EMAIL_FIELDS)."""
+        for email_data in emails:
+            yield [
+                email_data.get('subject', ''),
+                email_data.get('sender', ''),
+                ', '.join(email_data.get('recipients') or _addresses(email_data.get('to_recipients'))),
+                _iso(email_data.get('received_time', '')),
+                email_data.get('body', ''),
+                email_data.get('folder', ''),
+            ]
+    
     def clean_body(self, body: str, is_html: bool = False) -> str:
-        """Clean and normalize email body text."""
-        if not body:
-            return ""
-            
+        """Clean and normalize email body text (see body_cleaner.BodyCleaner)."""
         try:
-            # Convert to string if needed
-            if not isinstance(body, str):
-                body = str(body)
-                
-            # Remove HTML tags if present
-            if is_html:
-                body = self.patterns['html_tags'].sub(' ', body)
-                body = html.unescape(body)
-                
-            # Remove common email artifacts
-            body = self.patterns['quoted_text'].sub('', body)
-            body = self.patterns['signature'].sub('', body)
-            body = self.patterns['confidentiality_notice'].sub('', body)
-            
-            # Normalize whitespace
-            body = self.patterns['leading_whitespace'].sub('', body)
-            body = self.patterns['trailing_whitespace'].sub('', body)
-            body = self.patterns['multiple_newlines'].sub('\n\n', body)
-            body = body.strip()
-            
-            return body
-            
+            return self.body_cleaner.clean(body, is_html)
         except Exception as e:
             logger.error(f"Error cleaning email body: {str(e)}")
             return body or ""
@@ -153,66 +274,248 @@ class CSVExporter:
         sentences = re.split(r'(?<=[.!?])\s+', body)
         return ' '.join(sentences[:max_sentences])
 
+    def clean_text(self, body: str, is_html: bool = False) -> Tuple[str, str]:
+        """Clean a body and summarize the cleaned text.
+        
+        Returns:
+            (cleaned body, summary), as stored for the body cleaner version
+        """
+        clean_body = self.clean_body(body, is_html)
+        return clean_body, self.extract_summary(clean_body)
+
+    def clean_bodies(
+        self,
+        bodies: Iterable[Tuple[str, bool]],
+        workers: Optional[int] = None,
+        chunk_size: int = CLEAN_CHUNK_SIZE,
+        store=None
+    ) -> Iterator[str]:
+        """Clean many bodies, in order (see clean_texts).
+        
+        Yields:
+            Cleaned bodies, in the order of ``bodies`` (see clean_body)
+        """
+        for clean_body, _ in self.clean_texts(bodies, workers, chunk_size, store):
+            yield clean_body
+
+    def clean_texts(
+        self,
+        bodies: Iterable[Tuple[str, bool]],
+        workers: Optional[int] = None,
+        chunk_size: int = CLEAN_CHUNK_SIZE,
+        store=None
+    ) -> Iterator[Tuple[str, str]]:
+        """Clean and summarize many bodies, in order, fanning chunks out to worker processes.
+        
+        Bodies are read a window at a time (two chunks per worker), so any
+        iterable can be cleaned with bounded memory. Results are cached by
+        body hash, so bodies are only cleaned once: ``store`` is asked for
+        the results it holds for the current cleaner version, bodies seen
+        before by this exporter come from memory, and only the others are
+        cleaned. Results the store did not hold are saved to it. If the
+        process pool cannot be used, bodies are cleaned in this process.
+        
+        Args:
+            bodies: (body, is_html) pairs
+            workers: Worker processes (defaults to export.clean_workers;
+                0 or 1 cleans in this process)
+            chunk_size: Bodies per worker task
+            store: EmailStorage persisting cleaned bodies (see
+                EmailStorage.get_cleaned_bodies), or None
+            
+        Yields:
+            (cleaned body, summary), in the order of ``bodies`` (see clean_text)
+        """
+        workers = self.clean_workers if workers is None else workers
+        chunk_size = max(1, chunk_size)
+        executor = None
+        if workers > 1:
+            try:
+                executor = ProcessPoolExecutor(max_workers=workers)
+            except Exception as e:
+                logger.warning(f"Cleaning bodies in this process, the process pool failed: {e}")
+        
+        bodies = iter(bodies)
+        cache = self._clean_cache
+        version = self.body_cleaner.version
+        try:
+            while True:
+                window = list(islice(bodies, chunk_size * max(workers, 1) * 2))
+                if not window:
+                    break
+                keys = [body_hash(str(body or ''), is_html) for body, is_html in window]
+                unique = dict(zip(keys, window))
+                # Texts the store lacks (or has for another cleaner version)
+                unsaved: List[Tuple[bytes, str, str]] = []
+                if store is not None:
+                    found = store.get_cleaned_bodies(list(unique), version)
+                    cache.update(found)
+                    unsaved = [(key, *cache[key]) for key in unique if key not in found and key in cache]
+                missing = {key: pair for key, pair in unique.items() if key not in cache}
+                
+                if missing:
+                    pairs = list(missing.values())
+                    cleaned = None
+                    if executor is not None and len(pairs) > chunk_size:
+                        chunks = [pairs[start:start + chunk_size] for start in range(0, len(pairs), chunk_size)]
+                        try:
+                            cleaned = list(chain.from_iterable(executor.map(_clean_chunk, chunks)))
+                        except Exception as e:
+                            logger.warning(f"Cleaning bodies in this process, the process pool failed: {e}")
+                            executor.shutdown()
+                            executor = None
+                    if cleaned is None:
+                        cleaned = [self.clean_text(body, is_html) for body, is_html in pairs]
+                    cache.update(zip(missing, cleaned))
+                    self.bodies_cleaned += len(cleaned)
+                    unsaved.extend((key, *texts) for key, texts in zip(missing, cleaned))
+                if unsaved and store is not None:
+                    store.save_cleaned_bodies(unsaved, version)
+                
+                results = [cache[key] for key in keys]
+                for key in keys:
+                    cache.move_to_end(key)
+                while len(cache) > self.clean_cache_size:
+                    cache.popitem(last=False)
+                yield from results
+        finally:
+            if executor is not None:
+                executor.shutdown()
+    
+    def cleaned(self, emails: Iterable[Dict], store=None) -> Iterator[Tuple[Dict, str, str]]:
+        """Pair emails (export_emails_to_csv shape) with their cleaned bodies and summaries.
+        
+        Args:
+            emails: Iterable of email dictionaries with a ``body`` dict
+            store: EmailStorage persisting cleaned bodies, or None (see clean_texts)
+            
+        Yields:
+            (email dictionary, cleaned body, summary), in order
+        """
+        pending = deque()
+        
+        def bodies():
+            for email_data in emails:
+                pending.append(email_data)
+                yield _body_pair(email_data)
+        
+        for clean_body, summary in self.clean_texts(bodies(), store=store):
+            yield pending.popleft(), clean_body, summary
+
     def export_emails_to_csv(
         self,
-        emails: List[Dict],
+        emails: Iterable[Dict],
         output_path: str,
-        include_headers: bool = True
+        include_headers: bool = True,
+        progress_callback: Optional[Callable[[int], None]] = None,
+        progress_every: int = PROGRESS_EVERY,
+        store=None
     ) -> str:
-        """Export list of email dictionaries to CSV file."""
-        if not emails:
+        """Export email dictionaries to a CSV file with cleaned bodies and summaries.
+        
+        Bodies are cleaned and summarized row by row while writing, so any
+        iterable can be exported without holding all rows in memory.
+        
+        Args:
+            emails: Iterable of email dictionaries
+            output_path: Path of the CSV file
+            include_headers: Whether to write the header row
+            progress_callback: Called with the number of rows written so far
+            progress_every: Rows between progress callbacks
+            store: EmailStorage persisting cleaned bodies, or None (see clean_texts)
+            
+        Returns:
+            Path of the CSV file, or "" if there were no emails
+        """
+        emails = _peek(emails or [])
+        if emails is None:
             logger.warning("No emails provided for CSV export")
             return ""
             
         try:
-            # Ensure output directory exists
-            output_path = Path(output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Define CSV fields
-            fields = [
-                'id', 'conversation_id', 'subject', 'sender', 'to_recipients',
-                'cc_recipients', 'bcc_recipients', 'sent_datetime', 'received_datetime',
-                'has_attachments', 'importance', 'is_read', 'body_preview',
-                'web_link', 'parent_folder', 'categories', 'clean_body', 'summary'
-            ]
-            
-            # Prepare data for CSV
-            rows = []
-            for email_data in emails:
-                row = {field: email_data.get(field, '') for field in fields}
-                
-                # Clean and process body
-                body = email_data.get('body', {}).get('content', '')
-                is_html = email_data.get('body', {}).get('contentType', '').lower() == 'html'
-                clean_body = self.clean_body(body, is_html)
-                summary = self.extract_summary(clean_body)
-                
-                # Update row with processed data
-                row.update({
-                    'clean_body': clean_body,
-                    'summary': summary,
-                    'to_recipients': '; '.join(email_data.get('toRecipients', [])),
-                    'cc_recipients': '; '.join(email_data.get('ccRecipients', [])),
-                    'bcc_recipients': '; '.join(email_data.get('bccRecipients', [])),
-                    'categories': '; '.join(email_data.get('categories', []))
-                })
-                
-                rows.append(row)
-            
-            # Write to CSV
-            with open(output_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=fields)
-                if include_headers:
-                    writer.writeheader()
-                writer.writerows(rows)
+            written = write_csv_rows(
+                str(output_path), GRAPH_FIELDS if include_headers else None, self._graph_rows(emails, store),
+                progress_callback=progress_callback, progress_every=progress_every
+            )
                 
-            logger.info(f"Successfully exported {len(emails)} emails to {output_path}")
-            return str(output_path)
+            logger.info(f"Successfully exported {written} emails to {output_path}")
+            return str(Path(output_path))
             
         except Exception as e:
             logger.error(f"Error exporting emails to CSV: {str(e)}")
             raise
+    
+    def export_from_storage(
+        self,
+        storage,
+        output_path: str,
+        email_filter=None,
+        include_headers: bool = True,
+        progress_callback: Optional[Callable[[int], None]] = None,
+        progress_every: int = PROGRESS_EVERY
+    ) -> str:
+        """Export stored emails matching a filter, streaming them from storage.
+        
+        Neither the extraction nor the full email list is needed: matching
+        emails are read in batches (filtered in SQL for SQLiteStorage) and
+        written as they arrive, in the format of export_emails_to_csv.
+        Cleaned bodies and summaries are kept in the storage, so bodies are
+        cleaned on their first export only (again after a cleaner version
+        change).
+        
+        Args:
+            storage: EmailStorage to read from
+            output_path: Path of the CSV file
+            email_filter: storage.EmailFilter selecting the emails (None for all)
+            include_headers: Whether to write the header row
+            progress_callback: Called with the number of rows written so far
+            progress_every: Rows between progress callbacks
+            
+        Returns:
+            Path of the CSV file, or "" if no email matched
+        """
+        records = (export_record(email_data) for email_data in storage.iter_emails(email_filter))
+        return self.export_emails_to_csv(records, output_path, include_headers,
+                                         progress_callback=progress_callback, progress_every=progress_every,
+                                         store=storage)
+    
+    def refresh_cleaned_bodies(self, storage, email_filter=None, workers: Optional[int] = None) -> int:
+        """Clean and store the bodies a storage has no current cleaned version of.
+        
+        Run after an extraction, or after a cleaner version change, so the
+        next exports only read cleaned bodies. Bodies already stored for the
+        current cleaner version are not cleaned again.
+        
+        Args:
+            storage: EmailStorage to read emails from and store cleaned bodies in
+            email_filter: storage.EmailFilter selecting the emails (None for all)
+            workers: Worker processes (defaults to export.clean_workers)
+            
+        Returns:
+            int: Number of bodies cleaned
+        """
+        cleaned_before = self.bodies_cleaned
+        bodies = (_body_pair(export_record(email_data)) for email_data in storage.iter_emails(email_filter))
+        for _ in self.clean_texts(bodies, workers, store=storage):
+            pass
+        return self.bodies_cleaned - cleaned_before
+    
+    def _graph_rows(self, emails: Iterable[Dict], store=None) -> Iterator[List[Any]]:
+        """Rows of export_emails_to_csv, one per email (see GRAPH_FIELDS)."""
+        for email_data, clean_body, summary in self.cleaned(emails, store):
+            row = {field: email_data.get(field, '') for field in GRAPH_FIELDS}
+            
+            # Update row with processed data
+            row.update({
+                'clean_body': clean_body,
+                'summary': summary,
+                'to_recipients': '; '.join(email_data.get('toRecipients', [])),
+                'cc_recipients': '; '.join(email_data.get('ccRecipients', [])),
+                'bcc_recipients': '; '.join(email_data.get('bccRecipients', [])),
+                'categories': '; '.join(email_data.get('categories', []))
+            })
+            
+            yield [row[field] for field in GRAPH_FIELDS]
 
     def export_subject_analysis(
         self,
@@ -244,7 +547,8 @@ class CSVExporter:
             # Sort by count descending
             rows.sort(key=lambda x: x['count'], reverse=True)
             
-            # Write to CSV
+            # Write to CSV (pandas is only needed here, so import it lazily)
+            import pandas as pd
             df = pd.DataFrame(rows)
             df.to_csv(output_path, index=False)
             
@@ -253,4 +557,65 @@ class CSVExporter:
             
         except Exception as e:
             logger.error(f"Error generating subject analysis: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+    
+    def export_thread_analysis(
+        self,
+        emails: List[Dict],
+        output_path: str,
+        thread_id_for: Optional[Callable[[str], Optional[str]]] = None
+    ) -> str:
+        """Generate per-thread statistics and a weekday/hour activity report.
+        
+        Writes one row per thread to ``output_path`` (see
+        core.thread_analytics.THREAD_STAT_COLUMNS, times in UTC) and the
+        message counts by weekday and hour next to it as
+        ``<name>_activity.csv``.
+        
+        Args:
+            emails: Email dictionaries to analyse
+            output_path: Path of the thread statistics CSV
+            thread_id_for: Maps a Message-ID to its thread id, for emails
+                without a 'thread_id' (e.g. ThreadManager.thread_id_for)
+            
+        Returns:
+            Path of the thread statistics CSV
+        """
+        try:
+            # NumPy is only needed here, so import the analytics lazily
+            import numpy as np
+            from ..core.thread_analytics import THREAD_STAT_COLUMNS, ThreadFrame
+            
+            frame = ThreadFrame.from_emails(emails, thread_id_for)
+            stats = frame.thread_stats()
+            order = np.argsort(-stats['messages'], kind='stable')
+            
+            def iso(epochs):
+                return np.datetime_as_string(epochs.astype('datetime64[s]'), timezone='UTC')
+            
+            columns = dict(stats)
+            columns['first_message'] = iso(stats['first_message'])
+            columns['last_message'] = iso(stats['last_message'])
+            with open(output_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(THREAD_STAT_COLUMNS)
+                writer.writerows(zip(*(
+                    ['' if value != value else value for value in columns[name][order].tolist()]
+                    for name in THREAD_STAT_COLUMNS
+                )))
+            
+            activity_path = Path(output_path).with_name(f"{Path(output_path).stem}_activity.csv")
+            weekdays = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+            with open(activity_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['weekday'] + [f'{hour:02d}' for hour in range(24)])
+                for weekday, counts in zip(weekdays, frame.activity().tolist()):
+                    writer.writerow([weekday] + counts)
+            
+            logger.info(f"Thread analysis of {len(frame)} emails in {len(stats['thread_id'])} threads "
+                        f"exported to {output_path}")
+            return str(output_path)
+            
+        except Exception as e:
+            logger.error(f"Error generating thread analysis: {str(e)}")
+            raise
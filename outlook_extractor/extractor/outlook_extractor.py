@@ -10,41 +10,70 @@ import logging
 import sqlite3
 import json
 import hashlib
+import time
 import uuid
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Set, Tuple, DefaultDict
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple, DefaultDict
 from email.utils import getaddresses, parseaddr
 
 from ..core.outlook_client import OutlookClient
-from ..core.email_threading import ThreadManager, EmailThread, THREAD_STATUS_ACTIVE
-from ..storage.base import EmailStorage
+from ..core.email_threading import ThreadManager, EmailThread, THREAD_STATUS_ACTIVE, message_id_of
+from ..core.jwz_threading import DEFAULT_MAX_DEPTH, create_thread_manager
+from ..core.persistent_threading import PersistentThreadManager
+from ..core.sharded_threading import ShardedThreadManager
+from ..core.extraction_profile import DEFAULT_PROFILE, fetch_body, resolve_profile
+from ..core.internet_headers import PR_TRANSPORT_MESSAGE_HEADERS, parse_internet_headers
+from ..core.metrics import (
+    STAGE_ATTACHMENTS, STAGE_BODY_FETCH, STAGE_FOLDER_DISCOVERY, STAGE_HEADER_EXTRACTION,
+    STAGE_ITEM_FETCH, STAGE_NORMALIZATION, STAGE_RESTRICT, STAGE_STORAGE_WRITE, STAGE_THREADING,
+    RunMetrics, metrics_path_for,
+)
+from ..core.metrics_textfile import DEFAULT_INTERVAL, create_metrics_sink
+from ..core.profiling import DEFAULT_TOP_N, RunProfiler
+from ..storage.attachment_store import AttachmentStore
+from ..storage.attachment_writer import AttachmentWriter
+from ..storage.base import EmailFilter, EmailStorage
 from ..storage.sqlite_storage import SQLiteStorage
 from ..storage.json_storage import JSONStorage
-from ..export.csv_exporter import CSVExporter
+from ..storage import create_storage
+from ..export.csv_exporter import CSVExporter, export_record
+from ..export.parquet_exporter import ParquetExporter
 from ..config import ConfigManager
 
 logger = logging.getLogger(__name__)
 
+# RunMetrics counters reported as COM errors
+COM_ERROR_COUNTERS = ('item_fetch_errors', 'header_errors', 'email_errors')
+
 class OutlookExtractor:
     """Main class for extracting emails from Outlook with threading support."""
     
-    def __init__(self, config_path: str = None):
+    def __init__(self, config_path: str = None, config: Optional[ConfigManager] = None):
         """Initialize the OutlookExtractor.
         
         Args:
             config_path: Path to the configuration file
+            config: Already loaded configuration (takes precedence over config_path)
         """
-        self.config = ConfigManager(config_path) if config_path else ConfigManager()
+        if config is None:
+            config = ConfigManager(config_path) if config_path else ConfigManager()
+        self.config = config
         self._outlook_client = None  # Make it a private attribute
         self.storage = None
         self.csv_exporter = CSVExporter(self.config)
-        self.thread_manager = ThreadManager()
+        self.thread_manager = create_thread_manager(
+            self.config.get('threading', 'thread_method', 'hybrid'),
+            self.config.get_int('threading', 'max_thread_depth', DEFAULT_MAX_DEPTH)
+        )
         self.priority_addresses = set()
         self.admin_addresses = set()
+        self.header_allowlist = None  # None means the default header set
         
         # Initialize storage only, outlook_client will be initialized on demand
         self._init_storage()
+        self._init_thread_persistence()
+        self._init_parallel_threading()
         self._load_config()
     
     @property
@@ -74,16 +103,35 @@ class OutlookExtractor:
     def _init_storage(self) -> None:
         """Initialize the storage backend."""
         storage_type = self.config.get('storage', 'type', 'sqlite')
-        
-        if storage_type.lower() == 'sqlite':
-            db_path = self.config.get('storage', 'sqlite_path', 'emails.db')
-            self.storage = SQLiteStorage(db_path)
-        else:  # Default to JSON
-            json_path = self.config.get('storage', 'json_path', 'emails.json')
-            self.storage = JSONStorage(json_path)
+        self.storage = create_storage(self.config)
         
         logger.info(f"Initialized {storage_type} storage at {self.storage.file_path}")
     
+    def _init_thread_persistence(self) -> None:
+        """Keep threading state in the database if threading.persist_threads is set."""
+        if not self.config.get_boolean('threading', 'persist_threads', False):
+            return
+        if not isinstance(self.storage, SQLiteStorage):
+            logger.warning("threading.persist_threads requires SQLite storage; threads are kept in memory")
+            return
+        self.thread_manager = PersistentThreadManager(self.storage)
+        logger.warning("threading.persist_threads links on Message-ID/References/ConversationIndex only; "
+                       "thread_method and max_thread_depth are ignored")
+        logger.info("Threading against the conversations stored in the database")
+    
+    def _init_parallel_threading(self) -> None:
+        """Thread in worker processes if threading.parallel_workers is above 1."""
+        workers = int(self.config.get_int('threading', 'parallel_workers', 0))
+        if workers <= 1:
+            return
+        if isinstance(self.thread_manager, PersistentThreadManager):
+            logger.warning("threading.parallel_workers is ignored with persist_threads")
+            return
+        self.thread_manager = ShardedThreadManager(workers)
+        logger.warning("threading.parallel_workers links on Message-ID/References/ConversationIndex only; "
+                       "thread_method and max_thread_depth are ignored")
+        logger.info(f"Threading in {workers} worker processes")
+    
     def folder_matches_pattern(self, folder_name: str, patterns: List[str]) -> bool:
         """Check if folder name matches any of the patterns (supports wildcards).
         
@@ -403,15 +451,18 @@ class OutlookExtractor:
         # Load priority and admin emails from config
         self.priority_addresses = set(
             email.strip().lower() 
-            for email in self.config.get('email_processing.priority_emails', '').split(',')
+            for email in (self.config.get('email_processing', 'priority_emails', '') or '').split(',')
             if email.strip()
         )
         
         self.admin_addresses = set(
             email.strip().lower()
-            for email in self.config.get('email_processing.admin_emails', '').split(',')
+            for email in (self.config.get('email_processing', 'admin_emails', '') or '').split(',')
             if email.strip()
         )
+        
+        # Internet headers to persist with each email
+        self.header_allowlist = self.config.get_list('email_processing', 'header_allowlist') or None
     
     def _extract_email_headers(self, msg) -> Dict[str, Any]:
         """Extract email headers for threading.
@@ -429,9 +480,17 @@ class OutlookExtractor:
             sender = getattr(msg, 'SenderName', 'Unknown Sender')
             sender_email = getattr(msg, 'SenderEmailAddress', '')
                 
-            # Get threading headers
-            in_reply_to = getattr(msg, 'InReplyTo', '')
-            references = getattr(msg, 'ConversationID', '') or getattr(msg, 'ConversationTopic', '')
+            # Get threading headers from a single read of the transport headers
+            headers = parse_internet_headers(
+                self._get_mapi_property(msg, PR_TRANSPORT_MESSAGE_HEADERS, ''),
+                self.header_allowlist
+            )
+            message_id = headers['message_id']
+            in_reply_to = headers['in_reply_to'] or getattr(msg, 'InReplyTo', '')
+            references = (
+                ' '.join(headers['references']) or
+                getattr(msg, 'ConversationID', '') or getattr(msg, 'ConversationTopic', '')
+            )
             thread_index = getattr(msg, 'ConversationIndex', '')
                 
             # Get recipients
@@ -473,10 +532,7 @@ class OutlookExtractor:
             received_str = received_time.isoformat() if received_time else ''
             sent_str = sent_time.isoformat() if sent_time else ''
                 
-            # Get message body
-            body = getattr(msg, 'Body', '')
-                
-            # Create email data dictionary
+            # Create email data dictionary (bodies are fetched separately)
             email_data = {
                 'entry_id': entry_id,
                 'folder': '',  # Will be set by the caller
@@ -487,14 +543,16 @@ class OutlookExtractor:
                 'cc_recipients': cc_str.lower(),
                 'received_time': received_str,
                 'sent_on': sent_str,
-                'body': body,
-                'body_preview': body[:500] + '...' if len(body) > 500 else body,
+                'body': '',
+                'body_preview': '',
+                'message_id': message_id,
                 'in_reply_to': in_reply_to,
                 'references': references,
                 'thread_index': thread_index,
                 'is_read': bool(getattr(msg, 'UnRead', 0) == 0),  # 0 means read, 1 means unread
                 'has_attachments': bool(getattr(msg, 'Attachments', None) and msg.Attachments.Count > 0),
-                'categories': getattr(msg, 'Categories', '')
+                'categories': getattr(msg, 'Categories', ''),
+                'internet_headers': headers['fields']
             }
                 
             return email_data
@@ -503,6 +561,135 @@ class OutlookExtractor:
             logger.error(f"Error extracting email headers: {e}", exc_info=True)
             raise
 
+    def _fetch_email_body(self, msg, email_data: Dict[str, Any], profile: str,
+                          max_body_bytes: int = 0) -> Dict[str, Any]:
+        """Fetch the message body required by the extraction profile.
+        
+        Args:
+            msg: Outlook message object
+            email_data: Email data from _extract_email_headers to update in place
+            profile: Extraction profile ('headers', 'text' or 'full')
+            max_body_bytes: Maximum size of each body in bytes (0 for no limit)
+            
+        Returns:
+            The updated email data dictionary
+        """
+        try:
+            body_data = fetch_body(msg, profile, max_body_bytes)
+        except Exception as e:
+            logger.error(f"Error fetching email body: {e}", exc_info=True)
+            return email_data
+        
+        body = body_data['body']
+        email_data['body'] = body
+        email_data['body_preview'] = body[:500] + '...' if len(body) > 500 else body
+        if body_data['html_body']:
+            email_data['html_body'] = body_data['html_body']
+        email_data['body_truncated'] = body_data['body_truncated']
+        return email_data
+
+    def _create_profiler(self, mode: Optional[str] = None, trace_memory: Optional[bool] = None,
+                         output_dir: Optional[str] = None, run_id: Optional[str] = None) -> Optional[RunProfiler]:
+        """Create a profiler for an extraction run if profiling is enabled.
+        
+        Args:
+            mode: Profiler mode ('cprofile', 'sampling', 'auto' or 'off';
+                defaults to the profiling.mode setting)
+            trace_memory: Whether to trace allocations (defaults to the
+                profiling.trace_memory setting)
+            output_dir: Report directory (defaults to profiling.output_dir,
+                then <storage output_dir>/profiles)
+            run_id: Identifier used in report file names
+            
+        Returns:
+            A RunProfiler, or None if neither CPU nor memory profiling is enabled
+        """
+        if mode is None:
+            mode = self.config.get('profiling', 'mode', 'off')
+        if trace_memory is None:
+            trace_memory = self.config.get_boolean('profiling', 'trace_memory', False)
+        output_dir = (output_dir or self.config.get('profiling', 'output_dir', '') or
+                      os.path.join(self.config.get('storage', 'output_dir', 'output'), 'profiles'))
+        profiler = RunProfiler(
+            output_dir, mode=mode, trace_memory=bool(trace_memory),
+            top_n=self.config.get_int('profiling', 'top_n', DEFAULT_TOP_N), run_id=run_id
+        )
+        return profiler if profiler.enabled else None
+
+    def _create_attachment_writer(self, workers: Optional[int] = None) -> Optional[AttachmentWriter]:
+        """Create the background attachment writer for an extraction run.
+        
+        Args:
+            workers: Number of writer threads (defaults to the configured value)
+            
+        Returns:
+            An AttachmentWriter, or None if it could not be created
+        """
+        try:
+            if workers is None:
+                workers = self.config.get_int('email_processing', 'attachment_workers', 4)
+            budget_mb = self.config.get_float('email_processing', 'attachment_byte_budget_mb', 0)
+            return AttachmentWriter(
+                AttachmentStore(self.config.get_attachment_dir()),
+                max_workers=int(workers),
+                retries=self.config.get_int('email_processing', 'attachment_retries', 3),
+                byte_budget=int(float(budget_mb) * 1024 * 1024)
+            )
+        except Exception as e:
+            logger.error(f"Error creating attachment writer, attachments will not be saved: {e}",
+                         exc_info=True)
+            return None
+
+    def _queue_attachments(self, msg, email_data: Dict[str, Any], writer: AttachmentWriter) -> None:
+        """Queue an email's attachments for background saving.
+        
+        Args:
+            msg: Outlook message object
+            email_data: Email data to attach the attachment metadata to
+            writer: Attachment writer receiving the files
+        """
+        attachments = []
+        max_size = self.config.get_float('email_processing', 'max_attachment_size', 0) * 1024 * 1024
+        email_id = email_data.get('entry_id')
+        
+        try:
+            for i in range(1, msg.Attachments.Count + 1):
+                try:
+                    attachment = msg.Attachments.Item(i)
+                    attachment_info = {
+                        'filename': attachment.FileName,
+                        'size': attachment.Size,
+                        'content_type': getattr(attachment, 'Type', 'application/octet-stream'),
+                        'saved_path': None
+                    }
+                    attachments.append(attachment_info)
+                    
+                    if max_size and attachment_info['size'] > max_size:
+                        attachment_info['error'] = 'attachment exceeds max_attachment_size'
+                        continue
+                    writer.submit(attachment, attachment_info, email_id)
+                except Exception as e:
+                    logger.error(f"Error processing attachment {i}: {e}")
+        except Exception as e:
+            logger.error(f"Error processing attachments: {e}")
+        
+        email_data['attachments'] = attachments
+
+    def _save_completed_attachments(self, writer: AttachmentWriter) -> None:
+        """Apply and record the attachment writes finished since the last call.
+        
+        Must run on the extraction thread, which owns the attachment metadata
+        of the emails.
+        """
+        completed: Dict[str, List[Dict[str, Any]]] = {}
+        for email_id, attachment_info in writer.pop_completed():
+            completed.setdefault(email_id, []).append(attachment_info)
+        
+        if not completed or not hasattr(self.storage, 'save_attachment_refs'):
+            return
+        for email_id, attachments in completed.items():
+            self.storage.save_attachment_refs(email_id, attachments)
+
     def _get_mapi_property(self, prop_accessor, prop_name: str, default: Any = None) -> Any:
         """Safely get a MAPI property.
         
@@ -662,10 +849,64 @@ class OutlookExtractor:
                 - thread_status: str - Status to set for new threads
                 - recursive: bool - Whether to search subfolders recursively (default: True)
                 - max_emails: int - Maximum number of emails to process (0 for no limit)
+                - extraction_profile: str - Body fetch profile: 'headers' (no body),
+                  'text' (plain body) or 'full' (plain and HTML body)
+                - max_body_bytes: int - Maximum size of each body in bytes (0 for no limit)
+                - email_filter: callable - Predicate applied to header data; bodies
+                  are only fetched and stored for emails it accepts
+                - extract_attachments: bool - Whether to save attachments (defaults
+                  to the email_processing.extract_attachments setting)
+                - attachment_workers: int - Number of background attachment writers
+                - return_emails: bool - Whether to include the extracted emails in
+                  the result under 'emails' (default: False)
+                - metrics: RunMetrics - Metrics object to record into (a new one
+                  is created if omitted); returned under 'metrics'
+                - write_metrics: bool - Whether to append the run metrics to a
+                  JSON Lines file next to the database (defaults to the
+                  storage.write_metrics setting)
+                - metrics_textfile: str - ``.prom`` file for node_exporter's
+                  textfile collector, rewritten during the run (defaults to
+                  the metrics.textfile_path setting; empty to disable)
+                - profiler: str - Profile the run with 'cprofile', 'sampling'
+                  (pyinstrument) or 'auto'; 'off' to disable (defaults to
+                  the profiling.mode setting)
+                - trace_memory: bool - Trace allocations with tracemalloc and
+                  report the top allocation sites per folder
+                - profile_dir: str - Directory for profile reports; the
+                  written files are returned under 'profiling'
                 
         Returns:
             Dictionary containing extraction results with thread information
         """
+        kwargs['metrics'] = metrics = kwargs.get('metrics') or RunMetrics()
+        profiler = self._create_profiler(
+            kwargs.get('profiler'), kwargs.get('trace_memory'),
+            kwargs.get('profile_dir'), run_id=metrics.run_id
+        )
+        if not profiler:
+            return self._extract_emails(folder_patterns, start_date, end_date, **kwargs)
+        
+        logger.info(f"Profiling extraction run {metrics.run_id}")
+        with profiler:
+            result = self._extract_emails(folder_patterns, start_date, end_date,
+                                          run_profiler=profiler, **kwargs)
+        result['profiling'] = profiler.summary()
+        return result
+    
+    def _extract_emails(
+        self,
+        folder_patterns: List[str],
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        run_profiler: Optional[RunProfiler] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """Run an extraction; see extract_emails for the arguments.
+        
+        Args:
+            run_profiler: Profiler running around the extraction, told when
+                each folder is finished
+        """
         # Initialize counters
         emails_processed = 0
         emails_saved = 0
@@ -677,8 +918,33 @@ class OutlookExtractor:
         thread_status = kwargs.get('thread_status', 'active')
         recursive = kwargs.get('recursive', True)
         max_emails = int(kwargs.get('max_emails', 0))  # 0 means no limit
+        extraction_profile = resolve_profile(
+            kwargs.get('extraction_profile') or
+            self.config.get('email_processing', 'extraction_profile', DEFAULT_PROFILE)
+        )
+        max_body_bytes = int(kwargs.get(
+            'max_body_bytes',
+            self.config.get('email_processing', 'max_body_bytes', 0) or 0
+        ))
+        email_filter = kwargs.get('email_filter')
+        extract_attachments = kwargs.get('extract_attachments')
+        if extract_attachments is None:
+            extract_attachments = self.config.get_boolean('email_processing', 'extract_attachments', False)
+        attachment_writer = None
+        return_emails = kwargs.get('return_emails', False)
+        extracted_emails = []
+        metrics = kwargs.get('metrics') or RunMetrics()
+        write_metrics = kwargs.get('write_metrics')
+        if write_metrics is None:
+            write_metrics = self.config.get_boolean('storage', 'write_metrics', False)
+        metrics_sink = create_metrics_sink(
+            kwargs.get('metrics_textfile', self.config.get('metrics', 'textfile_path', '')),
+            metrics.run_id,
+            float(self.config.get('metrics', 'textfile_interval', DEFAULT_INTERVAL) or DEFAULT_INTERVAL)
+        )
         
         try:
+
             # Get date range from config if not provided
             if start_date is None or end_date is None:
                 config_start, config_end = self.parse_date_ranges()
@@ -694,6 +960,7 @@ class OutlookExtractor:
             logger.info(f"Extracting emails from {start_date} to {end_date}")
             
             # Get the namespace and root folder
+            discovery_started = time.perf_counter()
             namespace = self.outlook_client.GetNamespace("MAPI")
             root_folder = namespace.Folders
             
@@ -723,9 +990,9 @@ class OutlookExtractor:
                         if hasattr(item, 'name'):
                             logger.debug(f"    name: {getattr(item, 'name', 'N/A')}")
                         if hasattr(item, 'Folders'):
-                            folders = getattr(item, 'Folders', [])
-                            if hasattr(folders, '__iter__'):
-                                logger.debug(f"    Has {len(list(folders))} subfolders in 'Folders'")
+                            item_folders = getattr(item, 'Folders', [])
+                            if hasattr(item_folders, '__iter__'):
+                                logger.debug(f"    Has {len(list(item_folders))} subfolders in 'Folders'")
             except Exception as e:
                 logger.error(f"Error inspecting root folder contents: {e}", exc_info=True)
             
@@ -759,6 +1026,8 @@ class OutlookExtractor:
             except Exception as e:
                 logger.error(f"Error iterating through root folder items: {e}", exc_info=True)
             
+            metrics.add_time(STAGE_FOLDER_DISCOVERY, time.perf_counter() - discovery_started)
+            
             if not folders:
                 error_msg = f"No folders found matching patterns: {', '.join(folder_patterns)}"
                 logger.warning(error_msg)
@@ -767,36 +1036,43 @@ class OutlookExtractor:
                     'error': error_msg,
                     'emails_processed': 0,
                     'emails_saved': 0,
-                    'folders_processed': 0
+                    'folders_processed': 0,
+                    'metrics': self._finish_metrics(metrics, write_metrics, metrics_sink, success=False)
                 }
             
             logger.info(f"Found {len(folders)} folders to process")
             
+            if extract_attachments:
+                attachment_writer = self._create_attachment_writer(kwargs.get('attachment_workers'))
+            
             # Process each folder
             for folder, folder_path in folders:
+                folder_emails_start = emails_processed
                 try:
                     if not self.is_mail_folder(folder):
                         logger.debug(f"Skipping non-mail folder: {folder_path}")
                         continue
                         
                     logger.info(f"Processing folder: {folder_path}")
+                    metrics.folder_started(folder_path)
                     
-                    # Get all emails in the folder
-                    items = folder.Items
-                    items.Sort("[ReceivedTime]", True)  # Sort by received time, newest first
-                    
-                    # Apply date filter
-                    filter_str = []
-                    if start_date:
-                        filter_str.append(f"[ReceivedTime] >= '{start_date.strftime('%m/%d/%Y %H:%M %p')}'")
-                    if end_date:
-                        filter_str.append(f"[ReceivedTime] <= '{end_date.strftime('%m/%d/%Y %H:%M %p')}'")
-                    
-                    if filter_str:
-                        items = items.Restrict(' AND '.join(filter_str))
-                    
-                    # Get emails with progress tracking
-                    total_emails = items.Count
+                    with metrics.stage(STAGE_RESTRICT):
+                        # Get all emails in the folder
+                        items = folder.Items
+                        items.Sort("[ReceivedTime]", True)  # Sort by received time, newest first
+                        
+                        # Apply date filter
+                        filter_str = []
+                        if start_date:
+                            filter_str.append(f"[ReceivedTime] >= '{start_date.strftime('%m/%d/%Y %H:%M %p')}'")
+                        if end_date:
+                            filter_str.append(f"[ReceivedTime] <= '{end_date.strftime('%m/%d/%Y %H:%M %p')}'")
+                        
+                        if filter_str:
+                            items = items.Restrict(' AND '.join(filter_str))
+                        
+                        # Get emails with progress tracking
+                        total_emails = items.Count
                     logger.info(f"Found {total_emails} emails in folder {folder_path}")
                     
                     # Process emails in batches to manage memory
@@ -810,15 +1086,22 @@ class OutlookExtractor:
                             break
                             
                         # Process a batch of emails
+                        batch_started = time.perf_counter()
+                        batch_emails_start = emails_processed
+                        com_errors_start = self._com_error_count(metrics)
                         batch = []
                         for j in range(i, min(i + batch_size, total_emails)):
                             try:
-                                msg = items[j + 1]  # Outlook collections are 1-based
+                                with metrics.stage(STAGE_ITEM_FETCH):
+                                    msg = items[j + 1]  # Outlook collections are 1-based
                                 batch.append(msg)
                             except Exception as e:
+                                metrics.count('item_fetch_errors')
                                 logger.error(f"Error getting email {j+1}/{total_emails}: {e}")
                         
-                        # Process the batch
+                        # First pass: headers only, so filtered-out emails never
+                        # have their bodies marshalled over COM
+                        pending_bodies = []
                         for msg in batch:
                             try:
                                 # Check if we've reached the maximum number of emails to process
@@ -826,20 +1109,29 @@ class OutlookExtractor:
                                     break
                                 
                                 # Extract email headers and metadata
-                                email_data = self._extract_email_headers(msg)
+                                with metrics.stage(STAGE_HEADER_EXTRACTION):
+                                    email_data = self._extract_email_headers(msg)
                                 if not email_data:
+                                    metrics.count('header_errors')
                                     continue
                                 
                                 # Set the folder path
                                 email_data['folder'] = folder_path
                                 
                                 # Process and validate email data
-                                email_data = self._process_email_data(email_data)
+                                with metrics.stage(STAGE_NORMALIZATION):
+                                    email_data = self._process_email_data(email_data)
+                                
+                                if email_filter is not None and not email_filter(email_data):
+                                    metrics.count('emails_filtered')
+                                    continue
                                 
                                 # Add to thread manager if threading is enabled
                                 if include_threads:
-                                    self.thread_manager.add_email(email_data)
+                                    with metrics.stage(STAGE_THREADING):
+                                        self.thread_manager.add_email(email_data)
                                 
+                                pending_bodies.append((msg, email_data))
                                 processed_emails.append(email_data)
                                 emails_processed += 1
                                 
@@ -848,50 +1140,112 @@ class OutlookExtractor:
                                     logger.info(f"Processed {emails_processed} emails ({len(processed_emails)} in current batch)")
                                 
                             except Exception as e:
+                                metrics.count('email_errors')
                                 logger.error(f"Error processing email: {e}", exc_info=True)
                                 continue
                         
+                        # Second pass: fetch bodies for the emails that were kept
+                        for msg, email_data in pending_bodies:
+                            with metrics.stage(STAGE_BODY_FETCH):
+                                self._fetch_email_body(msg, email_data, extraction_profile, max_body_bytes)
+                            if attachment_writer and email_data.get('has_attachments'):
+                                with metrics.stage(STAGE_ATTACHMENTS):
+                                    self._queue_attachments(msg, email_data, attachment_writer)
+                            if return_emails:
+                                extracted_emails.append(email_data)
+                        
                         # Save the batch to storage
                         if processed_emails:
                             try:
-                                saved_count = self.storage.save_emails(processed_emails)
+                                persist_threads = include_threads and isinstance(
+                                    self.thread_manager, PersistentThreadManager
+                                )
+                                if persist_threads:
+                                    with metrics.stage(STAGE_THREADING):
+                                        for email_data in processed_emails:
+                                            message_id = message_id_of(email_data)
+                                            if message_id:
+                                                email_data['thread_id'] = self.thread_manager.thread_id_for(
+                                                    message_id
+                                                )
+                                write_started = time.perf_counter()
+                                with metrics.stage(STAGE_STORAGE_WRITE):
+                                    saved_count = self.storage.save_emails(processed_emails)
+                                    if persist_threads:
+                                        self.thread_manager.flush()
+                                metrics_sink.observe_storage_write(
+                                    folder_path, time.perf_counter() - write_started, saved_count
+                                )
                                 emails_saved += saved_count
+                                metrics.count('emails_saved', saved_count)
                                 logger.info(f"Saved {saved_count} emails to storage")
                                 
+                                # Record attachments written in the background so far
+                                if attachment_writer:
+                                    with metrics.stage(STAGE_STORAGE_WRITE):
+                                        self._save_completed_attachments(attachment_writer)
+                                
                                 # Log memory usage
-                                try:
-                                    import psutil
-                                    process = psutil.Process()
-                                    memory_info = process.memory_info()
-                                    logger.debug(
-                                        f"Memory usage: {memory_info.rss / 1024 / 1024:.2f}MB "
-                                        f"(virtual: {memory_info.vms / 1024 / 1024:.2f}MB)"
-                                    )
-                                except ImportError:
-                                    pass  # psutil not available, skip memory logging
+                                peak_rss = metrics.sample_memory()
+                                if peak_rss:
+                                    logger.debug(f"Peak memory usage: {peak_rss / 1024 / 1024:.2f}MB")
                                 
                                 # Clear the processed batch
                                 processed_emails = []
                                 
                             except Exception as e:
+                                metrics.count('storage_errors')
                                 logger.error(f"Error saving emails to storage: {e}", exc_info=True)
                                 # Continue processing other folders even if one fails
+                        
+                        if metrics_sink.enabled:
+                            metrics_sink.observe_batch(
+                                folder_path, time.perf_counter() - batch_started,
+                                emails_processed - batch_emails_start,
+                                self._com_error_count(metrics) - com_errors_start
+                            )
+                            if attachment_writer:
+                                attachment_stats = attachment_writer.stats()
+                                metrics_sink.set_queue_depth('attachments', attachment_stats['pending'])
+                                metrics_sink.set_attachment_bytes(attachment_stats['bytes_written'])
+                            metrics_sink.maybe_flush()
                     
                 except Exception as e:
+                    metrics.count('folder_errors')
                     logger.error(f"Error processing folder {folder_path}: {e}", exc_info=True)
                     continue
+                finally:
+                    metrics.folder_finished(folder_path, emails_processed - folder_emails_start)
+                    if run_profiler:
+                        run_profiler.folder_finished(folder_path)
             
             # Process threads if enabled
             threads = []
             if include_threads and self.thread_manager:
                 try:
-                    threads = self.thread_manager.get_threads()
+                    with metrics.stage(STAGE_THREADING):
+                        threads = self.thread_manager.get_threads()
                     threads_processed = len(threads)
                     logger.info(f"Processed {threads_processed} email threads")
                 except Exception as e:
                     logger.error(f"Error processing threads: {e}", exc_info=True)
                     # Continue with empty threads list if there's an error
             
+            # Wait for queued attachments and record the remaining ones
+            if attachment_writer:
+                with metrics.stage(STAGE_ATTACHMENTS):
+                    attachment_writer.close()
+                with metrics.stage(STAGE_STORAGE_WRITE):
+                    self._save_completed_attachments(attachment_writer)
+            
+            # Store cleaned bodies now, so exports of this run only read them
+            if emails_saved and self.config.get_boolean('export', 'precompute_clean_bodies', False):
+                with metrics.stage(STAGE_STORAGE_WRITE):
+                    cleaned = self.csv_exporter.refresh_cleaned_bodies(
+                        self.storage, EmailFilter(start_date=start_date, end_date=end_date)
+                    )
+                logger.info(f"Stored {cleaned} cleaned email bodies")
+            
             # Prepare results
             result = {
                 'success': True,
@@ -900,6 +1254,14 @@ class OutlookExtractor:
                 'threads_processed': threads_processed,
                 'folders_processed': len(folders)
             }
+            if attachment_writer:
+                result['attachments'] = attachment_writer.stats()
+                metrics.count('attachment_bytes', result['attachments'].get('bytes_written', 0))
+                metrics_sink.set_queue_depth('attachments', 0)
+                metrics_sink.set_attachment_bytes(result['attachments'].get('bytes_written', 0))
+            result['metrics'] = self._finish_metrics(metrics, write_metrics, metrics_sink)
+            if return_emails:
+                result['emails'] = extracted_emails
             
             # Only include threads in result if threading is enabled
             if include_threads and threads:
@@ -914,30 +1276,65 @@ class OutlookExtractor:
         except Exception as e:
             error_msg = f"Failed to extract emails: {str(e)}"
             logger.error(error_msg, exc_info=True)
+            if attachment_writer:
+                attachment_writer.close()
             return {
                 'success': False,
                 'error': error_msg,
                 'emails_processed': emails_processed,
                 'emails_saved': emails_saved,
-                'folders_processed': len(folders)
+                'folders_processed': len(folders),
+                'metrics': self._finish_metrics(metrics, write_metrics, metrics_sink, success=False)
             }
     
+    @staticmethod
+    def _com_error_count(metrics: RunMetrics) -> int:
+        """Total COM errors recorded so far in a run."""
+        return sum(metrics.counters.get(name, 0) for name in COM_ERROR_COUNTERS)
+    
+    def _finish_metrics(self, metrics: RunMetrics, write: bool = False,
+                        sink=None, success: bool = True) -> Dict[str, Any]:
+        """Stop the run clock and optionally persist the metrics next to the database.
+        
+        Args:
+            metrics: Metrics of the run
+            write: Whether to append the metrics to the metrics file
+            sink: Textfile metrics sink to close, if any
+            success: Whether the run succeeded (reported by the sink)
+            
+        Returns:
+            Dictionary form of the metrics
+        """
+        metrics.finish()
+        if sink is not None:
+            sink.close(success=success)
+        if write and self.storage:
+            storage_path = getattr(self.storage, 'file_path', None) or getattr(self.storage, 'json_path', None)
+            if storage_path:
+                metrics_path = metrics_path_for(storage_path)
+                if metrics.write_json(metrics_path):
+                    logger.info(f"Wrote run metrics to {metrics_path}")
+        return metrics.to_dict()
+    
     def export_emails(
         self,
-        emails: List[Dict[str, Any]],
+        emails: Optional[Iterable[Dict[str, Any]]],
         format: str = 'csv',
         export_settings: Optional[Dict[str, Any]] = None
     ) -> tuple:
         """Export emails to the specified format.
         
         Args:
-            emails: List of email dictionaries to export
-            format: Export format ('csv' or 'json')
+            emails: Email dictionaries to export, or None to stream the stored
+                emails matching export_settings['email_filter'] from storage
+            format: Export format ('csv' or 'parquet')
             export_settings: Dictionary of export settings
             
         Returns:
             Tuple of (success, output_files)
         """
+        if emails is None and self.storage is not None:
+            emails = self.storage.iter_emails((export_settings or {}).get('email_filter'))
         if not emails:
             logger.warning("No emails to export")
             return False, []
@@ -945,7 +1342,7 @@ class OutlookExtractor:
         export_settings = export_settings or {}
         
         try:
-            if format.lower() == 'csv':
+            if format.lower() in ('csv', 'parquet'):
                 output_dir = export_settings.get('output_dir', str(Path.home() / 'email_exports'))
                 file_prefix = export_settings.get('file_prefix', 'emails_')
                 
@@ -954,7 +1351,14 @@ class OutlookExtractor:
                 
                 # Generate output filename with timestamp
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                output_file = os.path.join(output_dir, f"{file_prefix}{timestamp}.csv")
+                output_file = os.path.join(output_dir, f"{file_prefix}{timestamp}.{format.lower()}")
+                
+                if format.lower() == 'parquet':
+                    output_file = ParquetExporter(self.config).export_emails(
+                        (export_record(email_data) for email_data in emails), output_file,
+                        store=self.storage
+                    )
+                    return bool(output_file), [output_file] if output_file else []
                 
                 # Export to CSV
                 success = self.csv_exporter.export_emails(
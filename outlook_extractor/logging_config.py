@@ -17,7 +17,6 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union, cast
 
-import FreeSimpleGUI as sg
 from typing_extensions import Literal
 
 # Type aliases
@@ -63,6 +62,8 @@ class UILogHandler(logging.Handler):
     
     def _update_ui(self) -> None:
         """Background thread to update the UI with new log entries."""
+        import FreeSimpleGUI as sg  # Imported here so headless use never loads the UI toolkit
+        
         while not self._stop_event.is_set():
             try:
                 window = sg.Window._active_window or sg.Window._window_that_exited
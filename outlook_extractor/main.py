@@ -21,10 +21,7 @@ from .core.outlook_client import OutlookClient
 from .core.email_threading import EmailThread, ThreadManager
 from .storage import SQLiteStorage, JSONStorage, EmailStorage
 from .export.csv_exporter import CSVExporter
-from .ui import EmailExtractorUI, ExportTab
 
-# Set up logging
-setup_logging()
 logger = get_logger(__name__)
 
 class OutlookExtractor:
@@ -44,7 +41,8 @@ class OutlookExtractor:
         self.storage = None
         self.thread_manager = ThreadManager()
         self.csv_exporter = CSVExporter(self.config)
-        self.ui = EmailExtractorUI(config_path=config_path)  # Pass config_path instead of self
+        self.config_path = config_path
+        self.ui = None  # Created in run() so headless use never loads the UI toolkit
         
         # Initialize storage
         self._init_storage()
@@ -242,6 +240,13 @@ class OutlookExtractor:
                         analysis_file = output_dir / f'subject_analysis_{timestamp}.csv'
                         self.csv_exporter.export_subject_analysis(emails, str(analysis_file))
                         output_files.append(str(analysis_file))
+                        
+                        thread_file = output_dir / f'thread_analysis_{timestamp}.csv'
+                        self.csv_exporter.export_thread_analysis(
+                            emails, str(thread_file), self.thread_manager.thread_id_for
+                        )
+                        output_files.append(str(thread_file))
+                        output_files.append(str(thread_file.with_name(f'{thread_file.stem}_activity.csv')))
             
             return True, output_files
             
@@ -315,6 +320,9 @@ class OutlookExtractor:
         """
         try:
             # Start the UI
+            if self.ui is None:
+                from .ui import EmailExtractorUI
+                self.ui = EmailExtractorUI(config_path=self.config_path)
             return self.ui.run()
         except Exception as e:
             logger.critical(f"Fatal error: {e}", exc_info=True)
@@ -342,6 +350,9 @@ def main() -> int:
     """Main entry point for the command-line interface."""
     import argparse
     
+    # Set up logging
+    setup_logging()
+    
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description='Outlook Email Extraction Tool')
     parser.add_argument('--config', '-c', help='Path to configuration file')
@@ -4,8 +4,25 @@ Storage module for the Outlook Extractor package.
 This module provides classes for storing and retrieving email data in different formats.
 """
 
-from .base import EmailStorage
+from .base import EmailFilter, EmailStorage
 from .sqlite_storage import SQLiteStorage
 from .json_storage import JSONStorage
+from .attachment_store import AttachmentStore
+from .attachment_writer import AttachmentWriter
 
-__all__ = ['EmailStorage', 'SQLiteStorage', 'JSONStorage']
+__all__ = ['EmailFilter', 'EmailStorage', 'SQLiteStorage', 'JSONStorage', 'AttachmentStore', 'AttachmentWriter',
+           'create_storage']
+
+
+def create_storage(config) -> EmailStorage:
+    """Open the storage backend selected in the configuration.
+    
+    Args:
+        config: ConfigManager ([storage] type, sqlite_path or json_path)
+        
+    Returns:
+        SQLiteStorage or JSONStorage
+    """
+    if config.get('storage', 'type', 'sqlite').lower() == 'sqlite':
+        return SQLiteStorage(config.get('storage', 'sqlite_path', 'emails.db'))
+    return JSONStorage(config.get('storage', 'json_path', 'emails.json'))
@@ -0,0 +1,195 @@
+"""
+Content-addressed storage for email attachments.
+
+Attachments are stored once per unique content, named by the SHA-256 of
+their bytes and sharded into two levels of subdirectories::
+
+    <root>/ab/cd/abcd1234...
+
+Saving writes to a temporary file inside the store, hashes it while
+streaming it back from disk and renames it into place. A file that is
+already present is not written again, so the same attachment forwarded many
+times only occupies disk space once.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Read size used when hashing attachment files
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class AttachmentStore:
+    """Deduplicating, content-addressed attachment store."""
+
+    def __init__(self, root_dir: str):
+        """Initialize the attachment store.
+
+        Args:
+            root_dir: Directory holding the sharded attachment files
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.temp_dir = os.path.join(self.root_dir, '.tmp')
+        os.makedirs(self.temp_dir, exist_ok=True)
+
+    def blob_path(self, sha256: str) -> str:
+        """Get the storage path for a content hash.
+
+        Args:
+            sha256: Hex SHA-256 digest of the attachment content
+
+        Returns:
+            Absolute path of the sharded file
+        """
+        return os.path.join(self.root_dir, sha256[:2], sha256[2:4], sha256)
+
+    def contains(self, sha256: str) -> bool:
+        """Check whether content with the given hash is already stored."""
+        return os.path.exists(self.blob_path(sha256))
+
+    def new_temp_path(self, suffix: str = '') -> str:
+        """Reserve a temporary file path inside the store.
+
+        Temporary files live on the same filesystem as the store so that
+        moving them into place is an atomic rename.
+
+        Args:
+            suffix: Optional file suffix (e.g. the attachment extension)
+
+        Returns:
+            Path of a new, empty temporary file
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self.temp_dir, suffix=suffix)
+        os.close(fd)
+        return temp_path
+
+    def save_attachment(self, attachment: Any, filename: Optional[str] = None) -> Dict[str, Any]:
+        """Save an Outlook attachment into the store.
+
+        Args:
+            attachment: Outlook Attachment object (anything with SaveAsFile)
+            filename: Original filename, used only for its extension
+
+        Returns:
+            Dictionary with sha256, size, stored_path and deduplicated keys
+        """
+        filename = filename or getattr(attachment, 'FileName', '') or ''
+        temp_path = self.new_temp_path(os.path.splitext(filename)[1])
+        try:
+            attachment.SaveAsFile(temp_path)
+        except Exception:
+            self._discard(temp_path)
+            raise
+        return self.add_file(temp_path)
+
+    def import_file(self, path: str) -> Dict[str, Any]:
+        """Move a file from outside the store into it.
+
+        The file is first hard-linked (copied across filesystems) to a
+        temporary path inside the store and then renamed into place, so a
+        partially written file is never visible under its content hash.
+        The source file is only removed once the import succeeded, so a
+        failed import can be retried.
+
+        Args:
+            path: Path of the file to import; it is consumed by a
+                successful call
+
+        Returns:
+            Dictionary with sha256, size, stored_path and deduplicated keys
+        """
+        temp_path = self.new_temp_path(os.path.splitext(path)[1])
+        try:
+            try:
+                # Replace the reserved (empty) file; a link needs no copy on the same filesystem
+                os.remove(temp_path)
+                os.link(path, temp_path)
+            except OSError:
+                shutil.copyfile(path, temp_path)
+        except Exception:
+            self._discard(temp_path)
+            raise
+        stored = self.add_file(temp_path)
+        self._discard(path)
+        return stored
+
+    def add_file(self, temp_path: str) -> Dict[str, Any]:
+        """Move a file into the store under its content hash.
+
+        Args:
+            temp_path: Path of the file to add; it is consumed by this call
+
+        Returns:
+            Dictionary with sha256, size, stored_path and deduplicated keys
+        """
+        try:
+            sha256, size = self.hash_file(temp_path)
+            stored_path = self.blob_path(sha256)
+
+            if os.path.exists(stored_path):
+                self._discard(temp_path)
+                deduplicated = True
+            else:
+                os.makedirs(os.path.dirname(stored_path), exist_ok=True)
+                os.replace(temp_path, stored_path)
+                deduplicated = False
+        except Exception:
+            self._discard(temp_path)
+            raise
+
+        return {
+            'sha256': sha256,
+            'size': size,
+            'stored_path': stored_path,
+            'deduplicated': deduplicated,
+        }
+
+    def link(self, sha256: str, link_path: str) -> str:
+        """Expose a stored file under a readable name.
+
+        A hard link is used where the filesystem supports it, otherwise the
+        file is copied.
+
+        Args:
+            sha256: Content hash of a stored file
+            link_path: Path to create
+
+        Returns:
+            The created path
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(link_path)), exist_ok=True)
+        try:
+            os.link(self.blob_path(sha256), link_path)
+        except OSError:
+            shutil.copy2(self.blob_path(sha256), link_path)
+        return link_path
+
+    @staticmethod
+    def hash_file(path: str):
+        """Compute the SHA-256 digest and size of a file by streaming it.
+
+        Args:
+            path: Path of the file to hash
+
+        Returns:
+            Tuple of (hex digest, size in bytes)
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+                size += len(chunk)
+        return digest.hexdigest(), size
+
+    def _discard(self, path: str) -> None:
+        """Remove a temporary file, ignoring errors."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,244 @@
+"""
+Background persistence of email attachments.
+
+Outlook COM objects can only be used from the thread that created them, so
+``Attachment.SaveAsFile`` still runs on the extraction thread. It writes to a
+local spool directory, which is fast; copying the file into the attachment
+store (often a network share), hashing it and renaming it into place is done
+by a bounded pool of worker threads. The extraction loop only blocks when
+the pool's queue is full.
+
+Workers never modify the attachment metadata of an email, which the
+extraction thread may be serializing at the same time: their results are
+queued and applied by ``pop_completed`` on the extraction thread.
+"""
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .attachment_store import AttachmentStore
+
+logger = logging.getLogger(__name__)
+
+
+class AttachmentWriter:
+    """Bounded background pool writing attachments to an AttachmentStore."""
+
+    def __init__(self, store: AttachmentStore, max_workers: int = 4,
+                 max_pending: int = 64, retries: int = 3,
+                 retry_delay: float = 0.5, byte_budget: int = 0):
+        """Initialize the writer.
+
+        Args:
+            store: Attachment store receiving the files
+            max_workers: Number of worker threads
+            max_pending: Maximum queued or in-flight attachments before
+                submit() blocks
+            retries: Number of retries for a failed write
+            retry_delay: Initial delay between retries in seconds (doubles
+                after each attempt)
+            byte_budget: Maximum total attachment bytes accepted for the run
+                (0 for no limit)
+        """
+        self.store = store
+        self.retries = max(0, retries)
+        self.retry_delay = retry_delay
+        self.byte_budget = max(0, byte_budget)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers),
+            thread_name_prefix='attachment-writer'
+        )
+        self._slots = threading.BoundedSemaphore(max(1, max_pending))
+        self._spool_dir = tempfile.mkdtemp(prefix='outlook_attachments_')
+        self._lock = threading.Lock()
+        # (email_id, attachment_info, result) of finished writes, not yet applied
+        self._completed: List[Tuple[str, Dict[str, Any], Dict[str, Any]]] = []
+        self._pending = 0
+        self._closed = False
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        self._bytes_accepted = 0
+        self._stats = {
+            'submitted': 0,
+            'saved': 0,
+            'deduplicated': 0,
+            'failed': 0,
+            'skipped_budget': 0,
+            'retries': 0,
+            'bytes_written': 0,
+        }
+
+    @property
+    def pending(self) -> int:
+        """Number of attachments queued or being written."""
+        with self._lock:
+            return self._pending
+
+    def submit(self, attachment: Any, attachment_info: Dict[str, Any], email_id: str) -> bool:
+        """Spool an attachment and queue it for background persistence.
+
+        Must be called from the thread that owns the Outlook COM objects.
+        ``attachment_info`` is updated in place by the pop_completed call
+        that follows the write.
+
+        Args:
+            attachment: Outlook Attachment object
+            attachment_info: Attachment metadata dictionary for the email
+            email_id: ID of the email the attachment belongs to
+
+        Returns:
+            bool: True if the attachment was queued, False if it was skipped
+            or could not be spooled
+        """
+        if self._closed:
+            raise RuntimeError("AttachmentWriter is closed")
+
+        size = int(attachment_info.get('size') or 0)
+        with self._lock:
+            if self._started_at is None:
+                self._started_at = time.monotonic()
+            if self.byte_budget and self._bytes_accepted + size > self.byte_budget:
+                self._stats['skipped_budget'] += 1
+                attachment_info['error'] = 'attachment byte budget exceeded'
+                return False
+            self._bytes_accepted += size
+            self._stats['submitted'] += 1
+
+        filename = attachment_info.get('filename') or ''
+        fd, spool_path = tempfile.mkstemp(dir=self._spool_dir, suffix=os.path.splitext(filename)[1])
+        os.close(fd)
+        try:
+            attachment.SaveAsFile(spool_path)
+        except Exception as e:
+            logger.error(f"Error spooling attachment {filename}: {e}")
+            attachment_info['error'] = str(e)
+            self._remove(spool_path)
+            with self._lock:
+                self._stats['failed'] += 1
+            return False
+
+        # Blocks while the pool is saturated, bounding spool disk usage
+        self._slots.acquire()
+        with self._lock:
+            self._pending += 1
+        self._executor.submit(self._write, spool_path, dict(attachment_info), attachment_info, email_id)
+        return True
+
+    def _write(self, spool_path: str, info: Dict[str, Any], attachment_info: Dict[str, Any],
+               email_id: str) -> None:
+        """Move a spooled file into the store, retrying on failure.
+
+        Runs on a pool thread: reads the copy ``info`` and queues the result
+        for pop_completed to apply to ``attachment_info``.
+        """
+        filename = info.get('filename')
+        try:
+            delay = self.retry_delay
+            for attempt in range(self.retries + 1):
+                try:
+                    stored = self.store.import_file(spool_path)
+                    break
+                except Exception as e:
+                    if attempt >= self.retries or not os.path.exists(spool_path):
+                        logger.error(f"Error saving attachment {filename}: {e}")
+                        with self._lock:
+                            self._stats['failed'] += 1
+                            self._completed.append((email_id, attachment_info, {'error': str(e)}))
+                        return
+                    with self._lock:
+                        self._stats['retries'] += 1
+                    time.sleep(delay)
+                    delay *= 2
+
+            result = {
+                'sha256': stored['sha256'],
+                'saved_path': stored['stored_path'],
+                'deduplicated': stored['deduplicated'],
+            }
+            with self._lock:
+                self._stats['saved'] += 1
+                if stored['deduplicated']:
+                    self._stats['deduplicated'] += 1
+                else:
+                    self._stats['bytes_written'] += stored['size']
+                self._completed.append((email_id, attachment_info, result))
+        finally:
+            self._remove(spool_path)
+            with self._lock:
+                self._pending -= 1
+                self._finished_at = time.monotonic()
+            self._slots.release()
+
+    def pop_completed(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """Apply the writes finished since the last call to their attachment_info.
+
+        Must be called from the thread that submitted the attachments.
+        Saved attachments get ``sha256``, ``saved_path`` and
+        ``deduplicated``, failed ones ``error``.
+
+        Returns:
+            (email_id, attachment_info) pairs of the attachments saved since
+            the last call
+        """
+        with self._lock:
+            completed, self._completed = self._completed, []
+        saved = []
+        for email_id, attachment_info, result in completed:
+            attachment_info.update(result)
+            if 'error' not in result:
+                saved.append((email_id, attachment_info))
+        return saved
+
+    def close(self, wait: bool = True) -> None:
+        """Stop accepting attachments and optionally wait for the queue to drain.
+
+        Args:
+            wait: Whether to block until all queued attachments are written
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.shutdown(wait=wait)
+        if wait:
+            shutil.rmtree(self._spool_dir, ignore_errors=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get attachment throughput and failure counters for the run.
+
+        Returns:
+            Dictionary of counters plus elapsed seconds and throughput
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending'] = self._pending
+            if self._started_at is not None:
+                end = self._finished_at or time.monotonic()
+                elapsed = max(end - self._started_at, 0.0)
+            else:
+                elapsed = 0.0
+        stats['seconds'] = round(elapsed, 3)
+        stats['bytes_per_second'] = round(stats['bytes_written'] / elapsed, 1) if elapsed else 0.0
+        stats['files_per_second'] = round(stats['saved'] / elapsed, 2) if elapsed else 0.0
+        return stats
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit - drain the queue."""
+        self.close()
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        """Remove a spool file, ignoring errors."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -1,10 +1,72 @@
 """
 Base storage interface for email data persistence.
 """
+import re
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any, Set
+from dataclasses import dataclass, replace
+from fnmatch import fnmatchcase
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Sequence, Set, Tuple
 from datetime import datetime
 
+# Keys holding the date of a stored email, in order of preference
+EMAIL_DATE_KEYS = ('sent_date', 'sent_on', 'received_date', 'received_time')
+
+_QUERY_TERM_RE = re.compile(r'\w[\w@.\-]*', re.UNICODE)
+
+
+@dataclass
+class EmailFilter:
+    """Criteria for selecting stored emails; unset criteria match everything.
+    
+    Attributes:
+        start_date: Earliest sent (or received) date, inclusive
+        end_date: Latest sent (or received) date, inclusive
+        folders: Folder paths, with ``*``/``?``/``[...]`` wildcards (case-sensitive)
+        senders: Sender addresses (case-insensitive)
+        query: Full-text query over subject, sender, recipients and body;
+            emails match if they contain every word of it (FTS5 operators
+            and punctuation are not interpreted)
+        limit: Maximum number of emails (None for all)
+    """
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    folders: Sequence[str] = ()
+    senders: Sequence[str] = ()
+    query: Optional[str] = None
+    limit: Optional[int] = None
+    
+    def query_terms(self) -> List[str]:
+        """Lowercase words of the query, without FTS operators and quotes."""
+        if not self.query:
+            return []
+        return [term.lower() for term in _QUERY_TERM_RE.findall(self.query)
+                if term not in ('AND', 'OR', 'NOT', 'NEAR')]
+    
+    def matches_folder(self, folder: Optional[str]) -> bool:
+        """Check a folder path against the folder patterns."""
+        return not self.folders or any(fnmatchcase(folder or '', pattern) for pattern in self.folders)
+    
+    def matches_sender(self, sender: Optional[str]) -> bool:
+        """Check a sender address against the sender addresses."""
+        return not self.senders or (sender or '').lower() in {s.lower() for s in self.senders}
+
+
+def email_date(email: Dict[str, Any]) -> Any:
+    """Get the sent (or received) date of a stored email as stored.
+    
+    Args:
+        email: Stored email dictionary
+        
+    Returns:
+        The first set value of EMAIL_DATE_KEYS, or None
+    """
+    for key in EMAIL_DATE_KEYS:
+        value = email.get(key)
+        if value:
+            return value
+    return None
+
+
 class EmailStorage(ABC):    
     """Abstract base class for email storage backends."""
     
@@ -104,6 +166,57 @@ class EmailStorage(ABC):
         """
         pass
     
+    def iter_emails(self, email_filter: Optional[EmailFilter] = None,
+                    batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Stream the stored emails matching a filter, in storage order.
+        
+        Args:
+            email_filter: Criteria the emails must match (None for all emails)
+            batch_size: Emails read per round trip, for backends that batch
+            
+        Yields:
+            Email data dictionaries
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support iter_emails")
+    
+    def count_emails(self, email_filter: Optional[EmailFilter] = None) -> int:
+        """Count the stored emails matching a filter.
+        
+        Args:
+            email_filter: Criteria the emails must match (None for all emails)
+            
+        Returns:
+            int: Number of matching emails (ignoring the filter's limit)
+        """
+        return sum(1 for _ in self.iter_emails(replace(email_filter or EmailFilter(), limit=None)))
+    
+    def get_cleaned_bodies(self, body_hashes: Iterable[bytes], version: int) -> Dict[bytes, Tuple[str, str]]:
+        """Look up stored cleaned bodies and summaries by body hash.
+        
+        Backends that do not persist cleaned bodies find none.
+        
+        Args:
+            body_hashes: Body hashes to look up (see csv_exporter.body_hash)
+            version: Cleaner version the entries must have been cleaned with
+        
+        Returns:
+            Dict mapping the hashes found to (cleaned body, summary)
+        """
+        return {}
+    
+    def save_cleaned_bodies(self, entries: Iterable[Tuple[bytes, str, str]], version: int) -> bool:
+        """Store cleaned bodies and summaries, replacing older versions.
+        
+        Args:
+            entries: (body hash, cleaned body, summary) tuples
+            version: Cleaner version the entries were cleaned with
+        
+        Returns:
+            bool: True if the entries were stored, False if the backend
+            does not persist cleaned bodies or saving failed
+        """
+        return False
+    
     @abstractmethod
     def get_unique_senders(self) -> Set[str]:
         """Get all unique email senders in the storage.
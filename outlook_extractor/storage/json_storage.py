@@ -5,11 +5,12 @@ import os
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Set, Union
+from typing import Dict, Iterator, List, Optional, Any, Set, Union
 from pathlib import Path
 
 from ..config import get_config
-from .base import EmailStorage
+from ..core.dates import DateParser
+from .base import EmailFilter, EmailStorage, email_date
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,10 @@ class JSONStorage(EmailStorage):
         """
         self.config = config or get_config()
         self.json_path = json_path or self.config.get('storage', 'json_path', 'emails.json')
+        self._date_parser = DateParser()
+        # Email id -> (date value, epoch seconds), so queries compare integers
+        # and only reparse a date when it changes
+        self._date_epochs: Dict[str, tuple] = {}
         self.data = {
             'emails': {},
             'threads': {},
@@ -215,56 +220,35 @@ class JSONStorage(EmailStorage):
     def get_emails_by_date_range(self, start_date: datetime, end_date: datetime, limit: int = 100) -> List[Dict[str, Any]]:
         """Retrieve emails within a date range."""
         results = []
+        start_epoch = self._date_parser.to_epoch(start_date)
+        end_epoch = self._date_parser.to_epoch(end_date)
+        if start_epoch is None or end_epoch is None:
+            return results
         
-        for email in self.data['emails'].values():
-            # Check sent_date or received_date
-            email_date = None
-            if 'sent_date' in email and email['sent_date']:
-                email_date = self._parse_date(email['sent_date'])
-            elif 'received_date' in email and email['received_date']:
-                email_date = self._parse_date(email['received_date'])
-            
-            if email_date and start_date <= email_date <= end_date:
-                results.append(email)
+        for email_id, email in self.data['emails'].items():
+            email_epoch = self._email_epoch(email_id, email)
+            if email_epoch is not None and start_epoch <= email_epoch <= end_epoch:
+                results.append((email_epoch, email))
                 if len(results) >= limit:
                     break
         
         # Sort by date (newest first)
-        results.sort(
-            key=lambda x: self._get_email_date(x) or datetime.min,
-            reverse=True
-        )
-        
-        return results
+        results.sort(key=lambda item: item[0], reverse=True)
+        return [email for _, email in results]
     
     def _parse_date(self, date_str: str) -> Optional[datetime]:
-        """Parse a date string into a datetime object."""
-        if not date_str:
-            return None
-            
-        try:
-            if isinstance(date_str, str):
-                if 'T' in date_str:  # ISO format
-                    return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                else:
-                    # Try common date formats
-                    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%m/%d/%Y %H:%M:%S', '%m/%d/%Y'):
-                        try:
-                            return datetime.strptime(date_str, fmt)
-                        except ValueError:
-                            continue
-        except (ValueError, TypeError):
-            pass
-            
-        return None
+        """Parse a date string into an aware datetime (UTC if it has no offset)."""
+        return self._date_parser.parse(date_str)
     
-    def _get_email_date(self, email: Dict[str, Any]) -> Optional[datetime]:
-        """Get the most relevant date from an email."""
-        if 'sent_date' in email and email['sent_date']:
-            return self._parse_date(email['sent_date'])
-        elif 'received_date' in email and email['received_date']:
-            return self._parse_date(email['received_date'])
-        return None
+    def _email_epoch(self, email_id: str, email: Dict[str, Any]) -> Optional[int]:
+        """Get the sent (or received) date of a stored email as epoch seconds."""
+        value = email_date(email)
+        cached = self._date_epochs.get(email_id)
+        if cached is not None and cached[0] == value:
+            return cached[1]
+        epoch = self._date_parser.to_epoch(value)
+        self._date_epochs[email_id] = (value, epoch)
+        return epoch
     
     def search_emails(self, query: str, fields: List[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
         """Search for emails matching the query."""
@@ -309,13 +293,53 @@ class JSONStorage(EmailStorage):
                     break
         
         # Sort by date (newest first)
-        results.sort(
-            key=lambda x: self._get_email_date(x) or datetime.min,
-            reverse=True
-        )
+        results.sort(key=lambda x: self._email_epoch(x.get('id'), x) or 0, reverse=True)
         
         return results
     
+    def iter_emails(self, email_filter: Optional[EmailFilter] = None,
+                    batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Stream the stored emails matching a filter, in insertion order.
+        
+        A full-text query matches emails whose subject, sender, recipients
+        or body contain every word of it (case-insensitive).
+        
+        Args:
+            email_filter: Criteria the emails must match (None for all emails)
+            batch_size: Unused; the emails are already in memory
+            
+        Yields:
+            Email data dictionaries
+        """
+        email_filter = email_filter or EmailFilter()
+        start_epoch = self._date_parser.to_epoch(email_filter.start_date) if email_filter.start_date else None
+        end_epoch = self._date_parser.to_epoch(email_filter.end_date) if email_filter.end_date else None
+        terms = email_filter.query_terms()
+        remaining = email_filter.limit
+        
+        for email_id, email in list(self.data['emails'].items()):
+            if remaining is not None and remaining <= 0:
+                return
+            if start_epoch is not None or end_epoch is not None:
+                epoch = self._email_epoch(email_id, email)
+                if (epoch is None or (start_epoch is not None and epoch < start_epoch)
+                        or (end_epoch is not None and epoch > end_epoch)):
+                    continue
+            if not email_filter.matches_folder(email.get('folder_path') or email.get('folder')):
+                continue
+            if not email_filter.matches_sender(email.get('sender_email') or email.get('sender')):
+                continue
+            if terms:
+                text = ' '.join(str(email.get(field) or '') for field in (
+                    'subject', 'sender', 'sender_email', 'recipients', 'to_recipients',
+                    'cc_recipients', 'body_text', 'body'
+                )).lower()
+                if not all(term in text for term in terms):
+                    continue
+            if remaining is not None:
+                remaining -= 1
+            yield email
+    
     def get_unique_senders(self) -> Set[str]:
         """Get all unique email senders in the storage."""
         senders = set()
@@ -6,14 +6,37 @@ import sqlite3
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Set, Union, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Set, Union, Tuple
 from pathlib import Path
 
 from ..config import get_config
-from .base import EmailStorage
+from ..core.dates import to_epoch
+from .base import EmailFilter, EmailStorage
 
 logger = logging.getLogger(__name__)
 
+# Values of a stored email that the extractor keeps only in raw_data, with
+# the column used when the raw value is missing ({row} is the table alias)
+_SENDER_SQL = "COALESCE(NULLIF(json_extract({row}.raw_data, '$.sender_email'), ''), {row}.sender)"
+_DATE_SQL = ("COALESCE({row}.sent_date, json_extract({row}.raw_data, '$.sent_on'), "
+             "{row}.received_date, json_extract({row}.raw_data, '$.received_time'))")
+_FOLDER_SQL = "COALESCE({row}.folder_path, json_extract({row}.raw_data, '$.folder'))"
+_RECIPIENTS_SQL = ("COALESCE(json_extract({row}.raw_data, '$.to_recipients'), '') || ' ' || "
+                   "COALESCE(json_extract({row}.raw_data, '$.cc_recipients'), '') || ' ' || "
+                   "COALESCE({row}.recipients, '') || ' ' || COALESCE({row}.cc_recipients, '')")
+_BODY_SQL = "COALESCE({row}.body_text, json_extract({row}.raw_data, '$.body'))"
+
+# Bound parameters per statement, below SQLite's lowest default limit (999)
+_MAX_SQL_PARAMS = 500
+
+# Columns of the full-text index and the expressions filling them
+_FTS_COLUMNS = (
+    ('subject', '{row}.subject'),
+    ('sender', _SENDER_SQL),
+    ('recipients', _RECIPIENTS_SQL),
+    ('body', _BODY_SQL),
+)
+
 class SQLiteStorage(EmailStorage):
     """SQLite storage implementation for email data."""
     
@@ -89,10 +112,138 @@ class SQLiteStorage(EmailStorage):
                 end_date TIMESTAMP,
                 status TEXT,
                 categories TEXT,   -- JSON array of categories
+                root_message_id TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
             ''')
+            thread_columns = {row['name'] for row in self.conn.execute('PRAGMA table_info(threads)')}
+            if 'root_message_id' not in thread_columns:
+                self.conn.execute('ALTER TABLE threads ADD COLUMN root_message_id TEXT')
+            
+            # Threading state, so later runs can thread against the full history
+            self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS message_to_thread (
+                message_id TEXT PRIMARY KEY,
+                thread_id TEXT NOT NULL
+            )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_message_to_thread_thread_id ON message_to_thread(thread_id)')
+            self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS thread_participants (
+                address TEXT NOT NULL,
+                thread_id TEXT NOT NULL,
+                PRIMARY KEY (address, thread_id)
+            )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_thread_participants_thread_id ON thread_participants(thread_id)')
+            # Referenced Message-IDs not seen yet -> thread of the referring message
+            self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS pending_references (
+                message_id TEXT PRIMARY KEY,
+                thread_id TEXT NOT NULL
+            )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_pending_references_thread_id ON pending_references(thread_id)')
+            # Ids of merged threads (and conversation keys) -> live thread id
+            self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS thread_aliases (
+                alias TEXT PRIMARY KEY,
+                thread_id TEXT NOT NULL
+            )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_thread_aliases_thread_id ON thread_aliases(thread_id)')
+            
+            # Attachment references (content lives in the AttachmentStore)
+            self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS attachments (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email_id TEXT NOT NULL,
+                filename TEXT,
+                sha256 TEXT NOT NULL,
+                size INTEGER,
+                content_type TEXT,
+                stored_path TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (email_id, filename, sha256)
+            )
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_attachments_email_id ON attachments(email_id)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_attachments_sha256 ON attachments(sha256)')
+            
+            # Cleaned bodies and summaries for exports, by body hash
+            self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS cleaned_bodies (
+                body_hash BLOB PRIMARY KEY,
+                cleaner_version INTEGER NOT NULL,
+                clean_body TEXT NOT NULL,
+                summary TEXT NOT NULL
+            ) WITHOUT ROWID
+            ''')
+        
+        # Epoch seconds of stored dates, so filters compare dates with any offset
+        self.conn.create_function('to_epoch', 1, to_epoch, deterministic=True)
+        self.has_fts = self._ensure_fts()
+    
+    def _ensure_fts(self) -> bool:
+        """Create the FTS5 index over subject, sender, recipients and body.
+        
+        The index has external content (a view over the emails table), so
+        the text is not stored twice; triggers keep it in step with the
+        emails table, and an existing database is indexed once.
+        
+        Returns:
+            bool: True if full-text search is available
+        """
+        columns = ', '.join(name for name, _ in _FTS_COLUMNS)
+        
+        def values(row: str) -> str:
+            return ', '.join(expression.format(row=row) for _, expression in _FTS_COLUMNS)
+        
+        try:
+            exists = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'emails_fts'"
+            ).fetchone() is not None
+            with self.conn:
+                self.conn.execute(f'''
+                CREATE VIEW IF NOT EXISTS emails_search AS
+                SELECT e.rowid AS email_rowid, {', '.join(
+                    f'{expression.format(row="e")} AS {name}' for name, expression in _FTS_COLUMNS
+                )}
+                FROM emails e
+                ''')
+                self.conn.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS emails_fts USING fts5(
+                    {columns}, content='emails_search', content_rowid='email_rowid'
+                )
+                ''')
+                delete = (f"INSERT INTO emails_fts(emails_fts, rowid, {columns}) "
+                          f"VALUES ('delete', old.rowid, {values('old')});")
+                insert = f"INSERT INTO emails_fts(rowid, {columns}) VALUES (new.rowid, {values('new')});"
+                self.conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS emails_fts_insert AFTER INSERT ON emails BEGIN
+                    {insert}
+                END
+                ''')
+                self.conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS emails_fts_delete AFTER DELETE ON emails BEGIN
+                    {delete}
+                END
+                ''')
+                # Thread id updates leave the indexed text alone
+                self.conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS emails_fts_update
+                AFTER UPDATE OF subject, sender, recipients, cc_recipients, body_text, raw_data ON emails BEGIN
+                    {delete}
+                    {insert}
+                END
+                ''')
+                if not exists:
+                    self.conn.execute("INSERT INTO emails_fts(emails_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite full-text search (FTS5) is unavailable, queries use LIKE: {e}")
+            return False
     
     def _dict_factory(self, cursor, row):
         """Convert database row to dictionary."""
@@ -113,7 +264,7 @@ class SQLiteStorage(EmailStorage):
         """Save a single email to the database."""
         try:
             # Prepare data for insertion
-            email_id = email_data.get('id')
+            email_id = email_data.get('id') or email_data.get('entry_id')
             if not email_id:
                 logger.warning("Email data missing 'id' field, skipping")
                 return False
@@ -204,6 +355,7 @@ class SQLiteStorage(EmailStorage):
             
             # Execute the query
             cursor.execute(query, params)
+            self._save_attachment_refs(cursor, email_id, email_data.get('attachments'))
             self.conn.commit()
             return True
             
@@ -213,6 +365,64 @@ class SQLiteStorage(EmailStorage):
                 self.conn.rollback()
             return False
     
+    def _save_attachment_refs(self, cursor, email_id: str, attachments: Any) -> None:
+        """Record references to stored attachment content for an email.
+        
+        Only attachments that were saved to the attachment store (and so
+        carry a 'sha256') are recorded.
+        """
+        if not attachments or not isinstance(attachments, list):
+            return
+            
+        rows = [
+            (
+                email_id,
+                attachment.get('filename'),
+                attachment['sha256'],
+                attachment.get('size'),
+                attachment.get('content_type'),
+                attachment.get('saved_path') or attachment.get('stored_path'),
+            )
+            for attachment in attachments
+            if isinstance(attachment, dict) and attachment.get('sha256')
+        ]
+        if rows:
+            cursor.executemany('''
+            INSERT OR IGNORE INTO attachments (
+                email_id, filename, sha256, size, content_type, stored_path
+            ) VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+    
+    def save_attachment_refs(self, email_id: str, attachments: List[Dict[str, Any]]) -> bool:
+        """Record attachment references for an already saved email.
+        
+        Used when attachments finish writing after their email was saved.
+        """
+        try:
+            cursor = self.conn.cursor()
+            self._save_attachment_refs(cursor, email_id, attachments)
+            self.conn.commit()
+            return True
+        except Exception as e:
+            logger.error(f"Error saving attachment references for {email_id}: {e}", exc_info=True)
+            if self.conn:
+                self.conn.rollback()
+            return False
+    
+    def get_attachments(self, email_id: str) -> List[Dict[str, Any]]:
+        """Retrieve attachment references for an email."""
+        try:
+            cursor = self.conn.cursor()
+            cursor.row_factory = self._dict_factory
+            cursor.execute(
+                'SELECT * FROM attachments WHERE email_id = ? ORDER BY id',
+                (email_id,)
+            )
+            return cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Error retrieving attachments for {email_id}: {e}", exc_info=True)
+            return []
+    
     def save_emails(self, emails: List[Dict[str, Any]]) -> int:
         """Save multiple emails to the database."""
         if not emails:
@@ -234,31 +444,37 @@ class SQLiteStorage(EmailStorage):
             
             if not row:
                 return None
-                
-            # Convert row to dict and deserialize JSON fields
-            email = dict(row)
-            
-            # Convert string dates back to datetime objects
-            for date_field in ['sent_date', 'received_date', 'created_at', 'updated_at']:
-                if date_field in email and email[date_field]:
-                    try:
-                        email[date_field] = datetime.fromisoformat(email[date_field])
-                    except (ValueError, TypeError):
-                        pass
-            
-            # Deserialize raw_data if present
-            if 'raw_data' in email and email['raw_data']:
-                try:
-                    email.update(json.loads(email['raw_data']))
-                except (json.JSONDecodeError, TypeError):
-                    pass
-                    
-            return email
+            return self._email_from_row(row)
             
         except Exception as e:
             logger.error(f"Error retrieving email {email_id}: {e}", exc_info=True)
             return None
     
+    def _email_from_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the email dict of a row read with _dict_factory."""
+        email = dict(row)
+        
+        # Convert string dates back to datetime objects
+        for date_field in ['sent_date', 'received_date', 'created_at', 'updated_at']:
+            if date_field in email and email[date_field]:
+                try:
+                    email[date_field] = datetime.fromisoformat(email[date_field])
+                except (ValueError, TypeError):
+                    pass
+        
+        # Deserialize raw_data if present
+        if 'raw_data' in email and email['raw_data']:
+            thread_id = email.get('thread_id')
+            try:
+                email.update(json.loads(email['raw_data']))
+            except (json.JSONDecodeError, TypeError):
+                pass
+            # The column follows thread merges; raw_data keeps the id at save time
+            if thread_id:
+                email['thread_id'] = thread_id
+        
+        return email
+    
     def get_emails_by_sender(self, sender: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Retrieve emails by sender email address."""
         try:
@@ -366,6 +582,143 @@ class SQLiteStorage(EmailStorage):
             logger.error(f"Error searching emails: {e}", exc_info=True)
             return []
     
+    def _filter_clause(self, email_filter: EmailFilter) -> Tuple[str, str, List[Any]]:
+        """Translate a filter into SQL.
+        
+        Args:
+            email_filter: Criteria to translate
+            
+        Returns:
+            (JOIN clause, WHERE clause, parameters), clauses empty if unused
+        """
+        join, conditions, params = '', [], []
+        terms = email_filter.query_terms()
+        if terms:
+            if self.has_fts:
+                # Each word as a quoted phrase, so "Q3-report" or "re:" are not FTS5 syntax
+                join = 'JOIN emails_fts ON emails_fts.rowid = e.rowid'
+                conditions.append('emails_fts MATCH ?')
+                params.append(' '.join(f'"{term}"' for term in terms))
+            else:
+                for term in terms:
+                    conditions.append(f"(e.subject LIKE ? OR {_BODY_SQL.format(row='e')} LIKE ?)")
+                    params.extend([f'%{term}%'] * 2)
+        if email_filter.start_date is not None:
+            conditions.append(f"to_epoch({_DATE_SQL.format(row='e')}) >= ?")
+            params.append(to_epoch(email_filter.start_date))
+        if email_filter.end_date is not None:
+            conditions.append(f"to_epoch({_DATE_SQL.format(row='e')}) <= ?")
+            params.append(to_epoch(email_filter.end_date))
+        if email_filter.folders:
+            folder = _FOLDER_SQL.format(row='e')
+            conditions.append('(' + ' OR '.join(f'{folder} GLOB ?' for _ in email_filter.folders) + ')')
+            params.extend(email_filter.folders)
+        if email_filter.senders:
+            conditions.append(f"lower({_SENDER_SQL.format(row='e')}) IN "
+                              f"({', '.join('?' for _ in email_filter.senders)})")
+            params.extend(sender.lower() for sender in email_filter.senders)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return join, where, params
+    
+    def iter_emails(self, email_filter: Optional[EmailFilter] = None,
+                    batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Stream the stored emails matching a filter, in insertion order.
+        
+        Filtering runs in SQLite (full-text queries on the FTS5 index), and
+        rows are fetched ``batch_size`` at a time, so memory does not grow
+        with the number of matches.
+        
+        Args:
+            email_filter: Criteria the emails must match (None for all emails)
+            batch_size: Rows fetched per round trip
+            
+        Yields:
+            Email data dictionaries (as returned by get_email)
+            
+        Raises:
+            sqlite3.Error: If reading fails, including part way through
+        """
+        email_filter = email_filter or EmailFilter()
+        join, where, params = self._filter_clause(email_filter)
+        sql = f'SELECT e.* FROM emails e {join} {where} ORDER BY e.rowid'
+        if email_filter.limit is not None:
+            sql += ' LIMIT ?'
+            params.append(email_filter.limit)
+        # Read errors propagate: a stream cut short must not pass for a complete one
+        cursor = self.conn.cursor()
+        cursor.row_factory = self._dict_factory
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield self._email_from_row(row)
+    
+    def count_emails(self, email_filter: Optional[EmailFilter] = None) -> int:
+        """Count the stored emails matching a filter.
+        
+        Args:
+            email_filter: Criteria the emails must match (None for all emails)
+            
+        Returns:
+            int: Number of matching emails (ignoring the filter's limit)
+        """
+        join, where, params = self._filter_clause(email_filter or EmailFilter())
+        try:
+            return self.conn.execute(f'SELECT COUNT(*) FROM emails e {join} {where}', params).fetchone()[0]
+        except Exception as e:
+            logger.error(f"Error counting emails: {e}", exc_info=True)
+            return 0
+    
+    def get_cleaned_bodies(self, body_hashes: Iterable[bytes], version: int) -> Dict[bytes, Tuple[str, str]]:
+        """Look up stored cleaned bodies and summaries by body hash.
+        
+        Args:
+            body_hashes: Body hashes to look up (see csv_exporter.body_hash)
+            version: Cleaner version the entries must have been cleaned with
+            
+        Returns:
+            Dict mapping the hashes found to (cleaned body, summary);
+            entries of other cleaner versions are not returned
+        """
+        body_hashes = list(body_hashes)
+        found: Dict[bytes, Tuple[str, str]] = {}
+        try:
+            for start in range(0, len(body_hashes), _MAX_SQL_PARAMS):
+                chunk = body_hashes[start:start + _MAX_SQL_PARAMS]
+                rows = self.conn.execute(
+                    'SELECT body_hash, clean_body, summary FROM cleaned_bodies '
+                    f"WHERE cleaner_version = ? AND body_hash IN ({', '.join('?' for _ in chunk)})",
+                    [version, *chunk]
+                )
+                found.update((bytes(key), (clean_body, summary)) for key, clean_body, summary in rows)
+        except Exception as e:
+            logger.error(f"Error reading cleaned bodies: {e}", exc_info=True)
+        return found
+    
+    def save_cleaned_bodies(self, entries: Iterable[Tuple[bytes, str, str]], version: int) -> bool:
+        """Store cleaned bodies and summaries, replacing older versions.
+        
+        Args:
+            entries: (body hash, cleaned body, summary) tuples
+            version: Cleaner version the entries were cleaned with
+            
+        Returns:
+            bool: True if the entries were stored, False otherwise
+        """
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO cleaned_bodies (body_hash, cleaner_version, clean_body, summary) '
+                    'VALUES (?, ?, ?, ?)',
+                    ((key, version, clean_body, summary) for key, clean_body, summary in entries)
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Error saving cleaned bodies: {e}", exc_info=True)
+            return False
+    
     def get_unique_senders(self) -> Set[str]:
         """Get all unique email senders in the database."""
         try:
@@ -411,6 +764,261 @@ class SQLiteStorage(EmailStorage):
             logger.error(f"Error getting email count: {e}", exc_info=True)
             return 0
     
+    def iter_thread_activity(self, batch_size: int = 10000) -> Iterator[Tuple[str, Optional[str], Optional[str], Tuple[List[str], ...]]]:
+        """Iterate over the threaded emails for analytics, without bodies.
+        
+        Args:
+            batch_size: Rows fetched per round trip
+            
+        Yields:
+            (thread_id, date, sender address, (recipients, cc_recipients)),
+            where date is the sent time if known, else the received time
+        """
+        try:
+            cursor = self.conn.execute('''
+            SELECT thread_id,
+                   COALESCE(sent_date, json_extract(raw_data, '$.sent_on'),
+                            received_date, json_extract(raw_data, '$.received_time')),
+                   COALESCE(NULLIF(json_extract(raw_data, '$.sender_email'), ''), sender),
+                   recipients, cc_recipients
+            FROM emails
+            WHERE thread_id IS NOT NULL
+            ''')
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for thread_id, date_value, sender, recipients, cc_recipients in rows:
+                    yield thread_id, date_value, sender, (
+                        self._json_list(recipients), self._json_list(cc_recipients)
+                    )
+        except Exception as e:
+            logger.error(f"Error reading thread activity: {e}", exc_info=True)
+    
+    @staticmethod
+    def _json_list(value: Optional[str]) -> List[str]:
+        """Decode a JSON array column, returning [] for anything else."""
+        if not value:
+            return []
+        try:
+            decoded = json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return []
+        return decoded if isinstance(decoded, list) else []
+    
+    def _lookup_value(self, query: str, key: str) -> Optional[str]:
+        """Run a single-value lookup, returning None when there is no row."""
+        try:
+            row = self.conn.execute(query, (key,)).fetchone()
+            return row[0] if row else None
+        except Exception as e:
+            logger.error(f"Error looking up {key}: {e}", exc_info=True)
+            return None
+    
+    def get_message_thread_id(self, message_id: str) -> Optional[str]:
+        """Get the stored thread id of a threaded message.
+        
+        Args:
+            message_id: Message-ID of the email
+            
+        Returns:
+            Thread id, or None if the message has not been threaded
+        """
+        return self._lookup_value('SELECT thread_id FROM message_to_thread WHERE message_id = ?', message_id)
+    
+    def get_pending_reference(self, message_id: str) -> Optional[str]:
+        """Get the thread of an earlier email that referenced an unseen message.
+        
+        Args:
+            message_id: Referenced Message-ID
+            
+        Returns:
+            Thread id, or None if no stored email references the message
+        """
+        return self._lookup_value('SELECT thread_id FROM pending_references WHERE message_id = ?', message_id)
+    
+    def get_thread_alias(self, thread_id: str) -> Optional[str]:
+        """Get the live thread a merged thread id (or conversation key) points to.
+        
+        Args:
+            thread_id: Thread id that may have been merged
+            
+        Returns:
+            Id of the live thread, or None if the id is not an alias
+        """
+        return self._lookup_value('SELECT thread_id FROM thread_aliases WHERE alias = ?', thread_id)
+    
+    def _thread_from_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a threads row to the EmailThread.to_dict() layout."""
+        thread = dict(row)
+        thread['thread_id'] = thread.pop('id')
+        for field in ('participants', 'message_ids', 'categories'):
+            if not isinstance(thread.get(field), list):
+                thread[field] = []
+        return thread
+    
+    def get_thread(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve a stored thread by id (following merges).
+        
+        Args:
+            thread_id: Id of the thread
+            
+        Returns:
+            Thread dictionary, or None if not found
+        """
+        try:
+            cursor = self.conn.cursor()
+            cursor.row_factory = self._dict_factory
+            cursor.execute('SELECT * FROM threads WHERE id = ?', (self.get_thread_alias(thread_id) or thread_id,))
+            row = cursor.fetchone()
+            return self._thread_from_row(row) if row else None
+        except Exception as e:
+            logger.error(f"Error retrieving thread {thread_id}: {e}", exc_info=True)
+            return None
+    
+    def get_threads(self, thread_ids: Optional[List[str]] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Retrieve stored threads, most recently active first.
+        
+        Args:
+            thread_ids: Ids of the threads to return (all threads if None)
+            limit: Maximum number of threads to return
+            
+        Returns:
+            List of thread dictionaries
+        """
+        try:
+            cursor = self.conn.cursor()
+            cursor.row_factory = self._dict_factory
+            if thread_ids is None:
+                query = 'SELECT * FROM threads ORDER BY end_date DESC'
+                params: List[Any] = []
+                if limit:
+                    query += ' LIMIT ?'
+                    params.append(limit)
+                return [self._thread_from_row(row) for row in cursor.execute(query, params).fetchall()]
+            
+            threads = []
+            thread_ids = list(dict.fromkeys(thread_ids))
+            # Stay below SQLite's bound parameter limit
+            for start in range(0, len(thread_ids), 500):
+                chunk = thread_ids[start:start + 500]
+                cursor.execute(f"SELECT * FROM threads WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+                threads.extend(self._thread_from_row(row) for row in cursor.fetchall())
+            threads.sort(key=lambda thread: thread.get('end_date') or '', reverse=True)
+            return threads[:limit] if limit else threads
+        except Exception as e:
+            logger.error(f"Error retrieving threads: {e}", exc_info=True)
+            return []
+    
+    def get_threads_for_participant(self, address: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Retrieve the stored threads an email address takes part in.
+        
+        Args:
+            address: Email address (case-insensitive)
+            limit: Maximum number of threads to return
+            
+        Returns:
+            List of thread dictionaries, most recently active first
+        """
+        try:
+            cursor = self.conn.cursor()
+            cursor.row_factory = self._dict_factory
+            query = '''
+            SELECT t.* FROM threads t
+            JOIN thread_participants p ON p.thread_id = t.id
+            WHERE p.address = ?
+            ORDER BY t.end_date DESC
+            '''
+            params: List[Any] = [address.lower()]
+            if limit:
+                query += ' LIMIT ?'
+                params.append(limit)
+            return [self._thread_from_row(row) for row in cursor.execute(query, params).fetchall()]
+        except Exception as e:
+            logger.error(f"Error retrieving threads for {address}: {e}", exc_info=True)
+            return []
+    
+    def save_thread_state(self,
+                          threads: List[Dict[str, Any]],
+                          message_to_thread: Dict[str, str],
+                          pending_references: Dict[str, str],
+                          merged_threads: Dict[str, str]) -> bool:
+        """Write a batch of threading changes in one transaction.
+        
+        Args:
+            threads: Changed threads (EmailThread.to_dict() layout)
+            message_to_thread: Newly threaded Message-ID -> thread id
+            pending_references: Referenced, unseen Message-ID -> thread id
+            merged_threads: Absorbed thread id or conversation key -> live thread id
+            
+        Returns:
+            bool: True if the changes were saved
+        """
+        try:
+            with self.conn:
+                cursor = self.conn.cursor()
+                # Repoint everything that referred to an absorbed thread
+                for alias, thread_id in merged_threads.items():
+                    cursor.execute('DELETE FROM threads WHERE id = ?', (alias,))
+                    cursor.execute('DELETE FROM thread_participants WHERE thread_id = ?', (alias,))
+                    for table in ('message_to_thread', 'pending_references', 'thread_aliases', 'emails'):
+                        cursor.execute(f'UPDATE {table} SET thread_id = ? WHERE thread_id = ?', (thread_id, alias))
+                cursor.executemany(
+                    'INSERT OR REPLACE INTO thread_aliases (alias, thread_id) VALUES (?, ?)',
+                    merged_threads.items()
+                )
+                
+                cursor.executemany('''
+                INSERT INTO threads (
+                    id, subject, participants, message_ids, start_date, end_date,
+                    status, categories, root_message_id
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    subject = excluded.subject, participants = excluded.participants,
+                    message_ids = excluded.message_ids, start_date = excluded.start_date,
+                    end_date = excluded.end_date, status = excluded.status,
+                    categories = excluded.categories, root_message_id = excluded.root_message_id,
+                    updated_at = CURRENT_TIMESTAMP
+                ''', [
+                    (
+                        thread['thread_id'],
+                        thread.get('subject'),
+                        json.dumps(sorted(thread.get('participants', []))),
+                        json.dumps(sorted(thread.get('message_ids', []))),
+                        thread.get('start_date'),
+                        thread.get('end_date'),
+                        thread.get('status'),
+                        json.dumps(sorted(thread.get('categories', []))),
+                        thread.get('root_message_id'),
+                    )
+                    for thread in threads
+                ])
+                cursor.executemany(
+                    'INSERT OR IGNORE INTO thread_participants (address, thread_id) VALUES (?, ?)',
+                    [
+                        (address, thread['thread_id'])
+                        for thread in threads
+                        for address in thread.get('participants', [])
+                    ]
+                )
+                
+                cursor.executemany(
+                    'INSERT OR REPLACE INTO message_to_thread (message_id, thread_id) VALUES (?, ?)',
+                    message_to_thread.items()
+                )
+                cursor.executemany(
+                    'DELETE FROM pending_references WHERE message_id = ?',
+                    [(message_id,) for message_id in message_to_thread]
+                )
+                cursor.executemany(
+                    'INSERT OR REPLACE INTO pending_references (message_id, thread_id) VALUES (?, ?)',
+                    pending_references.items()
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Error saving thread state: {e}", exc_info=True)
+            return False
+    
     def close(self) -> None:
         """Close the database connection."""
         try:
@@ -2,9 +2,25 @@
 UI components for the Outlook Extractor application.
 
 This module contains the user interface implementation using PySimpleGUI.
+The UI classes are imported on first access, so importing this package does
+not load the GUI toolkit.
 """
 
-from .main_window import EmailExtractorUI
-from .export_tab import ExportTab
+import importlib
+from typing import Any
+
+_LAZY_EXPORTS = {
+    'EmailExtractorUI': '.main_window',
+    'ExportTab': '.export_tab',
+}
 
 __all__ = ['EmailExtractorUI', 'ExportTab']
+
+
+def __getattr__(name: str) -> Any:
+    """Import UI classes on first access."""
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
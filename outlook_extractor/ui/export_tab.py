@@ -532,15 +532,11 @@ class ExportTab:
                 self.logger.info(f'Export settings: {export_settings}')
 
                 try:
-                    # Get the main application instance to access email data
-                    from outlook_extractor.main import get_application
-                    app = get_application()
-                    
-                    if not app or not hasattr(app, 'email_data') or not app.email_data:
-                        raise ValueError('No email data available for export. Please load emails first.')
-                    
-                    # Get the email data
-                    email_data = app.email_data
+                    # Stream the stored emails straight from the storage backend
+                    from outlook_extractor.storage import create_storage
+                    storage = create_storage(self.config)
+                    if not storage.count_emails():
+                        raise ValueError('No email data available for export. Please extract emails first.')
                     
                     # Initialize the CSV exporter
                     from outlook_extractor.export.csv_exporter import CSVExporter
@@ -557,15 +553,23 @@ class ExportTab:
                         self.window['-EXPORT_CSV_BUTTON-'].update(disabled=True, text='Exporting...')
                         self.window.refresh()
                     
+                    def show_progress(rows: int) -> None:
+                        if self.window:
+                            self.window['-EXPORT_CSV_BUTTON-'].update(text=f'Exporting... {rows:,}')
+                            self.window.refresh()
+                    
                     # Export to CSV
                     output_file = output_path / filename
-                    export_path = exporter.export_emails_to_csv(
-                        emails=email_data,
+                    exported = []
+                    export_path = exporter.export_from_storage(
+                        storage,
                         output_path=str(output_file),
-                        include_headers=True
+                        include_headers=True,
+                        progress_callback=lambda rows: (exported.append(rows), show_progress(rows))
                     )
+                    storage.close()
                     
-                    success_msg = f'Successfully exported {len(email_data)} emails to:\n{export_path}'
+                    success_msg = f'Successfully exported {exported[-1] if exported else 0} emails to:\n{export_path}'
                     self.logger.info(success_msg)
                     
                     # Show success message
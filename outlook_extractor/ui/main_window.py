@@ -5,6 +5,7 @@ including all tabs and their associated functionality.
 """
 
 import logging
+import multiprocessing
 import os
 import shutil
 import sys
@@ -20,6 +21,7 @@ from outlook_extractor import __version__
 from outlook_extractor.config import ConfigManager, load_config, get_config
 from outlook_extractor.logging_config import setup_logging, get_logger
 from outlook_extractor.logging_utils import log_errors
+from outlook_extractor.storage import EmailFilter
 from outlook_extractor.ui.export_tab import ExportTab
 from outlook_extractor.ui.update_dialog import check_for_updates
 
@@ -322,7 +324,15 @@ class EmailExtractorUI:
                 ], key='-EXPORT_TAB-'),
                 
                 # Logs Tab - Must be last to ensure it's fully initialized
-                sg.Tab('Logs', [[sg.Multiline(
+                sg.Tab('Logs', [[
+                    sg.Checkbox('Profile next extraction', key='-PROFILE_RUN-',
+                                default=self.config.get('profiling', 'mode', 'off').lower() not in ('', 'off'),
+                                tooltip='Write CPU profile reports (cProfile, or pyinstrument if '
+                                        'installed) to the profiles folder'),
+                    sg.Checkbox('Trace memory', key='-TRACE_MEMORY-',
+                                default=self.config.get_boolean('profiling', 'trace_memory', False),
+                                tooltip='Report the top memory allocation sites per folder (slower)')
+                ], [sg.Multiline(
                     size=(80, 25),
                     autoscroll=True,
                     auto_refresh=True,
@@ -1002,12 +1012,22 @@ class EmailExtractorUI:
             
             self.logger.info('Extracting emails from %s to %s', start_date, end_date)
             
+            # Profiling options from the Logs tab
+            options = {}
+            if values and '-PROFILE_RUN-' in values:
+                options['profiler'] = 'auto' if values.get('-PROFILE_RUN-') else 'off'
+            if values and '-TRACE_MEMORY-' in values:
+                options['trace_memory'] = bool(values.get('-TRACE_MEMORY-'))
+            
             # Run extraction
             result = extractor.extract_emails(
                 folder_patterns=folder_patterns,
                 start_date=start_date,
-                end_date=end_date
+                end_date=end_date,
+                **options
             )
+            if result.get('profiling'):
+                self.logger.info('Profile reports: %s', ', '.join(result['profiling']['files']))
             
             # Handle CSV export if enabled
             if result.get('success') and values and values.get('-EXPORT_CSV-', False):
@@ -1026,8 +1046,10 @@ class EmailExtractorUI:
                     'include_summaries': values.get('-INCLUDE_SUMMARIES-', True)
                 }
                 
+                # Stream this run's date range back out of storage
+                export_settings['email_filter'] = EmailFilter(start_date=start_date, end_date=end_date)
                 success, output_files = extractor.export_emails(
-                    result.get('emails', []),
+                    None,
                     format='csv',
                     export_settings=export_settings
                 )
@@ -1709,4 +1731,5 @@ def main() -> None:
         sys.exit(1)
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()  # threading workers in frozen builds
     main()
@@ -0,0 +1,104 @@
+"""Tests for the content-addressed attachment store."""
+
+import hashlib
+import os
+
+import pytest
+
+from outlook_extractor.storage.attachment_store import AttachmentStore
+from outlook_extractor.storage.sqlite_storage import SQLiteStorage
+
+
+class FakeAttachment:
+    """Attachment stand-in that writes fixed content on SaveAsFile."""
+
+    def __init__(self, filename, content):
+        self.FileName = filename
+        self.content = content
+
+    def SaveAsFile(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.content)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create an attachment store in a temporary directory."""
+    return AttachmentStore(str(tmp_path / 'attachments'))
+
+
+def test_save_attachment_uses_sharded_content_path(store):
+    """Files are stored under their SHA-256 in two-level shard directories."""
+    content = b'%PDF-1.4 quarterly report'
+    digest = hashlib.sha256(content).hexdigest()
+
+    stored = store.save_attachment(FakeAttachment('report.pdf', content))
+
+    assert stored['sha256'] == digest
+    assert stored['size'] == len(content)
+    assert stored['deduplicated'] is False
+    assert stored['stored_path'] == os.path.join(store.root_dir, digest[:2], digest[2:4], digest)
+    with open(stored['stored_path'], 'rb') as f:
+        assert f.read() == content
+
+
+def test_identical_content_is_stored_once(store):
+    """The same content saved under different names is written only once."""
+    content = b'same bytes forwarded many times'
+
+    first = store.save_attachment(FakeAttachment('a.pdf', content))
+    second = store.save_attachment(FakeAttachment('b.pdf', content))
+
+    assert second['deduplicated'] is True
+    assert second['stored_path'] == first['stored_path']
+    assert os.listdir(store.temp_dir) == []
+
+
+def test_failed_save_leaves_no_temp_files(store):
+    """A failing SaveAsFile does not leave partial files behind."""
+    class BrokenAttachment:
+        FileName = 'broken.bin'
+
+        def SaveAsFile(self, path):
+            raise IOError('share unavailable')
+
+    with pytest.raises(IOError):
+        store.save_attachment(BrokenAttachment())
+
+    assert os.listdir(store.temp_dir) == []
+
+
+def test_link_exposes_stored_file(store, tmp_path):
+    """Stored content can be exposed under a readable filename."""
+    stored = store.save_attachment(FakeAttachment('notes.txt', b'notes'))
+
+    link_path = store.link(stored['sha256'], str(tmp_path / 'view' / 'notes.txt'))
+
+    with open(link_path, 'rb') as f:
+        assert f.read() == b'notes'
+
+
+def test_sqlite_records_attachment_references(store, tmp_path):
+    """Saving an email records one reference row per stored attachment."""
+    storage = SQLiteStorage(str(tmp_path / 'emails.db'))
+    stored = store.save_attachment(FakeAttachment('report.pdf', b'content'))
+    email = {
+        'entry_id': 'msg001',
+        'subject': 'Report',
+        'attachments': [
+            {'filename': 'report.pdf', 'size': stored['size'], 'sha256': stored['sha256'],
+             'saved_path': stored['stored_path'], 'content_type': 'application/pdf'},
+            {'filename': 'not-saved.txt', 'size': 10},
+        ],
+    }
+
+    try:
+        assert storage.save_email(email)
+        assert storage.save_email(email)  # Re-saving does not duplicate references
+
+        refs = storage.get_attachments('msg001')
+        assert len(refs) == 1
+        assert refs[0]['sha256'] == stored['sha256']
+        assert refs[0]['stored_path'] == stored['stored_path']
+    finally:
+        storage.close()
@@ -0,0 +1,153 @@
+"""Tests for the background attachment writer."""
+
+import os
+
+import pytest
+
+from outlook_extractor.storage.attachment_store import AttachmentStore
+from outlook_extractor.storage.attachment_writer import AttachmentWriter
+
+
+class FakeAttachment:
+    """Attachment stand-in that writes fixed content on SaveAsFile."""
+
+    def __init__(self, filename, content):
+        self.FileName = filename
+        self.content = content
+
+    def SaveAsFile(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.content)
+
+
+class FlakyStore(AttachmentStore):
+    """Store whose first imports fail, like a briefly unavailable share."""
+
+    def __init__(self, root_dir, failures):
+        super().__init__(root_dir)
+        self.failures = failures
+
+    def import_file(self, path):
+        if self.failures:
+            self.failures -= 1
+            raise OSError('share unavailable')
+        return super().import_file(path)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Create an attachment store in a temporary directory."""
+    return AttachmentStore(str(tmp_path / 'attachments'))
+
+
+def _info(name, content):
+    return {'filename': name, 'size': len(content)}
+
+
+def test_attachments_are_written_in_background(store):
+    """Queued attachments end up in the store and are reported as completed."""
+    infos = [_info(f'file{i}.txt', b'content %d' % (i % 3)) for i in range(10)]
+
+    with AttachmentWriter(store, max_workers=3, max_pending=2) as writer:
+        for i, info in enumerate(infos):
+            assert writer.submit(FakeAttachment(info['filename'], b'content %d' % (i % 3)),
+                                 info, f'msg{i}')
+
+    completed = writer.pop_completed()
+    assert sorted(email_id for email_id, _ in completed) == sorted(f'msg{i}' for i in range(10))
+    assert all(os.path.exists(info['saved_path']) for info in infos)
+
+    stats = writer.stats()
+    assert stats['saved'] == 10
+    assert stats['deduplicated'] == 7
+    assert stats['failed'] == 0
+    assert stats['pending'] == 0
+    assert os.listdir(store.temp_dir) == []
+    assert writer.pop_completed() == []
+
+
+def test_byte_budget_skips_attachments(store):
+    """Attachments beyond the per-run byte budget are not written."""
+    writer = AttachmentWriter(store, byte_budget=10)
+    try:
+        first = _info('a.bin', b'12345678')
+        second = _info('b.bin', b'12345678')
+        assert writer.submit(FakeAttachment('a.bin', b'12345678'), first, 'msg1')
+        assert not writer.submit(FakeAttachment('b.bin', b'12345678'), second, 'msg2')
+    finally:
+        writer.close()
+
+    assert 'error' in second
+    assert writer.stats()['skipped_budget'] == 1
+    assert writer.stats()['saved'] == 1
+
+
+def test_failed_writes_are_retried(tmp_path):
+    """Transient store errors are retried before the attachment is failed."""
+    store = FlakyStore(str(tmp_path / 'attachments'), failures=2)
+    info = _info('report.pdf', b'pdf')
+
+    with AttachmentWriter(store, retries=2, retry_delay=0) as writer:
+        writer.submit(FakeAttachment('report.pdf', b'pdf'), info, 'msg1')
+
+    assert writer.pop_completed() == [('msg1', info)]
+    stats = writer.stats()
+    assert stats['saved'] == 1
+    assert stats['retries'] == 2
+    assert info['sha256']
+
+
+def test_failure_after_import_started_is_retried(store, monkeypatch):
+    """A failed rename into the store leaves the spooled file for the retry."""
+    real_replace = os.replace
+    failures = []
+
+    def failing_replace(source, destination):
+        if not failures:
+            failures.append(destination)
+            raise OSError('rename failed on share')
+        return real_replace(source, destination)
+
+    monkeypatch.setattr(os, 'replace', failing_replace)
+    info = _info('report.pdf', b'pdf')
+    with AttachmentWriter(store, retries=2, retry_delay=0) as writer:
+        writer.submit(FakeAttachment('report.pdf', b'pdf'), info, 'msg1')
+
+    writer.pop_completed()
+    stats = writer.stats()
+    assert failures and stats['saved'] == 1 and stats['retries'] == 1 and stats['failed'] == 0
+    with open(info['saved_path'], 'rb') as f:
+        assert f.read() == b'pdf'
+    assert os.listdir(store.temp_dir) == []
+
+
+def test_results_are_applied_by_pop_completed(tmp_path):
+    """Workers leave attachment_info alone until the submitting thread pops the results."""
+    store = FlakyStore(str(tmp_path / 'attachments'), failures=1)
+    saved, failed = _info('a.txt', b'a'), _info('b.txt', b'b')
+
+    with AttachmentWriter(store, max_workers=1, retries=0) as writer:
+        writer.submit(FakeAttachment('b.txt', b'b'), failed, 'msg2')
+        writer.submit(FakeAttachment('a.txt', b'a'), saved, 'msg1')
+
+    assert saved == _info('a.txt', b'a') and failed == _info('b.txt', b'b')
+    assert writer.pop_completed() == [('msg1', saved)]
+    assert saved['sha256'] and not saved['deduplicated']
+    assert failed['error'] == 'share unavailable'
+    assert writer.pop_completed() == []
+
+
+def test_spool_failure_is_reported(store):
+    """An attachment that cannot be spooled is counted as failed."""
+    class BrokenAttachment:
+        FileName = 'broken.bin'
+
+        def SaveAsFile(self, path):
+            raise IOError('cannot save')
+
+    info = _info('broken.bin', b'')
+    with AttachmentWriter(store) as writer:
+        assert not writer.submit(BrokenAttachment(), info, 'msg1')
+
+    assert info['error'] == 'cannot save'
+    assert writer.stats()['failed'] == 1
@@ -0,0 +1,101 @@
+"""Tests for the line-oriented body cleaner."""
+
+import time
+
+import pytest
+
+from outlook_extractor.core.synthetic_mailbox import SyntheticMailbox
+from outlook_extractor.export.body_cleaner import BodyCleaner, html_to_text
+
+# Cleaning throughput on the synthetic mailbox, well below what one core does
+MIN_MB_PER_SECOND = 5.0
+# Time allowed for one pathological body of PATHOLOGICAL_SIZE characters
+PATHOLOGICAL_SECONDS = 2.0
+PATHOLOGICAL_SIZE = 1_000_000
+
+# Inputs that made the previous DOTALL patterns backtrack quadratically
+PATHOLOGICAL = {
+    'long line without @': ('a' * PATHOLOGICAL_SIZE, False),
+    'dotted words': ('a.' * (PATHOLOGICAL_SIZE // 2), False),
+    'addresses without domain': ('x@' * (PATHOLOGICAL_SIZE // 2), False),
+    'www prefixes': ('www.' * (PATHOLOGICAL_SIZE // 4), False),
+    'phone labels without colon': ('phone ' * (PATHOLOGICAL_SIZE // 6), False),
+    'dash then spaces': ('--' + ' ' * PATHOLOGICAL_SIZE, False),
+    'notices without end': ('confidential information ' * (PATHOLOGICAL_SIZE // 25), False),
+    'attribution without colon': ('On ' + 'x ' * (PATHOLOGICAL_SIZE // 2), False),
+    'unclosed tags': ('<p ' * (PATHOLOGICAL_SIZE // 3), True),
+    'angle brackets': ('<' * PATHOLOGICAL_SIZE, True),
+    'unclosed style': ('<style>' + 'p{margin:0}' * (PATHOLOGICAL_SIZE // 11), True),
+}
+
+
+@pytest.fixture
+def cleaner():
+    return BodyCleaner()
+
+
+def test_removes_quotes_headers_and_signature(cleaner):
+    body = ('Hi Bob,\r\n\r\n\r\n  The report is attached.  \r\n\r\n'
+            'Best regards,\r\nAlice\r\nAcme Corp\r\nPhone: 555-1234\r\nalice@acme.com\r\n\r\n'
+            'On Mon, 1 Jan 2024, Bob wrote:\r\n> Can you send the report?\r\n')
+    assert cleaner.clean(body) == 'Hi Bob,\n\nThe report is attached.'
+
+    body = 'Done.\n-- \nAlice\n\nFrom: Bob\nSent: Monday\nTo: Alice\nSubject: Report\nOlder text'
+    assert cleaner.clean(body) == 'Done.'
+
+
+def test_keeps_content_that_only_looks_like_a_signature(cleaner):
+    assert cleaner.clean('Thanks!') == 'Thanks!'
+    assert cleaner.clean('Thanks for the update, will do.\nSee you.') == 'Thanks for the update, will do.\nSee you.'
+    # Too much text after the closing for a signature block
+    body = 'Intro.\nThanks,\n' + '\n'.join(f'Point {number}.' for number in range(10))
+    assert cleaner.clean(body) == body
+    assert cleaner.clean('Write to alice@example.com about it.') == 'Write to alice@example.com about it.'
+
+
+def test_short_reply_keeps_text_before_the_signature(cleaner):
+    body = 'Hi Bob,\nThanks!\nThe meeting is moved to 3pm.\nPlease confirm.\nBest regards,\nAlice'
+    assert cleaner.clean(body) == 'Hi Bob,\nThanks!\nThe meeting is moved to 3pm.\nPlease confirm.'
+    # A thanks line right after the greeting never starts a signature
+    assert cleaner.clean('Hi Bob,\nThanks!\nAlice') == 'Hi Bob,\nThanks!\nAlice'
+    assert cleaner.clean('Hello team,\nThanks,\nSee the notes below.') == 'Hello team,\nThanks,\nSee the notes below.'
+
+
+def test_confidentiality_notice(cleaner):
+    body = ('Numbers attached. CONFIDENTIALITY NOTICE: this message is private.\n'
+            'If you are an unintended recipient, delete it. Next steps below.\nSee you Friday.')
+    assert cleaner.clean(body) == 'Numbers attached. Next steps below.\nSee you Friday.'
+    # Without its closing clause the notice is kept
+    assert cleaner.clean('Contains confidential information.\nMore.') == 'Contains confidential information.\nMore.'
+
+
+def test_html(cleaner):
+    body = ('<html><head><title>x</title><style>p{margin:0}</style></head><body>'
+            '<p>Hello &amp; welcome.</p><div>Second <b>line</b>.</div>'
+            '<script>alert(1)</script><br>Thanks,<br>Bob</body></html>')
+    assert cleaner.clean(body, is_html=True) == 'Hello & welcome.\n\nSecond line .'
+    assert html_to_text('a<p b') == 'a<p b'
+
+
+def test_synthetic_mailbox_throughput(cleaner):
+    mailbox = SyntheticMailbox(message_count=500, seed=7)
+    bodies = []
+    for index in range(len(mailbox)):
+        spec = mailbox.message(index)
+        bodies.append((spec.html_body, True) if spec.html_body else (spec.body, False))
+    megabytes = sum(len(body) for body, _ in bodies) / 1e6
+
+    started = time.perf_counter()
+    cleaned = [cleaner.clean(body, is_html) for body, is_html in bodies]
+    elapsed = time.perf_counter() - started
+
+    assert all(cleaned)
+    assert megabytes / elapsed > MIN_MB_PER_SECOND
+
+
+@pytest.mark.parametrize('name', sorted(PATHOLOGICAL))
+def test_pathological_input_is_linear(cleaner, name):
+    body, is_html = PATHOLOGICAL[name]
+    started = time.perf_counter()
+    cleaner.clean(body, is_html)
+    assert time.perf_counter() - started < PATHOLOGICAL_SECONDS
@@ -0,0 +1,101 @@
+"""Tests for the headless command-line interface."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from outlook_extractor import cli
+
+PROJECT_ROOT = str(Path(__file__).parent.parent.absolute())
+
+
+@pytest.fixture
+def extractor_class():
+    """Patch the extractor used by the CLI and return its mock class."""
+    com_modules = {'win32com': MagicMock(), 'win32com.client': MagicMock(), 'pythoncom': MagicMock()}
+    with patch.dict(sys.modules, com_modules):
+        with patch('outlook_extractor.extractor.OutlookExtractor') as mock_class:
+            yield mock_class
+
+
+def test_usage_errors_exit_with_code_2(capsys):
+    """Missing commands and invalid values are usage errors."""
+    assert cli.main([]) == cli.EXIT_USAGE
+    assert cli.main(['extract', '--start-date', '2024-13-01']) == cli.EXIT_USAGE
+    assert cli.main(['extract', '--max-emails', '-5']) == cli.EXIT_USAGE
+    assert cli.main(['extract', '--start-date', '2024-02-01', '--end-date', '2024-01-01']) == cli.EXIT_USAGE
+
+
+def test_extract_prints_json_result(extractor_class, capsys, tmp_path):
+    """A successful extraction prints a JSON summary and exits with 0."""
+    extractor = extractor_class.return_value
+    extractor.extract_emails.return_value = {
+        'success': True, 'emails_processed': 3, 'emails_saved': 3,
+        'folders_processed': 1, 'threads': [{'id': 't1'}],
+    }
+
+    exit_code = cli.main([
+        'extract', '--folder', 'Inbox', '--start-date', '2024-01-01', '--end-date', '2024-01-31',
+        '--storage', 'json', '--db-path', str(tmp_path / 'emails.json'),
+        '--workers', '2', '--profile', 'headers', '--json',
+    ])
+
+    assert exit_code == cli.EXIT_OK
+    output = json.loads(capsys.readouterr().out)
+    assert output['emails_saved'] == 3
+    assert 'threads' not in output
+    assert set(output['timings']) >= {'startup_seconds', 'extract_seconds', 'total_seconds'}
+
+    config = extractor_class.call_args.kwargs['config']
+    assert config.get('storage', 'type') == 'json'
+    assert config.get('storage', 'json_path') == str(tmp_path / 'emails.json')
+
+    folders, start_date, end_date = extractor.extract_emails.call_args.args
+    options = extractor.extract_emails.call_args.kwargs
+    assert folders == ['Inbox']
+    assert (start_date.day, end_date.day) == (1, 31)
+    assert options['attachment_workers'] == 2
+    assert options['extraction_profile'] == 'headers'
+    extractor.close.assert_called_once()
+
+
+def test_failed_extraction_exits_with_code_1(extractor_class, capsys):
+    """A failed extraction reports the error and exits with 1."""
+    extractor_class.return_value.extract_emails.return_value = {
+        'success': False, 'error': 'No folders found matching patterns: Missing',
+    }
+
+    assert cli.main(['extract', '--folder', 'Missing']) == cli.EXIT_FAILURE
+    assert 'No folders found' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('command', ['extract', 'export'])
+def test_cli_does_not_import_ui_toolkit(command):
+    """Running the headless CLI never tries to import FreeSimpleGUI."""
+    script = (
+        "import sys\n"
+        "requested = []\n"
+        "class Recorder:\n"
+        "    def find_spec(self, name, path=None, target=None):\n"
+        "        requested.append(name)\n"
+        "        return None\n"
+        "sys.meta_path.insert(0, Recorder())\n"
+        f"sys.argv = ['outlook_extractor', '{command}', '--help']\n"
+        "import runpy\n"
+        "try:\n"
+        "    runpy.run_module('outlook_extractor', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print('UI_IMPORTED' if any(n.startswith('FreeSimpleGUI') for n in requested) else 'UI_NOT_IMPORTED')\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, '-c', script], cwd=PROJECT_ROOT,
+        capture_output=True, text=True, timeout=120
+    )
+
+    assert 'usage:' in completed.stdout
+    assert completed.stdout.strip().endswith('UI_NOT_IMPORTED')
@@ -0,0 +1,102 @@
+"""Tests for ConversationIndex decoding and threading on it."""
+
+from datetime import datetime, timedelta, timezone
+
+from outlook_extractor.core.conversation_index import parse_conversation_index
+from outlook_extractor.core.email_threading import ThreadManager
+from outlook_extractor.core.jwz_threading import JWZThreader
+from outlook_extractor.core.sharded_threading import ShardedThreadManager
+from outlook_extractor.core.synthetic_mailbox import (
+    SyntheticMailbox,
+    conversation_index_child,
+    conversation_index_header,
+)
+
+GUID = bytes(range(16))
+START = datetime(2024, 3, 1, 9, 0, tzinfo=timezone.utc)
+
+
+def header_only_emails(mailbox):
+    """Emails of a mailbox with the ConversationIndex but no reply headers, newest first."""
+    emails = []
+    for index in reversed(range(len(mailbox))):
+        spec = mailbox.message(index)
+        emails.append({
+            'entry_id': spec.entry_id,
+            'message_id': spec.message_id,
+            'subject': spec.subject,
+            'sender_email': spec.sender_email,
+            'thread_index': spec.conversation_index,
+        })
+    return emails
+
+
+def test_decode_header_and_child_blocks():
+    reply_time = START + timedelta(hours=5)
+    raw = conversation_index_header(START, GUID) + conversation_index_child(START, reply_time, 7)
+    index = parse_conversation_index(raw.hex().upper())
+
+    assert index.depth == 1
+    assert index.guid.bytes == GUID
+    assert index.root == raw[:22]
+    assert index.parent_key == raw[:22].hex().upper()
+    assert index.ancestor_keys() == [index.parent_key]
+    assert abs(index.started - START) < timedelta(seconds=2)
+    assert abs(index.sent - reply_time) < timedelta(seconds=2)
+
+    # Code 1 blocks carry deltas too large for 31 bits of 2^18 ticks
+    late = START + timedelta(days=90)
+    far = parse_conversation_index(conversation_index_header(START, GUID) + conversation_index_child(START, late))
+    assert abs(far.sent - late) < timedelta(seconds=2)
+
+
+def test_malformed_values_are_rejected():
+    header = conversation_index_header(START, GUID)
+    assert parse_conversation_index(None) is None
+    assert parse_conversation_index('') is None
+    assert parse_conversation_index('not hex') is None
+    assert parse_conversation_index(header[:21]) is None
+    assert parse_conversation_index(header + b'\x00\x01') is None
+    assert parse_conversation_index(header).depth == 0
+
+
+def test_thread_manager_threads_on_conversation_root():
+    """Without Internet headers, messages are threaded exactly by their index."""
+    mailbox = SyntheticMailbox(message_count=400, seed=5, span_days=30)
+    manager = ThreadManager()
+    for email in header_only_emails(mailbox):
+        manager.add_email(email)
+    assert len(manager.threads_by_id) == mailbox.thread_count
+
+    # Emails without an index are not thrown into one shared thread
+    manager.add_email({'entry_id': 'a', 'message_id': '<a@x>', 'subject': 'A', 'thread_index': ''})
+    manager.add_email({'entry_id': 'b', 'message_id': '<b@x>', 'subject': 'B', 'thread_index': ''})
+    assert len(manager.threads_by_id) == mailbox.thread_count + 2
+
+
+def test_messages_without_message_id_are_threaded_by_index():
+    """Exchange mail read without transport headers has no Message-ID."""
+    mailbox = SyntheticMailbox(message_count=200, seed=11, span_days=30)
+    emails = [dict(email, message_id='') for email in header_only_emails(mailbox)]
+    for manager in (ThreadManager(), ShardedThreadManager(workers=1, shards=4)):
+        for email in emails:
+            manager.add_email(email)
+        threads = manager.get_threads()
+        assert len(threads) == mailbox.thread_count
+        assert sum(len(thread['message_ids']) for thread in threads) == len(emails)
+
+
+def test_jwz_threader_builds_reply_tree_from_index():
+    mailbox = SyntheticMailbox(message_count=300, seed=9, span_days=30)
+    threader = JWZThreader(method='headers', max_depth=0)
+    for email in header_only_emails(mailbox):
+        threader.add_email(email)
+    threads = threader.get_threads()
+    assert len(threads) == mailbox.thread_count
+
+    positions = {mailbox.message_id(i): i for i in range(len(mailbox))}
+    for thread in threads:
+        for message in thread['messages']:
+            parent = mailbox.parent_of(positions[message['message_id']])
+            expected = mailbox.message_id(parent) if parent >= 0 else None
+            assert message['parent_id'] == expected
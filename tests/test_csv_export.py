@@ -0,0 +1,99 @@
+"""Tests for the streaming CSV export."""
+
+import csv
+import tracemalloc
+
+from outlook_extractor.export.csv_exporter import GRAPH_FIELDS, CSVExporter, write_csv_rows
+
+
+def graph_email(number):
+    """Build an email dict in the shape export_emails_to_csv expects."""
+    return {
+        'id': f'id-{number}',
+        'subject': f'Subject {number}',
+        'sender': 'alice@example.com',
+        'toRecipients': ['bob@example.com', 'carol@example.com'],
+        'categories': ['Blue'],
+        'body': {'content': f'<p>Hello {number}.</p><p>Second sentence. Third one.</p>' * 20,
+                 'contentType': 'html'},
+    }
+
+
+def test_export_streams_generator_with_progress(tmp_path):
+    output = tmp_path / 'emails.csv'
+    progress = []
+    result = CSVExporter().export_emails_to_csv(
+        (graph_email(number) for number in range(2500)), str(output),
+        progress_callback=progress.append, progress_every=1000
+    )
+
+    assert result == str(output)
+    assert progress == [1000, 2000, 2500]
+    with open(output, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 2500 and list(rows[0]) == GRAPH_FIELDS
+    assert rows[7]['id'] == 'id-7'
+    assert rows[7]['to_recipients'] == 'bob@example.com; carol@example.com'
+    assert rows[7]['summary'].startswith('Hello 7.')
+
+
+def test_export_of_empty_iterable(tmp_path):
+    output = tmp_path / 'emails.csv'
+    assert CSVExporter().export_emails_to_csv(iter([]), str(output)) == ''
+    assert CSVExporter().export_emails((email for email in []), str(output)) is False
+    assert not output.exists()
+
+
+def test_write_csv_rows_chunks(tmp_path):
+    output = tmp_path / 'rows.csv'
+    progress = []
+    written = write_csv_rows(str(output), ['n', 'text'], ([n, f'line {n}\nwith "quotes"'] for n in range(25)),
+                             chunk_size=10, progress_callback=progress.append, progress_every=5)
+
+    assert written == 25 and progress == [10, 20, 25]
+    with open(output, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['n', 'text'] and len(rows) == 26
+    assert rows[25] == ['24', 'line 24\nwith "quotes"']
+
+
+def test_memory_does_not_grow_with_row_count(tmp_path):
+    exporter = CSVExporter()
+    # Without the cleaned-body cache, which is bounded by clean_cache_size instead
+    exporter.clean_cache_size = 0
+
+    def peak(count):
+        tracemalloc.start()
+        exporter.export_emails_to_csv((graph_email(number) for number in range(count)),
+                                      str(tmp_path / f'{count}.csv'))
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak_bytes
+
+    small, large = peak(1000), peak(4000)
+    assert large < small * 1.5
+
+
+def test_clean_bodies_in_process_pool_keeps_order():
+    exporter = CSVExporter()
+    bodies = [(graph_email(number % 150)['body']['content'], number % 3 != 0) for number in range(600)]
+    expected = [exporter.clean_body(body, is_html) for body, is_html in bodies]
+
+    assert list(CSVExporter().clean_bodies(bodies, workers=2, chunk_size=40)) == expected
+
+
+def test_clean_bodies_reuses_cleaned_bodies(monkeypatch):
+    exporter = CSVExporter()
+    calls = []
+    clean_body = exporter.clean_body
+    monkeypatch.setattr(exporter, 'clean_body', lambda body, is_html: calls.append(body) or clean_body(body, is_html))
+    bodies = [(f'Body {number % 10}\n-- \nSignature', False) for number in range(50)]
+
+    first = list(exporter.clean_bodies(iter(bodies)))
+    assert len(calls) == 10 and first[0] == 'Body 0'
+    assert list(exporter.clean_bodies(bodies)) == first
+    assert len(calls) == 10
+
+    exporter.clean_cache_size = 4
+    assert list(exporter.clean_bodies(bodies[:5])) == first[:5]
+    assert len(exporter._clean_cache) == 4
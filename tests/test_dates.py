@@ -0,0 +1,64 @@
+"""Tests for the shared date normalization."""
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from outlook_extractor.core.dates import DateParser, parse_datetime, to_epoch
+from outlook_extractor.core.email_threading import EmailThread
+from outlook_extractor.storage.json_storage import JSONStorage
+
+UTC = timezone.utc
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2024-03-01T09:30:00+00:00', datetime(2024, 3, 1, 9, 30, tzinfo=UTC)),
+    ('2024-03-01T10:30:00+01:00', datetime(2024, 3, 1, 9, 30, tzinfo=UTC)),
+    ('2024-03-01T09:30:00Z', datetime(2024, 3, 1, 9, 30, tzinfo=UTC)),
+    ('2024-03-01 09:30:00', datetime(2024, 3, 1, 9, 30, tzinfo=UTC)),
+    ('03/01/2024 09:30:00 AM', datetime(2024, 3, 1, 9, 30, tzinfo=UTC)),
+    ('Fri, 01 Mar 2024 09:30:00 +0000', datetime(2024, 3, 1, 9, 30, tzinfo=UTC)),
+    (datetime(2024, 3, 1, 9, 30), datetime(2024, 3, 1, 9, 30, tzinfo=UTC)),
+    (date(2024, 3, 1), datetime(2024, 3, 1, tzinfo=UTC)),
+    (1709285400, datetime(2024, 3, 1, 9, 30, tzinfo=UTC)),
+])
+def test_parse_datetime_returns_aware_values(value, expected):
+    parsed = parse_datetime(value)
+    assert parsed == expected
+    assert parsed.tzinfo is not None
+
+
+@pytest.mark.parametrize('value', [None, '', 'not a date', '2024-13-45', object()])
+def test_unparseable_values_return_none(value):
+    assert parse_datetime(value) is None
+    assert to_epoch(value) is None
+
+
+def test_parser_remembers_the_layout_of_its_source():
+    parser = DateParser()
+    assert parser.to_epoch('03/01/2024 09:30:00') == 1709285400
+    assert parser._last_format == '%m/%d/%Y %H:%M:%S'
+    assert parser.to_epoch('03/02/2024 09:30:00') == 1709285400 + 86400
+    # A different layout is still detected
+    assert parser.to_epoch('2024-03-01') == 1709251200
+
+
+def test_thread_dates_from_extractor_iso_strings():
+    thread = EmailThread(thread_id='t', subject='s')
+    thread.add_email({'entry_id': 'a', 'sent_on': '2024-03-01T09:30:00+00:00'})
+    thread.add_email({'entry_id': 'b', 'received_time': '2024-03-02T09:30:00+00:00'})
+    assert thread.start_date == datetime(2024, 3, 1, 9, 30, tzinfo=UTC)
+    assert thread.end_date == datetime(2024, 3, 2, 9, 30, tzinfo=UTC)
+
+
+def test_json_storage_range_filter_mixes_layouts(tmp_path):
+    storage = JSONStorage(str(tmp_path / 'emails.json'))
+    storage.save_emails([
+        {'id': 'iso', 'sent_date': '2024-03-01T09:30:00+00:00'},
+        {'id': 'naive', 'sent_date': '2024-03-02 09:30:00'},
+        {'id': 'received', 'received_date': datetime(2024, 3, 3, tzinfo=UTC)},
+        {'id': 'outside', 'sent_date': '2023-12-31T23:59:59+00:00'},
+    ])
+    start = datetime(2024, 3, 1, tzinfo=UTC)
+    emails = storage.get_emails_by_date_range(start, start + timedelta(days=7))
+    assert [email['id'] for email in emails] == ['received', 'naive', 'iso']
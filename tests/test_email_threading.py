@@ -363,6 +363,51 @@ class TestThreadManager:
                            if t.status == THREAD_STATUS_ARCHIVED]
         assert len(archived_threads) == 1
         assert archived_threads[0].subject == 'Archived Thread'
+    
+    def test_out_of_order_replies_merge_into_one_thread(self, thread_manager):
+        """Replies seen before their parent end up in the parent's thread."""
+        reply = SAMPLE_EMAIL_2.copy()
+        reply['references'] = ''
+        thread_manager.add_email(SAMPLE_EMAIL_3)
+        thread_manager.add_email(reply)
+        thread_manager.add_email(SAMPLE_EMAIL_1)
+        
+        assert len(thread_manager.threads_by_id) == 1
+        thread = next(iter(thread_manager.threads_by_id.values()))
+        assert thread.message_ids == {'msg001', 'msg002', 'msg003'}
+        assert thread.root_message_id == SAMPLE_EMAIL_1['message_id']
+        assert thread.subject == 'Test Email'
+        for email in (SAMPLE_EMAIL_1, SAMPLE_EMAIL_2, SAMPLE_EMAIL_3):
+            assert thread_manager.thread_id_for(email['message_id']) == thread.thread_id
+        assert thread_manager.pending_references == {}
+    
+    def test_late_message_links_two_existing_threads(self, thread_manager):
+        """A message connecting two separately threaded branches merges them."""
+        reply = SAMPLE_EMAIL_2.copy()
+        reply['references'] = ''
+        grandchild = SAMPLE_EMAIL_3.copy()
+        grandchild.update(entry_id='msg004', message_id='<msg004@example.com>',
+                          in_reply_to='<msg003@example.com>', references='',
+                          sender_email='late@example.com')
+        middle = SAMPLE_EMAIL_3.copy()
+        middle['references'] = ''
+        thread_manager.add_email(reply)
+        thread_manager.add_email(grandchild)
+        assert len(thread_manager.threads_by_id) == 2
+        
+        thread_manager.add_email(middle)
+        
+        assert len(thread_manager.threads_by_id) == 1
+        thread_id, thread = next(iter(thread_manager.threads_by_id.items()))
+        assert thread.message_ids == {'msg002', 'msg003', 'msg004'}
+        assert 'late@example.com' in thread.participants
+        for participant in thread.participants:
+            assert thread_manager.threads_by_participant[participant] == {thread_id}
+        
+        restored = ThreadManager.from_dict(thread_manager.to_dict())
+        assert set(restored.message_to_thread.values()) == {thread_id}
+        restored.add_email(SAMPLE_EMAIL_1)
+        assert list(restored.threads_by_id) == [thread_id]
 
 # Mock the storage module before importing OutlookExtractor
 class MockEmailStorage:
@@ -0,0 +1,86 @@
+"""Tests for body extraction profiles."""
+
+import pytest
+
+from outlook_extractor.core.extraction_profile import (
+    PROFILE_FULL,
+    PROFILE_HEADERS,
+    PROFILE_TEXT,
+    fetch_body,
+    resolve_profile,
+    truncate_body,
+)
+
+
+class CountingMailItem:
+    """Mail item stand-in that records which body properties were read."""
+
+    def __init__(self, body='Plain body', html_body='<p>HTML body</p>'):
+        self._body = body
+        self._html_body = html_body
+        self.reads = []
+
+    @property
+    def Body(self):
+        self.reads.append('Body')
+        return self._body
+
+    @property
+    def HTMLBody(self):
+        self.reads.append('HTMLBody')
+        return self._html_body
+
+
+@pytest.mark.parametrize('profile, expected_reads', [
+    (PROFILE_HEADERS, []),
+    (PROFILE_TEXT, ['Body']),
+    (PROFILE_FULL, ['Body', 'HTMLBody']),
+])
+def test_fetch_body_reads_only_profile_properties(profile, expected_reads):
+    """Each profile should touch only the body properties it needs."""
+    item = CountingMailItem()
+
+    result = fetch_body(item, profile)
+
+    assert item.reads == expected_reads
+    assert result['body_fetched'] is (profile != PROFILE_HEADERS)
+    if profile == PROFILE_FULL:
+        assert result['html_body'] == '<p>HTML body</p>'
+    else:
+        assert result['html_body'] == ''
+
+
+def test_fetch_body_applies_byte_cap():
+    """Bodies larger than the cap are truncated and flagged."""
+    item = CountingMailItem(body='x' * 100, html_body='y' * 10)
+
+    result = fetch_body(item, PROFILE_FULL, max_body_bytes=20)
+
+    assert result['body'] == 'x' * 20
+    assert result['html_body'] == 'y' * 10
+    assert result['body_truncated'] is True
+
+
+def test_truncate_body_keeps_valid_utf8():
+    """Truncation never leaves a partial multi-byte character behind."""
+    text = 'é' * 10  # two bytes per character
+
+    truncated, was_truncated = truncate_body(text, 5)
+
+    assert was_truncated is True
+    assert truncated == 'é' * 2
+    assert len(truncated.encode('utf-8')) <= 5
+
+
+def test_truncate_body_without_limit():
+    """A cap of zero disables truncation."""
+    assert truncate_body('abc', 0) == ('abc', False)
+    assert truncate_body('', 10) == ('', False)
+
+
+def test_resolve_profile():
+    """Profile names are normalized and unknown values fall back."""
+    assert resolve_profile('FULL') == PROFILE_FULL
+    assert resolve_profile('') == PROFILE_TEXT
+    assert resolve_profile(None, fallback=PROFILE_FULL) == PROFILE_FULL
+    assert resolve_profile('bodies') == PROFILE_TEXT
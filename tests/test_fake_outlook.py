@@ -0,0 +1,114 @@
+"""Tests for the synthetic mailbox and the fake Outlook object model."""
+
+import os
+import time
+from datetime import timedelta
+
+import pytest
+
+from outlook_extractor.config import ConfigManager
+from outlook_extractor.core.fake_outlook import FakeOutlookApplication
+from outlook_extractor.core.synthetic_mailbox import SyntheticMailbox
+from outlook_extractor.extractor import OutlookExtractor
+
+
+@pytest.fixture
+def mailbox():
+    """A small seeded mailbox."""
+    return SyntheticMailbox(message_count=300, seed=7, span_days=30,
+                            median_attachment_bytes=2_000)
+
+
+def test_mailbox_is_deterministic(mailbox):
+    """The same seed always produces the same mailbox."""
+    other = SyntheticMailbox(message_count=300, seed=7, span_days=30, end=mailbox.end,
+                             median_attachment_bytes=2_000)
+
+    assert other.stats() == mailbox.stats()
+    assert [other.message(i) for i in (0, 150, 299)] == [mailbox.message(i) for i in (0, 150, 299)]
+    assert SyntheticMailbox(300, seed=8, end=mailbox.end).message(0) != mailbox.message(0)
+
+
+def test_replies_carry_threading_headers(mailbox):
+    """Replies reference their parent and share the thread's ConversationIndex root."""
+    replies = [i for i in range(len(mailbox)) if mailbox.parent_of(i) >= 0]
+    assert replies, "mailbox should contain threads"
+
+    for index in replies[:50]:
+        message = mailbox.message(index)
+        parent = mailbox.message(mailbox.parent_of(index))
+        assert message.in_reply_to == parent.message_id
+        assert message.references[-1] == parent.message_id
+        # 22-byte header plus one 5-byte block per reply level
+        assert message.conversation_index[:44] == parent.conversation_index[:44]
+        assert len(message.conversation_index) == len(parent.conversation_index) + 10
+        assert message.received_time >= parent.received_time
+
+
+def test_items_sort_restrict_and_iterate(mailbox):
+    """Items supports Sort, Restrict, GetFirst/GetNext, GetTable and 1-based indexing."""
+    app = FakeOutlookApplication(mailbox)
+    inbox = app.GetNamespace('MAPI').GetDefaultFolder(6)
+    items = inbox.Items
+    items.Sort('[ReceivedTime]', True)
+
+    first, last = items[1], items[items.Count]
+    assert first.ReceivedTime >= last.ReceivedTime
+    with pytest.raises(IndexError):
+        items[0]
+
+    cutoff = mailbox.end - timedelta(days=10)
+    recent = items.Restrict(f"[ReceivedTime] >= '{cutoff.strftime('%m/%d/%Y %H:%M %p')}'")
+    assert 0 < recent.Count < items.Count
+
+    walked = []
+    item = recent.GetFirst()
+    while item is not None:
+        walked.append(item.EntryID)
+        item = recent.GetNext()
+    assert len(walked) == recent.Count
+
+    table = recent.GetTable()
+    table.Columns.Add('SenderEmailAddress')
+    row = table.GetNextRow()
+    assert row('EntryID') == walked[0]
+    assert '@' in row('SenderEmailAddress')
+
+
+def test_calls_are_counted_and_delayed(mailbox):
+    """COM calls are counted and pay the configured latency."""
+    app = FakeOutlookApplication(mailbox, call_latency=0.002)
+    items = app.GetNamespace('MAPI').GetDefaultFolder(6).Items
+
+    started = time.perf_counter()
+    item = items[1]
+    _ = item.Subject, item.Body
+    elapsed = time.perf_counter() - started
+
+    assert app.call_counts['MailItem.Subject'] == 1
+    assert app.call_counts['MailItem.Body'] == 1
+    assert elapsed >= 3 * 0.002
+
+
+def test_extract_emails_end_to_end(mailbox, tmp_path):
+    """OutlookExtractor.extract_emails runs unchanged against the fake."""
+    config = ConfigManager()
+    config.config['storage']['sqlite_path'] = str(tmp_path / 'emails.db')
+    config.config['storage']['output_dir'] = str(tmp_path)
+    extractor = OutlookExtractor(config=config)
+    extractor.outlook_client = FakeOutlookApplication(mailbox)
+
+    try:
+        result = extractor.extract_emails(
+            ['Inbox', 'Archive', 'Sent Items'], mailbox.start, mailbox.end,
+            extract_attachments=True
+        )
+        assert result['success'], result.get('error')
+        assert result['folders_processed'] == 3
+        assert result['emails_processed'] == len(mailbox)
+        assert extractor.storage.get_email_count() == len(mailbox)
+        assert result['attachments']['failed'] == 0
+        assert result['attachments']['saved'] > 0
+        assert os.listdir(os.path.join(str(tmp_path), 'attachments'))
+    finally:
+        extractor.close()
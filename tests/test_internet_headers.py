@@ -0,0 +1,66 @@
+"""Tests for Internet header parsing."""
+
+from outlook_extractor.core.internet_headers import (
+    parse_internet_headers,
+    parse_message_ids,
+)
+
+RAW_HEADERS = (
+    "Received: from mail.example.com (10.0.0.1) by mx.example.com;\r\n"
+    "\tMon, 2 Jan 2023 10:00:00 +0000\r\n"
+    "Received: from client.example.com by mail.example.com;\r\n"
+    "\tMon, 2 Jan 2023 09:59:58 +0000\r\n"
+    "Message-ID: <reply002@example.com>\r\n"
+    "In-Reply-To: <root001@example.com>\r\n"
+    "References: <root001@example.com>\r\n"
+    "\t<middle001@example.com>\r\n"
+    "Subject: Re: Quarterly report\r\n"
+    "X-Mailer: Example Mail 1.0\r\n"
+    "MIME-Version: 1.0\r\n"
+    "\r\n"
+)
+
+
+def test_threading_headers_are_extracted():
+    """Message-ID, In-Reply-To and References are parsed for threading."""
+    headers = parse_internet_headers(RAW_HEADERS)
+
+    assert headers['message_id'] == '<reply002@example.com>'
+    assert headers['in_reply_to'] == '<root001@example.com>'
+    assert headers['references'] == ['<root001@example.com>', '<middle001@example.com>']
+
+
+def test_default_allowlist_filters_fields():
+    """Only the default header set is kept, with repeated headers as lists."""
+    fields = parse_internet_headers(RAW_HEADERS)['fields']
+
+    assert 'X-Mailer' not in fields
+    assert 'Subject' not in fields
+    assert fields['MIME-Version'] == '1.0'
+    assert len(fields['Received']) == 2
+    assert fields['Received'][0].startswith('from mail.example.com')
+    assert '\n' not in fields['Received'][0]
+
+
+def test_custom_allowlist():
+    """A configured allowlist controls persisted fields but not threading data."""
+    headers = parse_internet_headers(RAW_HEADERS, allowlist=['x-mailer'])
+
+    assert headers['fields'] == {'X-Mailer': 'Example Mail 1.0'}
+    assert headers['message_id'] == '<reply002@example.com>'
+
+    everything = parse_internet_headers(RAW_HEADERS, allowlist=['*'])['fields']
+    assert 'Subject' in everything and 'X-Mailer' in everything
+
+
+def test_missing_or_invalid_headers():
+    """Empty or non-string input yields an empty structure."""
+    for raw in (None, '', 42):
+        headers = parse_internet_headers(raw)
+        assert headers == {'message_id': '', 'in_reply_to': '', 'references': [], 'fields': {}}
+
+
+def test_parse_message_ids_without_brackets():
+    """Bare message IDs are split on whitespace."""
+    assert parse_message_ids('a@example.com b@example.com') == ['a@example.com', 'b@example.com']
+    assert parse_message_ids('') == []
@@ -0,0 +1,48 @@
+"""Tests for the compact collections used by threading."""
+
+import sys
+
+from outlook_extractor.core.email_threading import EmailThread, ThreadManager
+from outlook_extractor.core.interning import AddressSet, ParticipantIndex, SortedStringSet
+
+
+def test_compact_sets_behave_like_sets():
+    addresses = AddressSet(['b@example.com', 'a@example.com', 'b@example.com'])
+    assert addresses == {'a@example.com', 'b@example.com'}
+    assert 'a@example.com' in addresses and 'c@example.com' not in addresses
+    addresses.update(AddressSet(['c@example.com']))
+    addresses.discard('a@example.com')
+    assert sorted(addresses) == ['b@example.com', 'c@example.com']
+
+    message_ids = SortedStringSet(['m2', 'm1'])
+    message_ids.update(['m3', 'm1'])
+    assert list(message_ids) == ['m1', 'm2', 'm3']
+    assert message_ids | {'m4'} == {'m1', 'm2', 'm3', 'm4'}
+
+
+def test_participant_index_moves_addresses_between_threads():
+    index = ParticipantIndex()
+    index.add('a@example.com', 't1')
+    index.add('a@example.com', 't2')
+    index.add('b@example.com', 't2')
+    index.replace('a@example.com', 't2', 't1')
+    index.replace('b@example.com', 't2', 't1')
+    assert dict(index.items()) == {'a@example.com': {'t1'}, 'b@example.com': {'t1'}}
+    assert index.get('nobody@example.com', []) == []
+    assert dict(ParticipantIndex.from_dict({'a@example.com': ['t1', 't3']}).items()) == {
+        'a@example.com': {'t1', 't3'}
+    }
+
+
+def test_thread_state_uses_compact_storage():
+    thread = EmailThread(thread_id='t', subject='s', participants={'x@example.com'}, message_ids={'m1'})
+    assert isinstance(thread.participants, AddressSet)
+    assert isinstance(thread.message_ids, SortedStringSet)
+    if sys.version_info >= (3, 10):
+        assert not hasattr(thread, '__dict__')
+
+    manager = ThreadManager()
+    manager.add_email({'entry_id': 'e1', 'message_id': '<1@x>', 'subject': 'S',
+                       'sender_email': 'Alice@Example.com'})
+    restored = ThreadManager.from_dict(manager.to_dict())
+    assert restored.get_threads_for_participant('alice@example.com')[0]['message_ids'] == ['e1']
@@ -0,0 +1,94 @@
+"""Tests for JWZ threading."""
+
+from outlook_extractor.core.jwz_threading import (
+    JWZThreader,
+    METHOD_CONTENT,
+    METHOD_HEADERS,
+    normalize_subject,
+    resolve_thread_method,
+)
+
+
+def make_email(number, subject='Budget', references=(), in_reply_to=None):
+    """Email dict with Message-ID <number@example.com>."""
+    return {
+        'entry_id': f'entry{number}',
+        'message_id': f'<{number}@example.com>',
+        'subject': subject,
+        'sender_email': f'user{number}@example.com',
+        'references': ' '.join(f'<{ref}@example.com>' for ref in references),
+        'in_reply_to': f'<{in_reply_to}@example.com>' if in_reply_to else None,
+        'body': 'x' * 1000,
+    }
+
+
+def tree(thread):
+    """(entry id, parent entry id, depth) for each message of a thread."""
+    entries = {m['message_id']: m['entry_id'] for m in thread['messages']}
+    return [(m['entry_id'], entries.get(m['parent_id']), m['depth']) for m in thread['messages']]
+
+
+def test_normalize_subject():
+    assert normalize_subject('RE: Fwd: AW:  Quarterly   Budget ') == 'quarterly budget'
+    assert normalize_subject('Re[2]: SV: WG: Budget') == 'budget'
+    assert normalize_subject('Regarding the budget') == 'regarding the budget'
+    assert normalize_subject(None) == ''
+    assert resolve_thread_method('references') == METHOD_HEADERS
+    assert resolve_thread_method('bogus') == 'hybrid'
+
+
+def test_reference_chain_in_any_order_with_missing_parent():
+    """Replies are linked through References even when a parent was never seen."""
+    threader = JWZThreader()
+    threader.add_email(make_email(3, 'Re: Budget', references=(1, 2), in_reply_to=2))
+    threader.add_email(make_email(4, 'Re: Budget', references=(1,), in_reply_to=1))
+    threader.add_email(make_email(1))
+
+    threads = threader.get_threads()
+    assert len(threads) == 1
+    # Message 2 was never seen: its empty container is pruned and 3 moves up
+    assert tree(threads[0]) == [('entry1', None, 0), ('entry3', 'entry1', 1), ('entry4', 'entry1', 1)]
+    assert threads[0]['root_message_id'] == '<1@example.com>'
+    assert set(threads[0]['participants']) == {'user1@example.com', 'user3@example.com', 'user4@example.com'}
+    # Rebuilding gives the same result
+    assert threader.get_threads() == threads
+
+
+def test_reference_loops_are_ignored():
+    threader = JWZThreader()
+    threader.add_email(make_email(1, references=(2,)))
+    threader.add_email(make_email(2, references=(1,)))
+    assert [len(t['messages']) for t in threader.get_threads()] == [2]
+
+
+def test_thread_methods_and_subject_grouping():
+    """hybrid groups by subject, headers does not, content ignores headers."""
+    emails = [
+        make_email(1),
+        make_email(2, 'Re: Budget'),  # reply without headers, e.g. from a web client
+        make_email(3, 'Lunch', references=(1,), in_reply_to=1),
+    ]
+    counts = {}
+    for method in ('hybrid', METHOD_HEADERS, METHOD_CONTENT):
+        threader = JWZThreader(method=method)
+        for email in emails:
+            threader.add_email(email)
+        counts[method] = sorted(len(t['messages']) for t in threader.get_threads())
+    assert counts == {'hybrid': [3], METHOD_HEADERS: [1, 2], METHOD_CONTENT: [1, 2]}
+
+
+def test_two_originals_with_same_subject_share_an_empty_root():
+    threader = JWZThreader()
+    threader.add_email(make_email(1, 'Status'))
+    threader.add_email(make_email(2, 'Status'))
+    threads = threader.get_threads()
+    assert len(threads) == 1
+    assert tree(threads[0]) == [('entry1', None, 1), ('entry2', None, 1)]
+
+
+def test_max_depth_flattens_deep_replies():
+    threader = JWZThreader(max_depth=2)
+    for number in range(1, 7):
+        threader.add_email(make_email(number, references=range(1, number)))
+    depths = [depth for _, _, depth in tree(threader.get_threads()[0])]
+    assert depths == [0, 1, 2, 2, 2, 2]
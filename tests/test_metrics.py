@@ -0,0 +1,86 @@
+"""Tests for per-run extraction metrics."""
+
+import json
+import sys
+
+from outlook_extractor.config import ConfigManager
+from outlook_extractor.core import metrics as run_metrics
+from outlook_extractor.core.fake_outlook import FakeOutlookApplication
+from outlook_extractor.core.metrics import RunMetrics, metrics_path_for
+from outlook_extractor.core.synthetic_mailbox import SyntheticMailbox
+from outlook_extractor.extractor import OutlookExtractor
+
+
+def test_stage_timers_and_counters():
+    """Stages accumulate time and calls; folders report throughput."""
+    metrics = RunMetrics(run_id='run-1')
+    for _ in range(3):
+        with metrics.stage('header_extraction'):
+            pass
+    metrics.add_time('restrict', 0.5, calls=2)
+    metrics.count('emails_saved', 10)
+    metrics.count('emails_saved', 5)
+    metrics.folder_started('Inbox')
+    metrics.folder_finished('Inbox', 15)
+    metrics.finish()
+
+    data = metrics.to_dict()
+    assert data['run_id'] == 'run-1'
+    assert data['stages']['header_extraction']['calls'] == 3
+    assert data['stages']['restrict'] == {
+        'seconds': 0.5, 'calls': 2, 'mean_ms': 250.0,
+        'share': data['stages']['restrict']['share'],
+    }
+    assert data['counters'] == {'emails_saved': 15}
+    assert data['folders']['Inbox']['emails'] == 15
+    assert json.loads(json.dumps(data)) == data
+
+
+def test_write_json_appends_one_line_per_run(tmp_path):
+    """Each run appends a line to the metrics file next to the database."""
+    path = metrics_path_for(str(tmp_path / 'out' / 'emails.db'))
+    assert path.endswith('emails.metrics.jsonl')
+
+    for run_id in ('a', 'b'):
+        metrics = RunMetrics(run_id=run_id)
+        metrics.finish()
+        assert metrics.write_json(path)
+
+    with open(path, encoding='utf-8') as f:
+        assert [json.loads(line)['run_id'] for line in f] == ['a', 'b']
+
+
+def test_peak_rss_falls_back_without_psutil(monkeypatch):
+    """Peak RSS comes from getrusage when psutil is not installed."""
+    monkeypatch.setitem(sys.modules, 'psutil', None)
+    assert run_metrics.peak_rss_bytes() > 0
+
+
+def test_extract_emails_returns_stage_metrics(tmp_path):
+    """extract_emails reports per-stage timings and writes them when asked."""
+    mailbox = SyntheticMailbox(message_count=120, seed=3, span_days=10)
+    config = ConfigManager()
+    config.config['storage']['sqlite_path'] = str(tmp_path / 'emails.db')
+    extractor = OutlookExtractor(config=config)
+    extractor.outlook_client = FakeOutlookApplication(mailbox)
+
+    try:
+        result = extractor.extract_emails(
+            mailbox.folder_names, mailbox.start, mailbox.end,
+            extract_attachments=False, write_metrics=True
+        )
+    finally:
+        extractor.close()
+
+    assert result['success'], result.get('error')
+    data = result['metrics']
+    for stage in ('folder_discovery', 'restrict', 'item_fetch', 'header_extraction',
+                  'normalization', 'threading', 'body_fetch', 'storage_write'):
+        assert stage in data['stages'], stage
+    assert data['stages']['header_extraction']['calls'] == len(mailbox)
+    assert data['counters']['emails_saved'] == len(mailbox)
+    assert sum(folder['emails'] for folder in data['folders'].values()) == len(mailbox)
+    assert data['peak_rss_bytes'] > 0
+
+    with open(tmp_path / 'emails.metrics.jsonl', encoding='utf-8') as f:
+        assert json.loads(f.readline())['run_id'] == data['run_id']
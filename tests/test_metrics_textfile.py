@@ -0,0 +1,99 @@
+"""Tests for the node_exporter textfile metrics sink."""
+
+import os
+import re
+
+from outlook_extractor.config import ConfigManager
+from outlook_extractor.core.fake_outlook import FakeOutlookApplication
+from outlook_extractor.core.metrics_textfile import (
+    NullMetricsSink, TextfileMetricsSink, create_metrics_sink,
+)
+from outlook_extractor.core.synthetic_mailbox import SyntheticMailbox
+from outlook_extractor.extractor import OutlookExtractor
+
+SAMPLE_LINE = re.compile(r'^[a-z_]+(\{[a-z_]+="(?:[^"\\]|\\.)*"(,[a-z_]+="(?:[^"\\]|\\.)*")*\})? \S+$')
+
+
+def parse_samples(text):
+    """Map 'name{labels}' to value, checking every line is well formed."""
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith('# '):
+            assert line.split()[1] in ('HELP', 'TYPE'), line
+            continue
+        assert SAMPLE_LINE.match(line), line
+        key, value = line.rsplit(' ', 1)
+        samples[key] = float(value)
+    return samples
+
+
+def test_disabled_sink_is_a_no_op(tmp_path):
+    """Without a path nothing is recorded or written."""
+    sink = create_metrics_sink('', 'run-1')
+    assert isinstance(sink, NullMetricsSink) and not sink.enabled
+    sink.observe_batch('Inbox', 0.1, 100)
+    assert sink.flush() is False
+    sink.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_render_and_atomic_flush(tmp_path):
+    """Counters, histograms and labels are written in exposition format."""
+    path = str(tmp_path / 'collector' / 'outlook.prom')
+    sink = TextfileMetricsSink(path, run_id='run-1', interval=3600)
+    sink.observe_batch('Inbox', 0.2, 100, com_errors=2)
+    sink.observe_batch('Inbox', 3.0, 50)
+    sink.observe_batch('Team "A"', 0.01, 10)
+    sink.observe_storage_write('Inbox', 0.004, 150)
+    sink.set_queue_depth('attachments', 7)
+    sink.set_attachment_bytes(2048)
+
+    assert sink.flush()
+    assert sink.maybe_flush() is False  # Interval not reached
+    assert os.listdir(os.path.dirname(path)) == ['outlook.prom']
+
+    with open(path, encoding='utf-8') as f:
+        samples = parse_samples(f.read())
+    inbox = 'run_id="run-1",folder="Inbox"'
+    assert samples[f'outlook_extractor_emails_processed_total{{{inbox}}}'] == 150
+    assert samples[f'outlook_extractor_com_errors_total{{{inbox}}}'] == 2
+    assert samples[f'outlook_extractor_batch_duration_seconds_bucket{{{inbox},le="0.25"}}'] == 1
+    assert samples[f'outlook_extractor_batch_duration_seconds_bucket{{{inbox},le="+Inf"}}'] == 2
+    assert samples[f'outlook_extractor_batch_duration_seconds_count{{{inbox}}}'] == 2
+    assert samples[f'outlook_extractor_storage_write_duration_seconds_bucket{{{inbox},le="0.005"}}'] == 1
+    assert samples['outlook_extractor_queue_depth{run_id="run-1",queue="attachments"}'] == 7
+    assert samples['outlook_extractor_attachment_bytes_total{run_id="run-1"}'] == 2048
+    assert samples['outlook_extractor_emails_processed_total{run_id="run-1",folder="Team \\"A\\""}'] == 10
+    assert samples['outlook_extractor_run_finished{run_id="run-1"}'] == 0
+
+    sink.close(success=False)
+    with open(path, encoding='utf-8') as f:
+        samples = parse_samples(f.read())
+    assert samples['outlook_extractor_run_finished{run_id="run-1"}'] == 1
+    assert samples['outlook_extractor_run_success{run_id="run-1"}'] == 0
+
+
+def test_extract_emails_writes_textfile(tmp_path):
+    """An extraction keeps the textfile up to date with per-folder metrics."""
+    mailbox = SyntheticMailbox(message_count=150, seed=5, span_days=10)
+    config = ConfigManager()
+    config.config['storage']['sqlite_path'] = str(tmp_path / 'emails.db')
+    extractor = OutlookExtractor(config=config)
+    extractor.outlook_client = FakeOutlookApplication(mailbox)
+    path = tmp_path / 'outlook.prom'
+
+    try:
+        result = extractor.extract_emails(
+            mailbox.folder_names, mailbox.start, mailbox.end,
+            extract_attachments=False, metrics_textfile=str(path)
+        )
+    finally:
+        extractor.close()
+
+    assert result['success'], result.get('error')
+    samples = parse_samples(path.read_text(encoding='utf-8'))
+    run_id = result['metrics']['run_id']
+    processed = sum(value for key, value in samples.items()
+                    if key.startswith(f'outlook_extractor_emails_processed_total{{run_id="{run_id}"'))
+    assert processed == len(mailbox)
+    assert samples[f'outlook_extractor_run_success{{run_id="{run_id}"}}'] == 1
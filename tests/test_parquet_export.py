@@ -0,0 +1,70 @@
+"""Tests for the Parquet export."""
+
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+from outlook_extractor.export.csv_exporter import GRAPH_FIELDS, CSVExporter
+from outlook_extractor.export.parquet_exporter import ParquetExporter
+
+
+def graph_email(number):
+    """Build an email dict in the shape export_emails_to_csv expects."""
+    return {
+        'id': f'id-{number}',
+        'subject': f'Subject {number}',
+        'sender': 'alice@example.com',
+        'toRecipients': ['bob@example.com', 'carol@example.com'],
+        'sent_datetime': f'2024-01-02T09:{number % 60:02d}:00+02:00',
+        'received_datetime': '',
+        'has_attachments': number % 2 == 0,
+        'is_read': 'False',
+        'categories': ['Blue'],
+        'body': {'content': f'<p>Hello {number}.</p><p>Second sentence.</p>', 'contentType': 'html'},
+    }
+
+
+def test_columns_are_typed():
+    columns = ParquetExporter()._columns(list(CSVExporter().cleaned([graph_email(3)])))
+
+    assert list(columns) == GRAPH_FIELDS
+    assert columns['id'] == ['id-3'] and columns['conversation_id'] == [None]
+    assert columns['sent_datetime'] == [datetime(2024, 1, 2, 7, 3, tzinfo=timezone.utc)]
+    assert columns['received_datetime'] == [None]
+    assert columns['has_attachments'] == [False] and columns['is_read'] == [False]
+    assert columns['to_recipients'] == [['bob@example.com', 'carol@example.com']]
+    assert columns['cc_recipients'] == [[]] and columns['categories'] == [['Blue']]
+    # Bodies are cleaned as for the CSV export
+    clean_body = CSVExporter().clean_body(graph_email(3)['body']['content'], is_html=True)
+    assert columns['clean_body'] == [clean_body] and clean_body.startswith('Hello 3.')
+    assert columns['summary'] == [CSVExporter().extract_summary(clean_body)]
+
+
+def test_without_pyarrow(monkeypatch, tmp_path):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    output = tmp_path / 'emails.parquet'
+    assert ParquetExporter().export_emails([graph_email(1)], str(output)) == ''
+    assert not output.exists()
+
+
+def test_round_trip(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    output = tmp_path / 'emails.parquet'
+    progress = []
+
+    result = ParquetExporter().export_emails((graph_email(number) for number in range(25)), str(output),
+                                             row_group_size=10, progress_callback=progress.append,
+                                             progress_every=10)
+
+    assert result == str(output) and progress == [10, 20, 25]
+    parquet_file = pq.ParquetFile(result)
+    assert parquet_file.metadata.num_row_groups == 3
+    assert parquet_file.metadata.row_group(0).column(0).compression == 'ZSTD'
+    table = parquet_file.read()
+    assert table.column_names == GRAPH_FIELDS
+    assert str(table.schema.field('sent_datetime').type) == 'timestamp[us, tz=UTC]'
+    rows = table.to_pylist()
+    assert rows[4]['has_attachments'] is True and rows[4]['is_read'] is False
+    assert rows[4]['to_recipients'] == ['bob@example.com', 'carol@example.com']
+    assert rows[4]['sent_datetime'] == datetime(2024, 1, 2, 7, 4, tzinfo=timezone.utc)
@@ -0,0 +1,66 @@
+"""Tests for extraction profiling hooks."""
+
+import os
+import pstats
+
+from outlook_extractor.config import ConfigManager
+from outlook_extractor.core import profiling
+from outlook_extractor.core.fake_outlook import FakeOutlookApplication
+from outlook_extractor.core.profiling import RunProfiler, resolve_profiler
+from outlook_extractor.core.synthetic_mailbox import SyntheticMailbox
+from outlook_extractor.extractor import OutlookExtractor
+
+
+def test_resolve_profiler(monkeypatch):
+    """'auto' and 'sampling' fall back to cProfile without pyinstrument."""
+    monkeypatch.setattr(profiling, 'sampling_profiler_available', lambda: False)
+    assert resolve_profiler('off') is None
+    assert resolve_profiler('') is None
+    assert resolve_profiler('cProfile') == 'cprofile'
+    assert resolve_profiler('auto') == 'cprofile'
+    assert resolve_profiler('sampling') == 'cprofile'
+
+    monkeypatch.setattr(profiling, 'sampling_profiler_available', lambda: True)
+    assert resolve_profiler('auto') == 'sampling'
+
+
+def test_cprofile_and_allocation_reports(tmp_path):
+    """cProfile stats load with pstats and allocations are reported per folder."""
+    with RunProfiler(str(tmp_path), mode='cprofile', trace_memory=True, top_n=5, run_id='r1') as profiler:
+        kept = []
+        for folder in ('Inbox', 'Archive'):
+            kept.append([str(i) * 10 for i in range(5000)])
+            profiler.folder_finished(folder)
+
+    names = sorted(os.listdir(tmp_path))
+    assert names == ['allocations-r1.txt', 'profile-r1.prof', 'profile-r1.txt']
+    assert pstats.Stats(str(tmp_path / 'profile-r1.prof')).total_calls > 0
+
+    report = (tmp_path / 'allocations-r1.txt').read_text(encoding='utf-8')
+    assert '== After folder Inbox ==' in report
+    assert '== Growth during folder Archive ==' in report
+    assert profiler.summary()['files'] == profiler.outputs
+
+
+def test_extract_emails_with_profiler(tmp_path):
+    """extract_emails writes profile reports and lists them in the result."""
+    mailbox = SyntheticMailbox(message_count=60, seed=2, span_days=5)
+    config = ConfigManager()
+    config.config['storage']['sqlite_path'] = str(tmp_path / 'emails.db')
+    extractor = OutlookExtractor(config=config)
+    extractor.outlook_client = FakeOutlookApplication(mailbox)
+
+    try:
+        result = extractor.extract_emails(
+            mailbox.folder_names, mailbox.start, mailbox.end, extract_attachments=False,
+            profiler='cprofile', trace_memory=True, profile_dir=str(tmp_path / 'profiles')
+        )
+    finally:
+        extractor.close()
+
+    assert result['success'], result.get('error')
+    assert result['emails_processed'] == len(mailbox)
+    files = result['profiling']['files']
+    run_id = result['metrics']['run_id']
+    assert os.path.join(str(tmp_path / 'profiles'), f'profile-{run_id}.prof') in files
+    assert all(os.path.exists(path) for path in files)
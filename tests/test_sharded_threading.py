@@ -0,0 +1,112 @@
+"""Tests for sharded threading across worker processes."""
+
+import random
+
+import pytest
+
+from outlook_extractor.core.email_threading import ThreadManager
+from outlook_extractor.core.sharded_threading import ShardedThreadManager, shard_of, thread_in_shards
+from outlook_extractor.core.synthetic_mailbox import SyntheticMailbox
+
+
+def mailbox_emails(count, seed):
+    """Extractor-style email dicts of a synthetic mailbox."""
+    mailbox = SyntheticMailbox(message_count=count, seed=seed)
+    emails = []
+    for index in range(len(mailbox)):
+        spec = mailbox.message(index)
+        emails.append({
+            'entry_id': spec.entry_id,
+            'message_id': spec.message_id,
+            'in_reply_to': spec.in_reply_to,
+            'references': ' '.join(spec.references),
+            'thread_index': spec.conversation_index,
+            'subject': spec.subject,
+            'sender_email': spec.sender_email,
+            'to_recipients': '; '.join(address for _, address in spec.to),
+            'sent_on': spec.sent_on.isoformat(),
+            'categories': spec.categories,
+        })
+    return emails
+
+
+def single_process(emails):
+    manager = ThreadManager()
+    for email_data in emails:
+        manager.add_email(email_data)
+    return manager.to_dict()
+
+
+def assert_same_state(sharded, expected):
+    assert sharded['threads'] == expected['threads']
+    for key in ('message_to_thread', 'pending_references', 'thread_aliases'):
+        assert sharded[key] == expected[key]
+    assert ({address: set(ids) for address, ids in sharded['threads_by_participant'].items()}
+            == {address: set(ids) for address, ids in expected['threads_by_participant'].items()})
+
+
+def test_matches_single_process_on_synthetic_mailbox():
+    emails = mailbox_emails(800, seed=11)
+    expected = single_process(emails)
+    for shards in (1, 3, 8):
+        assert_same_state(thread_in_shards(emails, shards=shards).to_dict(), expected)
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_matches_single_process_with_links_across_shards(seed):
+    """Without ConversationIndex and with edited subjects, replies land in other shards."""
+    rng = random.Random(seed)
+    emails = mailbox_emails(600, seed=seed)
+    rng.shuffle(emails)
+    for email_data in emails:
+        if rng.random() < 0.6:
+            email_data['thread_index'] = None
+        if rng.random() < 0.3:
+            email_data['subject'] = rng.choice(['Re: Budget', 'Budget', email_data['subject'] + ' (updated)'])
+        if rng.random() < 0.2:
+            email_data['references'] = ''
+
+    assert len({shard_of(email_data, 5) for email_data in emails}) == 5
+    assert_same_state(thread_in_shards(emails, shards=5).to_dict(), single_process(emails))
+
+
+def test_older_ancestor_in_another_shard():
+    """A reply joins its nearest known ancestor only, leaving the older one in its own thread."""
+    def email(name, subject, **headers):
+        return dict({'entry_id': name, 'message_id': f'<{name}>', 'subject': subject,
+                     'sender_email': f'{name}@example.com'}, **headers)
+
+    emails = [
+        email('a', 'Alpha'),
+        email('b', 'Beta'),
+        email('c', 'Gamma', in_reply_to='<b>', references='<a> <b>'),
+        email('d', 'Delta', references='<a>'),
+    ]
+    assert len({shard_of(email_data, 4) for email_data in emails}) > 1
+
+    expected = single_process(emails)
+    assert len(expected['threads']) == 2
+    assert_same_state(thread_in_shards(emails, shards=4).to_dict(), expected)
+
+
+def test_process_pool():
+    emails = mailbox_emails(300, seed=5)
+    for email_data in emails[::3]:
+        email_data['thread_index'] = None
+    assert_same_state(thread_in_shards(emails, workers=2, shards=3).to_dict(), single_process(emails))
+
+
+def test_manager_threads_collected_emails_on_access():
+    emails = mailbox_emails(200, seed=9)
+    manager = ShardedThreadManager(workers=1, shards=4)
+    for email_data in emails[:150]:
+        manager.add_email(email_data)
+    assert not manager.threads_by_id
+
+    threads = manager.get_threads()
+    assert sum(len(thread['message_ids']) for thread in threads) == 150
+
+    # Later emails are threaded directly
+    for email_data in emails[150:]:
+        manager.add_email(email_data)
+    assert_same_state(manager.to_dict(), single_process(emails))
@@ -0,0 +1,73 @@
+"""Startup cost checks for the package and the headless CLI."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import outlook_extractor
+
+PROJECT_ROOT = str(Path(__file__).parent.parent.absolute())
+
+# Modules that must only be imported when the feature needing them is used
+HEAVY_MODULES = ('pandas', 'numpy', 'FreeSimpleGUI', 'win32com', 'pythoncom', 'requests')
+
+# Cumulative import time budget for the headless entry point, in milliseconds
+IMPORT_BUDGET_MS = float(os.environ.get('OUTLOOK_EXTRACTOR_IMPORT_BUDGET_MS', '300'))
+
+
+def _import_profile(module):
+    """Import a module in a fresh interpreter with -X importtime.
+
+    Returns:
+        Tuple of (cumulative import time in ms, heavy modules that were loaded)
+    """
+    script = (
+        f"import sys, {module}\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=120
+    )
+    assert completed.returncode == 0, completed.stderr
+
+    cumulative_us = None
+    for line in completed.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative_us = int(parts[1].strip())
+    assert cumulative_us is not None, f"{module} not found in -X importtime output"
+
+    loaded = [name for name in completed.stdout.strip().split(',') if name]
+    return cumulative_us / 1000, loaded
+
+
+@pytest.mark.parametrize('module', [
+    'outlook_extractor',
+    'outlook_extractor.cli',
+    'outlook_extractor.storage',
+    'outlook_extractor.extractor',
+])
+def test_import_does_not_load_heavy_dependencies(module):
+    """Importing the package and headless modules defers heavy dependencies."""
+    _, loaded = _import_profile(module)
+    assert loaded == []
+
+
+def test_cli_import_time_budget():
+    """The headless CLI imports within the startup budget (best of three runs)."""
+    best_ms = min(_import_profile('outlook_extractor.cli')[0] for _ in range(3))
+    assert best_ms < IMPORT_BUDGET_MS, f"import took {best_ms:.1f}ms (budget {IMPORT_BUDGET_MS}ms)"
+
+
+def test_lazy_exports():
+    """Public names resolve on first access; unknown names raise AttributeError."""
+    from outlook_extractor.config import ConfigManager
+
+    assert outlook_extractor.ConfigManager is ConfigManager
+    assert 'SQLiteStorage' in dir(outlook_extractor)
+    with pytest.raises(AttributeError):
+        outlook_extractor.NoSuchThing
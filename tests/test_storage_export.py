@@ -0,0 +1,193 @@
+"""Tests for filtered exports straight from storage."""
+
+import csv
+import json
+import sqlite3
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+from outlook_extractor import cli
+from outlook_extractor import storage as storage_package
+from outlook_extractor.export.csv_exporter import CSVExporter, body_hash
+
+# Attribute lookups on the package, as test_email_threading swaps it out of sys.modules
+EmailFilter = storage_package.EmailFilter
+JSONStorage = storage_package.JSONStorage
+SQLiteStorage = storage_package.SQLiteStorage
+
+
+@pytest.fixture(autouse=True)
+def real_storage_modules(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'outlook_extractor.storage', storage_package)
+    monkeypatch.setitem(sys.modules, 'outlook_extractor.storage.base', storage_package.base)
+
+
+def stored_email(number, folder='Inbox', sender='alice@example.com', body='Weekly status update'):
+    """Build an email dict in the shape the extractor stores."""
+    return {
+        'id': f'id-{number}',
+        'entry_id': f'id-{number}',
+        'subject': f'Report {number}',
+        'sender_email': sender,
+        'to_recipients': 'Bob <bob@example.com>; carol@example.com',
+        'sent_on': f'2024-01-{number:02d}T09:30:00+02:00',
+        'received_time': f'2024-01-{number:02d}T09:31:00+02:00',
+        'folder': folder,
+        'body': body,
+    }
+
+
+def mailbox():
+    return [
+        stored_email(1),
+        stored_email(2, folder='Inbox/Projects', body='Invoice 42 attached'),
+        stored_email(3, folder='Sent Items', sender='Bob@Example.com'),
+        stored_email(4, body='Please pay the invoice'),
+        stored_email(5, folder='Inbox/Projects', sender='bob@example.com'),
+    ]
+
+
+@pytest.fixture(params=['sqlite', 'json'])
+def storage(request, tmp_path):
+    if request.param == 'sqlite':
+        backend = SQLiteStorage(str(tmp_path / 'emails.db'))
+    else:
+        backend = JSONStorage(str(tmp_path / 'emails.json'))
+    backend.save_emails(mailbox())
+    yield backend
+    backend.close()
+
+
+def ids(emails):
+    return [email_data['id'] for email_data in emails]
+
+
+def test_filters(storage):
+    assert ids(storage.iter_emails()) == ['id-1', 'id-2', 'id-3', 'id-4', 'id-5']
+    assert ids(storage.iter_emails(EmailFilter(query='invoice'))) == ['id-2', 'id-4']
+    assert ids(storage.iter_emails(EmailFilter(folders=['Inbox/*']))) == ['id-2', 'id-5']
+    assert ids(storage.iter_emails(EmailFilter(senders=['bob@example.com']))) == ['id-3', 'id-5']
+    assert ids(storage.iter_emails(EmailFilter(folders=['Inbox*'], limit=2))) == ['id-1', 'id-2']
+    assert storage.count_emails(EmailFilter(folders=['Inbox*'], limit=2)) == 4
+
+
+def test_date_range_compares_instants(storage):
+    # 2024-01-02T09:30+02:00 is 07:30 UTC
+    email_filter = EmailFilter(start_date=datetime(2024, 1, 2, 7, 30, tzinfo=timezone.utc),
+                               end_date=datetime(2024, 1, 4, 7, 29, tzinfo=timezone.utc))
+    assert ids(storage.iter_emails(email_filter)) == ['id-2', 'id-3']
+
+
+def test_search_index_follows_updates(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / 'emails.db'))
+    storage.save_emails(mailbox())
+    storage.save_email(stored_email(1, body='Final invoice'))
+    assert ids(storage.iter_emails(EmailFilter(query='invoice'))) == ['id-1', 'id-2', 'id-4']
+    storage.close()
+
+
+def test_search_index_built_for_existing_database(tmp_path):
+    path = str(tmp_path / 'emails.db')
+    storage = SQLiteStorage(path)
+    storage.save_emails(mailbox())
+    storage.close()
+    with sqlite3.connect(path) as conn:
+        for name in ('emails_fts', 'emails_search'):
+            kind = 'TABLE' if name == 'emails_fts' else 'VIEW'
+            conn.execute(f'DROP {kind} {name}')
+
+    storage = SQLiteStorage(path)
+    assert ids(storage.iter_emails(EmailFilter(query='invoice'))) == ['id-2', 'id-4']
+    storage.close()
+
+
+def test_query_punctuation_is_not_fts_syntax(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / 'emails.db'))
+    emails = mailbox() + [dict(stored_email(6, body='Q3-report draft'), subject='Re: Report 6')]
+    storage.save_emails(emails)
+    assert ids(storage.iter_emails(EmailFilter(query='Q3-report'))) == ['id-6']
+    assert ids(storage.iter_emails(EmailFilter(query='re: report'))) == ['id-6']
+    assert storage.count_emails(EmailFilter(query='"invoice" AND')) == 2
+    storage.close()
+
+
+def test_read_errors_end_the_stream_with_an_error(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / 'emails.db'))
+    storage.save_emails(mailbox())
+    emails = storage.iter_emails(batch_size=1)
+    assert next(emails)['id'] == 'id-1'
+    storage.conn.close()
+    with pytest.raises(sqlite3.Error):
+        next(emails)
+
+
+def test_export_from_storage(storage, tmp_path):
+    output = tmp_path / 'export.csv'
+    progress = []
+    result = CSVExporter().export_from_storage(storage, str(output), EmailFilter(folders=['Inbox*']),
+                                               progress_callback=progress.append)
+
+    assert result == str(output) and progress == [4]
+    with open(output, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['id'] for row in rows] == ['id-1', 'id-2', 'id-4', 'id-5']
+    assert rows[1]['to_recipients'] == 'bob@example.com; carol@example.com'
+    assert rows[1]['parent_folder'] == 'Inbox/Projects'
+    assert rows[1]['clean_body'] == 'Invoice 42 attached'
+    assert CSVExporter().export_from_storage(storage, str(tmp_path / 'none.csv'),
+                                             EmailFilter(query='nothing')) == ''
+
+
+def test_cleaned_bodies_are_stored_once(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / 'emails.db'))
+    storage.save_emails(mailbox())
+    first, second = CSVExporter(), CSVExporter()
+    # Cleaned before, without storage: still saved by the export
+    list(first.clean_bodies([('Invoice 42 attached', False)]))
+
+    first.export_from_storage(storage, str(tmp_path / 'first.csv'))
+    second.export_from_storage(storage, str(tmp_path / 'second.csv'))
+
+    # Three distinct bodies, cleaned by the first export only
+    assert first.bodies_cleaned == 3 and second.bodies_cleaned == 0
+    assert (tmp_path / 'first.csv').read_bytes() == (tmp_path / 'second.csv').read_bytes()
+    key = body_hash('Invoice 42 attached')
+    assert storage.get_cleaned_bodies([key], first.body_cleaner.version) == {
+        key: ('Invoice 42 attached', 'Invoice 42 attached')}
+    storage.close()
+
+
+def test_cleaner_version_change_recomputes(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / 'emails.db'))
+    storage.save_emails(mailbox())
+    exporter = CSVExporter()
+    version = exporter.body_cleaner.version
+    assert exporter.refresh_cleaned_bodies(storage) == 3
+    assert CSVExporter().refresh_cleaned_bodies(storage) == 0
+
+    bumped = CSVExporter()
+    bumped.body_cleaner.version = version + 1
+    assert bumped.refresh_cleaned_bodies(storage, EmailFilter(folders=['Inbox/*'])) == 2
+    keys = [body_hash(body) for body in ('Weekly status update', 'Invoice 42 attached', 'Please pay the invoice')]
+    assert len(storage.get_cleaned_bodies(keys, version + 1)) == 2
+    assert len(storage.get_cleaned_bodies(keys, version)) == 1
+    storage.close()
+
+
+def test_cli_export(tmp_path, capsys):
+    db_path = str(tmp_path / 'emails.db')
+    storage = SQLiteStorage(db_path)
+    storage.save_emails(mailbox())
+    storage.close()
+    output = tmp_path / 'export.csv'
+
+    exit_code = cli.main(['export', '--storage', 'sqlite', '--db-path', db_path, '--output', str(output),
+                          '--start-date', '2024-01-02', '--end-date', '2024-01-04', '--sender', 'bob@example.com',
+                          '--json'])
+
+    assert exit_code == cli.EXIT_OK
+    assert json.loads(capsys.readouterr().out)['emails_exported'] == 1
+    with open(output, newline='', encoding='utf-8') as f:
+        assert [row['id'] for row in csv.DictReader(f)] == ['id-3']
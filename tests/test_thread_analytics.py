@@ -0,0 +1,107 @@
+"""Tests for the vectorized thread analytics."""
+
+import csv
+import math
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from outlook_extractor.core.email_threading import ThreadManager
+from outlook_extractor.core.thread_analytics import ThreadFrame
+from outlook_extractor.export.csv_exporter import CSVExporter
+from outlook_extractor.storage.sqlite_storage import SQLiteStorage
+
+# Monday 2024-03-04
+EMAILS = [
+    # Thread A: alice, bob replies after 1h, bob follows up, alice replies after 3h
+    {'message_id': '<a1>', 'sender_email': 'alice@example.com', 'to_recipients': 'Bob <bob@example.com>',
+     'sent_on': '2024-03-04T09:00:00+00:00'},
+    {'message_id': '<a2>', 'in_reply_to': '<a1>', 'sender_email': 'bob@example.com',
+     'to_recipients': 'alice@example.com', 'cc_recipients': 'carol@example.com',
+     'sent_on': '2024-03-04T10:00:00+00:00'},
+    {'message_id': '<a3>', 'in_reply_to': '<a2>', 'sender_email': 'bob@example.com',
+     'to_recipients': 'alice@example.com', 'sent_on': '2024-03-04T10:30:00+00:00'},
+    {'message_id': '<a4>', 'in_reply_to': '<a3>', 'sender_email': 'ALICE@example.com',
+     'to_recipients': 'bob@example.com', 'sent_on': '2024-03-04T13:30:00+00:00'},
+    # Thread B: a single message on Tuesday
+    {'message_id': '<b1>', 'sender_email': 'dave@example.com', 'to_recipients': 'alice@example.com',
+     'subject': 'Other', 'sent_on': '2024-03-05T22:15:00+00:00'},
+    # No date: skipped
+    {'message_id': '<c1>', 'sender_email': 'erin@example.com', 'subject': 'Undated'},
+]
+
+
+def build_frame():
+    manager = ThreadManager()
+    emails = [dict(email_data, entry_id=email_data['message_id'].strip('<>'),
+                   subject=email_data.get('subject', 'Plan'))
+              for email_data in EMAILS]
+    for email_data in emails:
+        manager.add_email(email_data)
+    return manager, emails, manager.analytics(emails)
+
+
+def test_thread_stats():
+    manager, _, frame = build_frame()
+    assert len(frame) == 5 and frame.skipped_messages == 1
+
+    stats = frame.thread_stats()
+    row = list(stats['thread_id']).index(manager.thread_id_for('<a1>'))
+    assert stats['messages'][row] == 4
+    assert stats['participants'][row] == 3
+    assert stats['duration_seconds'][row] == 4.5 * 3600
+    assert stats['replies'][row] == 2
+    assert stats['mean_reply_seconds'][row] == 2 * 3600
+    assert stats['median_reply_seconds'][row] == 2 * 3600
+    assert stats['max_reply_seconds'][row] == 3 * 3600
+
+    single = 1 - row
+    assert stats['messages'][single] == 1
+    assert stats['duration_seconds'][single] == 0
+    assert stats['replies'][single] == 0
+    assert math.isnan(stats['median_reply_seconds'][single])
+
+
+def test_activity_and_summary():
+    _, _, frame = build_frame()
+    activity = frame.activity()
+    assert activity.shape == (7, 24)
+    assert activity[0, 9] == 1 and activity[0, 10] == 2 and activity[1, 22] == 1
+    assert frame.activity(utc_offset_minutes=120)[2, 0] == 1  # Tuesday 22:15 is Wednesday 00:15
+
+    summary = frame.summary()
+    assert summary['messages'] == 5 and summary['threads'] == 2 and summary['replies'] == 2
+    assert summary['reply_seconds']['p50'] == 2 * 3600
+    assert summary['busiest_hour'] == 10
+
+
+def test_frame_from_storage_matches_emails(tmp_path):
+    manager, emails, frame = build_frame()
+    storage = SQLiteStorage(str(tmp_path / 'emails.db'))
+    for email_data in emails:
+        email_data['thread_id'] = manager.thread_id_for(email_data['message_id'])
+    storage.save_emails(emails)
+
+    stored = ThreadFrame.from_storage(storage).thread_stats()
+    storage.close()
+    expected = frame.thread_stats()
+    order, stored_order = np.argsort(expected['thread_id']), np.argsort(stored['thread_id'])
+    for column in ('messages', 'duration_seconds', 'replies', 'max_reply_seconds'):
+        np.testing.assert_array_equal(stored[column][stored_order], expected[column][order])
+
+
+def test_export_thread_analysis(tmp_path):
+    manager, emails, _ = build_frame()
+    output = tmp_path / 'threads.csv'
+    CSVExporter().export_thread_analysis(emails, str(output), manager.thread_id_for)
+
+    with open(output, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['messages'] for row in rows] == ['4', '1']
+    assert rows[0]['first_message'] == '2024-03-04T09:00:00Z'
+    assert rows[1]['median_reply_seconds'] == ''
+
+    with open(tmp_path / 'threads_activity.csv', newline='', encoding='utf-8') as f:
+        activity = list(csv.reader(f))
+    assert activity[1][0] == 'Monday' and activity[1][1 + 10] == '2'
@@ -0,0 +1,146 @@
+"""Tests for threading against the state stored in SQLite."""
+
+import random
+import sqlite3
+
+import pytest
+
+from outlook_extractor.core.email_threading import ThreadManager
+from outlook_extractor.core.persistent_threading import PersistentThreadManager
+from outlook_extractor.core.synthetic_mailbox import SyntheticMailbox
+from outlook_extractor.storage.sqlite_storage import SQLiteStorage
+
+
+def make_email(entry_id, subject='Budget', sender='alice@example.com', in_reply_to=None, references=''):
+    """Build a minimal email dict for threading."""
+    return {
+        'entry_id': entry_id,
+        'id': entry_id,
+        'message_id': f'<{entry_id}@example.com>',
+        'in_reply_to': f'<{in_reply_to}@example.com>' if in_reply_to else None,
+        'references': ' '.join(f'<{ref}@example.com>' for ref in references.split()),
+        'subject': subject,
+        'sender_email': sender,
+        'to_recipients': 'team@example.com',
+        'sent_on': '2024-03-01 09:00:00',
+    }
+
+
+@pytest.fixture
+def storage(tmp_path):
+    """Create a SQLite storage in a temporary directory."""
+    storage = SQLiteStorage(str(tmp_path / 'emails.db'))
+    yield storage
+    storage.close()
+
+
+def run(storage, emails):
+    """Thread emails in a fresh manager (a new run) and flush them."""
+    manager = PersistentThreadManager(storage)
+    for email_data in emails:
+        manager.add_email(email_data)
+        email_data['thread_id'] = manager.thread_id_for(email_data['message_id'])
+    storage.save_emails(emails)
+    assert manager.flush()
+    return manager
+
+
+def test_delta_run_threads_against_stored_history(storage):
+    run(storage, [make_email('root', sender='alice@example.com')])
+
+    manager = run(storage, [
+        make_email('reply', subject='Re: Budget', sender='bob@example.com', in_reply_to='root', references='root')
+    ])
+
+    assert not manager.threads_by_id and not manager.message_to_thread
+    thread_id = storage.get_message_thread_id('<root@example.com>')
+    assert storage.get_message_thread_id('<reply@example.com>') == thread_id
+    thread = manager.get_thread(thread_id)
+    assert set(thread['message_ids']) == {'root', 'reply'}
+    assert thread['root_message_id'] == '<root@example.com>'
+    assert [t['thread_id'] for t in manager.get_threads_for_participant('BOB@example.com')] == [thread_id]
+    assert [t['thread_id'] for t in manager.get_threads()] == [thread_id]
+
+
+def test_late_message_merges_stored_threads(storage):
+    run(storage, [
+        make_email('a', subject='Budget'),
+        make_email('r', subject='Re: Budget', sender='carol@example.com', in_reply_to='p', references='p'),
+    ])
+    thread_a = storage.get_message_thread_id('<a@example.com>')
+    thread_r = storage.get_message_thread_id('<r@example.com>')
+
+    # The missing middle message links the stored threads
+    run(storage, [make_email('p', subject='Re: Budget', in_reply_to='a', references='a')])
+
+    survivor = storage.get_message_thread_id('<p@example.com>')
+    absorbed = thread_r if survivor == thread_a else thread_a
+    assert thread_a != thread_r
+    assert {storage.get_message_thread_id(f'<{m}@example.com>') for m in 'apr'} == {survivor}
+    assert storage.get_thread_alias(absorbed) == survivor
+    assert storage.get_thread(absorbed)['thread_id'] == survivor
+    assert {storage.get_email(m)['thread_id'] for m in 'apr'} == {survivor}
+    assert [t['thread_id'] for t in storage.get_threads_for_participant('carol@example.com')] == [survivor]
+    assert len(storage.get_threads()) == 1
+
+
+def test_reply_before_parent_across_runs(storage):
+    run(storage, [make_email('reply', in_reply_to='parent', references='parent')])
+    assert storage.get_pending_reference('<parent@example.com>')
+
+    run(storage, [make_email('parent')])
+
+    assert storage.get_pending_reference('<parent@example.com>') is None
+    assert (storage.get_message_thread_id('<parent@example.com>')
+            == storage.get_message_thread_id('<reply@example.com>'))
+
+
+def test_batched_runs_match_in_memory_threading(storage):
+    mailbox = SyntheticMailbox(message_count=600, seed=7)
+    emails = []
+    for index in range(len(mailbox)):
+        spec = mailbox.message(index)
+        emails.append({
+            'entry_id': spec.entry_id,
+            'message_id': spec.message_id,
+            'in_reply_to': spec.in_reply_to,
+            'references': ' '.join(spec.references),
+            'thread_index': spec.conversation_index,
+            'subject': spec.subject,
+            'sender_email': spec.sender_email,
+            'sent_on': str(spec.sent_on),
+        })
+    random.Random(3).shuffle(emails)
+
+    memory = ThreadManager()
+    for email_data in emails:
+        memory.add_email(dict(email_data))
+    manager = PersistentThreadManager(storage)
+    for start in range(0, len(emails), 50):
+        for email_data in emails[start:start + 50]:
+            manager.add_email(dict(email_data))
+        manager.flush()
+
+    def groups(thread_id_for):
+        threads = {}
+        for email_data in emails:
+            threads.setdefault(thread_id_for(email_data['message_id']), set()).add(email_data['entry_id'])
+        return sorted(sorted(members) for members in threads.values())
+
+    assert groups(storage.get_message_thread_id) == groups(memory.thread_id_for)
+    assert len(manager.get_threads()) == len(memory.threads_by_id)
+
+
+def test_existing_database_gains_thread_columns(tmp_path):
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE threads (id TEXT PRIMARY KEY, subject TEXT, participants TEXT, '
+                 'message_ids TEXT, start_date TIMESTAMP, end_date TIMESTAMP, status TEXT, '
+                 'categories TEXT, created_at TIMESTAMP, updated_at TIMESTAMP)')
+    conn.commit()
+    conn.close()
+
+    storage = SQLiteStorage(path)
+    run(storage, [make_email('root')])
+    assert storage.get_threads()[0]['root_message_id'] == '<root@example.com>'
+    storage.close()